@@ -5,3 +5,6 @@ class AcademicsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sims.academics"
     verbose_name = "Core Setup"
+
+    def ready(self):
+        import sims.academics.signals  # noqa: F401  – register signal handlers
@@ -1,5 +1,7 @@
 from datetime import date
-from django.db.models import Count
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
 from django.utils import timezone
 from sims.academics.models import (
     ResidentTrainingRecord,
@@ -17,68 +19,184 @@ from sims.supervision.models import ResidentSupervisorAssignment
 from sims.academics.services import get_academic_data_quality
 
 
-def get_admin_monitoring_dashboard() -> dict:
-    total_residents = ResidentProfile.objects.filter(is_archived=False).count()
-    active_residents = ResidentProfile.objects.filter(is_archived=False, user__is_active=True).count()
-    
-    residents_with_record = ResidentTrainingRecord.objects.filter(is_active=True).values_list("resident_id", flat=True).distinct()
-    residents_with_record_count = len(residents_with_record)
+MONITORING_CACHE_VERSION_KEY = "academics:monitoring:version"
+DATA_QUALITY_COUNT_CACHE_KEY = "academics:monitoring:data-quality-count"
+
+
+def _monitoring_cache_version() -> int:
+    version = cache.get(MONITORING_CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(MONITORING_CACHE_VERSION_KEY, 1, None)
+        version = cache.get(MONITORING_CACHE_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_monitoring_cache() -> None:
+    """Retire every cached monitoring payload by bumping the shared cache version."""
+    try:
+        cache.incr(MONITORING_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.add(MONITORING_CACHE_VERSION_KEY, 2, None)
+
+
+def _cached_monitoring(name: str, build):
+    ttl = getattr(settings, "MONITORING_CACHE_TTL", 0)
+    if ttl <= 0:
+        return build()
+    key = f"academics:monitoring:{name}:v{_monitoring_cache_version()}"
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, ttl)
+    return payload
+
+
+def _data_quality_issue_count() -> int:
+    """
+    Total issue count from the full data-quality scan.
+
+    The scan is far heavier than the rest of the dashboard, so its total is
+    cached on its own TTL rather than the write-bumped monitoring version.
+    """
+    ttl = getattr(settings, "MONITORING_DATA_QUALITY_TTL", 0)
+    if ttl > 0:
+        count = cache.get(DATA_QUALITY_COUNT_CACHE_KEY)
+        if count is not None:
+            return count
+    dq = get_academic_data_quality()
+    count = sum(section["count"] for section in dq.get("sections", []))
+    if ttl > 0:
+        cache.set(DATA_QUALITY_COUNT_CACHE_KEY, count, ttl)
+    return count
+
+
+_EMPTY_COUNTS = {
+    "active_residents": 0,
+    "training_records": 0,
+    "pending_evaluations": 0,
+    "approved_evaluations": 0,
+    "pending_logbooks": 0,
+    "verified_logbooks": 0,
+}
+
+
+def _resident_counts_by(dimension: str) -> dict:
+    """
+    Per-group resident workload counters for a ResidentProfile FK dimension
+    (``department_ref``, ``program_ref`` or ``academic_session_ref``).
+
+    Keyed by the FK's stored value; issues four grouped queries regardless of
+    how many groups exist.
+    """
+    counts: dict = {}
+
+    def bucket(group_id):
+        return counts.setdefault(group_id, dict(_EMPTY_COUNTS))
+
+    for row in (
+        ResidentProfile.objects.filter(is_archived=False)
+        .values(dimension)
+        .annotate(n=Count("id"))
+        .order_by()
+    ):
+        bucket(row[dimension])["active_residents"] = row["n"]
+
+    record_key = f"resident__{dimension}"
+    for row in (
+        ResidentTrainingRecord.objects.filter(is_active=True, resident__is_archived=False)
+        .values(record_key)
+        .annotate(n=Count("id"))
+        .order_by()
+    ):
+        bucket(row[record_key])["training_records"] = row["n"]
+
+    for row in (
+        EvaluationSubmission.objects.filter(resident__is_archived=False)
+        .values(record_key)
+        .annotate(
+            pending=Count("id", filter=Q(status="SUBMITTED")),
+            approved=Count("id", filter=Q(status="APPROVED")),
+        )
+        .order_by()
+    ):
+        group = bucket(row[record_key])
+        group["pending_evaluations"] = row["pending"]
+        group["approved_evaluations"] = row["approved"]
+
+    for row in (
+        LogbookEntry.objects.filter(resident__is_archived=False)
+        .values(record_key)
+        .annotate(
+            pending=Count("id", filter=Q(status="SUBMITTED")),
+            verified=Count("id", filter=Q(status="VERIFIED")),
+        )
+        .order_by()
+    ):
+        group = bucket(row[record_key])
+        group["pending_logbooks"] = row["pending"]
+        group["verified_logbooks"] = row["verified"]
+
+    return counts
+
+
+def _build_admin_monitoring_dashboard() -> dict:
+    resident_totals = ResidentProfile.objects.filter(is_archived=False).aggregate(
+        total=Count("id"),
+        active=Count("id", filter=Q(user__is_active=True)),
+    )
+    total_residents = resident_totals["total"]
+    active_residents = resident_totals["active"]
+
+    residents_with_record_count = ResidentTrainingRecord.objects.filter(is_active=True).aggregate(
+        n=Count("resident_id", distinct=True)
+    )["n"]
     residents_without_record_count = total_residents - residents_with_record_count
-    
-    residents_with_primary_supervisor = ResidentSupervisorAssignment.objects.filter(
+
+    residents_with_primary_supervisor_count = ResidentSupervisorAssignment.objects.filter(
         assignment_type=ResidentSupervisorAssignment.ASSIGNMENT_PRIMARY,
         status="ACTIVE"
-    ).values_list("resident_id", flat=True).distinct()
-    residents_with_primary_supervisor_count = len(residents_with_primary_supervisor)
+    ).aggregate(n=Count("resident_id", distinct=True))["n"]
     residents_without_primary_supervisor_count = total_residents - residents_with_primary_supervisor_count
-    
+
     eval_stats = dict(
-        EvaluationSubmission.objects.values_list("status").annotate(count=Count("id"))
+        EvaluationSubmission.objects.values_list("status").annotate(count=Count("id")).order_by()
     )
     log_stats = dict(
-        LogbookEntry.objects.values_list("status").annotate(count=Count("id"))
+        LogbookEntry.objects.values_list("status").annotate(count=Count("id")).order_by()
     )
-    
-    pending_reviews = SupervisorReviewQueueItem.objects.filter(status=SupervisorReviewQueueItem.STATUS_PENDING).count()
-    overdue_reviews = SupervisorReviewQueueItem.objects.filter(
-        status=SupervisorReviewQueueItem.STATUS_PENDING,
-        due_date__lt=date.today()
-    ).count()
-    
-    returned_evals = EvaluationSubmission.objects.filter(status="RETURNED").count()
-    returned_logbooks = LogbookEntry.objects.filter(status="RETURNED").count()
-    returned_items = returned_evals + returned_logbooks
-    
-    rejected_items = EvaluationSubmission.objects.filter(status="REJECTED").count() + LogbookEntry.objects.filter(status="REJECTED").count()
-    
-    verified_logbooks = LogbookEntry.objects.filter(status="VERIFIED").count()
-    approved_evaluations = EvaluationSubmission.objects.filter(status="APPROVED").count()
-    
-    dept_breakdown = []
-    for dept in Department.objects.filter(active=True):
-        dept_residents = ResidentProfile.objects.filter(department_ref=dept, is_archived=False).values_list("id", flat=True)
-        active_records = ResidentTrainingRecord.objects.filter(resident_id__in=dept_residents, is_active=True).count()
-        dept_breakdown.append({
+
+    review_stats = SupervisorReviewQueueItem.objects.filter(
+        status=SupervisorReviewQueueItem.STATUS_PENDING
+    ).aggregate(
+        pending=Count("id"),
+        overdue=Count("id", filter=Q(due_date__lt=date.today())),
+    )
+
+    returned_items = eval_stats.get("RETURNED", 0) + log_stats.get("RETURNED", 0)
+    rejected_items = eval_stats.get("REJECTED", 0) + log_stats.get("REJECTED", 0)
+
+    dept_counts = _resident_counts_by("department_ref")
+    dept_breakdown = [
+        {
             "id": dept.id,
             "name": dept.name,
-            "active_residents": len(dept_residents),
-            "active_records": active_records,
-        })
-        
-    prog_breakdown = []
-    for prog in TrainingProgram.objects.filter(active=True):
-        prog_residents = ResidentProfile.objects.filter(program_ref=prog, is_archived=False).values_list("id", flat=True)
-        active_records = ResidentTrainingRecord.objects.filter(resident_id__in=prog_residents, is_active=True).count()
-        prog_breakdown.append({
+            "active_residents": dept_counts.get(dept.id, _EMPTY_COUNTS)["active_residents"],
+            "active_records": dept_counts.get(dept.id, _EMPTY_COUNTS)["training_records"],
+        }
+        for dept in Department.objects.filter(active=True)
+    ]
+
+    prog_counts = _resident_counts_by("program_ref")
+    prog_breakdown = [
+        {
             "id": prog.id,
             "name": prog.name,
-            "active_residents": len(prog_residents),
-            "active_records": active_records,
-        })
+            "active_residents": prog_counts.get(prog.id, _EMPTY_COUNTS)["active_residents"],
+            "active_records": prog_counts.get(prog.id, _EMPTY_COUNTS)["training_records"],
+        }
+        for prog in TrainingProgram.objects.filter(active=True)
+    ]
 
-    dq = get_academic_data_quality()
-    dq_issue_count = sum(section["count"] for section in dq.get("sections", []))
-    
     return {
         "total_residents": total_residents,
         "active_residents": active_residents,
@@ -88,18 +206,23 @@ def get_admin_monitoring_dashboard() -> dict:
         "residents_without_primary_supervisor": residents_without_primary_supervisor_count,
         "eval_stats": eval_stats,
         "log_stats": log_stats,
-        "pending_supervisor_reviews": pending_reviews,
-        "overdue_supervisor_reviews": overdue_reviews,
+        "pending_supervisor_reviews": review_stats["pending"],
+        "overdue_supervisor_reviews": review_stats["overdue"],
         "returned_items": returned_items,
         "rejected_items": rejected_items,
-        "verified_logbooks": verified_logbooks,
-        "approved_evaluations": approved_evaluations,
+        "verified_logbooks": log_stats.get("VERIFIED", 0),
+        "approved_evaluations": eval_stats.get("APPROVED", 0),
         "department_breakdown": dept_breakdown,
         "program_breakdown": prog_breakdown,
-        "data_quality_issue_count": dq_issue_count,
     }
 
 
+def get_admin_monitoring_dashboard() -> dict:
+    data = dict(_cached_monitoring("admin-dashboard", _build_admin_monitoring_dashboard))
+    data["data_quality_issue_count"] = _data_quality_issue_count()
+    return data
+
+
 def get_supervisor_monitoring_dashboard(supervisor: SupervisorProfile) -> dict:
     assigned_residents_ids = ResidentSupervisorAssignment.objects.filter(
         supervisor=supervisor,
@@ -422,68 +545,76 @@ def get_logbook_report(filters: dict) -> list:
     return rows
 
 
-def get_department_monitoring_summary() -> list:
+def _build_department_monitoring_summary() -> list:
+    counts = _resident_counts_by("department_ref")
+    supervisors = dict(
+        SupervisorProfile.objects.filter(is_archived=False)
+        .values_list("department_ref")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
     res = []
     for dept in Department.objects.filter(active=True):
-        residents = ResidentProfile.objects.filter(department_ref=dept, is_archived=False).values_list("id", flat=True)
-        active_records = ResidentTrainingRecord.objects.filter(resident_id__in=residents, is_active=True).count()
-        supervisors = SupervisorProfile.objects.filter(department_ref=dept, is_archived=False).count()
-        pending_evals = EvaluationSubmission.objects.filter(resident_id__in=residents, status="SUBMITTED").count()
-        pending_logbooks = LogbookEntry.objects.filter(resident_id__in=residents, status="SUBMITTED").count()
-        approved_evals = EvaluationSubmission.objects.filter(resident_id__in=residents, status="APPROVED").count()
-        verified_logbooks = LogbookEntry.objects.filter(resident_id__in=residents, status="VERIFIED").count()
+        group = counts.get(dept.id, _EMPTY_COUNTS)
         res.append({
             "department_id": dept.id,
             "name": dept.name,
             "code": dept.code,
-            "active_residents": len(residents),
-            "supervisors": supervisors,
-            "training_records": active_records,
-            "pending_evaluations": pending_evals,
-            "pending_logbooks": pending_logbooks,
-            "approved_evaluations": approved_evals,
-            "verified_logbooks": verified_logbooks,
+            "active_residents": group["active_residents"],
+            "supervisors": supervisors.get(dept.id, 0),
+            "training_records": group["training_records"],
+            "pending_evaluations": group["pending_evaluations"],
+            "pending_logbooks": group["pending_logbooks"],
+            "approved_evaluations": group["approved_evaluations"],
+            "verified_logbooks": group["verified_logbooks"],
         })
     return res
 
 
-def get_program_monitoring_summary() -> list:
+def _build_program_monitoring_summary() -> list:
+    counts = _resident_counts_by("program_ref")
     res = []
     for prog in TrainingProgram.objects.filter(active=True):
-        residents = ResidentProfile.objects.filter(program_ref=prog, is_archived=False).values_list("id", flat=True)
-        active_records = ResidentTrainingRecord.objects.filter(resident_id__in=residents, is_active=True).count()
-        pending_evals = EvaluationSubmission.objects.filter(resident_id__in=residents, status="SUBMITTED").count()
-        pending_logbooks = LogbookEntry.objects.filter(resident_id__in=residents, status="SUBMITTED").count()
-        approved_evals = EvaluationSubmission.objects.filter(resident_id__in=residents, status="APPROVED").count()
-        verified_logbooks = LogbookEntry.objects.filter(resident_id__in=residents, status="VERIFIED").count()
+        group = counts.get(prog.id, _EMPTY_COUNTS)
         res.append({
             "program_id": prog.id,
             "name": prog.name,
             "code": prog.code,
-            "active_residents": len(residents),
-            "training_records": active_records,
-            "pending_evaluations": pending_evals,
-            "pending_logbooks": pending_logbooks,
-            "approved_evaluations": approved_evals,
-            "verified_logbooks": verified_logbooks,
+            "active_residents": group["active_residents"],
+            "training_records": group["training_records"],
+            "pending_evaluations": group["pending_evaluations"],
+            "pending_logbooks": group["pending_logbooks"],
+            "approved_evaluations": group["approved_evaluations"],
+            "verified_logbooks": group["verified_logbooks"],
         })
     return res
 
 
-def get_session_monitoring_summary() -> list:
+def _build_session_monitoring_summary() -> list:
+    counts = _resident_counts_by("academic_session_ref")
     res = []
     for session in AcademicSession.objects.filter(active=True):
-        residents = ResidentProfile.objects.filter(academic_session_ref=session, is_archived=False).values_list("id", flat=True)
-        active_records = ResidentTrainingRecord.objects.filter(resident_id__in=residents, is_active=True).count()
-        pending_evals = EvaluationSubmission.objects.filter(resident_id__in=residents, status="SUBMITTED").count()
-        pending_logbooks = LogbookEntry.objects.filter(resident_id__in=residents, status="SUBMITTED").count()
+        # ResidentProfile.academic_session_ref targets AcademicSession.code.
+        group = counts.get(session.code, _EMPTY_COUNTS)
         res.append({
             "session_id": session.id,
             "name": session.name,
             "code": session.code,
-            "active_residents": len(residents),
-            "training_records": active_records,
-            "pending_evaluations": pending_evals,
-            "pending_logbooks": pending_logbooks,
+            "active_residents": group["active_residents"],
+            "training_records": group["training_records"],
+            "pending_evaluations": group["pending_evaluations"],
+            "pending_logbooks": group["pending_logbooks"],
         })
     return res
+
+
+def get_department_monitoring_summary() -> list:
+    return _cached_monitoring("departments", _build_department_monitoring_summary)
+
+
+def get_program_monitoring_summary() -> list:
+    return _cached_monitoring("programs", _build_program_monitoring_summary)
+
+
+def get_session_monitoring_summary() -> list:
+    return _cached_monitoring("sessions", _build_session_monitoring_summary)
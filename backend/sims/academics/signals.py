@@ -0,0 +1,29 @@
+"""Cache-invalidation signals for the academics monitoring dashboards."""
+
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from sims.academics.reporting import invalidate_monitoring_cache
+
+MONITORED_MODELS = (
+    "academics.Department",
+    "academics.AcademicSession",
+    "academics.ResidentTrainingRecord",
+    "academics.EvaluationSubmission",
+    "academics.LogbookEntry",
+    "academics.SupervisorReviewQueueItem",
+    "training.TrainingProgram",
+    "users.ResidentProfile",
+    "users.SupervisorProfile",
+    "supervision.ResidentSupervisorAssignment",
+)
+
+
+def _invalidate_monitoring(sender, **kwargs):
+    invalidate_monitoring_cache()
+
+
+for _label in MONITORED_MODELS:
+    _model = apps.get_model(_label)
+    post_save.connect(_invalidate_monitoring, sender=_model, dispatch_uid=f"monitoring-save-{_label}")
+    post_delete.connect(_invalidate_monitoring, sender=_model, dispatch_uid=f"monitoring-delete-{_label}")
@@ -1,7 +1,10 @@
 from datetime import date
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -16,6 +19,12 @@ from sims.academics.models import (
     EvaluationSubmission,
     LogbookEntry,
 )
+from sims.academics.reporting import (
+    get_admin_monitoring_dashboard,
+    get_department_monitoring_summary,
+    get_program_monitoring_summary,
+    get_session_monitoring_summary,
+)
 from sims.academics.services import create_training_record
 from sims.rotations.models import Hospital
 from sims.supervision.services import create_supervisor_assignment
@@ -539,4 +548,98 @@ class AcademicsFoundationTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
-
+class MonitoringDashboardQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username="mon_admin", password="pass12345", role="ADMIN")
+        self.hospital = Hospital.objects.create(name="Monitoring Hospital", code="MH")
+        self.category = LogbookCategory.objects.create(
+            code="MON-LOG", name="Monitoring Category", category_type="PROCEDURE", is_active=True
+        )
+        self.serial = 0
+
+    def _add_department(self, residents=1):
+        self.serial += 1
+        n = self.serial
+        department = Department.objects.create(name=f"Dept {n}", code=f"D{n}", active=True)
+        session = AcademicSession.objects.create(name=f"Session {n}", code=f"S{n}", active=True)
+        program = TrainingProgram.objects.create(
+            name=f"Program {n}",
+            code=f"P{n}",
+            duration_months=48,
+            degree_type=TrainingProgram.DEGREE_FCPS,
+            department=department,
+            active=True,
+        )
+        for i in range(residents):
+            user = User.objects.create_user(username=f"mon_res_{n}_{i}", password="pass12345", role="RESIDENT")
+            profile = ResidentProfile.objects.create(
+                user=user,
+                hospital=self.hospital,
+                department_ref=department,
+                program_ref=program,
+                academic_session_ref=session,
+            )
+            record = create_training_record(resident=profile, start_date=date(2026, 7, 1), actor=self.admin)
+            for entry_status in ("SUBMITTED", "VERIFIED"):
+                LogbookEntry.objects.create(
+                    resident=profile,
+                    training_record=record,
+                    category=self.category,
+                    entry_date=date(2026, 7, 15),
+                    title="Case",
+                    status=entry_status,
+                )
+        return department
+
+    def _query_count(self, func):
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        return len(ctx.captured_queries)
+
+    def test_department_summary_counts(self):
+        department = self._add_department(residents=2)
+        self._add_department(residents=1)
+        row = next(r for r in get_department_monitoring_summary() if r["department_id"] == department.id)
+        self.assertEqual(row["active_residents"], 2)
+        self.assertEqual(row["training_records"], 2)
+        self.assertEqual(row["pending_logbooks"], 2)
+        self.assertEqual(row["verified_logbooks"], 2)
+        self.assertEqual(row["pending_evaluations"], 0)
+
+    def test_summary_query_counts_independent_of_group_count(self):
+        self._add_department()
+        baseline = {
+            func: self._query_count(func)
+            for func in (
+                get_department_monitoring_summary,
+                get_program_monitoring_summary,
+                get_session_monitoring_summary,
+            )
+        }
+        for _ in range(4):
+            self._add_department(residents=2)
+        for func, expected in baseline.items():
+            self.assertEqual(self._query_count(func), expected, func.__name__)
+
+    @override_settings(MONITORING_DATA_QUALITY_TTL=300)
+    def test_admin_dashboard_query_count_independent_of_department_count(self):
+        self._add_department()
+        get_admin_monitoring_dashboard()  # warm the data-quality total
+        baseline = self._query_count(get_admin_monitoring_dashboard)
+        for _ in range(4):
+            self._add_department(residents=2)
+        self.assertEqual(self._query_count(get_admin_monitoring_dashboard), baseline)
+        data = get_admin_monitoring_dashboard()
+        self.assertEqual(data["total_residents"], 9)
+        self.assertEqual(data["log_stats"], {"SUBMITTED": 9, "VERIFIED": 9})
+        self.assertEqual(len(data["department_breakdown"]), 5)
+
+    @override_settings(MONITORING_CACHE_TTL=60)
+    def test_summary_cache_is_invalidated_by_writes(self):
+        self._add_department()
+        first = get_department_monitoring_summary()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_department_monitoring_summary(), first)
+        self._add_department()
+        self.assertEqual(len(get_department_monitoring_summary()), 2)
@@ -8,7 +8,6 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from sims.common_permissions import ReadAnyWriteAdminOnly
 
-from django.db.models import Q
 from rest_framework.exceptions import ValidationError
 
 from .models import (
@@ -29,6 +28,8 @@ from sims.rotations.models import Hospital
 from sims.training.models import TrainingProgram
 from sims.users.models import ResidentProfile, SupervisorProfile
 from sims.supervision.models import ResidentSupervisorAssignment
+from sims.supervision.scope import SupervisionScope
+from sims.supervision.scoping import scope_queryset
 
 from .serializers import (
     AcademicPeriodSerializer,
@@ -96,20 +97,7 @@ class ResidentTrainingRecordViewSet(viewsets.ModelViewSet):
     ordering_fields = ["created_at", "start_date", "training_year"]
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        user = self.request.user
-        if getattr(user, "is_superuser", False) or getattr(user, "role", None) == "ADMIN":
-            return queryset
-        if getattr(user, "role", None) == "RESIDENT" and hasattr(user, "resident_profile"):
-            return queryset.filter(resident=user.resident_profile)
-        if getattr(user, "role", None) == "SUPERVISOR" and hasattr(user, "supervisor_profile"):
-            return queryset.filter(
-                resident__supervisor_assignments__supervisor=user.supervisor_profile,
-                resident__supervisor_assignments__is_active=True,
-            ).distinct()
-        if getattr(user, "role", None) == "SUPPORT_STAFF":
-            return queryset
-        return queryset.none()
+        return scope_queryset(super().get_queryset(), self.request.user)
 
     def perform_create(self, serializer):
         resident = serializer.validated_data["resident"]
@@ -210,17 +198,7 @@ class SupervisorReviewQueueItemViewSet(viewsets.ModelViewSet):
     ]
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        user = self.request.user
-        if getattr(user, "is_superuser", False) or getattr(user, "role", None) == "ADMIN":
-            return queryset
-        if getattr(user, "role", None) == "RESIDENT" and hasattr(user, "resident_profile"):
-            return queryset.filter(resident=user.resident_profile)
-        if getattr(user, "role", None) == "SUPERVISOR" and hasattr(user, "supervisor_profile"):
-            return queryset.filter(supervisor=user.supervisor_profile)
-        if getattr(user, "role", None) == "SUPPORT_STAFF":
-            return queryset
-        return queryset.none()
+        return scope_queryset(super().get_queryset(), self.request.user)
 
     def create(self, request, *args, **kwargs):
         if not (request.user.is_superuser or request.user.role == "ADMIN"):
@@ -346,20 +324,7 @@ class EvaluationSubmissionViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == "ADMIN" or user.is_superuser:
-            return self.queryset
-        elif user.role == "RESIDENT" and hasattr(user, "resident_profile"):
-            return self.queryset.filter(resident=user.resident_profile)
-        elif user.role == "SUPERVISOR" and hasattr(user, "supervisor_profile"):
-            supervised_residents = ResidentSupervisorAssignment.objects.filter(
-                supervisor=user.supervisor_profile,
-                status="ACTIVE"
-            ).values_list("resident_id", flat=True)
-            return self.queryset.filter(
-                Q(supervisor=user.supervisor_profile) | Q(resident_id__in=supervised_residents)
-            )
-        return self.queryset.none()
+        return scope_queryset(self.queryset, self.request.user)
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -487,20 +452,7 @@ class LogbookEntryViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == "ADMIN" or user.is_superuser:
-            return self.queryset
-        elif user.role == "RESIDENT" and hasattr(user, "resident_profile"):
-            return self.queryset.filter(resident=user.resident_profile)
-        elif user.role == "SUPERVISOR" and hasattr(user, "supervisor_profile"):
-            supervised_residents = ResidentSupervisorAssignment.objects.filter(
-                supervisor=user.supervisor_profile,
-                status="ACTIVE"
-            ).values_list("resident_id", flat=True)
-            return self.queryset.filter(
-                Q(supervisor=user.supervisor_profile) | Q(resident_id__in=supervised_residents)
-            )
-        return self.queryset.none()
+        return scope_queryset(self.queryset, self.request.user)
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -794,11 +746,7 @@ class ResidentProgressReportView(APIView):
             if user.resident_profile.id != resident_id:
                 raise PermissionDenied("Residents can only access their own report.")
         elif user.role == "SUPERVISOR" and hasattr(user, "supervisor_profile"):
-            exists = ResidentSupervisorAssignment.objects.filter(
-                supervisor=user.supervisor_profile,
-                resident_id=resident_id,
-                status="ACTIVE"
-            ).exists()
+            exists = resident_id in SupervisionScope.for_user(user).resident_profile_ids
             if not exists:
                 raise PermissionDenied("Supervisors can only view assigned resident progress.")
         elif user.role == "SUPPORT_STAFF" and not user.is_superuser:
@@ -864,10 +812,7 @@ class EvaluationReportView(APIView):
         if user.role == "RESIDENT" and hasattr(user, "resident_profile"):
             filters["resident_id"] = user.resident_profile.id
         elif user.role == "SUPERVISOR" and hasattr(user, "supervisor_profile"):
-            assigned_ids = ResidentSupervisorAssignment.objects.filter(
-                supervisor=user.supervisor_profile,
-                status="ACTIVE"
-            ).values_list("resident_id", flat=True)
+            assigned_ids = SupervisionScope.for_user(user).resident_profile_ids
             req_res = filters.get("resident_id")
             if req_res:
                 if int(req_res) not in assigned_ids:
@@ -892,10 +837,7 @@ class LogbookReportView(APIView):
         if user.role == "RESIDENT" and hasattr(user, "resident_profile"):
             filters["resident_id"] = user.resident_profile.id
         elif user.role == "SUPERVISOR" and hasattr(user, "supervisor_profile"):
-            assigned_ids = ResidentSupervisorAssignment.objects.filter(
-                supervisor=user.supervisor_profile,
-                status="ACTIVE"
-            ).values_list("resident_id", flat=True)
+            assigned_ids = SupervisionScope.for_user(user).resident_profile_ids
             req_res = filters.get("resident_id")
             if req_res:
                 if int(req_res) not in assigned_ids:
@@ -953,11 +895,7 @@ class ResidentProgressExportCSVView(APIView):
             if user.resident_profile.id != resident_id:
                 raise PermissionDenied("Residents can only export their own progress.")
         elif user.role == "SUPERVISOR" and hasattr(user, "supervisor_profile"):
-            exists = ResidentSupervisorAssignment.objects.filter(
-                supervisor=user.supervisor_profile,
-                resident_id=resident_id,
-                status="ACTIVE"
-            ).exists()
+            exists = resident_id in SupervisionScope.for_user(user).resident_profile_ids
             if not exists:
                 raise PermissionDenied("Supervisors can only export assigned resident progress.")
         elif user.role == "SUPPORT_STAFF" and not user.is_superuser:
@@ -1040,10 +978,7 @@ class EvaluationReportExportCSVView(APIView):
         if user.role == "RESIDENT" and hasattr(user, "resident_profile"):
             filters["resident_id"] = user.resident_profile.id
         elif user.role == "SUPERVISOR" and hasattr(user, "supervisor_profile"):
-            assigned_ids = ResidentSupervisorAssignment.objects.filter(
-                supervisor=user.supervisor_profile,
-                status="ACTIVE"
-            ).values_list("resident_id", flat=True)
+            assigned_ids = SupervisionScope.for_user(user).resident_profile_ids
             req_res = filters.get("resident_id")
             if req_res:
                 if int(req_res) not in assigned_ids:
@@ -1072,10 +1007,7 @@ class LogbookReportExportCSVView(APIView):
         if user.role == "RESIDENT" and hasattr(user, "resident_profile"):
             filters["resident_id"] = user.resident_profile.id
         elif user.role == "SUPERVISOR" and hasattr(user, "supervisor_profile"):
-            assigned_ids = ResidentSupervisorAssignment.objects.filter(
-                supervisor=user.supervisor_profile,
-                status="ACTIVE"
-            ).values_list("resident_id", flat=True)
+            assigned_ids = SupervisionScope.for_user(user).resident_profile_ids
             req_res = filters.get("resident_id")
             if req_res:
                 if int(req_res) not in assigned_ids:
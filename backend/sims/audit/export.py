@@ -0,0 +1,304 @@
+"""
+Streaming ActivityLog export.
+
+Rows are read in keyset pages ordered by ``(created_at, id)`` (one short
+query per page, no OFFSET and no long-lived cursor) and rendered to CSV or
+JSONL as they arrive, optionally gzip-compressed, so an export of any size
+runs in constant memory. Every row carries a ``cursor`` token; passing the
+last one received as ``?cursor=`` resumes an interrupted download right after
+that row. Very large ranges can instead run as a background ``BulkOperation``
+whose file is served by the bulk operation download endpoint.
+"""
+from __future__ import annotations
+
+import base64
+import csv
+import io
+import json
+import logging
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.db.models.fields.json import KeyTransform
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+CSV_HEADER = ("id", "timestamp", "actor", "action", "verb", "target", "ip", "sensitive", "metadata", "cursor")
+_ROW_FIELDS = (
+    "id",
+    "created_at",
+    "actor_id",
+    "action",
+    "verb",
+    "target_content_type_id",
+    "target_object_id",
+    "target_repr",
+    "ip_address",
+    "is_sensitive",
+    "metadata",
+)
+_FILTER_PARAMS = ("actor", "action", "is_sensitive", "search", "metadata_key", "metadata_value")
+_CHUNK_CHARS = 64 * 1024
+
+Cursor = Tuple[datetime, int]
+
+
+def filter_metadata(queryset, key: str, raw_value: str):
+    """Match ``metadata[key] == value``; ``value`` is read as JSON when it parses."""
+    try:
+        value = json.loads(raw_value)
+    except ValueError:
+        value = raw_value
+    if connection.vendor == "postgresql":
+        # Containment is served by the jsonb_path_ops GIN index.
+        return queryset.filter(metadata__contains={key: value})
+    # An explicit key transform: the key is never parsed as a lookup ("has_keys", "isnull", ...).
+    return queryset.alias(metadata_match=KeyTransform(key, "metadata")).filter(metadata_match=value)
+
+
+# -- cursors and parameters ------------------------------------------------------------
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    raw = f"{created_at.isoformat()}|{pk}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+        created_raw, pk = raw.rsplit("|", 1)
+        created_at = parse_datetime(created_raw)
+        if created_at is None:
+            raise ValueError(created_raw)
+        return created_at, int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError("Invalid export cursor.")
+
+
+def _parse_bound(value: str, name: str) -> str:
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError(f"Invalid {name}; use an ISO date or datetime.")
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed.isoformat()
+
+
+def parse_export_params(query: Mapping[str, str]) -> dict:
+    """
+    Validate export query parameters into a JSON-safe dict (stored as the
+    options of a background job). ``start`` is inclusive, ``end`` exclusive.
+    """
+    export_format = (query.get("file_format") or "csv").lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationError("Unsupported export format. Use csv or jsonl.")
+    compress = (query.get("compress") or "").lower()
+    if compress not in ("", "gzip"):
+        raise ValidationError("Unsupported compression. Use gzip.")
+    params = {"file_format": export_format, "gzip": compress == "gzip"}
+    for name in ("start", "end"):
+        if query.get(name):
+            params[name] = _parse_bound(query[name], name)
+    if query.get("cursor"):
+        decode_cursor(query["cursor"])
+        params["cursor"] = query["cursor"]
+    for name in _FILTER_PARAMS:
+        if query.get(name) not in (None, ""):
+            params[name] = query[name]
+    return params
+
+
+def export_queryset(params: Mapping) -> QuerySet:
+    queryset = ActivityLog.objects.all()
+    if params.get("start"):
+        queryset = queryset.filter(created_at__gte=parse_datetime(params["start"]))
+    if params.get("end"):
+        queryset = queryset.filter(created_at__lt=parse_datetime(params["end"]))
+    if params.get("actor"):
+        queryset = queryset.filter(actor_id=params["actor"])
+    if params.get("action"):
+        queryset = queryset.filter(action=params["action"])
+    if params.get("is_sensitive"):
+        queryset = queryset.filter(is_sensitive=str(params["is_sensitive"]).lower() in ("true", "1", "yes"))
+    if params.get("search"):
+        term = params["search"]
+        queryset = queryset.filter(Q(verb__icontains=term) | Q(target_repr__icontains=term))
+    if params.get("metadata_key"):
+        queryset = filter_metadata(queryset, params["metadata_key"], params.get("metadata_value", ""))
+    return queryset
+
+
+# -- rows and rendering ----------------------------------------------------------------
+
+def iter_export_rows(queryset, *, after: Optional[Cursor] = None, page_size: Optional[int] = None) -> Iterator[dict]:
+    """Yield ``queryset`` rows in ``(created_at, id)`` order, one keyset page per query."""
+    page_size = page_size or settings.AUDIT_EXPORT_PAGE_SIZE
+    queryset = queryset.order_by("created_at", "id").values(*_ROW_FIELDS)
+    while True:
+        page = queryset
+        if after is not None:
+            page = page.filter(created_at__gte=after[0]).exclude(created_at=after[0], id__lte=after[1])
+        rows = list(page[:page_size])
+        for row in rows:
+            row["cursor"] = encode_cursor(row["created_at"], row["id"])
+            yield row
+        if len(rows) < page_size:
+            return
+        after = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+def _write_csv_row(writer, row: dict) -> None:
+    writer.writerow(
+        (
+            row["id"],
+            row["created_at"].isoformat(),
+            row["actor_id"] or "",
+            row["action"],
+            row["verb"],
+            row["target_repr"],
+            row["ip_address"] or "",
+            "true" if row["is_sensitive"] else "false",
+            json.dumps(row["metadata"], cls=DjangoJSONEncoder) if row["metadata"] else "",
+            row["cursor"],
+        )
+    )
+
+
+def _render(rows: Iterable[dict], export_format: str) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    if export_format == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+
+        def write(row: dict) -> None:
+            _write_csv_row(writer, row)
+    else:
+        def write(row: dict) -> None:
+            buffer.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(",", ":")))
+            buffer.write("\n")
+
+    for row in rows:
+        write(row)
+        if buffer.tell() >= _CHUNK_CHARS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@dataclass
+class ActivityExport:
+    filename: str
+    content_type: str
+    stream: Iterator[bytes]
+
+
+def stream_activity_export(
+    params: Mapping,
+    *,
+    progress: Optional[Callable[[int], None]] = None,
+) -> ActivityExport:
+    """Lazily render the export described by ``parse_export_params`` output."""
+    export_format = params["file_format"]
+    after = decode_cursor(params["cursor"]) if params.get("cursor") else None
+    rows = iter_export_rows(export_queryset(params), after=after)
+    if progress is not None:
+        rows = _counting(rows, progress)
+    stream = _render(rows, export_format)
+    filename = f"audit-log-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+    content_type = EXPORT_FORMATS[export_format]
+    if params.get("gzip"):
+        stream = _gzipped(stream)
+        filename += ".gz"
+        content_type = "application/gzip"
+    return ActivityExport(filename, content_type, stream)
+
+
+def _counting(rows: Iterable[dict], progress: Callable[[int], None]) -> Iterator[dict]:
+    count = 0
+    for count, row in enumerate(rows, 1):
+        yield row
+        if count % settings.AUDIT_EXPORT_PAGE_SIZE == 0:
+            progress(count)
+    progress(count)
+
+
+# -- background jobs -------------------------------------------------------------------
+
+def enqueue_activity_export(user, params: dict):
+    """Queue the export as a background bulk operation; poll it via the bulk status endpoint."""
+    from sims.bulk.models import BulkOperation
+
+    operation = BulkOperation.objects.create(
+        user=user,
+        operation=BulkOperation.OP_EXPORT,
+        options={"method": "export_activity_log", "resource": "activity_log", "params": params},
+    )
+
+    from .tasks import export_activity_log
+
+    transaction.on_commit(lambda: export_activity_log.delay(operation.pk))
+    return operation
+
+
+def run_activity_export_job(operation) -> None:
+    """Write a queued export to BULK_EXPORT_DIR (called by the worker)."""
+    operation.mark_running()
+    written = 0
+
+    def progress(count: int) -> None:
+        nonlocal written
+        written = count
+        operation.record_progress(count, count, count, [])
+
+    try:
+        export = stream_activity_export(operation.options["params"], progress=progress)
+        export_dir = Path(settings.BULK_EXPORT_DIR)
+        export_dir.mkdir(parents=True, exist_ok=True)
+        export_path = export_dir / f"{uuid.uuid4().hex}{''.join(Path(export.filename).suffixes)}"
+        with open(export_path, "wb") as handle:
+            for block in export.stream:
+                handle.write(block)
+    except Exception as exc:
+        logger.exception("Activity log export job %s failed", operation.pk)
+        operation.mark_failed({"error": str(exc)})
+        return
+
+    operation.options = {**operation.options, "export_path": str(export_path), "file_name": export.filename}
+    operation.save(update_fields=["options"])
+    operation.mark_completed(
+        written,
+        0,
+        {
+            "file_name": export.filename,
+            "content_type": export.content_type,
+            "download_url": f"/api/bulk/operations/{operation.pk}/download/",
+        },
+    )
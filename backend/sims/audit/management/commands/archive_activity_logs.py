@@ -0,0 +1,64 @@
+"""
+Management command: archive_activity_logs
+
+Creates upcoming ActivityLog partitions, rolls up closed days and moves months
+older than the retention window to compressed JSONL archives.
+
+Usage:
+    python manage.py archive_activity_logs
+    python manage.py archive_activity_logs --retain-months 6 --archive-dir /srv/audit-archive
+    python manage.py archive_activity_logs --dry-run   # list the months that would be archived
+"""
+from django.core.management.base import BaseCommand
+
+from sims.audit.partitions import maintain_activity_logs
+
+
+class Command(BaseCommand):
+    help = "Maintain ActivityLog partitions, daily rollups and cold-month archives."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=None,
+            help="Months kept in the live table besides the current one (default: AUDIT_LOG_RETENTION_MONTHS).",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=None,
+            help="Directory for .jsonl.gz archives (default: AUDIT_LOG_ARCHIVE_DIR).",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=None,
+            help="Partitions to create ahead of the current month (default: AUDIT_PARTITION_MONTHS_AHEAD).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the months that would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        result = maintain_activity_logs(
+            retain_months=options["retain_months"],
+            archive_dir=options["archive_dir"],
+            months_ahead=options["months_ahead"],
+            dry_run=dry_run,
+        )
+
+        for name in result["created"]:
+            self.stdout.write(f"Created partition {name}")
+        if result["rolled_up_days"]:
+            self.stdout.write(f"Rolled up {result['rolled_up_days']} day(s)")
+        for item in result["archived"]:
+            if dry_run:
+                self.stdout.write(f"Would archive {item.partition.name} ({item.rows} rows)")
+            else:
+                self.stdout.write(f"Archived {item.partition.name} ({item.rows} rows) -> {item.path}")
+        if not result["archived"]:
+            self.stdout.write("No partitions past the retention window.")
+        self.stdout.write(self.style.SUCCESS("✓ Activity log maintenance complete"))
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from .writer import buffered_activity_log
+
+
+class ActivityLogBufferMiddleware:
+    """Collect a request's ActivityLog entries and write them in one batch when it finishes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffered_activity_log():
+            return self.get_response(request)
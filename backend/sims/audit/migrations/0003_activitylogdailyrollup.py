@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("audit", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityLogDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("view", "View"),
+                            ("create", "Create"),
+                            ("update", "Update"),
+                            ("delete", "Delete"),
+                            ("export", "Export"),
+                            ("login", "Login"),
+                            ("logout", "Logout"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("verb", models.CharField(max_length=64)),
+                ("is_sensitive", models.BooleanField(default=False)),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-day"],
+                "indexes": [
+                    models.Index(fields=["day", "action"], name="audit_activ_day_88cc8f_idx"),
+                    models.Index(fields=["day", "actor"], name="audit_activ_day_b0db06_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,129 @@
+"""
+Range-partition audit_activitylog by month on PostgreSQL.
+
+The table is rebuilt as ``PARTITION BY RANGE (created_at)`` with one partition
+per month from the oldest row to two months ahead, plus a DEFAULT partition
+for anything outside them. The primary key becomes (id, created_at), as
+PostgreSQL requires the partition key in unique constraints; ids still come
+from the same identity/sequence. Existing indexes and foreign keys are
+recreated from their definitions, together with a jsonb_path_ops GIN index
+backing metadata containment filters. Other databases are left untouched
+(see sims.audit.partitions.RangeDeleteBackend).
+"""
+
+from datetime import date
+
+from django.db import migrations
+
+TABLE = "audit_activitylog"
+OLD_TABLE = "audit_activitylog_unpartitioned"
+MONTHS_AHEAD = 2
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _table_definitions(cursor, table):
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = %s::regclass AND NOT indisprimary",
+        [table],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    return indexes, foreign_keys
+
+
+def _rebuild(schema_editor, partitioned):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE])
+        if (cursor.fetchone() is not None) == partitioned:
+            return
+        indexes, foreign_keys = _table_definitions(cursor, TABLE)
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{OLD_TABLE}"')
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [OLD_TABLE]
+        )
+        primary_key = cursor.fetchone()[0]
+        cursor.execute(f'ALTER TABLE "{OLD_TABLE}" RENAME CONSTRAINT "{primary_key}" TO "{OLD_TABLE}_pkey"')
+
+        layout = " PARTITION BY RANGE (created_at)" if partitioned else ""
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{OLD_TABLE}" INCLUDING DEFAULTS INCLUDING IDENTITY '
+            f"INCLUDING CONSTRAINTS){layout}"
+        )
+        key = "id, created_at" if partitioned else "id"
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{primary_key}" PRIMARY KEY ({key})')
+
+        if partitioned:
+            cursor.execute(f'SELECT MIN(created_at) FROM "{OLD_TABLE}"')
+            oldest = cursor.fetchone()[0]
+            today = date.today().replace(day=1)
+            month = oldest.date().replace(day=1) if oldest else today
+            while month <= _add_months(today, MONTHS_AHEAD):
+                following = _add_months(month, 1)
+                cursor.execute(
+                    f'CREATE TABLE "{TABLE}_y{month:%Y}m{month:%m}" PARTITION OF "{TABLE}" '
+                    "FOR VALUES FROM (%s) TO (%s)",
+                    [month.isoformat(), following.isoformat()],
+                )
+                month = following
+            cursor.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{OLD_TABLE}"')
+
+        # A serial (pre-identity) column keeps its sequence; hand it to the new table.
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'",
+            [OLD_TABLE],
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [OLD_TABLE])
+            sequence = cursor.fetchone()[0]
+            if sequence:
+                cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{TABLE}".id')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+            f'FROM "{TABLE}"',
+            [TABLE],
+        )
+
+        cursor.execute(f'DROP TABLE "{OLD_TABLE}"')
+        for definition in indexes:
+            if "metadata_gin" in definition:
+                continue
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+        if partitioned:
+            cursor.execute(
+                f'CREATE INDEX "{TABLE}_metadata_gin" ON "{TABLE}" USING gin (metadata jsonb_path_ops)'
+            )
+
+
+def partition_activity_log(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        _rebuild(schema_editor, partitioned=True)
+
+
+def unpartition_activity_log(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        _rebuild(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0003_activitylogdailyrollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_activity_log, unpartition_activity_log),
+    ]
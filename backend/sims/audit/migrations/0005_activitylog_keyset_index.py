@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0004_partition_activitylog"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activitylog",
+            index=models.Index(fields=["created_at", "id"], name="audit_activ_created_3502f6_idx"),
+        ),
+    ]
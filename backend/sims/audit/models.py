@@ -10,6 +10,8 @@ from django.db import models
 from django.utils import timezone
 from simple_history.models import HistoricalRecords
 
+from .writer import current_buffer
+
 
 class ActivityLog(models.Model):
     ACTION_CHOICES = (
@@ -47,6 +49,8 @@ class ActivityLog(models.Model):
             models.Index(fields=["action"]),
             models.Index(fields=["is_sensitive"]),
             models.Index(fields=["actor", "created_at"]),
+            # Keyset order of the streaming export.
+            models.Index(fields=["created_at", "id"]),
         ]
 
     def __str__(self) -> str:
@@ -72,7 +76,7 @@ class ActivityLog(models.Model):
             target_ct = ContentType.objects.get_for_model(target, for_concrete_model=False)
             target_pk = str(target.pk)
             target_repr = str(target)
-        return cls.objects.create(
+        entry = cls(
             actor=actor,
             action=action,
             verb=verb,
@@ -83,6 +87,41 @@ class ActivityLog(models.Model):
             ip_address=ip_address,
             is_sensitive=is_sensitive,
         )
+        # Inside buffered_activity_log() (every request, bulk jobs) the entry is
+        # written later in a bulk_create batch; elsewhere it is saved now.
+        buffer = current_buffer()
+        if buffer is None:
+            entry.save()
+        else:
+            buffer.add(entry)
+        return entry
+
+
+class ActivityLogDailyRollup(models.Model):
+    """Per-day ActivityLog counts by action, actor and verb (see ``sims.audit.rollups``)."""
+
+    day = models.DateField()
+    action = models.CharField(max_length=32, choices=ActivityLog.ACTION_CHOICES)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    verb = models.CharField(max_length=64)
+    is_sensitive = models.BooleanField(default=False)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day"]
+        indexes = [
+            models.Index(fields=["day", "action"]),
+            models.Index(fields=["day", "actor"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day:%Y-%m-%d} {self.actor_id}:{self.action}:{self.verb} x{self.count}"
 
 
 class AuditReport(models.Model):
@@ -117,25 +156,9 @@ class AuditReport(models.Model):
         created_by: Optional[models.Model] = None,
         include_sensitive: bool = False,
     ) -> "AuditReport":
-        queryset = ActivityLog.objects.filter(created_at__range=(start, end))
-        if not include_sensitive:
-            queryset = queryset.filter(is_sensitive=False)
-
-        summary = {
-            "total": queryset.count(),
-            "by_action": {
-                row["action"]: row["count"]
-                for row in queryset.values("action")
-                .order_by("action")
-                .annotate(count=models.Count("id"))
-            },
-            "top_users": list(
-                queryset.values("actor_id")
-                .exclude(actor_id=None)
-                .annotate(count=models.Count("id"))
-                .order_by("-count")[:10]
-            ),
-        }
+        from .rollups import summarize_activity
+
+        summary = summarize_activity(start, end, include_sensitive=include_sensitive)
         report, created = cls.objects.get_or_create(
             start=start,
             end=end,
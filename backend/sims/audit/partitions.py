@@ -0,0 +1,285 @@
+"""
+Monthly ActivityLog partitions, retention and archival.
+
+On PostgreSQL ``audit_activitylog`` is range-partitioned by ``created_at``
+into one table per month (``audit_activitylog_y2026m01``; migration 0004)
+plus a DEFAULT partition. Rows that land in DEFAULT (months nobody created a
+partition for) are moved into their own month's partition the next time
+partitions are ensured, so they are archived like any other month.
+Queries bounded on ``created_at`` only touch the months they need, and
+retiring a month is a ``DETACH`` + ``DROP`` instead of a mass ``DELETE``.
+Other databases (SQLite in development and tests) use
+``RangeDeleteBackend``, which treats calendar months of the single table as
+partitions. ``AUDIT_PARTITION_BACKEND`` may name another backend class.
+
+``archive_partitions`` writes each month older than the retention window to
+``<AUDIT_LOG_ARCHIVE_DIR>/<partition>.jsonl.gz`` (one JSON object per row) and
+only then drops it. Days are rolled up first, so audit reports still cover
+archived months.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ActivityLog
+from .rollups import rollup_pending_days
+
+logger = logging.getLogger(__name__)
+
+TABLE = ActivityLog._meta.db_table
+ARCHIVE_FIELDS = (
+    "id",
+    "actor_id",
+    "action",
+    "verb",
+    "target_content_type_id",
+    "target_object_id",
+    "target_repr",
+    "metadata",
+    "ip_address",
+    "is_sensitive",
+    "created_at",
+)
+DEFAULT_PARTITION = f"{TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_bound(month: date) -> datetime:
+    return timezone.make_aware(datetime.combine(month, time.min))
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    start: date
+    end: date
+
+    @classmethod
+    def for_month(cls, month: date) -> "Partition":
+        month = month_start(month)
+        return cls(f"{TABLE}_y{month:%Y}m{month:%m}", month, add_months(month, 1))
+
+    def rows(self):
+        return ActivityLog.objects.filter(
+            created_at__gte=_month_bound(self.start), created_at__lt=_month_bound(self.end)
+        )
+
+
+class PartitionBackend:
+    """How monthly partitions are created, listed and retired."""
+
+    def ensure_partitions(self, through: date) -> List[str]:
+        """Create any missing partitions up to the month of ``through``; returns their names."""
+        return []
+
+    def partitions(self) -> List[Partition]:
+        raise NotImplementedError
+
+    def iter_rows(self, partition: Partition, chunk_size: int = 2000) -> Iterator[dict]:
+        return partition.rows().order_by("id").values(*ARCHIVE_FIELDS).iterator(chunk_size=chunk_size)
+
+    def drop(self, partition: Partition) -> None:
+        raise NotImplementedError
+
+
+class RangeDeleteBackend(PartitionBackend):
+    """Months of an unpartitioned table; retiring one deletes its rows in batches."""
+
+    delete_batch_size = 5000
+
+    def partitions(self) -> List[Partition]:
+        return [Partition.for_month(month) for month in ActivityLog.objects.dates("created_at", "month")]
+
+    def drop(self, partition: Partition) -> None:
+        rows = partition.rows()
+        while True:
+            ids = list(rows.values_list("id", flat=True)[: self.delete_batch_size])
+            if not ids:
+                return
+            ActivityLog.objects.filter(id__in=ids).delete()
+
+
+class PostgresPartitionBackend(PartitionBackend):
+    """Declarative range partitions, one child table per month plus a default partition."""
+
+    def is_partitioned(self) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE])
+            return cursor.fetchone() is not None
+
+    def ensure_partitions(self, through: date) -> List[str]:
+        existing = {partition.name for partition in self.partitions()}
+        months = set(self._default_months())
+        month = month_start(timezone.localdate())
+        while month <= month_start(through):
+            months.add(month)
+            month = add_months(month, 1)
+        created = []
+        for month in sorted(months):
+            partition = Partition.for_month(month)
+            if partition.name not in existing:
+                self._create(partition)
+                created.append(partition.name)
+        return created
+
+    def _has_default(self) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [DEFAULT_PARTITION])
+            return cursor.fetchone()[0] is not None
+
+    def _default_months(self) -> List[date]:
+        """Months with rows stranded in the DEFAULT partition; they get real partitions."""
+        if not self._has_default():
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE %s) FROM \"{DEFAULT_PARTITION}\"",
+                [timezone.get_current_timezone_name()],
+            )
+            return [row[0].date() for row in cursor.fetchall()]
+
+    def _create(self, partition: Partition) -> None:
+        """
+        Create ``partition``, moving any of its rows out of the DEFAULT partition.
+
+        PostgreSQL refuses a new partition whose range already has rows in the
+        attached DEFAULT, so DEFAULT is detached for the move and re-attached.
+        """
+        bounds = [_month_bound(partition.start), _month_bound(partition.end)]
+        has_default = self._has_default()
+        with transaction.atomic(), connection.cursor() as cursor:
+            if has_default:
+                cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{DEFAULT_PARTITION}"')
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{partition.name}" PARTITION OF "{TABLE}" '
+                "FOR VALUES FROM (%s) TO (%s)",
+                bounds,
+            )
+            if has_default:
+                cursor.execute(
+                    f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+                    "WHERE created_at >= %s AND created_at < %s RETURNING *) "
+                    f'INSERT INTO "{partition.name}" SELECT * FROM moved',
+                    bounds,
+                )
+                cursor.execute(f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT')
+
+    def partitions(self) -> List[Partition]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass(%s)",
+                [TABLE],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        partitions = []
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                partitions.append(Partition.for_month(date(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(partitions, key=lambda partition: partition.start)
+
+    def drop(self, partition: Partition) -> None:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{partition.name}"')
+            cursor.execute(f'DROP TABLE "{partition.name}"')
+
+
+def get_partition_backend() -> PartitionBackend:
+    if settings.AUDIT_PARTITION_BACKEND:
+        return import_string(settings.AUDIT_PARTITION_BACKEND)()
+    if connection.vendor == "postgresql":
+        backend = PostgresPartitionBackend()
+        if backend.is_partitioned():
+            return backend
+    return RangeDeleteBackend()
+
+
+@dataclass
+class ArchivedPartition:
+    partition: Partition
+    path: Optional[Path]
+    rows: int
+
+
+def archive_partitions(
+    *,
+    retain_months: int,
+    archive_dir: Path,
+    dry_run: bool = False,
+    backend: Optional[PartitionBackend] = None,
+) -> List[ArchivedPartition]:
+    """
+    Archive and drop every partition that ends before the retention window
+    (the current month plus the ``retain_months`` before it).
+    """
+    backend = backend or get_partition_backend()
+    cutoff = add_months(month_start(timezone.localdate()), -max(retain_months, 0))
+    cold = [partition for partition in backend.partitions() if partition.end <= cutoff]
+    if dry_run:
+        return [ArchivedPartition(partition, None, partition.rows().count()) for partition in cold]
+    if cold:
+        rollup_pending_days()
+
+    archived = []
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    for partition in cold:
+        path = archive_dir / f"{partition.name}.jsonl.gz"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        rows = 0
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+            for row in backend.iter_rows(partition):
+                handle.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(",", ":")))
+                handle.write("\n")
+                rows += 1
+        os.replace(tmp_path, path)
+        backend.drop(partition)
+        logger.info(f"Archived {rows} activity log rows from {partition.name} to {path}")
+        archived.append(ArchivedPartition(partition, path, rows))
+    return archived
+
+
+def maintain_activity_logs(
+    *,
+    retain_months: Optional[int] = None,
+    archive_dir: Optional[Path] = None,
+    months_ahead: Optional[int] = None,
+    dry_run: bool = False,
+) -> dict:
+    """Create upcoming partitions, roll up closed days and archive cold months."""
+    backend = get_partition_backend()
+    months_ahead = settings.AUDIT_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    created = [] if dry_run else backend.ensure_partitions(add_months(timezone.localdate(), months_ahead))
+    rolled_up = 0 if dry_run else rollup_pending_days()
+    archived = archive_partitions(
+        retain_months=settings.AUDIT_LOG_RETENTION_MONTHS if retain_months is None else retain_months,
+        archive_dir=Path(archive_dir or settings.AUDIT_LOG_ARCHIVE_DIR),
+        dry_run=dry_run,
+        backend=backend,
+    )
+    return {"created": created, "rolled_up_days": rolled_up, "archived": archived}
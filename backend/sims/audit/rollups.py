@@ -0,0 +1,142 @@
+"""
+Daily ActivityLog rollups.
+
+``rollup_pending_days`` condenses every closed day (in ``TIME_ZONE``) into
+``ActivityLogDailyRollup`` rows counting entries by action, actor, verb and
+sensitivity. Verbs are rolled up by family: history mirrors log verbs such as
+``"User:1234"``, so only the part before the first ``:`` is kept, otherwise a
+rollup would be as large as the raw table.
+
+Days are rolled up in order, so the latest rolled-up day is a watermark: every
+full day up to it is answered from rollups, including days that are already
+archived (see ``sims.audit.partitions``). Partial days at the edges of a range
+and days after the watermark are counted from raw rows.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, CharField, Count, F, Max, Min, Sum, Value, When
+from django.db.models.functions import Left, StrIndex
+from django.utils import timezone
+
+from .models import ActivityLog, ActivityLogDailyRollup
+
+ONE_DAY = timedelta(days=1)
+TOP_USERS = 10
+
+_VERB_FAMILY = Case(
+    When(verb__contains=":", then=Left("verb", StrIndex("verb", Value(":")) - 1)),
+    default=F("verb"),
+    output_field=CharField(),
+)
+
+
+def _aware(value: datetime) -> datetime:
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def rollup_day(day: date) -> int:
+    """(Re)build the rollup rows for ``day``; returns how many were written."""
+    groups = (
+        ActivityLog.objects.filter(created_at__gte=day_start(day), created_at__lt=day_start(day + ONE_DAY))
+        .annotate(verb_family=_VERB_FAMILY)
+        .values("action", "actor_id", "verb_family", "is_sensitive")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    rows = [
+        ActivityLogDailyRollup(
+            day=day,
+            action=group["action"],
+            actor_id=group["actor_id"],
+            verb=group["verb_family"][:64],
+            is_sensitive=group["is_sensitive"],
+            count=group["count"],
+        )
+        for group in groups.iterator()
+    ]
+    with transaction.atomic():
+        ActivityLogDailyRollup.objects.filter(day=day).delete()
+        ActivityLogDailyRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rollup_pending_days(until: Optional[date] = None) -> int:
+    """
+    Roll up every day after the watermark through ``until`` (default:
+    yesterday). Days without entries are skipped. Returns the days rolled up.
+    """
+    until = until or timezone.localdate() - ONE_DAY
+    latest = ActivityLogDailyRollup.objects.aggregate(day=Max("day"))["day"]
+    day = latest + ONE_DAY if latest else None
+    rolled = 0
+    while day is None or day <= until:
+        remaining = ActivityLog.objects.filter(created_at__lt=day_start(until + ONE_DAY))
+        if day is not None:
+            remaining = remaining.filter(created_at__gte=day_start(day))
+        first = remaining.aggregate(first=Min("created_at"))["first"]
+        if first is None:
+            break
+        day = timezone.localtime(first).date()
+        rollup_day(day)
+        rolled += 1
+        day += ONE_DAY
+    return rolled
+
+
+def _rolled_up_days(start: datetime, end: datetime) -> Optional[Tuple[date, date]]:
+    """The full days of the inclusive range [start, end] that rollups cover."""
+    latest = ActivityLogDailyRollup.objects.aggregate(day=Max("day"))["day"]
+    if latest is None:
+        return None
+    first = timezone.localtime(start).date()
+    if day_start(first) < start:
+        first += ONE_DAY
+    last = min(timezone.localtime(end + timedelta(microseconds=1)).date() - ONE_DAY, latest)
+    return (first, last) if first <= last else None
+
+
+def summarize_activity(start: datetime, end: datetime, *, include_sensitive: bool = False) -> dict:
+    """
+    ActivityLog totals for ``start``..``end`` (inclusive): overall, by action,
+    and the ten most active users. Rolled-up days are read from
+    ``ActivityLogDailyRollup``; only the rest touches raw rows.
+    """
+    start, end = _aware(start), _aware(end)
+    by_action: Counter = Counter()
+    by_actor: Counter = Counter()
+
+    raw = ActivityLog.objects.filter(created_at__range=(start, end))
+    rolled = _rolled_up_days(start, end)
+    if rolled:
+        first, last = rolled
+        raw = raw.exclude(created_at__gte=day_start(first), created_at__lt=day_start(last + ONE_DAY))
+        rollups = ActivityLogDailyRollup.objects.filter(day__range=rolled)
+        if not include_sensitive:
+            rollups = rollups.filter(is_sensitive=False)
+        for row in rollups.values("action").order_by().annotate(count=Sum("count")):
+            by_action[row["action"]] += row["count"]
+        for row in rollups.exclude(actor_id=None).values("actor_id").order_by().annotate(count=Sum("count")):
+            by_actor[row["actor_id"]] += row["count"]
+
+    if not include_sensitive:
+        raw = raw.filter(is_sensitive=False)
+    for row in raw.values("action").order_by().annotate(count=Count("id")):
+        by_action[row["action"]] += row["count"]
+    for row in raw.exclude(actor_id=None).values("actor_id").order_by().annotate(count=Count("id")):
+        by_actor[row["actor_id"]] += row["count"]
+
+    top_users = sorted(by_actor.items(), key=lambda item: (-item[1], item[0]))[:TOP_USERS]
+    return {
+        "total": sum(by_action.values()),
+        "by_action": dict(sorted(by_action.items())),
+        "top_users": [{"actor_id": actor_id, "count": count} for actor_id, count in top_users],
+    }
@@ -0,0 +1,34 @@
+"""
+Celery tasks for the audit app.
+"""
+from celery import shared_task
+from django.utils.dateparse import parse_datetime
+
+
+@shared_task(ignore_result=True)
+def write_activity_logs(rows):
+    """Insert an ActivityLog batch handed off by a buffered request (``AUDIT_LOG_ASYNC``)."""
+    from sims.audit.models import ActivityLog
+
+    ActivityLog.objects.bulk_create(
+        [ActivityLog(**{**row, "created_at": parse_datetime(row["created_at"])}) for row in rows]
+    )
+
+
+@shared_task(ignore_result=True)
+def maintain_activity_logs():
+    """Nightly partition upkeep, rollups and archival (see ``archive_activity_logs``)."""
+    from sims.audit.partitions import maintain_activity_logs as maintain
+
+    maintain()
+
+
+@shared_task(ignore_result=True)
+def export_activity_log(operation_id):
+    """Render an activity log export queued by ``enqueue_activity_export``."""
+    from sims.audit.export import run_activity_export_job
+    from sims.bulk.models import BulkOperation
+
+    operation = BulkOperation.objects.filter(pk=operation_id, status=BulkOperation.STATUS_PENDING).first()
+    if operation is not None:
+        run_activity_export_job(operation)
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from django.http import HttpResponse
+from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from .export import enqueue_activity_export, filter_metadata, parse_export_params, stream_activity_export
 from .models import ActivityLog, AuditReport
 from .serializers import ActivityLogSerializer, AuditReportSerializer
 
@@ -22,19 +24,46 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
         "is_sensitive": ["exact"],
     }
     ordering_fields = ["created_at"]
-    search_fields = ["verb", "target_repr", "metadata"]
+    # metadata is not text-searchable (an icontains over the JSON column cannot
+    # use an index); filter it with ?metadata_key=&metadata_value= instead.
+    search_fields = ["verb", "target_repr"]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        key = self.request.query_params.get("metadata_key")
+        if key:
+            queryset = filter_metadata(queryset, key, self.request.query_params.get("metadata_value", ""))
+        return queryset
 
     @action(detail=False, methods=["get"], url_path="export")
     def export_csv(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())[:1000]
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = "attachment; filename=audit-log.csv"
-        response.write("timestamp,actor,action,verb,target,ip\n")
-        for log in queryset:
-            response.write(
-                f"{log.created_at.isoformat()},{log.actor_id or ''},{log.action},{log.verb},"
-                f"{log.target_repr},{log.ip_address or ''}\n"
+        """
+        Stream the full (filtered) log as CSV or JSONL.
+
+        Query parameters: ``file_format`` (csv|jsonl), ``compress=gzip``,
+        ``start``/``end``, ``actor``, ``action``, ``is_sensitive``, ``search``,
+        ``metadata_key``/``metadata_value``, ``cursor`` (resume after the row
+        that carried it) and ``async=true`` to render on a worker instead.
+        """
+        try:
+            params = parse_export_params(request.query_params)
+        except ValidationError as exc:
+            return Response({"detail": exc.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        if str(request.query_params.get("async", "")).lower() in ("true", "1", "yes"):
+            operation = enqueue_activity_export(request.user, params)
+            return Response(
+                {
+                    "id": operation.pk,
+                    "status": operation.status,
+                    "status_url": f"/api/bulk/operations/{operation.pk}/",
+                },
+                status=status.HTTP_202_ACCEPTED,
             )
+
+        export = stream_activity_export(params)
+        response = StreamingHttpResponse(export.stream, content_type=export.content_type)
+        response["Content-Disposition"] = f'attachment; filename="{export.filename}"'
         return response
 
 
@@ -0,0 +1,125 @@
+"""
+Buffered ActivityLog writer.
+
+``ActivityLog.log`` runs for every simple_history record, so inserting each
+entry on its own adds a third INSERT to every model save. Inside
+``buffered_activity_log()`` entries are collected instead and written with
+one ``bulk_create`` per ``AUDIT_LOG_BATCH_SIZE`` entries, at the latest when
+the block exits. Requests are wrapped by ``ActivityLogBufferMiddleware``;
+bulk jobs (importers, data-quality recomputes) wrap themselves and always
+flush synchronously, so a job's audit trail is complete when it finishes.
+
+Buffering does not change what gets recorded: an entry logged inside a
+transaction is written only if that transaction (or savepoint) was not rolled
+back, exactly as an immediate INSERT would have been kept or discarded.
+"""
+from __future__ import annotations
+
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+_current_buffer: contextvars.ContextVar[Optional["ActivityLogBuffer"]] = contextvars.ContextVar(
+    "activity_log_buffer", default=None
+)
+
+_SERIALIZED_FIELDS = (
+    "actor_id",
+    "action",
+    "verb",
+    "target_content_type_id",
+    "target_object_id",
+    "target_repr",
+    "metadata",
+    "ip_address",
+    "is_sensitive",
+)
+
+
+class _PendingEntry:
+    """A buffered log plus a commit marker registered with ``transaction.on_commit``."""
+
+    __slots__ = ("log", "committed")
+
+    def __init__(self, log) -> None:
+        self.log = log
+        self.committed = False
+
+    def __call__(self) -> None:
+        self.committed = True
+
+
+class ActivityLogBuffer:
+    def __init__(self, *, batch_size: int, asynchronous: bool) -> None:
+        self.batch_size = max(batch_size, 1)
+        self.asynchronous = asynchronous
+        self._entries: List[_PendingEntry] = []
+
+    def add(self, log) -> None:
+        entry = _PendingEntry(log)
+        if transaction.get_connection().in_atomic_block:
+            # Django drops this hook if the enclosing savepoint or transaction
+            # rolls back, which is how flush() tells discarded entries apart.
+            transaction.on_commit(entry)
+        else:
+            entry.committed = True
+        self._entries.append(entry)
+        if len(self._entries) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write the surviving entries; returns how many were written or queued."""
+        entries, self._entries = self._entries, []
+        if not entries:
+            return 0
+        pending = {id(hook) for _, hook, _ in transaction.get_connection().run_on_commit}
+        logs = [entry.log for entry in entries if entry.committed or id(entry) in pending]
+        if not logs:
+            return 0
+        if self.asynchronous:
+            from .tasks import write_activity_logs
+
+            rows = [_serialize(log) for log in logs]
+            transaction.on_commit(lambda: write_activity_logs.delay(rows))
+        else:
+            type(logs[0]).objects.bulk_create(logs)
+        return len(logs)
+
+
+def _serialize(log) -> dict:
+    row = {field: getattr(log, field) for field in _SERIALIZED_FIELDS}
+    row["created_at"] = log.created_at.isoformat()
+    return row
+
+
+def current_buffer() -> Optional[ActivityLogBuffer]:
+    return _current_buffer.get()
+
+
+@contextmanager
+def buffered_activity_log(*, asynchronous: Optional[bool] = None) -> Iterator[ActivityLogBuffer]:
+    """
+    Buffer ``ActivityLog.log`` calls made inside the block.
+
+    Nested blocks share the outermost buffer. ``asynchronous`` (default
+    ``AUDIT_LOG_ASYNC``) hands each batch to a Celery task after commit
+    instead of inserting it in-process.
+    """
+    active = _current_buffer.get()
+    if active is not None:
+        yield active
+        return
+
+    buffer = ActivityLogBuffer(
+        batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+        asynchronous=settings.AUDIT_LOG_ASYNC if asynchronous is None else asynchronous,
+    )
+    token = _current_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _current_buffer.reset(token)
+        buffer.flush()
@@ -1,12 +1,38 @@
 import os
 import base64
+import struct
 import hashlib
 import logging
+from typing import NamedTuple
 from django.conf import settings
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 logger = logging.getLogger('sims.backup_center')
 
+# Streaming file format (version 2):
+#   header: MAGIC | version (1 byte) | chunk size (4 bytes) | nonce prefix (8 bytes)
+#   frames: final flag (1 byte) | ciphertext length (4 bytes) | AES-GCM ciphertext + tag
+# Each frame's nonce is the prefix plus a 4-byte frame counter, and the header,
+# counter and final flag are authenticated, so frames cannot be reordered,
+# dropped or truncated. Files without the magic are legacy single Fernet tokens.
+STREAM_MAGIC = b"PGSIMSENC"
+STREAM_VERSION = 2
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024
+_HEADER = struct.Struct(">9sBI8s")
+_FRAME = struct.Struct(">BI")
+_TAG_SIZE = 16
+
+
+class EncryptedFileDigests(NamedTuple):
+    """Checksums of the encrypted file, computed while it was written or read."""
+    sha256: str
+    md5: str
+    size: int
+
 def get_encryption_key() -> bytes:
     """
     Retrieves or derives a 32-byte Fernet key from environment variables.
@@ -34,35 +60,138 @@ def get_encryption_key() -> bytes:
     key_32bytes = hasher.digest()
     return base64.urlsafe_b64encode(key_32bytes)
 
-def encrypt_file(source_path: str, dest_path: str) -> None:
+def _stream_key() -> bytes:
+    # Separate AES-256 key for the streaming format, derived from the configured secret.
+    return HKDF(
+        algorithm=hashes.SHA256(), length=32, salt=None, info=b"pgsims backup stream v2",
+    ).derive(base64.urlsafe_b64decode(get_encryption_key()))
+
+
+def _frame_nonce(prefix: bytes, counter: int) -> bytes:
+    return prefix + struct.pack(">I", counter)
+
+
+def _frame_aad(header: bytes, counter: int, final: bool) -> bytes:
+    return header + struct.pack(">IB", counter, int(final))
+
+
+class _DigestingReader:
+    """Read from a file while hashing every byte returned."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.sha256 = hashlib.sha256()
+        self.md5 = hashlib.md5()  # nosec - transfer checksum only
+        self.size = 0
+
+    def read(self, size: int) -> bytes:
+        data = self._raw.read(size)
+        self.sha256.update(data)
+        self.md5.update(data)
+        self.size += len(data)
+        return data
+
+    def read_exact(self, size: int) -> bytes:
+        data = self.read(size)
+        if len(data) != size:
+            raise ValueError("Encrypted backup is truncated.")
+        return data
+
+    def digests(self) -> EncryptedFileDigests:
+        return EncryptedFileDigests(self.sha256.hexdigest(), self.md5.hexdigest(), self.size)
+
+
+def encrypt_file(source_path: str, dest_path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> EncryptedFileDigests:
     """
-    Encrypts source_path and writes encrypted contents to dest_path using Fernet.
+    Encrypts source_path into dest_path in the framed streaming format.
+
+    Memory use is bounded by ``chunk_size``; the checksums of the encrypted
+    output are computed as it is written and returned.
     """
-    key = get_encryption_key()
-    fernet = Fernet(key)
-    
-    with open(source_path, "rb") as f_in:
-        data = f_in.read()
-        
-    encrypted_data = fernet.encrypt(data)
-    
-    with open(dest_path, "wb") as f_out:
-        f_out.write(encrypted_data)
+    aead = AESGCM(_stream_key())
+    prefix = os.urandom(8)
+    header = _HEADER.pack(STREAM_MAGIC, STREAM_VERSION, chunk_size, prefix)
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()  # nosec - transfer checksum only
+    size = 0
+
+    def emit(f_out, data: bytes) -> None:
+        nonlocal size
+        sha256.update(data)
+        md5.update(data)
+        size += len(data)
+        f_out.write(data)
+
+    with open(source_path, "rb") as f_in, open(dest_path, "wb") as f_out:
+        emit(f_out, header)
+        counter = 0
+        chunk = f_in.read(chunk_size)
+        while True:
+            following = f_in.read(chunk_size) if chunk else b""
+            final = not following
+            ciphertext = aead.encrypt(_frame_nonce(prefix, counter), chunk, _frame_aad(header, counter, final))
+            emit(f_out, _FRAME.pack(int(final), len(ciphertext)))
+            emit(f_out, ciphertext)
+            if final:
+                break
+            chunk = following
+            counter += 1
+    return EncryptedFileDigests(sha256.hexdigest(), md5.hexdigest(), size)
 
-def decrypt_file(source_path: str, dest_path: str) -> None:
+
+def decrypt_file(source_path: str, dest_path: str) -> EncryptedFileDigests:
     """
-    Decrypts source_path and writes decrypted contents to dest_path using Fernet.
+    Decrypts source_path into dest_path and returns the checksums of the
+    encrypted source, computed in the same pass.
+
+    Streaming-format files are decrypted frame by frame; legacy files (one
+    Fernet token) are still accepted but are necessarily read whole.
     """
-    key = get_encryption_key()
-    fernet = Fernet(key)
-    
-    with open(source_path, "rb") as f_in:
-        data = f_in.read()
-        
-    decrypted_data = fernet.decrypt(data)
-    
+    with open(source_path, "rb") as raw_in:
+        f_in = _DigestingReader(raw_in)
+        head = f_in.read(_HEADER.size)
+        if not head.startswith(STREAM_MAGIC):
+            _decrypt_legacy_token(head + f_in.read(-1), dest_path)
+            return f_in.digests()
+
+        if len(head) != _HEADER.size:
+            raise ValueError("Encrypted backup is truncated.")
+        _, version, chunk_size, prefix = _HEADER.unpack(head)
+        if version != STREAM_VERSION:
+            raise ValueError(f"Unsupported encrypted backup version: {version}")
+        aead = AESGCM(_stream_key())
+        try:
+            with open(dest_path, "wb") as f_out:
+                counter = 0
+                while True:
+                    final, length = _FRAME.unpack(f_in.read_exact(_FRAME.size))
+                    if length > chunk_size + _TAG_SIZE:
+                        raise ValueError("Encrypted backup frame exceeds the declared chunk size.")
+                    ciphertext = f_in.read_exact(length)
+                    try:
+                        plaintext = aead.decrypt(
+                            _frame_nonce(prefix, counter), ciphertext, _frame_aad(head, counter, bool(final))
+                        )
+                    except InvalidTag:
+                        raise ValueError("Encrypted backup failed authentication (wrong key or corrupted data).")
+                    f_out.write(plaintext)
+                    if final:
+                        break
+                    counter += 1
+            if f_in.read(1):
+                raise ValueError("Unexpected data after the final encrypted frame.")
+        except Exception:
+            # Never leave a partially decrypted backup behind.
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            raise
+        return f_in.digests()
+
+
+def _decrypt_legacy_token(token: bytes, dest_path: str) -> None:
+    fernet = Fernet(get_encryption_key())
     with open(dest_path, "wb") as f_out:
-        f_out.write(decrypted_data)
+        f_out.write(fernet.decrypt(token))
 
 
 def encrypt_string(value: str) -> str:
@@ -1,5 +1,4 @@
 import datetime
-import hashlib
 import json
 import os
 import secrets
@@ -14,7 +13,16 @@ from django.core.cache import cache
 from django.utils import timezone
 
 from .models import BackupCloudConnection, BackupCloudCopy, BackupJob
-from .encryption import decrypt_file, encrypt_file
+from .encryption import decrypt_file
+from .transfer import (
+    TransferStats,
+    finish_encrypted_upload,
+    prepare_encrypted_upload,
+    record_transfer_stats,
+    resumable_upload,
+    save_upload_session,
+    transfer_settings,
+)
 
 
 GOOGLE_OAUTH_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
@@ -337,37 +345,38 @@ class GoogleDriveBackupProvider:
         folder_id: str,
         mime_type: str = "application/octet-stream",
         description: str | None = None,
+        session: Dict[str, Any] | None = None,
+        on_session=None,
     ) -> Dict[str, Any]:
+        """
+        Upload ``local_path`` through a Drive resumable session in chunks.
+
+        Pass a ``session`` dict (persisted via ``on_session``) to resume an
+        interrupted upload from the offset Drive has acknowledged.
+        """
         self._require_enabled()
-        token = self.get_valid_access_token(connection)
 
         metadata: Dict[str, Any] = {"name": remote_name, "parents": [folder_id]}
         if description:
             metadata["description"] = description
 
-        upload_url = self._init_resumable_upload(access_token=token, metadata=metadata)
-        file_size = os.path.getsize(local_path)
-
-        with open(local_path, "rb") as f:
-            put_resp = requests.put(
-                upload_url,
-                headers={
-                    **self._auth_headers(token),
-                    "Content-Type": mime_type,
-                    "Content-Length": str(file_size),
-                },
-                data=f,
-                timeout=60 * 10,
-            )
-
-        if put_resp.status_code not in (200, 201):
-            raise ValueError(f"Drive upload failed: {put_resp.status_code} {put_resp.text[:200]}")
+        chunk_size, _, attempts = transfer_settings()
+        drive_file, stats = resumable_upload(
+            local_path,
+            session=session if session is not None else {},
+            on_session=on_session or (lambda s: None),
+            start_session=lambda: self._init_resumable_upload(
+                access_token=self.get_valid_access_token(connection), metadata=metadata
+            ),
+            headers=lambda: {**self._auth_headers(self.get_valid_access_token(connection)), "Content-Type": mime_type},
+            chunk_size=chunk_size,
+            attempts=attempts,
+        )
 
-        drive_file = put_resp.json()
         file_id = drive_file.get("id")
         if not file_id:
             raise ValueError("Drive upload did not return file id")
-        return {"id": file_id}
+        return {"id": file_id, "stats": stats}
 
     def get_file_metadata(self, *, connection: BackupCloudConnection, file_id: str) -> Dict[str, Any]:
         token = self.get_valid_access_token(connection)
@@ -396,20 +405,6 @@ class GoogleDriveBackupProvider:
             raise ValueError("Remote file checksum mismatch")
         return meta
 
-    def _sha256_file(self, path: str) -> str:
-        h = hashlib.sha256()
-        with open(path, "rb") as f:
-            for chunk in iter(lambda: f.read(1024 * 1024), b""):
-                h.update(chunk)
-        return h.hexdigest()
-
-    def _md5_file(self, path: str) -> str:
-        h = hashlib.md5()  # nosec - checksum only (not for cryptographic security)
-        with open(path, "rb") as f:
-            for chunk in iter(lambda: f.read(1024 * 1024), b""):
-                h.update(chunk)
-        return h.hexdigest()
-
     def upload_backup(self, *, backup_record: BackupJob) -> BackupCloudCopy:
         self._require_enabled()
 
@@ -434,7 +429,8 @@ class GoogleDriveBackupProvider:
         checksum_name = f"{base_name}-checksum.sha256"
 
         tmp_dir = tempfile.mkdtemp(prefix="pgsims-drive-backup-")
-        encrypted_path = os.path.join(tmp_dir, encrypted_name)
+        encrypted_path = None
+        succeeded = False
         manifest_path = os.path.join(tmp_dir, manifest_name)
         checksum_path = os.path.join(tmp_dir, checksum_name)
 
@@ -448,18 +444,18 @@ class GoogleDriveBackupProvider:
         )
 
         try:
-            encrypt_file(backup_record.file_path, encrypted_path)
+            encrypted_path, digests, session = prepare_encrypted_upload(backup_record, "google_drive")
 
             manifest = backup_record.manifest_json or {}
             with open(manifest_path, "w", encoding="utf-8") as f:
                 json.dump(manifest, f, indent=2, sort_keys=True)
 
-            sha256_val = self._sha256_file(encrypted_path)
+            sha256_val = digests.sha256
             with open(checksum_path, "w", encoding="utf-8") as f:
                 f.write(f"{sha256_val}  {encrypted_name}\n")
 
-            md5_val = self._md5_file(encrypted_path)
-            size_val = os.path.getsize(encrypted_path)
+            md5_val = digests.md5
+            size_val = digests.size
 
             backup_file = self.upload_file(
                 connection=connection,
@@ -468,7 +464,11 @@ class GoogleDriveBackupProvider:
                 folder_id=folder_id,
                 mime_type="application/octet-stream",
                 description=f"PGSIMS encrypted backup ({backup_record.backup_kind})",
+                session=session,
+                on_session=lambda s: save_upload_session(backup_record, "google_drive", s),
             )
+            stats: TransferStats = backup_file["stats"]
+            record_transfer_stats(backup_record, stats)
             manifest_file = self.upload_file(
                 connection=connection,
                 local_path=manifest_path,
@@ -501,6 +501,7 @@ class GoogleDriveBackupProvider:
             cloud_copy.verification_status = "verified"
             cloud_copy.verified_at = timezone.now()
             cloud_copy.save()
+            succeeded = True
             return cloud_copy
         except Exception as e:
             cloud_copy.upload_status = "upload_failed"
@@ -509,8 +510,10 @@ class GoogleDriveBackupProvider:
             cloud_copy.save(update_fields=["upload_status", "verification_status", "error_message", "updated_at"])
             raise
         finally:
+            if encrypted_path:
+                finish_encrypted_upload(backup_record, "google_drive", encrypted_path, succeeded=succeeded)
             try:
-                for p in (encrypted_path, manifest_path, checksum_path):
+                for p in (manifest_path, checksum_path):
                     if os.path.exists(p):
                         os.remove(p)
                 if os.path.exists(tmp_dir):
@@ -548,13 +551,11 @@ class GoogleDriveBackupProvider:
                         if chunk:
                             f.write(chunk)
 
-            # Verify sha256 against stored checksum of encrypted file.
-            if cloud_copy.local_checksum:
-                sha = self._sha256_file(temp_enc_path)
-                if sha != cloud_copy.local_checksum:
-                    raise ValueError("Downloaded file checksum verification failed")
-
-            decrypt_file(temp_enc_path, destination_path)
+            # Verify sha256 against stored checksum of encrypted file (hashed while decrypting).
+            digests = decrypt_file(temp_enc_path, destination_path)
+            if cloud_copy.local_checksum and digests.sha256 != cloud_copy.local_checksum:
+                os.remove(destination_path)
+                raise ValueError("Downloaded file checksum verification failed")
 
             cloud_copy.download_status = "downloaded"
             cloud_copy.downloaded_at = timezone.now()
@@ -1,5 +1,9 @@
 from django.core.management.base import BaseCommand
-from sims.backup_center.services import create_routine_application_data_backup, create_disaster_recovery_backup
+from sims.backup_center.services import (
+    MEDIA_MODE_INCREMENTAL,
+    create_disaster_recovery_backup,
+    create_routine_application_data_backup,
+)
 
 class Command(BaseCommand):
     help = 'Creates a PGSIMS system backup'
@@ -16,6 +20,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Create a full disaster recovery backup (.pgsimsdr)',
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Routine backups only: write new media to the content-addressed store instead of archiving all media',
+        )
         parser.add_argument(
             '--notes',
             type=str,
@@ -28,7 +37,8 @@ class Command(BaseCommand):
         if options['routine']:
             self.stdout.write(self.style.NOTICE('Starting routine application data backup...'))
             try:
-                job = create_routine_application_data_backup(user=None, notes=notes)
+                media_mode = MEDIA_MODE_INCREMENTAL if options.get('incremental') else None
+                job = create_routine_application_data_backup(user=None, notes=notes, media_mode=media_mode)
                 self.stdout.write(self.style.SUCCESS(f'Routine backup completed: {job.file_name}'))
                 self.stdout.write(f"Path: {job.file_path}")
             except Exception as e:
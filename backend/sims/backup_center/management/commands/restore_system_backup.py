@@ -14,13 +14,19 @@ class Command(BaseCommand):
         parser.add_argument(
             'file_path',
             type=str,
-            help='Path to the .pgsimsbak file to restore',
+            help='Path to the .pgsimsbak or .pgsimsdr file to restore',
         )
         parser.add_argument(
             '--dry-run',
             action='store_true',
             help='Validate and simulate restore without modifying data',
         )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=None,
+            help='Run pg_restore with this many parallel jobs (default: BACKUP_RESTORE_JOBS or 1)',
+        )
         parser.add_argument(
             '--confirm',
             action='store_true',
@@ -86,7 +92,8 @@ class Command(BaseCommand):
                 restored_by=user,
                 password_confirmed=True,
                 typed_confirmation="RESTORE",
-                dry_run=dry_run
+                dry_run=dry_run,
+                jobs=options['jobs'],
             )
             
             if job.status == 'restored':
@@ -11,14 +11,25 @@ class Command(BaseCommand):
             type=str,
             help='Path to the backup file to validate',
         )
+        parser.add_argument(
+            '--quick',
+            action='store_true',
+            help='Check only the zip central directory and manifest (no member hashing)',
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Re-verify even if this unchanged file was validated before',
+        )
 
     def handle(self, *args, **options):
         file_path = options['file_path']
         self.stdout.write(self.style.NOTICE(f'Validating: {file_path}'))
         
-        result = validate_backup_file(file_path)
+        result = validate_backup_file(file_path, quick=options['quick'], use_cache=not options['no_cache'])
         
         self.stdout.write(f"Kind: {result['backup_kind']}")
+        self.stdout.write(f"Mode: {result['validation_mode']}{' (cached)' if result['cached'] else ''}")
         
         if result['valid']:
             self.stdout.write(self.style.SUCCESS('STATUS: VALID'))
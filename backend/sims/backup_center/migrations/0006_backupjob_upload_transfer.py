@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backup_center", "0005_backupcloudconnection_alter_backupauditlog_action_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backupjob",
+            name="cloud_upload_retries",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="backupjob",
+            name="cloud_upload_session",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="backupjob",
+            name="cloud_upload_throughput_bps",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
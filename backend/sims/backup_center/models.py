@@ -65,6 +65,10 @@ class BackupJob(models.Model):
     cloud_checksum = models.CharField(max_length=255, blank=True, null=True)
     cloud_encryption_status = models.CharField(max_length=50, default='unencrypted')
     cloud_error_message = models.TextField(blank=True, null=True)
+    cloud_upload_throughput_bps = models.BigIntegerField(blank=True, null=True)
+    cloud_upload_retries = models.PositiveIntegerField(default=0)
+    # In-flight multipart/resumable upload sessions keyed by provider, kept until the upload completes.
+    cloud_upload_session = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ['-created_at']
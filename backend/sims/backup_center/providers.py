@@ -3,16 +3,32 @@ import json
 import logging
 import datetime
 import tempfile
-import hashlib
 from typing import Dict, Any, List, Optional
 from django.conf import settings
 from django.utils import timezone
 
 from .models import BackupJob
-from .encryption import encrypt_file, decrypt_file
+from .encryption import decrypt_file
+from .transfer import (
+    finish_encrypted_upload,
+    prepare_encrypted_upload,
+    record_transfer_stats,
+    resumable_upload,
+    s3_multipart_upload,
+    save_upload_session,
+    transfer_settings,
+)
 
 logger = logging.getLogger('sims.backup_center')
 
+def _verify_download_checksum(expected: Optional[str], actual: str, destination_path: str) -> None:
+    """Discard the decrypted file if the encrypted download did not match its published checksum."""
+    if expected and expected != actual:
+        if os.path.exists(destination_path):
+            os.remove(destination_path)
+        raise ValueError("Downloaded file checksum verification failed!")
+
+
 class BaseBackupStorageProvider:
     def upload_backup(self, backup_job: BackupJob) -> Dict[str, Any]:
         """
@@ -112,29 +128,39 @@ class GoogleCloudStorageProvider(BaseBackupStorageProvider):
         client = self._get_client()
         bucket = client.bucket(self.bucket_name)
 
-        local_path = backup_job.file_path
-        encrypted_path = f"{local_path}.enc"
+        part_size, _, attempts = transfer_settings()
+        # 1. Encrypt file locally (checksummed in the same pass), or reuse an interrupted upload's file
+        encrypted_path, digests, session = prepare_encrypted_upload(backup_job, "gcs")
+        succeeded = False
 
         try:
-            # 1. Encrypt file locally
-            encrypt_file(local_path, encrypted_path)
-
-            # 2. Upload encrypted backup
+            # 2. Upload encrypted backup through a resumable session, chunk by chunk
             backup_blob = bucket.blob(keys["backup"])
-            backup_blob.upload_from_filename(encrypted_path)
+            _, stats = resumable_upload(
+                encrypted_path,
+                session=session,
+                on_session=lambda s: save_upload_session(backup_job, "gcs", s),
+                start_session=lambda: backup_blob.create_resumable_upload_session(
+                    content_type="application/octet-stream", size=digests.size
+                ),
+                chunk_size=part_size,
+                attempts=attempts,
+            )
+            record_transfer_stats(backup_job, stats)
 
             # 3. Upload manifest
             manifest_blob = bucket.blob(keys["manifest"])
             manifest_blob.upload_from_string(json.dumps(backup_job.manifest_json or {}), content_type='application/json')
 
             # 4. Upload checksum
-            checksum_val = hashlib.sha256(open(encrypted_path, 'rb').read()).hexdigest()
+            checksum_val = digests.sha256
             checksum_blob = bucket.blob(keys["checksum"])
             checksum_blob.upload_from_string(f"{checksum_val}  backup.enc", content_type='text/plain')
 
             # Verify size
             backup_blob.reload()
             remote_size = backup_blob.size
+            succeeded = True
 
             return {
                 "status": "uploaded",
@@ -144,11 +170,12 @@ class GoogleCloudStorageProvider(BaseBackupStorageProvider):
                 "manifest_key": keys["manifest"],
                 "checksum_key": keys["checksum"],
                 "checksum": checksum_val,
-                "size": remote_size
+                "size": remote_size,
+                "throughput_bps": stats.bytes_per_second,
+                "retries": stats.retries,
             }
         finally:
-            if os.path.exists(encrypted_path):
-                os.remove(encrypted_path)
+            finish_encrypted_upload(backup_job, "gcs", encrypted_path, succeeded=succeeded)
 
     def download_backup(self, backup_job: BackupJob, destination_path: str) -> None:
         client = self._get_client()
@@ -164,16 +191,14 @@ class GoogleCloudStorageProvider(BaseBackupStorageProvider):
             # Download encrypted backup
             blob.download_to_filename(temp_enc_path)
             
-            # Verify checksum if present
             checksum_blob = bucket.blob(keys["checksum"])
+            remote_chk_content = None
             if checksum_blob.exists():
                 remote_chk_content = checksum_blob.download_as_text().strip().split()[0]
-                local_chk_val = hashlib.sha256(open(temp_enc_path, 'rb').read()).hexdigest()
-                if remote_chk_content != local_chk_val:
-                    raise ValueError("Downloaded file checksum verification failed!")
 
-            # Decrypt
-            decrypt_file(temp_enc_path, destination_path)
+            # Decrypt; the ciphertext checksum is computed in the same pass
+            digests = decrypt_file(temp_enc_path, destination_path)
+            _verify_download_checksum(remote_chk_content, digests.sha256, destination_path)
         finally:
             if os.path.exists(temp_enc_path):
                 os.remove(temp_enc_path)
@@ -277,15 +302,25 @@ class S3CompatibleStorageProvider(BaseBackupStorageProvider):
         keys = self._get_keys(backup_job)
         client = self._get_client()
 
-        local_path = backup_job.file_path
-        encrypted_path = f"{local_path}.enc"
+        part_size, workers, attempts = transfer_settings()
+        # 1. Encrypt file locally (checksummed in the same pass), or reuse an interrupted upload's file
+        encrypted_path, digests, session = prepare_encrypted_upload(backup_job, "s3")
+        succeeded = False
 
         try:
-            # 1. Encrypt file locally
-            encrypt_file(local_path, encrypted_path)
-
-            # 2. Upload encrypted backup
-            client.upload_file(encrypted_path, self.bucket_name, keys["backup"])
+            # 2. Upload encrypted backup as a parallel multipart upload
+            stats = s3_multipart_upload(
+                client,
+                self.bucket_name,
+                keys["backup"],
+                encrypted_path,
+                session=session,
+                on_session=lambda s: save_upload_session(backup_job, "s3", s),
+                part_size=part_size,
+                workers=workers,
+                attempts=attempts,
+            )
+            record_transfer_stats(backup_job, stats)
 
             # 3. Upload manifest
             client.put_object(
@@ -296,7 +331,7 @@ class S3CompatibleStorageProvider(BaseBackupStorageProvider):
             )
 
             # 4. Upload checksum
-            checksum_val = hashlib.sha256(open(encrypted_path, 'rb').read()).hexdigest()
+            checksum_val = digests.sha256
             client.put_object(
                 Bucket=self.bucket_name,
                 Key=keys["checksum"],
@@ -307,6 +342,7 @@ class S3CompatibleStorageProvider(BaseBackupStorageProvider):
             # Get size
             resp = client.head_object(Bucket=self.bucket_name, Key=keys["backup"])
             remote_size = resp.get('ContentLength', 0)
+            succeeded = True
 
             return {
                 "status": "uploaded",
@@ -316,11 +352,12 @@ class S3CompatibleStorageProvider(BaseBackupStorageProvider):
                 "manifest_key": keys["manifest"],
                 "checksum_key": keys["checksum"],
                 "checksum": checksum_val,
-                "size": remote_size
+                "size": remote_size,
+                "throughput_bps": stats.bytes_per_second,
+                "retries": stats.retries,
             }
         finally:
-            if os.path.exists(encrypted_path):
-                os.remove(encrypted_path)
+            finish_encrypted_upload(backup_job, "s3", encrypted_path, succeeded=succeeded)
 
     def download_backup(self, backup_job: BackupJob, destination_path: str) -> None:
         client = self._get_client()
@@ -331,18 +368,16 @@ class S3CompatibleStorageProvider(BaseBackupStorageProvider):
             # Download encrypted backup
             client.download_file(self.bucket_name, keys["backup"], temp_enc_path)
             
-            # Verify checksum if present
+            remote_chk_content = None
             try:
                 chk_resp = client.get_object(Bucket=self.bucket_name, Key=keys["checksum"])
                 remote_chk_content = chk_resp['Body'].read().decode('utf-8').strip().split()[0]
-                local_chk_val = hashlib.sha256(open(temp_enc_path, 'rb').read()).hexdigest()
-                if remote_chk_content != local_chk_val:
-                    raise ValueError("Downloaded file checksum verification failed!")
             except Exception as e:
-                logger.warning(f"Could not fetch/verify checksum: {e}")
+                logger.warning(f"Could not fetch checksum: {e}")
 
-            # Decrypt
-            decrypt_file(temp_enc_path, destination_path)
+            # Decrypt; the ciphertext checksum is computed in the same pass
+            digests = decrypt_file(temp_enc_path, destination_path)
+            _verify_download_checksum(remote_chk_content, digests.sha256, destination_path)
         finally:
             if os.path.exists(temp_enc_path):
                 os.remove(temp_enc_path)
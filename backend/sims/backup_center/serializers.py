@@ -6,7 +6,8 @@ class BackupJobSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = BackupJob
-        fields = '__all__'
+        # Upload session URLs authorize writes to the remote object; keep them server-side.
+        exclude = ('cloud_upload_session',)
 
 class RestoreJobSerializer(serializers.ModelSerializer):
     restored_by_username = serializers.ReadOnlyField(source='restored_by.username')
@@ -1,3 +1,4 @@
+import io
 import os
 import json
 import zipfile
@@ -5,11 +6,18 @@ import hashlib
 import tempfile
 import subprocess
 import shutil
+import struct
 import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple, Callable, BinaryIO, Iterator, TextIO
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 from django.apps import apps
 from django.db import connection
@@ -20,7 +28,19 @@ from .models import BackupJob, BackupAuditLog, RestoreJob
 
 logger = logging.getLogger('sims.backup_center')
 
-SUPPORTED_BACKUP_FORMAT_VERSIONS = {"1.2"}
+BACKUP_FORMAT_VERSION = "1.3"
+# 1.3 replaced the whole-tree media hash with a hash over per-file digests.
+SUPPORTED_BACKUP_FORMAT_VERSIONS = {"1.2", BACKUP_FORMAT_VERSION}
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+# Already-compressed formats gain nothing from deflate; they are stored as-is.
+STORED_MEDIA_SUFFIXES = frozenset({
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp",
+    ".docx", ".xlsx", ".pptx", ".zip", ".gz", ".mp4",
+})
+# Media files up to this size are read ahead by the worker pool; larger ones are
+# streamed through zipfile directly so no worker holds them in memory.
+POOL_MEMBER_MAX_BYTES = 8 * 1024 * 1024
 
 def _sha256_file(path: Path) -> str:
     hasher = hashlib.sha256()
@@ -62,6 +82,356 @@ def _compute_tree_sha256(root: Path) -> Tuple[str, int]:
         hasher.update(b"\0")
     return hasher.hexdigest(), len(file_paths)
 
+
+MEDIA_MODE_FULL = "full"
+MEDIA_MODE_INCREMENTAL = "incremental"
+MEDIA_INDEX_MEMBER = "media_index.json"
+_MEDIA_SUMMARY_CACHE_PREFIX = "backup_center:media_summary:"
+
+
+class MediaFile(NamedTuple):
+    rel: str
+    path: Path
+    size: int
+    mtime_ns: int
+
+
+def _list_media_files(root: Path) -> List[MediaFile]:
+    """Files under ``root`` in the deterministic (relative path) order used by media hashes."""
+    entries: List[MediaFile] = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath) / name
+            rel = str(path.relative_to(root)).replace(os.sep, "/")
+            stat = path.stat()
+            entries.append(MediaFile(rel, path, stat.st_size, stat.st_mtime_ns))
+    entries.sort(key=lambda entry: entry.rel)
+    return entries
+
+
+def _media_files_digest(file_digests: List[Tuple[str, int, str]]) -> str:
+    """
+    Format 1.3 media hash: relative path + size + sha256 for each file, in
+    sorted path order. Unlike ``_compute_tree_sha256`` the per-file digests
+    can be produced independently (and in parallel).
+    """
+    hasher = hashlib.sha256()
+    for rel, size, digest in sorted(file_digests):
+        hasher.update(rel.encode("utf-8"))
+        hasher.update(b"\0")
+        hasher.update(str(size).encode("utf-8"))
+        hasher.update(b"\0")
+        hasher.update(digest.encode("ascii"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def backup_compression_workers() -> int:
+    configured = int(os.environ.get("BACKUP_COMPRESSION_WORKERS", "0"))
+    return configured if configured > 0 else min(4, os.cpu_count() or 1)
+
+
+class _HashingWriter(io.RawIOBase):
+    """
+    Write-only, non-seekable file wrapper that hashes everything written.
+
+    zipfile falls back to data descriptors on unseekable output, so the archive
+    is produced strictly sequentially and its checksum is known on close
+    without reading the file back.
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._position = 0
+        self.hasher = hashlib.sha256()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.hasher.update(data)
+        self._raw.write(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        self._raw.flush()
+
+
+def _write_zip_member(zipf: zipfile.ZipFile, source: Path, arcname: str, compress_type: int) -> str:
+    """Stream ``source`` into the archive, hashing it on the way; returns its sha256."""
+    info = zipfile.ZipInfo.from_file(source, arcname)
+    info.compress_type = compress_type
+    hasher = hashlib.sha256()
+    with open(source, "rb") as f_in, zipf.open(info, "w", force_zip64=True) as f_out:
+        for chunk in iter(lambda: f_in.read(_COPY_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+            f_out.write(chunk)
+    return hasher.hexdigest()
+
+
+def _read_member(path: str) -> Tuple[str, bytes]:
+    """Worker: read ``path`` once and return (sha256, contents)."""
+    hasher = hashlib.sha256()
+    parts = []
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_COPY_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+            parts.append(chunk)
+    return hasher.hexdigest(), b"".join(parts)
+
+
+def _write_prefetched_member(zipf: zipfile.ZipFile, info: zipfile.ZipInfo, data: bytes) -> None:
+    """Deflate a member whose contents a pool worker already read and hashed."""
+    info.compress_type = zipfile.ZIP_DEFLATED
+    zipf.writestr(info, data)
+
+
+def _archive_media_tree(zipf: zipfile.ZipFile, media_root: Path, workers: int) -> Dict[str, Any]:
+    """
+    Stream every file under ``media_root`` into ``media/`` in one read.
+
+    Each file is hashed while it is archived. Already-compressed types are
+    stored; small compressible files are read and hashed ahead by a thread
+    pool of ``workers`` (results are consumed in path order through a bounded
+    window) and deflated by zipfile itself.
+    Returns the media summary, including the format 1.3 ``tree_sha256``.
+    """
+    entries = _list_media_files(media_root)
+    pooled = [
+        entry for entry in entries
+        if workers > 1
+        and entry.size <= POOL_MEMBER_MAX_BYTES
+        and Path(entry.rel).suffix.lower() not in STORED_MEDIA_SUFFIXES
+    ]
+    pooled_rels = {entry.rel for entry in pooled}
+    file_digests: List[Tuple[str, int, str]] = []
+    total_size = 0
+
+    pool = ThreadPoolExecutor(max_workers=workers) if pooled else None
+    try:
+        pending = deque()
+        queued = iter(pooled)
+        for entry in entries:
+            arcname = f"media/{entry.rel}"
+            if entry.rel in pooled_rels:
+                while len(pending) < workers * 2:
+                    upcoming = next(queued, None)
+                    if upcoming is None:
+                        break
+                    pending.append(pool.submit(_read_member, str(upcoming.path)))
+                digest, data = pending.popleft().result()
+                _write_prefetched_member(zipf, zipfile.ZipInfo.from_file(entry.path, arcname), data)
+                size = len(data)
+            else:
+                stored = Path(entry.rel).suffix.lower() in STORED_MEDIA_SUFFIXES
+                digest = _write_zip_member(
+                    zipf, entry.path, arcname, zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+                )
+                size = zipf.getinfo(arcname).file_size
+            file_digests.append((entry.rel, size, digest))
+            total_size += size
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return {
+        "file_count": len(file_digests),
+        "total_size_bytes": total_size,
+        "media_root_exists": True,
+        "tree_sha256": _media_files_digest(file_digests),
+        "tree_hash_scheme": "per_file_sha256",
+    }
+
+
+def backup_location() -> Path:
+    return Path(settings.SIMS_SETTINGS.get('BACKUP_LOCATION', settings.BASE_DIR / 'backups'))
+
+
+def media_store_root() -> Path:
+    """Content-addressed media blob store shared by incremental backups."""
+    return backup_location() / "media_store"
+
+
+def default_media_mode() -> str:
+    mode = os.environ.get("BACKUP_MEDIA_MODE", MEDIA_MODE_FULL).lower()
+    return mode if mode in (MEDIA_MODE_FULL, MEDIA_MODE_INCREMENTAL) else MEDIA_MODE_FULL
+
+
+def _blob_path(store: Path, digest: str) -> Path:
+    return store / digest[:2] / digest
+
+
+def _load_media_inventory(store: Path) -> Dict[str, List]:
+    """``{rel: [size, mtime_ns, sha256]}`` as of the last incremental backup."""
+    try:
+        with open(store / "inventory.json", "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_media_inventory(store: Path, inventory: Dict[str, List]) -> None:
+    tmp_path = store / "inventory.json.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(inventory, f)
+    os.replace(tmp_path, store / "inventory.json")
+
+
+def _touch_blob(blob: Path) -> bool:
+    """Bump a reused blob's mtime so prune keeps it; False when it is missing."""
+    try:
+        os.utime(blob)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _ingest_blob(source: Path, store: Path) -> Tuple[str, int, bool]:
+    """
+    Copy ``source`` into the store under its sha256, hashing while copying.
+    Returns (digest, size, added); an existing blob is only touched, so a
+    concurrent prune sees it as in use.
+    """
+    staging = store / "tmp"
+    staging.mkdir(parents=True, exist_ok=True)
+    hasher = hashlib.sha256()
+    size = 0
+    with open(source, "rb") as f_in, tempfile.NamedTemporaryFile(dir=staging, delete=False) as f_out:
+        for chunk in iter(lambda: f_in.read(_COPY_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+            f_out.write(chunk)
+            size += len(chunk)
+    digest = hasher.hexdigest()
+    blob = _blob_path(store, digest)
+    if _touch_blob(blob):
+        os.remove(f_out.name)
+        return digest, size, False
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(f_out.name, blob)
+    return digest, size, True
+
+
+def _store_media_tree(media_root: Path, store: Path) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Bring the blob store up to date with ``media_root``.
+
+    Files whose size and mtime match the previous inventory reuse their
+    recorded digest without being read; everything else is hashed and, when
+    its content is new, written to the store. Returns the media index
+    (``path``/``size``/``sha256`` per file) and the media summary.
+    """
+    inventory = _load_media_inventory(store)
+    fresh_inventory: Dict[str, List] = {}
+    index: List[Dict[str, Any]] = []
+    new_blobs = 0
+    new_bytes = 0
+    for entry in _list_media_files(media_root):
+        cached = inventory.get(entry.rel)
+        if (
+            cached
+            and cached[0] == entry.size
+            and cached[1] == entry.mtime_ns
+            and _touch_blob(_blob_path(store, cached[2]))
+        ):
+            digest, size = cached[2], entry.size
+        else:
+            digest, size, added = _ingest_blob(entry.path, store)
+            if added:
+                new_blobs += 1
+                new_bytes += size
+        fresh_inventory[entry.rel] = [size, entry.mtime_ns, digest]
+        index.append({"path": entry.rel, "size": size, "sha256": digest})
+    _save_media_inventory(store, fresh_inventory)
+
+    summary = {
+        "file_count": len(index),
+        "total_size_bytes": sum(item["size"] for item in index),
+        "media_root_exists": True,
+        "tree_sha256": _media_files_digest([(item["path"], item["size"], item["sha256"]) for item in index]),
+        "tree_hash_scheme": "per_file_sha256",
+        "mode": MEDIA_MODE_INCREMENTAL,
+        "new_blob_count": new_blobs,
+        "new_blob_bytes": new_bytes,
+    }
+    return index, summary
+
+
+def _verify_media_store(index: List[Dict[str, Any]], store: Path, expected_digest: str) -> List[str]:
+    """Check an incremental backup's index against its checksum and every blob it references."""
+    errors = []
+    digests = [(item["path"], item["size"], item["sha256"]) for item in index]
+    if _media_files_digest(digests) != expected_digest:
+        errors.append("File integrity check failed for media contents.")
+    for rel, size, digest in digests:
+        blob = _blob_path(store, digest)
+        if not blob.exists():
+            errors.append(f"Media blob missing from store for {rel}.")
+        elif blob.stat().st_size != size or _sha256_file(blob) != digest:
+            errors.append(f"Media blob for {rel} is corrupted.")
+    return errors
+
+
+def _restore_media_from_store(index: List[Dict[str, Any]], store: Path, dest: Path) -> None:
+    """Reassemble an incremental backup's media tree under ``dest`` from the blob store."""
+    for item in index:
+        blob = _blob_path(store, item["sha256"])
+        if not blob.exists():
+            raise FileNotFoundError(f"Media blob missing from store for {item['path']}")
+        target = dest / item["path"]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(blob, target)
+
+
+def prune_media_store() -> Dict[str, int]:
+    """
+    Delete blobs no longer referenced by any incremental backup still on disk.
+
+    A running backup may reference blobs before its archive exists, so prune
+    does nothing while one is running, and never deletes a blob written or
+    reused after it started: backups touch every blob they dedup onto, so one
+    that starts mid-prune keeps its blobs.
+    """
+    store = media_store_root()
+    if not store.exists():
+        return {"removed": 0, "kept": 0}
+    started = time.time()
+    referenced = set()
+    jobs = BackupJob.objects.filter(backup_kind='routine_application_data').exclude(status='deleted')
+    for job in jobs.only("file_path"):
+        if not job.file_path or not os.path.exists(job.file_path):
+            continue
+        try:
+            with zipfile.ZipFile(job.file_path, "r") as zipf:
+                if MEDIA_INDEX_MEMBER in zipf.namelist():
+                    referenced.update(item["sha256"] for item in json.loads(zipf.read(MEDIA_INDEX_MEMBER)))
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            # An unreadable archive must not cost us blobs it may still reference.
+            logger.warning(f"Media store prune aborted, could not read {job.file_path}: {e}")
+            return {"removed": 0, "kept": -1}
+
+    if jobs.filter(status='running').exists():
+        logger.info("Media store prune skipped, a routine backup is running.")
+        return {"removed": 0, "kept": -1}
+
+    removed = kept = 0
+    for bucket in store.iterdir():
+        if not bucket.is_dir() or len(bucket.name) != 2:
+            continue
+        for blob in bucket.iterdir():
+            if blob.name in referenced or blob.stat().st_mtime >= started:
+                kept += 1
+            else:
+                blob.unlink()
+                removed += 1
+    inventory = _load_media_inventory(store)
+    _save_media_inventory(store, {rel: item for rel, item in inventory.items() if item[2] in referenced})
+    return {"removed": removed, "kept": kept}
+
+
 def _reset_sequences_all_models() -> None:
     """
     Reset autoincrement sequences after a loaddata-based restore.
@@ -110,12 +480,81 @@ def get_app_metadata() -> Dict[str, str]:
         
     return metadata
 
-def get_table_counts() -> Dict[str, int]:
-    """Get row counts for all database tables."""
+def exact_table_counts_enabled() -> bool:
+    return os.environ.get("BACKUP_EXACT_TABLE_COUNTS", "false").lower() in ("1", "true", "yes")
+
+
+def _estimated_row_counts() -> Dict[str, int]:
+    """
+    PostgreSQL planner row estimates by table name, from a single catalog
+    query: ``reltuples`` once the table has been vacuumed/analyzed, otherwise
+    ``n_live_tup`` from the statistics collector. Partitioned tables report
+    the sum of their partitions; tables with neither are omitted.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.oid, c.relname, c.relkind, c.reltuples, c.relpages, s.n_live_tup, i.inhparent
+            FROM pg_class c
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+            WHERE c.relkind IN ('r', 'p') AND pg_table_is_visible(c.oid)
+            """
+        )
+        rows = cursor.fetchall()
+
+    names: Dict[int, str] = {}
+    own: Dict[int, Optional[int]] = {}
+    partitions: Dict[int, List[int]] = {}
+    for oid, relname, relkind, reltuples, relpages, live_tuples, parent in rows:
+        names[oid] = relname
+        if relkind == 'r':
+            if reltuples is not None and reltuples >= 0 and relpages:
+                own[oid] = int(reltuples)
+            elif live_tuples is not None:
+                own[oid] = int(live_tuples)
+        if parent:
+            partitions.setdefault(parent, []).append(oid)
+
+    def estimate(oid: int) -> Optional[int]:
+        if oid not in partitions:
+            return own.get(oid)
+        parts = [estimate(child) for child in partitions[oid]]
+        return None if None in parts else sum(parts)
+
+    estimates = {}
+    for oid, relname in names.items():
+        value = estimate(oid)
+        if value is not None:
+            estimates[relname] = value
+    return estimates
+
+
+def get_table_counts(exact: Optional[bool] = None) -> Dict[str, int]:
+    """
+    Get row counts for all database tables.
+
+    On PostgreSQL these are planner estimates (one catalog query instead of a
+    ``COUNT(*)`` per table) unless ``exact`` is set (default
+    ``BACKUP_EXACT_TABLE_COUNTS``). Tables without statistics yet, and other
+    engines, are counted exactly.
+    """
+    if exact is None:
+        exact = exact_table_counts_enabled()
+    estimates: Dict[str, int] = {}
+    if not exact and 'postgresql' in detect_database_engine():
+        try:
+            estimates = _estimated_row_counts()
+        except Exception as e:
+            logger.warning(f"Could not read table statistics, counting exactly: {e}")
+
     counts = {}
     for model in apps.get_models():
         # Exclude some non-essential models if necessary, but here we include all
         label = f"{model._meta.app_label}.{model._meta.model_name}"
+        if model._meta.db_table in estimates:
+            counts[label] = estimates[model._meta.db_table]
+            continue
         try:
             counts[label] = model.objects.count()
         except Exception as e:
@@ -124,7 +563,15 @@ def get_table_counts() -> Dict[str, int]:
     return counts
 
 def get_media_summary() -> Dict[str, Any]:
-    """Summarize media files."""
+    """
+    Summarize media files.
+
+    Per-directory totals are cached against the directory's mtime, which
+    changes whenever an entry is added, removed or renamed, so only
+    directories that changed since the last call are listed again; the rest
+    cost one ``stat``. (Uploads are written as new files, not rewritten in
+    place.)
+    """
     summary = {
         "file_count": 0,
         "total_size_bytes": 0,
@@ -132,20 +579,53 @@ def get_media_summary() -> Dict[str, Any]:
     }
     
     media_root = Path(settings.MEDIA_ROOT)
-    if media_root.exists():
-        summary["media_root_exists"] = True
-        for root, _, files in os.walk(media_root):
-            for file in files:
-                summary["file_count"] += 1
-                summary["total_size_bytes"] += os.path.getsize(os.path.join(root, file))
-                
+    if not media_root.exists():
+        return summary
+    summary["media_root_exists"] = True
+
+    cache_key = _MEDIA_SUMMARY_CACHE_PREFIX + hashlib.sha256(str(media_root.resolve()).encode("utf-8")).hexdigest()
+    cached_dirs: Dict[str, Dict[str, Any]] = cache.get(cache_key) or {}
+    dirs: Dict[str, Dict[str, Any]] = {}
+    changed = False
+    pending = [""]
+    while pending:
+        rel = pending.pop()
+        directory = media_root / rel
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            changed = True
+            continue
+        entry = cached_dirs.get(rel)
+        if entry is None or entry["mtime_ns"] != mtime_ns:
+            entry = {"mtime_ns": mtime_ns, "file_count": 0, "total_size_bytes": 0, "subdirs": []}
+            with os.scandir(directory) as entries:
+                for item in entries:
+                    if item.is_dir(follow_symlinks=False):
+                        entry["subdirs"].append(item.name)
+                    elif item.is_file():
+                        entry["file_count"] += 1
+                        entry["total_size_bytes"] += item.stat().st_size
+            changed = True
+        dirs[rel] = entry
+        summary["file_count"] += entry["file_count"]
+        summary["total_size_bytes"] += entry["total_size_bytes"]
+        pending.extend(f"{rel}/{name}" if rel else name for name in entry["subdirs"])
+
+    if changed or len(dirs) != len(cached_dirs):
+        cache.set(cache_key, dirs, None)
     return summary
 
-def create_routine_application_data_backup(user=None, notes=None, backup_type='manual') -> BackupJob:
+def create_routine_application_data_backup(user=None, notes=None, backup_type='manual', media_mode=None) -> BackupJob:
     """
     Pathway 1: Routine Application Data Backup
     Includes full database + full media/uploads.
+
+    ``media_mode`` (default ``BACKUP_MEDIA_MODE``) selects ``"full"``, which
+    archives every media file, or ``"incremental"``, which writes only new
+    content to the shared blob store and archives the media index.
     """
+    media_mode = media_mode or default_media_mode()
     job = BackupJob.objects.create(
         backup_kind='routine_application_data',
         backup_type=backup_type,
@@ -171,7 +651,7 @@ def create_routine_application_data_backup(user=None, notes=None, backup_type='m
         
         # Include microseconds to avoid collisions (e.g., safety backup created in same second).
         timestamp = timezone.now().strftime('%Y-%m-%d_%H%M%S_%f')
-        backup_dir = Path(settings.SIMS_SETTINGS.get('BACKUP_LOCATION', settings.BASE_DIR / 'backups'))
+        backup_dir = backup_location()
         backup_dir.mkdir(parents=True, exist_ok=True)
         
         file_name = f"PGSIMS_DATA_BACKUP_{timestamp}.pgsimsbak"
@@ -234,91 +714,76 @@ def create_routine_application_data_backup(user=None, notes=None, backup_type='m
             else:
                 raise Exception(f"Unsupported database engine for backup: {db_engine}")
             
-            # 2. Media Copy
+            # 2. Archive: the dump and media are streamed straight into the zip
+            # (media read once from MEDIA_ROOT, hashed as it is written) and the
+            # archive checksum is computed from the bytes as they hit the disk.
             media_root = Path(settings.MEDIA_ROOT)
-            media_tmp = tmpdir / 'media'
-            media_included = False
-            if media_root.exists():
-                shutil.copytree(media_root, media_tmp, dirs_exist_ok=True)
-                media_included = True
-            
+            media_included = media_root.exists()
             job.media_included = media_included
-            
-            # 3. Summaries
-            table_counts = get_table_counts()
-            media_summary = get_media_summary()
-            job.table_counts_json = table_counts
-            job.media_summary_json = media_summary
-            media_tree_sha256 = None
-            if media_included:
-                try:
-                    media_tree_sha256, media_file_count = _compute_tree_sha256(media_tmp)
-                    media_summary = dict(media_summary)
-                    media_summary["tree_sha256"] = media_tree_sha256
-                    media_summary["file_count"] = media_file_count
+            dump_arcname = 'database_dump.sql' if 'postgresql' in db_engine else 'database_dump.json'
+
+            with open(file_path, 'wb') as raw_archive:
+                archive = _HashingWriter(raw_archive)
+                with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                    # pg_dump's custom format is already compressed.
+                    dump_compression = zipfile.ZIP_STORED if 'postgresql' in db_engine else zipfile.ZIP_DEFLATED
+                    dump_sha256 = _write_zip_member(zipf, db_dump_path, dump_arcname, dump_compression)
+
+                    media_index_bytes = None
+                    if media_included and media_mode == MEDIA_MODE_INCREMENTAL:
+                        media_index, media_summary = _store_media_tree(media_root, media_store_root())
+                        media_index_bytes = json.dumps(media_index).encode("utf-8")
+                        zipf.writestr(MEDIA_INDEX_MEMBER, media_index_bytes)
+                    elif media_included:
+                        media_summary = _archive_media_tree(zipf, media_root, backup_compression_workers())
+                    else:
+                        media_summary = {"file_count": 0, "total_size_bytes": 0, "media_root_exists": False}
+
+                    # 3. Summaries
+                    exact_counts = exact_table_counts_enabled() or 'postgresql' not in db_engine
+                    table_counts = get_table_counts(exact=exact_counts)
+                    job.table_counts_json = table_counts
                     job.media_summary_json = media_summary
-                except Exception as e:
-                    logger.warning(f"Media tree hash skipped: {e}")
-            
-            # 4. Manifest
-            manifest = {
-                "app_name": "PGSIMS",
-                "backup_format_version": "1.2",
-                "backup_kind": "routine_application_data",
-                "created_at": timezone.now().isoformat(),
-                "created_by": user.email if user else "system",
-                "app_version": job.app_version,
-                "branch": job.branch,
-                "commit_hash": job.commit_hash,
-                "database_engine": db_engine,
-                "media_included": media_included,
-                "table_counts": table_counts,
-                "media_summary": job.media_summary_json,
-                "notes": notes
-            }
-            
-            manifest_path = tmpdir / 'manifest.json'
-            with open(manifest_path, 'w') as f:
-                json.dump(manifest, f, indent=2)
-            
-            # 5. Backup Report
-            report_path = tmpdir / 'backup_report.json'
-            with open(report_path, 'w') as f:
-                json.dump(manifest, f, indent=2)
-            
-            # 6. Checksums (component-level integrity)
-            component_checksums = {
-                "database_dump": _sha256_file(db_dump_path),
-                "manifest.json": _sha256_file(manifest_path),
-                "backup_report.json": _sha256_file(report_path),
-            }
-            if media_tree_sha256:
-                component_checksums["media_tree_sha256"] = media_tree_sha256
-            checksum_path = tmpdir / 'checksum.sha256'
-            with open(checksum_path, 'w') as f:
-                for key, val in component_checksums.items():
-                    f.write(f"{val}  {key}\n")
-            
-            # 7. Compress into .pgsimsbak
-            with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                if 'postgresql' in db_engine:
-                    zipf.write(db_dump_path, arcname='database_dump.sql')
-                else:
-                    zipf.write(db_dump_path, arcname='database_dump.json')
-                
-                zipf.write(manifest_path, arcname='manifest.json')
-                zipf.write(report_path, arcname='backup_report.json')
-                zipf.write(checksum_path, arcname='checksum.sha256')
-                
-                if media_included:
-                    for root, _, files in os.walk(media_tmp):
-                        for file in files:
-                            abs_path = Path(root) / file
-                            rel_path = abs_path.relative_to(media_tmp)
-                            zipf.write(abs_path, arcname=Path('media') / rel_path)
-            
-            # 8. Final archive checksum (stored in DB metadata for operator reference)
-            job.checksum = _sha256_file(file_path)
+
+                    # 4. Manifest (the backup report carries the same content)
+                    manifest = {
+                        "app_name": "PGSIMS",
+                        "backup_format_version": BACKUP_FORMAT_VERSION,
+                        "backup_kind": "routine_application_data",
+                        "created_at": timezone.now().isoformat(),
+                        "created_by": user.email if user else "system",
+                        "app_version": job.app_version,
+                        "branch": job.branch,
+                        "commit_hash": job.commit_hash,
+                        "database_engine": db_engine,
+                        "media_included": media_included,
+                        "media_mode": media_mode,
+                        "table_counts": table_counts,
+                        "table_counts_source": "exact" if exact_counts else "estimated",
+                        "media_summary": media_summary,
+                        "notes": notes
+                    }
+                    manifest_bytes = json.dumps(manifest, indent=2).encode("utf-8")
+                    zipf.writestr('manifest.json', manifest_bytes)
+                    zipf.writestr('backup_report.json', manifest_bytes)
+
+                    # 5. Checksums (component-level integrity)
+                    manifest_sha256 = hashlib.sha256(manifest_bytes).hexdigest()
+                    component_checksums = {
+                        "database_dump": dump_sha256,
+                        "manifest.json": manifest_sha256,
+                        "backup_report.json": manifest_sha256,
+                    }
+                    if media_included:
+                        component_checksums["media_files_sha256"] = media_summary["tree_sha256"]
+                    if media_index_bytes is not None:
+                        component_checksums[MEDIA_INDEX_MEMBER] = hashlib.sha256(media_index_bytes).hexdigest()
+                    zipf.writestr('checksum.sha256', "".join(
+                        f"{val}  {key}\n" for key, val in component_checksums.items()
+                    ))
+
+            # 6. Final archive checksum (stored in DB metadata for operator reference)
+            job.checksum = archive.hasher.hexdigest()
             job.file_path = str(file_path)
             job.file_name = file_name
             job.file_size = os.path.getsize(file_path)
@@ -380,11 +845,12 @@ def create_disaster_recovery_backup(user=None, notes=None) -> BackupJob:
         job.save()
         
         # 1. Create Internal Routine Backup
-        routine_job = create_routine_application_data_backup(user=user, notes=f"Internal routine backup for Disaster Recovery: {job.id}", backup_type='automatic')
+        # Disaster bundles must be self-contained, so media is always archived in full.
+        routine_job = create_routine_application_data_backup(user=user, notes=f"Internal routine backup for Disaster Recovery: {job.id}", backup_type='automatic', media_mode=MEDIA_MODE_FULL)
         
         # Include microseconds to avoid collisions.
         timestamp = timezone.now().strftime('%Y-%m-%d_%H%M%S_%f')
-        backup_dir = Path(settings.SIMS_SETTINGS.get('BACKUP_LOCATION', settings.BASE_DIR / 'backups'))
+        backup_dir = backup_location()
         file_name = f"PGSIMS_DISASTER_BACKUP_{timestamp}.pgsimsdr"
         file_path = backup_dir / file_name
         
@@ -427,7 +893,8 @@ def create_disaster_recovery_backup(user=None, notes=None) -> BackupJob:
             
             # 5. Compress into .pgsimsdr
             with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                zipf.write(routine_job.file_path, arcname=os.path.basename(routine_job.file_path))
+                # The routine archive is already compressed; store it rather than deflating it again.
+                zipf.write(routine_job.file_path, arcname=os.path.basename(routine_job.file_path), compress_type=zipfile.ZIP_STORED)
                 zipf.write(deploy_meta_path, arcname='deployment_metadata.json')
                 zipf.write(env_template_path, arcname='env.template')
                 zipf.write(instructions_path, arcname='restore_instructions.md')
@@ -470,19 +937,355 @@ def create_disaster_recovery_backup(user=None, notes=None) -> BackupJob:
         )
         raise
 
-def validate_backup_file(file_path: str) -> Dict[str, Any]:
-    """Validate a backup file (.pgsimsbak or .pgsimsdr)."""
-    result = {
+
+VALIDATION_MODE_FULL = "full"
+VALIDATION_MODE_QUICK = "quick"
+_VALIDATION_CACHE_PREFIX = "backup_center:validation:"
+
+
+def backup_validation_workers() -> int:
+    configured = int(os.environ.get("BACKUP_VALIDATION_WORKERS", "0"))
+    return configured if configured > 0 else min(8, os.cpu_count() or 1)
+
+
+def _validation_cache_timeout() -> int:
+    return int(os.environ.get("BACKUP_VALIDATION_CACHE_SECONDS", str(7 * 24 * 3600)))
+
+
+class _MemberWindow(io.RawIOBase):
+    """
+    Read-only, seekable view of a stored (uncompressed) member inside an
+    outer zip file, so a nested archive can be opened in place instead of
+    being extracted first.
+    """
+
+    def __init__(self, path: str, start: int, size: int):
+        self._file = open(path, "rb")
+        self._start = start
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        remaining = self._size - self._position
+        if remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:min(len(buffer), remaining)]
+        self._file.seek(self._start + self._position)
+        count = self._file.readinto(view)
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def _member_data_offset(path: str, info: zipfile.ZipInfo) -> int:
+    """Absolute offset of a member's data, read from its local file header."""
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        header = struct.unpack(zipfile.structFileHeader, f.read(zipfile.sizeFileHeader))
+    if header[0] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local file header for {info.filename}.")
+    return (
+        info.header_offset
+        + zipfile.sizeFileHeader
+        + header[zipfile._FH_FILENAME_LENGTH]
+        + header[zipfile._FH_EXTRA_FIELD_LENGTH]
+    )
+
+
+def _hash_zip_members(
+    zipf: zipfile.ZipFile,
+    open_archive: Callable[[], BinaryIO],
+    members: List[str],
+    expected: Dict[str, str],
+    workers: int,
+) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    Hash ``members`` on a thread pool (largest first) and return
+    (digests, first member whose digest differs from ``expected``).
+
+    Each thread reads through its own handle from ``open_archive``. On the
+    first mismatch the remaining members are cancelled and in-flight reads
+    stop, so a corrupt archive fails fast.
+    """
+    local = threading.local()
+    handles: List[Tuple[zipfile.ZipFile, BinaryIO]] = []
+    handles_lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker_archive() -> zipfile.ZipFile:
+        if not hasattr(local, "zipf"):
+            handle = open_archive()
+            local.zipf = zipfile.ZipFile(handle)
+            with handles_lock:
+                handles.append((local.zipf, handle))
+        return local.zipf
+
+    def digest(member: str) -> Tuple[str, Optional[str]]:
+        hasher = hashlib.sha256()
+        with worker_archive().open(member, "r") as f:
+            for chunk in iter(lambda: f.read(_COPY_CHUNK_SIZE), b""):
+                if stop.is_set():
+                    return member, None
+                hasher.update(chunk)
+        return member, hasher.hexdigest()
+
+    digests: Dict[str, str] = {}
+    corrupt: Optional[str] = None
+    ordered = sorted(members, key=lambda member: zipf.getinfo(member).file_size, reverse=True)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [pool.submit(digest, member) for member in ordered]
+            try:
+                for future in as_completed(futures):
+                    member, value = future.result()
+                    if value is None:
+                        continue
+                    digests[member] = value
+                    if member in expected and value != expected[member]:
+                        corrupt = member
+                        break
+            finally:
+                stop.set()
+                for future in futures:
+                    future.cancel()
+    finally:
+        for worker_zip, handle in handles:
+            worker_zip.close()
+            handle.close()
+    return digests, corrupt
+
+
+def _read_checksum_entries(zipf: zipfile.ZipFile) -> Dict[str, str]:
+    checksum_text = zipf.read('checksum.sha256').decode('utf-8', errors='replace')
+    checks: Dict[str, str] = {}
+    for line in checksum_text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        checks[parts[-1].strip()] = parts[0].strip()
+    return checks
+
+
+def _new_validation_result(mode: str) -> Dict[str, Any]:
+    return {
         "valid": False,
         "can_restore": False,
         "backup_kind": "unknown",
+        "validation_mode": mode,
+        "cached": False,
         "errors": [],
         "warnings": [],
         "manifest": {},
         "table_counts": {},
         "media_summary": {}
     }
-    
+
+
+def _validation_cache_key(path: Path, zipf: zipfile.ZipFile) -> str:
+    """
+    Cache key over (path, size, mtime, archive checksum). The archive
+    checksum is taken from the central directory (name, CRC-32 and size of
+    every member), so computing it reads no member data.
+    """
+    stat = path.stat()
+    fingerprint = hashlib.sha256()
+    for info in zipf.infolist():
+        fingerprint.update(f"{info.filename}\0{info.CRC}\0{info.file_size}\n".encode("utf-8"))
+    raw = f"{path.resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}\0{fingerprint.hexdigest()}"
+    return _VALIDATION_CACHE_PREFIX + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _validate_routine_archive(
+    zipf: zipfile.ZipFile,
+    open_archive: Callable[[], BinaryIO],
+    result: Dict[str, Any],
+    quick: bool,
+) -> None:
+    """Check a routine archive's layout and manifest, then (unless ``quick``) its checksums."""
+    namelist = zipf.namelist()
+    result["backup_kind"] = "routine_application_data"
+    if 'manifest.json' not in namelist:
+        result["errors"].append("manifest.json is missing.")
+    else:
+        manifest = json.loads(zipf.read('manifest.json'))
+        result["manifest"] = manifest
+        result["table_counts"] = manifest.get("table_counts", {})
+        result["media_summary"] = manifest.get("media_summary", {})
+
+        if manifest.get("app_name") != "PGSIMS":
+            result["errors"].append("Not a PGSIMS backup file.")
+        fmt = str(manifest.get("backup_format_version", "")).strip()
+        if fmt not in SUPPORTED_BACKUP_FORMAT_VERSIONS:
+            result["errors"].append(f"Unsupported backup format version: {fmt or 'missing'}.")
+        if manifest.get("backup_kind") != "routine_application_data":
+            result["errors"].append("backup_kind mismatch for .pgsimsbak.")
+        if not manifest.get("database_engine"):
+            result["errors"].append("database_engine is missing from manifest.")
+
+    if 'database_dump.sql' not in namelist and 'database_dump.json' not in namelist:
+        result["errors"].append("database_dump.sql or database_dump.json is missing.")
+
+    if 'checksum.sha256' not in namelist:
+        result["errors"].append("checksum.sha256 is missing.")
+    if 'backup_report.json' not in namelist:
+        result["errors"].append("backup_report.json is missing.")
+
+    incremental_media = result["manifest"].get("media_mode") == MEDIA_MODE_INCREMENTAL
+    if result["manifest"].get("media_included"):
+        if incremental_media:
+            if MEDIA_INDEX_MEMBER not in namelist:
+                result["errors"].append(f"{MEDIA_INDEX_MEMBER} is missing but manifest indicates incremental media.")
+        else:
+            has_media_entries = any(n.startswith("media/") for n in namelist)
+            if not has_media_entries:
+                result["errors"].append("media folder is missing but manifest indicates media_included=true.")
+
+    if 'checksum.sha256' not in namelist:
+        return
+
+    # Integrity check: verify component hashes listed in checksum.sha256
+    try:
+        checks = _read_checksum_entries(zipf)
+
+        # Map logical keys to zip members
+        member_map = {
+            "manifest.json": "manifest.json",
+            "backup_report.json": "backup_report.json",
+        }
+        if 'database_dump.sql' in namelist:
+            member_map["database_dump"] = "database_dump.sql"
+        elif 'database_dump.json' in namelist:
+            member_map["database_dump"] = "database_dump.json"
+        if incremental_media and MEDIA_INDEX_MEMBER in namelist:
+            member_map[MEDIA_INDEX_MEMBER] = MEDIA_INDEX_MEMBER
+
+        expected: Dict[str, str] = {}
+        for key, member in member_map.items():
+            digest = checks.get(key)
+            if not digest:
+                result["errors"].append(f"checksum.sha256 missing entry for {key}.")
+                continue
+            expected[member] = digest
+
+        if quick:
+            # Only the (small) manifest is hashed; the dump and media are left for a full run.
+            if "manifest.json" in expected and _sha256_zip_member(zipf, "manifest.json") != expected["manifest.json"]:
+                result["errors"].append("File integrity check failed for manifest.json.")
+            return
+
+        # Format 1.3 media hash over per-file digests, hashed alongside the components
+        expected_media_files = checks.get("media_files_sha256")
+        media_members: List[str] = []
+        if expected_media_files and result["manifest"].get("media_included") and not incremental_media:
+            media_members = [n for n in namelist if n.startswith("media/") and not n.endswith("/")]
+
+        digests, corrupt = _hash_zip_members(
+            zipf, open_archive, list(expected) + media_members, expected, backup_validation_workers()
+        )
+        if corrupt:
+            result["errors"].append(f"File integrity check failed for {corrupt}.")
+            return
+
+        if media_members:
+            file_digests = [
+                (member[len("media/"):], zipf.getinfo(member).file_size, digests[member])
+                for member in media_members
+            ]
+            if _media_files_digest(file_digests) != expected_media_files:
+                result["errors"].append("File integrity check failed for media contents.")
+        elif expected_media_files and incremental_media and MEDIA_INDEX_MEMBER in namelist:
+            media_index = json.loads(zipf.read(MEDIA_INDEX_MEMBER))
+            result["errors"].extend(_verify_media_store(media_index, media_store_root(), expected_media_files))
+
+        # Format 1.2 media tree hash: one digest over all members in order, so it stays sequential
+        expected_media_tree = checks.get("media_tree_sha256")
+        if expected_media_tree and result["manifest"].get("media_included"):
+            # Recompute deterministically from the zip members (no extract)
+            media_members = sorted([n for n in namelist if n.startswith("media/") and not n.endswith("/")])
+            media_hasher = hashlib.sha256()
+            for member in media_members:
+                rel = member[len("media/"):]
+                media_hasher.update(rel.encode("utf-8"))
+                media_hasher.update(b"\0")
+                info = zipf.getinfo(member)
+                media_hasher.update(str(info.file_size).encode("utf-8"))
+                media_hasher.update(b"\0")
+                with zipf.open(member, "r") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        media_hasher.update(chunk)
+                media_hasher.update(b"\0")
+            actual_media_tree = media_hasher.hexdigest()
+            if actual_media_tree != expected_media_tree:
+                result["errors"].append("File integrity check failed for media contents.")
+    except Exception as e:
+        result["errors"].append(f"Checksum verification error: {e}")
+
+
+def _nested_archive_opener(outer_path: str, outer_zip: zipfile.ZipFile, member: str) -> Optional[Callable[[], BinaryIO]]:
+    """
+    Opener for a routine backup nested in a disaster bundle, read in place
+    through a window over the outer file. Bundles store it uncompressed;
+    returns None for older bundles that deflated it.
+    """
+    info = outer_zip.getinfo(member)
+    if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+        return None
+    start = _member_data_offset(outer_path, info)
+    return lambda: io.BufferedReader(_MemberWindow(outer_path, start, info.file_size), _COPY_CHUNK_SIZE)
+
+
+def _validate_nested_routine_archive(outer_path: str, outer_zip: zipfile.ZipFile, member: str, quick: bool) -> Dict[str, Any]:
+    """Validate the routine backup inside a disaster bundle without extracting it when possible."""
+    open_inner = _nested_archive_opener(outer_path, outer_zip, member)
+    if open_inner is None:
+        with tempfile.TemporaryDirectory() as td:
+            inner_path = Path(td) / Path(member).name
+            with outer_zip.open(member) as src, open(inner_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+            return validate_backup_file(str(inner_path), quick=quick, use_cache=False)
+
+    inner = _new_validation_result(VALIDATION_MODE_QUICK if quick else VALIDATION_MODE_FULL)
+    with open_inner() as handle, zipfile.ZipFile(handle) as inner_zip:
+        _validate_routine_archive(inner_zip, open_inner, inner, quick)
+    inner["valid"] = not inner["errors"]
+    return inner
+
+
+def validate_backup_file(file_path: str, *, quick: bool = False, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Validate a backup file (.pgsimsbak or .pgsimsdr).
+
+    A full validation hashes every member listed in checksum.sha256 in
+    parallel and stops at the first mismatch; its result is cached against
+    (path, size, mtime, archive checksum), so validating an unchanged file
+    again (e.g. restore after an explicit validate) costs one central
+    directory read. ``quick`` checks only the central directory and manifest.
+    """
+    result = _new_validation_result(VALIDATION_MODE_QUICK if quick else VALIDATION_MODE_FULL)
+
     path = Path(file_path)
     if not path.exists():
         result["errors"].append("File does not exist.")
@@ -494,99 +1297,18 @@ def validate_backup_file(file_path: str) -> Dict[str, Any]:
     
     try:
         with zipfile.ZipFile(file_path, 'r') as zipf:
+            cache_key = _validation_cache_key(path, zipf) if use_cache else None
+            if cache_key:
+                # A cached full result also answers a quick request.
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return {**cached, "cached": True}
+
             namelist = zipf.namelist()
             
             if path.suffix == '.pgsimsbak':
-                result["backup_kind"] = "routine_application_data"
-                if 'manifest.json' not in namelist:
-                    result["errors"].append("manifest.json is missing.")
-                else:
-                    manifest = json.loads(zipf.read('manifest.json'))
-                    result["manifest"] = manifest
-                    result["table_counts"] = manifest.get("table_counts", {})
-                    result["media_summary"] = manifest.get("media_summary", {})
-                    
-                    if manifest.get("app_name") != "PGSIMS":
-                        result["errors"].append("Not a PGSIMS backup file.")
-                    fmt = str(manifest.get("backup_format_version", "")).strip()
-                    if fmt not in SUPPORTED_BACKUP_FORMAT_VERSIONS:
-                        result["errors"].append(f"Unsupported backup format version: {fmt or 'missing'}.")
-                    if manifest.get("backup_kind") != "routine_application_data":
-                        result["errors"].append("backup_kind mismatch for .pgsimsbak.")
-                    if not manifest.get("database_engine"):
-                        result["errors"].append("database_engine is missing from manifest.")
-                
-                if 'database_dump.sql' not in namelist and 'database_dump.json' not in namelist:
-                    result["errors"].append("database_dump.sql or database_dump.json is missing.")
-                    
-                if 'checksum.sha256' not in namelist:
-                    result["errors"].append("checksum.sha256 is missing.")
-                if 'backup_report.json' not in namelist:
-                    result["errors"].append("backup_report.json is missing.")
-
-                if result["manifest"].get("media_included"):
-                    has_media_entries = any(n.startswith("media/") for n in namelist)
-                    if not has_media_entries:
-                        result["errors"].append("media folder is missing but manifest indicates media_included=true.")
-                
-                # Integrity check: verify component hashes listed in checksum.sha256
-                if 'checksum.sha256' in namelist:
-                    try:
-                        checksum_text = zipf.read('checksum.sha256').decode('utf-8', errors='replace')
-                        checks: Dict[str, str] = {}
-                        for line in checksum_text.splitlines():
-                            line = line.strip()
-                            if not line or line.startswith("#"):
-                                continue
-                            parts = line.split()
-                            if len(parts) < 2:
-                                continue
-                            digest = parts[0].strip()
-                            key = parts[-1].strip()
-                            checks[key] = digest
-
-                        # Map logical keys to zip members
-                        member_map = {
-                            "manifest.json": "manifest.json",
-                            "backup_report.json": "backup_report.json",
-                        }
-                        if 'database_dump.sql' in namelist:
-                            member_map["database_dump"] = "database_dump.sql"
-                        elif 'database_dump.json' in namelist:
-                            member_map["database_dump"] = "database_dump.json"
-
-                        for key, member in member_map.items():
-                            expected = checks.get(key)
-                            if not expected:
-                                result["errors"].append(f"checksum.sha256 missing entry for {key}.")
-                                continue
-                            actual = _sha256_zip_member(zipf, member)
-                            if actual != expected:
-                                result["errors"].append(f"File integrity check failed for {member}.")
-
-                        # Optional media tree hash
-                        expected_media_tree = checks.get("media_tree_sha256")
-                        if expected_media_tree and result["manifest"].get("media_included"):
-                            # Recompute deterministically from the zip members (no extract)
-                            media_members = sorted([n for n in namelist if n.startswith("media/") and not n.endswith("/")])
-                            media_hasher = hashlib.sha256()
-                            for member in media_members:
-                                rel = member[len("media/"):]
-                                media_hasher.update(rel.encode("utf-8"))
-                                media_hasher.update(b"\0")
-                                info = zipf.getinfo(member)
-                                media_hasher.update(str(info.file_size).encode("utf-8"))
-                                media_hasher.update(b"\0")
-                                with zipf.open(member, "r") as f:
-                                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
-                                        media_hasher.update(chunk)
-                                media_hasher.update(b"\0")
-                            actual_media_tree = media_hasher.hexdigest()
-                            if actual_media_tree != expected_media_tree:
-                                result["errors"].append("File integrity check failed for media contents.")
-                    except Exception as e:
-                        result["errors"].append(f"Checksum verification error: {e}")
-                
+                _validate_routine_archive(zipf, lambda: open(file_path, "rb"), result, quick)
+
             elif path.suffix == '.pgsimsdr':
                 result["backup_kind"] = "disaster_recovery"
                 if 'deployment_metadata.json' not in namelist:
@@ -601,18 +1323,14 @@ def validate_backup_file(file_path: str) -> Dict[str, Any]:
                 else:
                     # Validate the internal routine backup as well
                     try:
-                        with tempfile.TemporaryDirectory() as td:
-                            inner_path = Path(td) / Path(internal_bak[0]).name
-                            with open(inner_path, "wb") as f:
-                                f.write(zipf.read(internal_bak[0]))
-                            inner = validate_backup_file(str(inner_path))
-                            if not inner.get("valid"):
-                                result["errors"].append("Internal routine backup validation failed.")
-                                result["warnings"].extend([f"internal: {e}" for e in inner.get("errors", [])])
-                            else:
-                                result["manifest"] = inner.get("manifest", {})
-                                result["table_counts"] = inner.get("table_counts", {})
-                                result["media_summary"] = inner.get("media_summary", {})
+                        inner = _validate_nested_routine_archive(file_path, zipf, internal_bak[0], quick)
+                        if not inner.get("valid"):
+                            result["errors"].append("Internal routine backup validation failed.")
+                            result["warnings"].extend([f"internal: {e}" for e in inner.get("errors", [])])
+                        else:
+                            result["manifest"] = inner.get("manifest", {})
+                            result["table_counts"] = inner.get("table_counts", {})
+                            result["media_summary"] = inner.get("media_summary", {})
                     except Exception as e:
                         result["errors"].append(f"Failed to validate internal routine backup: {e}")
             else:
@@ -621,12 +1339,215 @@ def validate_backup_file(file_path: str) -> Dict[str, Any]:
             if not result["errors"]:
                 result["valid"] = True
                 result["can_restore"] = True
+
+            # Incremental archives also depend on the media store, which can change under an unchanged file.
+            if cache_key and not quick and result["manifest"].get("media_mode") != MEDIA_MODE_INCREMENTAL:
+                cache.set(cache_key, result, _validation_cache_timeout())
                 
     except Exception as e:
         result["errors"].append(f"Validation error: {e}")
         
     return result
 
+def backup_restore_jobs() -> int:
+    """pg_restore --jobs for destructive restores; 1 streams the dump through stdin."""
+    return max(1, int(os.environ.get("BACKUP_RESTORE_JOBS", "1")))
+
+
+@contextmanager
+def _open_routine_archive(file_path: str) -> Iterator[zipfile.ZipFile]:
+    """
+    Open a routine backup for reading: the file itself, or the .pgsimsbak
+    nested in a .pgsimsdr bundle (read in place, or spooled to a temporary
+    file for bundles that deflated it).
+    """
+    if not str(file_path).endswith(".pgsimsdr"):
+        with zipfile.ZipFile(file_path, "r") as zipf:
+            yield zipf
+        return
+
+    with ExitStack() as stack:
+        outer = stack.enter_context(zipfile.ZipFile(file_path, "r"))
+        inner_bak = [n for n in outer.namelist() if n.endswith(".pgsimsbak")]
+        if not inner_bak:
+            raise Exception("Disaster backup bundle missing internal .pgsimsbak.")
+        opener = _nested_archive_opener(file_path, outer, inner_bak[0])
+        if opener is None:
+            inner_path = Path(stack.enter_context(tempfile.TemporaryDirectory())) / Path(inner_bak[0]).name
+            with outer.open(inner_bak[0]) as src, open(inner_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+            handle = stack.enter_context(open(inner_path, "rb"))
+        else:
+            handle = stack.enter_context(opener())
+        yield stack.enter_context(zipfile.ZipFile(handle))
+
+
+def _iter_json_array(stream: TextIO, chunk_size: int = _COPY_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without reading the whole stream."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    opened = False
+
+    while True:
+        skip = " \t\r\n," if opened else " \t\r\n"
+        while pos < len(buffer) and buffer[pos] in skip:
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON dump.")
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        if not opened:
+            if buffer[pos] != "[":
+                raise ValueError("JSON dump is not an array.")
+            opened = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The element continues past the buffer; read more and decode it again.
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield item
+        pos = end
+
+
+def _load_json_dump(stream: TextIO) -> int:
+    """
+    Load a dumpdata fixture the way ``loaddata`` does (raw saves, forward
+    references resolved at the end, constraints checked once) but object by
+    object, so the fixture is never held in memory. Returns the object count.
+    """
+    from django.core.serializers.python import Deserializer as PythonDeserializer
+    from django.db import transaction
+
+    count = 0
+    with transaction.atomic():
+        with connection.constraint_checks_disabled():
+            deferred = []
+            for obj in PythonDeserializer(_iter_json_array(stream), handle_forward_references=True):
+                obj.save()
+                if obj.deferred_fields:
+                    deferred.append(obj)
+                count += 1
+            for obj in deferred:
+                obj.save_deferred_fields()
+        connection.check_constraints()
+    return count
+
+
+def _run_pg_restore(zipf: zipfile.ZipFile, member: str, restore_job_id: int, jobs: int) -> None:
+    """
+    Restore the custom-format dump ``member`` with pg_restore.
+
+    With one job the dump is piped to pg_restore's stdin straight out of the
+    archive. ``--jobs`` needs a seekable file, so for a parallel restore the
+    dump member alone is extracted to a temporary file.
+    """
+    db_config = settings.DATABASES['default']
+    env = os.environ.copy()
+    if db_config.get('PASSWORD'):
+        env['PGPASSWORD'] = db_config.get('PASSWORD')
+
+    pg_restore_cmd = os.environ.get('PG_RESTORE_CMD', 'pg_restore')
+    docker = 'docker exec' in pg_restore_cmd
+    if docker:
+        cmd = pg_restore_cmd.split()
+    else:
+        cmd = [
+            pg_restore_cmd,
+            '-h', db_config.get('HOST', 'localhost'),
+            '-p', str(db_config.get('PORT', '5432')),
+        ]
+    # Destructive restore
+    cmd += [
+        '-U', db_config.get('USER', ''),
+        '-d', db_config.get('NAME', ''),
+        '--clean',
+        '--if-exists',
+        '--no-owner',
+        '--no-privileges',
+    ]
+
+    if jobs > 1:
+        with tempfile.TemporaryDirectory() as td:
+            dump_path = Path(td) / 'database_dump.sql'
+            with zipf.open(member) as src, open(dump_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+            target = str(dump_path)
+            if docker:
+                container_id = pg_restore_cmd.split()[2]
+                target = f"/tmp/restore_{restore_job_id}.sql"
+                subprocess.run(['docker', 'cp', str(dump_path), f"{container_id}:{target}"], check=True)
+            result = subprocess.run(cmd + ['--jobs', str(jobs), target], env=env, capture_output=True, text=True)
+        # pg_restore often exits with code 0 but has warnings on stderr.
+        # Significant errors should be caught.
+        if result.returncode != 0:
+            raise Exception(f"pg_restore failed: {result.stderr}")
+        return
+
+    if docker and '-i' not in cmd:
+        # docker exec only forwards stdin with -i
+        cmd.insert(cmd.index('exec') + 1, '-i')
+    with zipf.open(member) as dump, tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(cmd, env=env, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+        try:
+            shutil.copyfileobj(dump, process.stdin, _COPY_CHUNK_SIZE)
+        except BrokenPipeError:
+            pass  # pg_restore stopped reading; its exit status and stderr say why
+        finally:
+            process.stdin.close()
+        if process.wait() != 0:
+            stderr.seek(0)
+            raise Exception(f"pg_restore failed: {stderr.read().decode('utf-8', errors='replace')}")
+
+
+def _extract_media_members(zipf: zipfile.ZipFile, dest: Path) -> int:
+    """Write the archive's media/ members under ``dest`` one at a time."""
+    root = dest.resolve()
+    count = 0
+    for info in zipf.infolist():
+        if not info.filename.startswith("media/") or info.is_dir():
+            continue
+        target = (dest / info.filename[len("media/"):]).resolve()
+        if root not in target.parents:
+            raise Exception(f"Unsafe media path in backup: {info.filename}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with zipf.open(info) as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+        count += 1
+    return count
+
+
+def _swap_in_directory(staging: Path, dest: Path) -> None:
+    """Replace ``dest`` with ``staging`` using renames, so it is never left half-restored."""
+    previous = dest.with_name(f".{dest.name}.previous")
+    if previous.exists():
+        shutil.rmtree(previous)
+    if dest.exists():
+        os.replace(dest, previous)
+    try:
+        os.replace(staging, dest)
+    except Exception:
+        if previous.exists():
+            os.replace(previous, dest)
+        raise
+    shutil.rmtree(previous, ignore_errors=True)
+
+
 def restore_routine_application_data_backup(
     file_path: str,
     restored_by,
@@ -634,10 +1555,17 @@ def restore_routine_application_data_backup(
     typed_confirmation: str = "",
     dry_run: bool = False,
     restore_job: Optional[RestoreJob] = None,
+    jobs: Optional[int] = None,
 ) -> RestoreJob:
     """
-    Restore a routine backup.
+    Restore a routine backup (or the one inside a .pgsimsdr bundle).
     Only Super Admin, requires password and typed confirmation.
+
+    Nothing is bulk-extracted: the dump is streamed out of the archive into
+    pg_restore (or the JSON loader on SQLite) and media is written member by
+    member into a staging directory that replaces MEDIA_ROOT once the
+    database is restored. ``jobs`` > 1 (default ``BACKUP_RESTORE_JOBS``)
+    runs ``pg_restore --jobs``.
     """
     if not restored_by.is_superuser:
         raise Exception("Access Denied: Super Admin only.")
@@ -648,32 +1576,7 @@ def restore_routine_application_data_backup(
         if typed_confirmation != "RESTORE":
             raise Exception("Typed confirmation 'RESTORE' required.")
             
-    # Resolve disaster bundle (.pgsimsdr) to its internal routine backup
     original_file_path = file_path
-    if str(file_path).endswith(".pgsimsdr"):
-        with tempfile.TemporaryDirectory() as td:
-            td_path = Path(td)
-            with zipfile.ZipFile(file_path, "r") as zipf:
-                inner_bak = [n for n in zipf.namelist() if n.endswith(".pgsimsbak")]
-                if not inner_bak:
-                    raise Exception("Disaster backup bundle missing internal .pgsimsbak.")
-                inner_path = td_path / Path(inner_bak[0]).name
-                with open(inner_path, "wb") as f:
-                    f.write(zipf.read(inner_bak[0]))
-            # Continue restore from the extracted routine file
-            file_path = str(inner_path)
-
-            # For dry-run, we can exit early after validation below; for destructive restore,
-            # we must keep the extracted file available for the duration of this function.
-            # So we re-enter the main logic via a nested helper.
-            return restore_routine_application_data_backup(
-                file_path=file_path,
-                restored_by=restored_by,
-                password_confirmed=password_confirmed,
-                typed_confirmation=typed_confirmation,
-                dry_run=dry_run,
-                restore_job=restore_job,
-            )
 
     if restore_job is None:
         restore_job = RestoreJob.objects.create(
@@ -744,111 +1647,75 @@ def restore_routine_application_data_backup(
         restore_job.status = 'restoring'
         restore_job.save()
         
-        with tempfile.TemporaryDirectory() as tmpdir_name:
-            tmpdir = Path(tmpdir_name)
-            with zipfile.ZipFile(file_path, 'r') as zipf:
-                zipf.extractall(tmpdir)
-            
-            db_dump_path = tmpdir / 'database_dump.sql'
-            db_engine = detect_database_engine()
-            
-            # Close connections before destructive restore
-            from django.db import connection
-            connection.close()
+        manifest = validation["manifest"]
+        media_dest = Path(settings.MEDIA_ROOT)
+        media_staging = media_dest.with_name(f".{media_dest.name}.restore-{restore_job.id}")
+        try:
+            with _open_routine_archive(file_path) as zipf:
+                namelist = zipf.namelist()
 
-            if 'postgresql' in db_engine:
-                db_config = settings.DATABASES['default']
-                env = os.environ.copy()
-                if db_config.get('PASSWORD'):
-                    env['PGPASSWORD'] = db_config.get('PASSWORD')
-                
-                pg_restore_cmd = os.environ.get('PG_RESTORE_CMD', 'pg_restore')
+                # Stage media first so a failure here leaves the database untouched.
+                if manifest.get("media_included"):
+                    if media_staging.exists():
+                        shutil.rmtree(media_staging)
+                    media_staging.mkdir(parents=True)
+                    if manifest.get("media_mode") == MEDIA_MODE_INCREMENTAL:
+                        media_index = json.loads(zipf.read(MEDIA_INDEX_MEMBER))
+                        _restore_media_from_store(media_index, media_store_root(), media_staging)
+                    else:
+                        _extract_media_members(zipf, media_staging)
+
+                db_engine = detect_database_engine()
+
+                # Close connections before destructive restore
+                connection.close()
+
+                if 'postgresql' in db_engine:
+                    _run_pg_restore(zipf, 'database_dump.sql', restore_job.id, jobs or backup_restore_jobs())
+                elif 'sqlite' in db_engine:
+                    # If database_dump.sql exists, it's an old backup format using raw sqlite
+                    if 'database_dump.json' in namelist:
+                        # New format using dumpdata
+                        # First clear all tables to avoid unique constraint errors while loading
+                        with connection.cursor() as cursor:
+                            cursor.execute("PRAGMA foreign_keys = OFF;")
+                            # Wipe all model tables (including auth/contenttypes) except django_migrations.
+                            for model in apps.get_models(include_auto_created=True):
+                                table = model._meta.db_table
+                                if table == "django_migrations":
+                                    continue
+                                cursor.execute(f"DELETE FROM {table};")
+                            cursor.execute("PRAGMA foreign_keys = ON;")
+
+                        with zipf.open('database_dump.json') as raw:
+                            _load_json_dump(io.TextIOWrapper(raw, encoding='utf-8'))
+                        _reset_sequences_all_models()
+                    elif 'database_dump.sql' in namelist:
+                        # Legacy support for sqlite file backup: sqlite3 needs it on disk
+                        db_path = str(Path(settings.DATABASES['default']['NAME']))
+                        wal_path = Path(db_path + '-wal')
+                        shm_path = Path(db_path + '-shm')
+                        if wal_path.exists():
+                            wal_path.unlink()
+                        if shm_path.exists():
+                            shm_path.unlink()
+                        import sqlite3
+                        with tempfile.TemporaryDirectory() as td:
+                            db_dump_sql_path = Path(td) / 'database_dump.sql'
+                            with zipf.open('database_dump.sql') as src, open(db_dump_sql_path, 'wb') as dst:
+                                shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+                            with sqlite3.connect(str(db_dump_sql_path)) as src, sqlite3.connect(db_path) as dst:
+                                src.backup(dst)
 
-                # Destructive restore
-                cmd = [
-                    pg_restore_cmd,
-                    '-h', db_config.get('HOST', 'localhost'),
-                    '-p', str(db_config.get('PORT', '5432')),
-                    '-U', db_config.get('USER', ''),
-                    '-d', db_config.get('NAME', ''),
-                    '--clean',
-                    '--if-exists',
-                    '--no-owner',
-                    '--no-privileges',
-                    str(db_dump_path)
-                ]
-                
-                if 'docker exec' in pg_restore_cmd:
-                     # For docker exec, we might need to cat the file into it or copy it first.
-                     # Simpler approach: docker cp db_dump_path into container, then run pg_restore.
-                     container_id = pg_restore_cmd.split()[2]
-                     dest_path = f"/tmp/restore_{restore_job.id}.sql"
-                     subprocess.run(['docker', 'cp', str(db_dump_path), f"{container_id}:{dest_path}"], check=True)
-                     cmd = pg_restore_cmd.split() + [
-                        '-U', db_config.get('USER', ''),
-                        '-d', db_config.get('NAME', ''),
-                        '--clean',
-                        '--if-exists',
-                        '--no-owner',
-                        '--no-privileges',
-                        dest_path
-                     ]
-                
-                result = subprocess.run(cmd, env=env, capture_output=True, text=True)
-                # pg_restore often exits with code 0 but has warnings on stderr.
-                # Significant errors should be caught.
-                if result.returncode != 0:
-                    raise Exception(f"pg_restore failed: {result.stderr}")
-            elif 'sqlite' in db_engine:
-                from django.core.management import call_command
-                
-                # If database_dump.sql exists, it's an old backup format using raw sqlite
-                db_dump_sql_path = tmpdir / 'database_dump.sql'
-                db_dump_json_path = tmpdir / 'database_dump.json'
-                
-                if db_dump_json_path.exists():
-                    # New format using dumpdata
-                    # First clear all tables to avoid unique constraint errors during loaddata
-                    from django.db import connection
-                    with connection.cursor() as cursor:
-                        cursor.execute("PRAGMA foreign_keys = OFF;")
-                        # Wipe all model tables (including auth/contenttypes) except django_migrations.
-                        from django.apps import apps
-                        for model in apps.get_models(include_auto_created=True):
-                            table = model._meta.db_table
-                            if table == "django_migrations":
-                                continue
-                            cursor.execute(f"DELETE FROM {table};")
-                        cursor.execute("PRAGMA foreign_keys = ON;")
-                        
-                    call_command('loaddata', str(db_dump_json_path))
-                    _reset_sequences_all_models()
-                elif db_dump_sql_path.exists():
-                    # Legacy support for sqlite file backup
-                    db_path = str(Path(settings.DATABASES['default']['NAME']))
-                    wal_path = Path(db_path + '-wal')
-                    shm_path = Path(db_path + '-shm')
-                    if wal_path.exists():
-                        wal_path.unlink()
-                    if shm_path.exists():
-                        shm_path.unlink()
-                    import sqlite3
-                    with sqlite3.connect(str(db_dump_sql_path)) as src, sqlite3.connect(db_path) as dst:
-                        src.backup(dst)
-                
             # Close connection again so it's clean for the post-restore check and save
             connection.close()
 
-            
             # Restore Media
-            manifest = validation["manifest"]
             if manifest.get("media_included"):
-                media_src = tmpdir / 'media'
-                media_dest = Path(settings.MEDIA_ROOT)
-                if media_src.exists():
-                    if media_dest.exists():
-                        shutil.rmtree(media_dest)
-                    shutil.copytree(media_src, media_dest)
+                _swap_in_directory(media_staging, media_dest)
+        finally:
+            if media_staging.exists():
+                shutil.rmtree(media_staging, ignore_errors=True)
         
         # 3. Post-Restore Integrity Checks
         checks = {
@@ -942,7 +1809,12 @@ def upload_backup_to_cloud_service(backup_job: BackupJob, actor=None) -> BackupJ
                 action='cloud_upload_completed',
                 actor=actor,
                 backup_job=backup_job,
-                details_json={'bucket': backup_job.cloud_bucket, 'key': backup_job.cloud_object_key}
+                details_json={
+                    'bucket': backup_job.cloud_bucket,
+                    'key': backup_job.cloud_object_key,
+                    'throughput_bps': backup_job.cloud_upload_throughput_bps,
+                    'retries': backup_job.cloud_upload_retries,
+                }
             )
         else:
             raise ValueError("Uploaded remote object checksum or existence verification failed.")
@@ -985,7 +1857,7 @@ def download_backup_from_cloud_service(backup_job: BackupJob, actor=None) -> Bac
         provider = get_storage_provider()
         
         # Determine local path
-        backup_dir = Path(settings.SIMS_SETTINGS.get('BACKUP_LOCATION', settings.BASE_DIR / 'backups'))
+        backup_dir = backup_location()
         backup_dir.mkdir(parents=True, exist_ok=True)
         
         dest_file_path = backup_dir / backup_job.file_name
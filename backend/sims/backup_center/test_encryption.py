@@ -0,0 +1,88 @@
+"""Tests for the chunked streaming file format in sims/backup_center/encryption.py."""
+
+import hashlib
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+
+from sims.backup_center.encryption import (
+    STREAM_MAGIC,
+    decrypt_file,
+    encrypt_file,
+    get_encryption_key,
+)
+
+
+@pytest.fixture(autouse=True)
+def encryption_key(monkeypatch):
+    monkeypatch.setenv("PGSIMS_BACKUP_ENCRYPTION_KEY", "test-key")
+
+
+def _write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+class TestStreamingEncryption:
+    def test_round_trip_across_many_frames(self, tmp_path):
+        data = os.urandom(10_000)
+        source = _write(tmp_path / "backup.pgsimsbak", data)
+        encrypted = str(tmp_path / "backup.enc")
+        restored = str(tmp_path / "restored.pgsimsbak")
+
+        written = encrypt_file(source, encrypted, chunk_size=1024)
+        read = decrypt_file(encrypted, restored)
+
+        with open(restored, "rb") as f:
+            assert f.read() == data
+        with open(encrypted, "rb") as f:
+            ciphertext = f.read()
+        assert ciphertext.startswith(STREAM_MAGIC)
+        assert written.sha256 == read.sha256 == hashlib.sha256(ciphertext).hexdigest()
+        assert written.md5 == hashlib.md5(ciphertext).hexdigest()
+        assert written.size == read.size == len(ciphertext)
+
+    def test_empty_file_round_trips(self, tmp_path):
+        source = _write(tmp_path / "empty", b"")
+        encrypted = str(tmp_path / "empty.enc")
+        restored = tmp_path / "restored"
+        encrypt_file(source, encrypted)
+        decrypt_file(encrypted, str(restored))
+        assert restored.read_bytes() == b""
+
+    def test_legacy_fernet_token_still_decrypts(self, tmp_path):
+        token = Fernet(get_encryption_key()).encrypt(b"legacy backup")
+        encrypted = _write(tmp_path / "legacy.enc", token)
+        restored = tmp_path / "restored"
+
+        digests = decrypt_file(encrypted, str(restored))
+
+        assert restored.read_bytes() == b"legacy backup"
+        assert digests.sha256 == hashlib.sha256(token).hexdigest()
+
+    def test_tampered_frame_is_rejected_and_output_removed(self, tmp_path):
+        source = _write(tmp_path / "backup", os.urandom(4096))
+        encrypted = tmp_path / "backup.enc"
+        encrypt_file(source, str(encrypted), chunk_size=1024)
+        corrupted = bytearray(encrypted.read_bytes())
+        corrupted[-5] ^= 0x01
+        encrypted.write_bytes(bytes(corrupted))
+        restored = tmp_path / "restored"
+
+        with pytest.raises(ValueError, match="authentication"):
+            decrypt_file(str(encrypted), str(restored))
+        assert not restored.exists()
+
+    def test_dropped_final_frame_is_detected(self, tmp_path):
+        source = _write(tmp_path / "backup", os.urandom(4096))
+        encrypted = tmp_path / "backup.enc"
+        encrypt_file(source, str(encrypted), chunk_size=1024)
+        # Keep the header and the first full frame only.
+        frame_size = 5 + 1024 + 16
+        header_size = len(STREAM_MAGIC) + 1 + 4 + 8
+        encrypted.write_bytes(encrypted.read_bytes()[: header_size + frame_size])
+
+        with pytest.raises(ValueError):
+            decrypt_file(str(encrypted), str(tmp_path / "restored"))
+        assert not (tmp_path / "restored").exists()
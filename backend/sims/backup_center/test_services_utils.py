@@ -11,10 +11,14 @@ import hashlib
 import zipfile
 from pathlib import Path
 
-from django.test import TestCase
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
 
 from sims.backup_center.services import (
     _compute_tree_sha256,
+    _estimated_row_counts,
     _sha256_file,
     _sha256_zip_member,
     detect_database_engine,
@@ -124,6 +128,33 @@ class GetTableCountsTests(TestCase):
         self.assertIn("users.user", counts)
         self.assertGreaterEqual(counts["users.user"], 0)
 
+    def test_postgres_uses_planner_estimates_unless_exact(self):
+        user_table = get_user_model()._meta.db_table
+        with patch("sims.backup_center.services.detect_database_engine", return_value="django.db.backends.postgresql"), \
+                patch("sims.backup_center.services._estimated_row_counts", return_value={user_table: 12345}) as estimates:
+            self.assertEqual(get_table_counts()["users.user"], 12345)
+            self.assertEqual(get_table_counts(exact=True)["users.user"], get_user_model().objects.count())
+        self.assertEqual(estimates.call_count, 1)
+
+    def test_estimates_fall_back_to_live_tuples_and_sum_partitions(self):
+        rows = [
+            # oid, relname, relkind, reltuples, relpages, n_live_tup, inhparent
+            (1, "analyzed", "r", 5000.0, 40, 4900, None),
+            (2, "never_analyzed", "r", -1.0, 0, 12, None),
+            (3, "no_stats", "r", -1.0, 0, None, None),
+            (10, "audit_log", "p", -1.0, 0, None, None),
+            (11, "audit_log_2026_01", "r", 300.0, 3, 310, 10),
+            (12, "audit_log_2026_02", "r", -1.0, 0, 7, 10),
+        ]
+        connection = MagicMock()
+        connection.cursor.return_value.__enter__.return_value.fetchall.return_value = rows
+        with patch("sims.backup_center.services.connection", connection):
+            estimates = _estimated_row_counts()
+        self.assertEqual(
+            estimates,
+            {"analyzed": 5000, "never_analyzed": 12, "audit_log": 307, "audit_log_2026_01": 300, "audit_log_2026_02": 7},
+        )
+
 
 class GetMediaSummaryTests(TestCase):
     def test_returns_summary_shape(self):
@@ -132,3 +163,27 @@ class GetMediaSummaryTests(TestCase):
         self.assertIn("total_size_bytes", summary)
         self.assertIn("media_root_exists", summary)
         self.assertIsInstance(summary["file_count"], int)
+
+    def test_rescans_only_directories_that_changed(self):
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as media_root:
+            root = Path(media_root)
+            for name in ("logbook", "cases", "certificates"):
+                (root / name).mkdir()
+                (root / name / "a.pdf").write_bytes(b"x" * 10)
+            with override_settings(MEDIA_ROOT=media_root):
+                self.assertEqual(get_media_summary()["file_count"], 3)
+
+                (root / "cases" / "b.pdf").write_bytes(b"y" * 5)
+                with patch("sims.backup_center.services.os.scandir", wraps=os.scandir) as scanned:
+                    summary = get_media_summary()
+
+                (root / "certificates" / "a.pdf").unlink()
+                after_delete = get_media_summary()
+
+        self.assertEqual([str(call.args[0]) for call in scanned.call_args_list], [str(root / "cases")])
+        self.assertEqual(summary["file_count"], 4)
+        self.assertEqual(summary["total_size_bytes"], 35)
+        self.assertEqual(after_delete["file_count"], 3)
@@ -1,8 +1,10 @@
+import io
 import os
 import pytest
 import zipfile
 import json
 import hashlib
+import time
 from unittest.mock import patch, MagicMock
 from django.conf import settings
 from django.urls import reverse
@@ -191,6 +193,245 @@ class TestBackupCenterServices:
         assert result["valid"] is False
         assert any("integrity" in e.lower() for e in result["errors"])
 
+    def test_routine_backup_streams_media_in_one_pass(self, super_admin, tmp_path, monkeypatch):
+        media_root = tmp_path / 'media'
+        (media_root / 'uploads').mkdir(parents=True)
+        (media_root / 'uploads' / 'notes.txt').write_bytes(b'logbook notes ' * 500)
+        (media_root / 'uploads' / 'scan.png').write_bytes(b'\x89PNG' + os.urandom(2048))
+        (media_root / 'big.txt').write_bytes(b'x' * 4096)
+        monkeypatch.setenv('BACKUP_COMPRESSION_WORKERS', '2')
+        # notes.txt streams through zipfile; big.txt is read ahead by a pool worker.
+        monkeypatch.setattr('sims.backup_center.services.POOL_MEMBER_MAX_BYTES', 5000)
+        from sims.backup_center import services
+
+        with patch('sims.backup_center.services.settings.MEDIA_ROOT', media_root):
+            with patch.dict('sims.backup_center.services.settings.SIMS_SETTINGS', {'BACKUP_LOCATION': tmp_path / 'backups'}, clear=False):
+                with patch.object(services, '_write_prefetched_member', wraps=services._write_prefetched_member) as pooled:
+                    job = create_routine_application_data_backup(user=super_admin, notes="streamed")
+
+        assert job.status == 'completed'
+        assert [call.args[1].filename for call in pooled.call_args_list] == ['media/big.txt']
+        assert job.checksum == hashlib.sha256(open(job.file_path, 'rb').read()).hexdigest()
+        with zipfile.ZipFile(job.file_path, 'r') as zipf:
+            assert zipf.testzip() is None
+            assert zipf.read('media/uploads/notes.txt') == b'logbook notes ' * 500
+            assert zipf.getinfo('media/uploads/notes.txt').compress_type == zipfile.ZIP_DEFLATED
+            assert zipf.getinfo('media/uploads/scan.png').compress_type == zipfile.ZIP_STORED
+            assert zipf.getinfo('media/big.txt').compress_type == zipfile.ZIP_DEFLATED
+            manifest = json.loads(zipf.read('manifest.json'))
+        assert manifest['backup_format_version'] == '1.3'
+        assert manifest['media_summary']['file_count'] == 3
+        assert manifest['media_summary']['total_size_bytes'] == 500 * 14 + 2052 + 4096
+
+        result = validate_backup_file(job.file_path)
+        assert result['valid'] is True, result['errors']
+
+    def test_validate_detects_tampered_media_member(self, super_admin, tmp_path):
+        media_root = tmp_path / 'media'
+        media_root.mkdir()
+        (media_root / 'a.txt').write_bytes(b'original')
+        with patch('sims.backup_center.services.settings.MEDIA_ROOT', media_root):
+            with patch.dict('sims.backup_center.services.settings.SIMS_SETTINGS', {'BACKUP_LOCATION': tmp_path / 'backups'}, clear=False):
+                job = create_routine_application_data_backup(user=super_admin)
+
+        tampered = tmp_path / 'tampered.pgsimsbak'
+        with zipfile.ZipFile(job.file_path, 'r') as src, zipfile.ZipFile(tampered, 'w') as dst:
+            for info in src.infolist():
+                data = b'tampered' if info.filename == 'media/a.txt' else src.read(info.filename)
+                dst.writestr(info.filename, data)
+
+        result = validate_backup_file(str(tampered))
+        assert result['valid'] is False
+        assert "File integrity check failed for media contents." in result['errors']
+
+    def test_validation_result_is_cached_for_unchanged_file(self, super_admin, tmp_path):
+        from sims.backup_center import services
+
+        media_root = tmp_path / 'media'
+        media_root.mkdir()
+        for i in range(5):
+            (media_root / f'f{i}.txt').write_bytes(os.urandom(1024))
+        with patch('sims.backup_center.services.settings.MEDIA_ROOT', media_root):
+            with patch.dict('sims.backup_center.services.settings.SIMS_SETTINGS', {'BACKUP_LOCATION': tmp_path / 'backups'}, clear=False):
+                job = create_routine_application_data_backup(user=super_admin)
+
+        first = validate_backup_file(job.file_path)
+        with patch.object(services, '_hash_zip_members', wraps=services._hash_zip_members) as hashed:
+            second = validate_backup_file(job.file_path)
+            uncached = validate_backup_file(job.file_path, use_cache=False)
+
+        assert first['valid'] is True and first['cached'] is False
+        assert second['valid'] is True and second['cached'] is True
+        assert uncached['cached'] is False
+        assert hashed.call_count == 1
+
+    def test_quick_validation_skips_member_hashes(self, super_admin, tmp_path):
+        media_root = tmp_path / 'media'
+        media_root.mkdir()
+        (media_root / 'a.txt').write_bytes(b'original')
+        with patch('sims.backup_center.services.settings.MEDIA_ROOT', media_root):
+            with patch.dict('sims.backup_center.services.settings.SIMS_SETTINGS', {'BACKUP_LOCATION': tmp_path / 'backups'}, clear=False):
+                job = create_routine_application_data_backup(user=super_admin)
+
+        tampered = tmp_path / 'tampered.pgsimsbak'
+        with zipfile.ZipFile(job.file_path, 'r') as src, zipfile.ZipFile(tampered, 'w') as dst:
+            for info in src.infolist():
+                data = b'tampered' if info.filename == 'database_dump.json' else src.read(info.filename)
+                dst.writestr(info.filename, data)
+
+        quick = validate_backup_file(str(tampered), quick=True)
+        full = validate_backup_file(str(tampered))
+        assert quick['valid'] is True
+        assert quick['validation_mode'] == 'quick'
+        assert full['valid'] is False
+        assert full['errors'] == ["File integrity check failed for database_dump.json."]
+
+    def test_disaster_bundle_is_validated_without_extracting_inner_backup(self, super_admin, tmp_path):
+        media_root = tmp_path / 'media'
+        media_root.mkdir()
+        (media_root / 'a.txt').write_bytes(b'bundle media')
+        with patch('sims.backup_center.services.settings.MEDIA_ROOT', media_root):
+            with patch.dict('sims.backup_center.services.settings.SIMS_SETTINGS', {'BACKUP_LOCATION': tmp_path / 'backups'}, clear=False):
+                job = create_routine_application_data_backup(user=super_admin)
+
+        def bundle(name, inner_path):
+            path = tmp_path / name
+            with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                zipf.writestr('deployment_metadata.json', '{}')
+                zipf.writestr('restore_instructions.md', '# Restore')
+                zipf.write(inner_path, arcname='PGSIMS_DATA_BACKUP.pgsimsbak', compress_type=zipfile.ZIP_STORED)
+            return str(path)
+
+        tampered_inner = tmp_path / 'inner.pgsimsbak'
+        with zipfile.ZipFile(job.file_path, 'r') as src, zipfile.ZipFile(tampered_inner, 'w') as dst:
+            for info in src.infolist():
+                data = b'tampered' if info.filename == 'media/a.txt' else src.read(info.filename)
+                dst.writestr(info.filename, data)
+
+        with patch('sims.backup_center.services.tempfile.TemporaryDirectory') as extracted:
+            good = validate_backup_file(bundle('good.pgsimsdr', job.file_path))
+            bad = validate_backup_file(bundle('bad.pgsimsdr', tampered_inner))
+
+        extracted.assert_not_called()
+        assert good['valid'] is True, good['errors']
+        assert good['backup_kind'] == 'disaster_recovery'
+        assert good['manifest']['backup_kind'] == 'routine_application_data'
+        assert bad['valid'] is False
+        assert "internal: File integrity check failed for media contents." in bad['warnings']
+
+    def test_incremental_backups_store_only_new_media(self, super_admin, tmp_path):
+        from sims.backup_center.services import (
+            MEDIA_MODE_INCREMENTAL,
+            _restore_media_from_store,
+            media_store_root,
+            prune_media_store,
+        )
+
+        media_root = tmp_path / 'media'
+        (media_root / 'synopsis').mkdir(parents=True)
+        (media_root / 'synopsis' / 'a.pdf').write_bytes(b'%PDF synopsis')
+        (media_root / 'cert.txt').write_bytes(b'certificate')
+        (media_root / 'cert_copy.txt').write_bytes(b'certificate')
+
+        with patch('sims.backup_center.services.settings.MEDIA_ROOT', media_root):
+            with patch.dict('sims.backup_center.services.settings.SIMS_SETTINGS', {'BACKUP_LOCATION': tmp_path / 'backups'}, clear=False):
+                first = create_routine_application_data_backup(user=super_admin, media_mode=MEDIA_MODE_INCREMENTAL)
+                second = create_routine_application_data_backup(user=super_admin, media_mode=MEDIA_MODE_INCREMENTAL)
+                (media_root / 'new_upload.txt').write_bytes(b'fresh upload')
+                third = create_routine_application_data_backup(user=super_admin, media_mode=MEDIA_MODE_INCREMENTAL)
+
+                # Duplicate content is stored once; unchanged files are never re-stored.
+                assert first.media_summary_json['new_blob_count'] == 2
+                assert second.media_summary_json['new_blob_count'] == 0
+                assert third.media_summary_json['new_blob_count'] == 1
+                assert third.media_summary_json['file_count'] == 4
+                with zipfile.ZipFile(third.file_path) as zipf:
+                    assert not any(name.startswith('media/') for name in zipf.namelist())
+                    index = json.loads(zipf.read('media_index.json'))
+
+                assert validate_backup_file(third.file_path)['valid'] is True
+
+                restored = tmp_path / 'restored'
+                _restore_media_from_store(index, media_store_root(), restored)
+                assert (restored / 'synopsis' / 'a.pdf').read_bytes() == b'%PDF synopsis'
+                assert (restored / 'new_upload.txt').read_bytes() == b'fresh upload'
+
+                # Deleting the only backup that referenced a blob lets prune reclaim it.
+                for job in (first, second):
+                    job.status = 'deleted'
+                    job.save()
+                os.remove(third.file_path)
+                assert prune_media_store()['removed'] == 3
+                assert not list(media_store_root().glob('??/*'))
+
+    def test_prune_keeps_blobs_while_a_backup_is_running(self, super_admin, tmp_path):
+        from sims.backup_center.services import MEDIA_MODE_INCREMENTAL, media_store_root, prune_media_store
+
+        media_root = tmp_path / 'media'
+        media_root.mkdir()
+        (media_root / 'a.txt').write_bytes(b'aaa')
+        with patch('sims.backup_center.services.settings.MEDIA_ROOT', media_root):
+            with patch.dict('sims.backup_center.services.settings.SIMS_SETTINGS', {'BACKUP_LOCATION': tmp_path / 'backups'}, clear=False):
+                # A backup that has ingested its blobs but not yet written its archive.
+                job = create_routine_application_data_backup(user=super_admin, media_mode=MEDIA_MODE_INCREMENTAL)
+                os.remove(job.file_path)
+                job.status = 'running'
+                job.save()
+
+                assert prune_media_store() == {'removed': 0, 'kept': -1}
+                assert len(list(media_store_root().glob('??/*'))) == 1
+
+                job.status = 'deleted'
+                job.save()
+                with patch('sims.backup_center.services.time.time', return_value=time.time() + 60):
+                    assert prune_media_store()['removed'] == 1
+
+    def test_prune_keeps_old_blobs_reused_by_a_backup_that_started_mid_prune(self, super_admin, tmp_path):
+        from sims.backup_center.services import MEDIA_MODE_INCREMENTAL, media_store_root, prune_media_store
+
+        media_root = tmp_path / 'media'
+        media_root.mkdir()
+        (media_root / 'a.txt').write_bytes(b'aaa')
+        (media_root / 'b.txt').write_bytes(b'bbb')
+        with patch('sims.backup_center.services.settings.MEDIA_ROOT', media_root):
+            with patch.dict('sims.backup_center.services.settings.SIMS_SETTINGS', {'BACKUP_LOCATION': tmp_path / 'backups'}, clear=False):
+                first = create_routine_application_data_backup(user=super_admin, media_mode=MEDIA_MODE_INCREMENTAL)
+                long_ago = time.time() - 3600
+                for blob in media_store_root().glob('??/*'):
+                    os.utime(blob, (long_ago, long_ago))
+                first.status = 'deleted'
+                first.save()
+
+                # a.txt is an inventory hit; c.txt dedups onto b.txt's blob.
+                (media_root / 'c.txt').write_bytes(b'bbb')
+                prune_started = time.time()
+                second = create_routine_application_data_backup(user=super_admin, media_mode=MEDIA_MODE_INCREMENTAL)
+                assert second.media_summary_json['new_blob_count'] == 0
+                assert all(blob.stat().st_mtime >= prune_started for blob in media_store_root().glob('??/*'))
+
+                # A prune that read the archives before ``second`` existed keeps its blobs.
+                second.status = 'deleted'
+                second.save()
+                with patch('sims.backup_center.services.time.time', return_value=prune_started):
+                    assert prune_media_store()['removed'] == 0
+                assert len(list(media_store_root().glob('??/*'))) == 2
+
+    def test_incremental_validation_detects_missing_blob(self, super_admin, tmp_path):
+        from sims.backup_center.services import MEDIA_MODE_INCREMENTAL, media_store_root
+
+        media_root = tmp_path / 'media'
+        media_root.mkdir()
+        (media_root / 'a.txt').write_bytes(b'aaa')
+        with patch('sims.backup_center.services.settings.MEDIA_ROOT', media_root):
+            with patch.dict('sims.backup_center.services.settings.SIMS_SETTINGS', {'BACKUP_LOCATION': tmp_path / 'backups'}, clear=False):
+                job = create_routine_application_data_backup(user=super_admin, media_mode=MEDIA_MODE_INCREMENTAL)
+                digest = hashlib.sha256(b'aaa').hexdigest()
+                os.remove(media_store_root() / digest[:2] / digest)
+                result = validate_backup_file(job.file_path)
+
+        assert result['valid'] is False
+        assert "Media blob missing from store for a.txt." in result['errors']
+
     @patch('sims.backup_center.services.create_routine_application_data_backup')
     def test_create_disaster_backup(self, mock_routine, super_admin, tmp_path):
         # Setup mock routine backup
@@ -217,6 +458,80 @@ class TestBackupCenterServices:
                 assert 'restore_instructions.md' in namelist
                 assert 'routine.pgsimsbak' in namelist
 
+class TestStreamingRestore:
+    @pytest.mark.django_db(transaction=True)
+    def test_bundle_restores_without_extracting_archive(self, super_admin, tmp_path):
+        media_root = tmp_path / 'media'
+        (media_root / 'uploads').mkdir(parents=True)
+        (media_root / 'uploads' / 'kept.txt').write_bytes(b'kept')
+        dept = Department.objects.create(name="Urology", code="URO", description="Test")
+
+        with patch('sims.backup_center.services.settings.MEDIA_ROOT', media_root):
+            with patch.dict('sims.backup_center.services.settings.SIMS_SETTINGS', {'BACKUP_LOCATION': tmp_path / 'backups'}, clear=False):
+                job = create_routine_application_data_backup(user=super_admin)
+                bundle = tmp_path / 'bundle.pgsimsdr'
+                with zipfile.ZipFile(bundle, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                    zipf.writestr('deployment_metadata.json', '{}')
+                    zipf.writestr('restore_instructions.md', '# Restore')
+                    zipf.write(job.file_path, arcname=job.file_name, compress_type=zipfile.ZIP_STORED)
+
+                Department.objects.filter(pk=dept.pk).delete()
+                (media_root / 'uploads' / 'kept.txt').unlink()
+                (media_root / 'stray.txt').write_bytes(b'created after the backup')
+
+                with patch.object(zipfile.ZipFile, 'extractall', side_effect=AssertionError("extractall used")):
+                    restored = restore_routine_application_data_backup(
+                        file_path=str(bundle),
+                        restored_by=super_admin,
+                        password_confirmed=True,
+                        typed_confirmation="RESTORE",
+                    )
+
+        assert restored.status == 'restored'
+        assert Department.objects.filter(pk=dept.pk, code="URO").exists()
+        assert (media_root / 'uploads' / 'kept.txt').read_bytes() == b'kept'
+        assert not (media_root / 'stray.txt').exists()
+        assert not any(p.name.startswith('.media') for p in tmp_path.iterdir())
+
+    def test_json_dump_is_parsed_incrementally(self):
+        from sims.backup_center.services import _iter_json_array
+
+        rows = [{"model": "a.b", "pk": i, "fields": {"name": "x" * i, "text": "[, ]"}} for i in range(50)]
+        stream = io.StringIO(json.dumps(rows, indent=2))
+        assert list(_iter_json_array(stream, chunk_size=7)) == rows
+        assert list(_iter_json_array(io.StringIO("[]"))) == []
+        with pytest.raises(ValueError):
+            list(_iter_json_array(io.StringIO('[{"pk": 1},')))
+
+    def test_pg_restore_reads_dump_from_stdin(self, tmp_path, monkeypatch):
+        from sims.backup_center.services import _run_pg_restore
+
+        archive = tmp_path / 'backup.pgsimsbak'
+        dump = os.urandom(3 * 1024 * 1024)
+        with zipfile.ZipFile(archive, 'w') as zipf:
+            zipf.writestr('database_dump.sql', dump)
+        monkeypatch.delenv('PG_RESTORE_CMD', raising=False)
+        piped = io.BytesIO()
+        process = MagicMock()
+        process.stdin = piped
+        piped.close = lambda: None
+        process.wait.return_value = 0
+
+        with zipfile.ZipFile(archive) as zipf:
+            with patch('sims.backup_center.services.subprocess.Popen', return_value=process) as popen:
+                _run_pg_restore(zipf, 'database_dump.sql', restore_job_id=1, jobs=1)
+            with patch('sims.backup_center.services.subprocess.run') as run:
+                run.return_value = MagicMock(returncode=0)
+                _run_pg_restore(zipf, 'database_dump.sql', restore_job_id=1, jobs=4)
+
+        cmd = popen.call_args.args[0]
+        assert cmd[0] == 'pg_restore' and cmd[-1] == '--no-privileges'
+        assert piped.getvalue() == dump
+        parallel_cmd = run.call_args.args[0]
+        assert parallel_cmd[-3:-1] == ['--jobs', '4']
+        assert parallel_cmd[-1].endswith('database_dump.sql')
+
+
 @pytest.mark.django_db
 class TestBackupCenterRBAC:
     
@@ -0,0 +1,331 @@
+"""
+Transfer engine shared by the cloud backup providers.
+
+Encrypted archives are sent in parts rather than as one request:
+
+* S3 multipart uploads push parts concurrently from a bounded thread pool
+  (each worker reads only its own part, so memory stays at
+  ``workers * part_size``).
+* Google resumable sessions (Drive, and GCS via a signed session URI) push
+  sequential chunks.
+
+Every part is retried with exponential backoff. The upload session and the
+encrypted file it refers to are kept on the ``BackupJob`` until the upload
+completes, so a failed upload resumes from the last acknowledged part or
+offset instead of starting again from zero.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+from .encryption import EncryptedFileDigests, encrypt_file
+from .models import BackupJob
+
+logger = logging.getLogger('sims.backup_center')
+
+# Google resumable chunks must be multiples of 256 KiB; S3 parts must be >= 5 MiB.
+RESUMABLE_CHUNK_ALIGNMENT = 256 * 1024
+_RANGE_HEADER = re.compile(r"bytes=0-(\d+)")
+
+
+def transfer_settings() -> Tuple[int, int, int]:
+    """(part_size_bytes, workers, attempts) from the environment."""
+    part_size = int(os.environ.get("BACKUP_UPLOAD_PART_SIZE_MB", "8")) * 1024 * 1024
+    workers = int(os.environ.get("BACKUP_UPLOAD_WORKERS", "4"))
+    attempts = int(os.environ.get("BACKUP_UPLOAD_MAX_ATTEMPTS", "5"))
+    return max(part_size, 5 * 1024 * 1024), max(workers, 1), max(attempts, 1)
+
+
+class TransferError(Exception):
+    pass
+
+
+@dataclass
+class TransferStats:
+    bytes_sent: int = 0
+    bytes_resumed: int = 0
+    parts: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_part(self, size: int) -> None:
+        with self._lock:
+            self.bytes_sent += size
+            self.parts += 1
+
+    def add_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    @property
+    def bytes_per_second(self) -> Optional[int]:
+        if self.elapsed <= 0:
+            return None
+        return int(self.bytes_sent / self.elapsed)
+
+
+def with_retries(operation: Callable[[], Any], *, attempts: int, stats: TransferStats,
+                 backoff: float = 1.0, sleep: Callable[[float], None] = time.sleep) -> Any:
+    """Run ``operation``, retrying failures with exponential backoff."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except Exception as e:
+            if attempt == attempts:
+                raise
+            stats.add_retry()
+            delay = backoff * 2 ** (attempt - 1)
+            logger.warning(f"Upload part failed (attempt {attempt}/{attempts}), retrying in {delay:.1f}s: {e}")
+            sleep(delay)
+
+
+# -- upload sessions ---------------------------------------------------------------
+
+def get_upload_session(backup_job: BackupJob, provider: str) -> Dict[str, Any]:
+    return dict((backup_job.cloud_upload_session or {}).get(provider) or {})
+
+
+def save_upload_session(backup_job: BackupJob, provider: str, session: Optional[Dict[str, Any]]) -> None:
+    sessions = dict(backup_job.cloud_upload_session or {})
+    if session:
+        sessions[provider] = session
+    else:
+        sessions.pop(provider, None)
+    backup_job.cloud_upload_session = sessions
+    backup_job.save(update_fields=["cloud_upload_session"])
+
+
+def prepare_encrypted_upload(backup_job: BackupJob, provider: str) -> Tuple[str, EncryptedFileDigests, Dict[str, Any]]:
+    """
+    Encrypt the backup for upload, or reuse the encrypted file of an
+    interrupted upload so its remote session can resume (a fresh encryption
+    would produce different bytes).
+    """
+    encrypted_path = f"{backup_job.file_path}.{provider}.enc"
+    session = get_upload_session(backup_job, provider)
+    if (
+        session.get("sha256")
+        and os.path.exists(encrypted_path)
+        and os.path.getsize(encrypted_path) == session.get("size")
+    ):
+        return encrypted_path, EncryptedFileDigests(session["sha256"], session["md5"], session["size"]), session
+
+    digests = encrypt_file(backup_job.file_path, encrypted_path)
+    session = {"sha256": digests.sha256, "md5": digests.md5, "size": digests.size}
+    save_upload_session(backup_job, provider, session)
+    return encrypted_path, digests, session
+
+
+def finish_encrypted_upload(backup_job: BackupJob, provider: str, encrypted_path: str, *, succeeded: bool) -> None:
+    """Drop the session and encrypted file once uploaded; keep them for resumption otherwise."""
+    session = get_upload_session(backup_job, provider)
+    resumable = session.get("upload_id") or session.get("upload_url")
+    if succeeded or not resumable:
+        if os.path.exists(encrypted_path):
+            os.remove(encrypted_path)
+    if succeeded:
+        save_upload_session(backup_job, provider, None)
+
+
+def record_transfer_stats(backup_job: BackupJob, stats: TransferStats) -> None:
+    backup_job.cloud_upload_throughput_bps = stats.bytes_per_second
+    backup_job.cloud_upload_retries = stats.retries
+    backup_job.save(update_fields=["cloud_upload_throughput_bps", "cloud_upload_retries"])
+
+
+# -- S3 multipart --------------------------------------------------------------------
+
+def s3_multipart_upload(
+    client,
+    bucket: str,
+    key: str,
+    path: str,
+    *,
+    session: Dict[str, Any],
+    on_session: Callable[[Dict[str, Any]], None],
+    part_size: int,
+    workers: int,
+    attempts: int,
+    sleep: Callable[[float], None] = time.sleep,
+) -> TransferStats:
+    """
+    Upload ``path`` as an S3 multipart upload, resuming ``session['upload_id']``
+    when it belongs to this key: parts S3 already lists are not sent again.
+    """
+    stats = TransferStats()
+    started = time.monotonic()
+    size = os.path.getsize(path)
+    part_count = max(1, math.ceil(size / part_size))
+
+    def expected_size(number: int) -> int:
+        return min(part_size, size - (number - 1) * part_size) if size else 0
+
+    done: Dict[int, str] = {}
+    upload_id = session.get("upload_id") if session.get("key") == key and session.get("part_size") == part_size else None
+    if upload_id:
+        try:
+            marker = 0
+            while True:
+                listing = client.list_parts(Bucket=bucket, Key=key, UploadId=upload_id, PartNumberMarker=marker)
+                for part in listing.get("Parts", []):
+                    if part["Size"] == expected_size(part["PartNumber"]):
+                        done[part["PartNumber"]] = part["ETag"]
+                if not listing.get("IsTruncated"):
+                    break
+                marker = listing["NextPartNumberMarker"]
+            stats.bytes_resumed = sum(expected_size(number) for number in done)
+        except Exception as e:
+            logger.warning(f"Cannot resume multipart upload {upload_id}, starting over: {e}")
+            upload_id = None
+            done = {}
+    if not upload_id:
+        upload_id = client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+        session.update({"upload_id": upload_id, "key": key, "part_size": part_size})
+        on_session(session)
+
+    def send(number: int) -> Tuple[int, str]:
+        with open(path, "rb") as f:
+            f.seek((number - 1) * part_size)
+            data = f.read(part_size)
+        response = with_retries(
+            lambda: client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=data),
+            attempts=attempts, stats=stats, sleep=sleep,
+        )
+        stats.add_part(len(data))
+        return number, response["ETag"]
+
+    pending = [number for number in range(1, part_count + 1) if number not in done]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for number, etag in pool.map(send, pending):
+            done[number] = etag
+
+    with_retries(
+        lambda: client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": [{"ETag": done[n], "PartNumber": n} for n in sorted(done)]},
+        ),
+        attempts=attempts, stats=stats, sleep=sleep,
+    )
+    stats.elapsed = time.monotonic() - started
+    return stats
+
+
+# -- Google resumable sessions -------------------------------------------------------
+
+def _committed_offset(response) -> int:
+    match = _RANGE_HEADER.match(response.headers.get("Range", ""))
+    return int(match.group(1)) + 1 if match else 0
+
+
+def resumable_upload(
+    path: str,
+    *,
+    session: Dict[str, Any],
+    on_session: Callable[[Dict[str, Any]], None],
+    start_session: Callable[[], str],
+    headers: Callable[[], Dict[str, str]] = dict,
+    chunk_size: int,
+    attempts: int,
+    timeout: int = 120,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Tuple[Dict[str, Any], TransferStats]:
+    """
+    Upload ``path`` through a Google resumable session (Drive or GCS).
+
+    An existing ``session['upload_url']`` is asked how many bytes it holds and
+    the upload continues from there; after a failed chunk the committed offset
+    is re-queried before retrying. Returns (final response JSON, stats).
+    """
+    stats = TransferStats()
+    started = time.monotonic()
+    size = os.path.getsize(path)
+    chunk_size = max(RESUMABLE_CHUNK_ALIGNMENT, chunk_size - chunk_size % RESUMABLE_CHUNK_ALIGNMENT)
+
+    def query_offset(upload_url: str):
+        return requests.put(
+            upload_url,
+            headers={**headers(), "Content-Length": "0", "Content-Range": f"bytes */{size}"},
+            timeout=timeout,
+        )
+
+    upload_url = session.get("upload_url")
+    offset = 0
+    if upload_url:
+        try:
+            status = query_offset(upload_url)
+        except requests.RequestException:
+            status = None
+        if status is not None and status.status_code in (200, 201):
+            stats.elapsed = time.monotonic() - started
+            return status.json(), stats
+        if status is not None and status.status_code == 308:
+            offset = _committed_offset(status)
+            stats.bytes_resumed = offset
+        else:
+            upload_url = None
+    if not upload_url:
+        upload_url = start_session()
+        session["upload_url"] = upload_url
+        on_session(session)
+
+    failures = 0
+    with open(path, "rb") as f:
+        while True:
+            f.seek(offset)
+            data = f.read(chunk_size)
+            end = offset + len(data) - 1
+            content_range = f"bytes {offset}-{end}/{size}" if data else f"bytes */{size}"
+            try:
+                response = requests.put(
+                    upload_url,
+                    headers={**headers(), "Content-Length": str(len(data)), "Content-Range": content_range},
+                    data=data,
+                    timeout=timeout,
+                )
+                if response.status_code in (200, 201):
+                    stats.add_part(len(data))
+                    stats.elapsed = time.monotonic() - started
+                    return response.json(), stats
+                if response.status_code == 308:
+                    committed = _committed_offset(response)
+                    if committed > offset:
+                        stats.add_part(committed - offset)
+                        offset = committed
+                        failures = 0
+                        continue
+                    # Acknowledged without moving forward: retry, but not forever.
+                    error = TransferError(f"Resumable upload made no progress at byte {offset}")
+                elif response.status_code not in (408, 429) and response.status_code < 500:
+                    raise TransferError(f"Resumable upload failed: {response.status_code} {response.text[:200]}")
+                else:
+                    error = TransferError(f"Resumable upload chunk rejected: {response.status_code}")
+            except requests.RequestException as e:
+                error = e
+
+            failures += 1
+            if failures >= attempts:
+                raise TransferError(f"Resumable upload gave up after {attempts} attempts: {error}")
+            stats.add_retry()
+            sleep(2 ** (failures - 1))
+            # The server may have kept part of the failed chunk; continue from what it acknowledged.
+            try:
+                status = query_offset(upload_url)
+                if status.status_code in (200, 201):
+                    stats.elapsed = time.monotonic() - started
+                    return status.json(), stats
+                if status.status_code == 308:
+                    offset = _committed_offset(status)
+            except requests.RequestException:
+                pass
@@ -25,8 +25,10 @@ from .models import (
 )
 from .serializers import BackupJobSerializer, RestoreJobSerializer, BackupAuditLogSerializer
 from .services import (
+    MEDIA_MODE_INCREMENTAL,
     create_routine_application_data_backup,
     create_disaster_recovery_backup,
+    prune_media_store,
     validate_backup_file,
     restore_routine_application_data_backup
 )
@@ -34,6 +36,12 @@ from .google_drive import GoogleDriveBackupProvider
 
 logger = logging.getLogger('sims.backup_center')
 
+
+def _quick_validation_requested(request) -> bool:
+    # {"mode": "quick"} checks only the central directory and manifest.
+    return str(request.data.get('mode', '')).lower() == 'quick'
+
+
 class IsSuperAdmin(BasePermission):
     """Allows access only to superadmin users."""
     def has_permission(self, request, view):
@@ -108,6 +116,9 @@ class DeleteBackupView(APIView):
             
             job.status = 'deleted'
             job.save()
+            if (job.manifest_json or {}).get('media_mode') == MEDIA_MODE_INCREMENTAL:
+                # Drop media blobs that only this backup referenced.
+                prune_media_store()
             
             BackupAuditLog.objects.create(
                 action='backup_deleted',
@@ -130,7 +141,7 @@ class ValidateBackupJobView(APIView):
             if not job.file_path or not os.path.exists(job.file_path):
                 raise Http404("Backup file not found on disk")
 
-            result = validate_backup_file(job.file_path)
+            result = validate_backup_file(job.file_path, quick=_quick_validation_requested(request))
             BackupAuditLog.objects.create(
                 action='backup_validated',
                 actor=request.user,
@@ -180,7 +191,7 @@ class ValidateRestoreJobView(APIView):
             restore_job = RestoreJob.objects.get(pk=pk)
             file_path = restore_job.uploaded_file.path
             
-            result = validate_backup_file(file_path)
+            result = validate_backup_file(file_path, quick=_quick_validation_requested(request))
             restore_job.validation_result_json = result
             if result['valid']:
                 restore_job.status = 'validation_passed'
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bulk", "0003_historicalmappingpreset_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bulkoperation",
+            name="options",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Parameters of a background job (service method, staged upload, flags).",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bulkoperation",
+            name="processed_items",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="bulkoperation",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="bulkoperation",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=16,
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bulk", "0004_bulkoperation_background_jobs"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="bulkoperation",
+            name="operation",
+            field=models.CharField(
+                choices=[
+                    ("review", "Bulk Review"),
+                    ("assignment", "Bulk Assignment"),
+                    ("import", "Bulk Import"),
+                    ("export", "Bulk Export"),
+                ],
+                max_length=32,
+            ),
+        ),
+    ]
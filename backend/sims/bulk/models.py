@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db import models
 from django.utils import timezone
 from simple_history.models import HistoricalRecords
 
 User = get_user_model()
 
+PROGRESS_CACHE_TTL = 60 * 60
+PROGRESS_FAILURE_SAMPLE = 20
+
 
 class BulkOperation(models.Model):
     """Audit trail for a bulk action executed by a user."""
@@ -18,17 +22,21 @@ class BulkOperation(models.Model):
     OP_REVIEW = "review"
     OP_ASSIGNMENT = "assignment"
     OP_IMPORT = "import"
+    OP_EXPORT = "export"
     OPERATION_CHOICES = (
         (OP_REVIEW, "Bulk Review"),
         (OP_ASSIGNMENT, "Bulk Assignment"),
         (OP_IMPORT, "Bulk Import"),
+        (OP_EXPORT, "Bulk Export"),
     )
 
     STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
     STATUS_COMPLETED = "completed"
     STATUS_FAILED = "failed"
     STATUS_CHOICES = (
         (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
         (STATUS_COMPLETED, "Completed"),
         (STATUS_FAILED, "Failed"),
     )
@@ -39,8 +47,15 @@ class BulkOperation(models.Model):
     total_items = models.PositiveIntegerField(default=0)
     success_count = models.PositiveIntegerField(default=0)
     failure_count = models.PositiveIntegerField(default=0)
+    processed_items = models.PositiveIntegerField(default=0)
     details = models.JSONField(default=dict, blank=True)
+    options = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Parameters of a background job (service method, staged upload, flags).",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
@@ -50,12 +65,75 @@ class BulkOperation(models.Model):
             models.Index(fields=["operation", "created_at"]),
         ]
 
+    @property
+    def is_background(self) -> bool:
+        return bool(self.options.get("method"))
+
+    @property
+    def progress_cache_key(self) -> str:
+        return f"bulk:operation:{self.pk}:progress"
+
+    def mark_running(self) -> None:
+        self.status = self.STATUS_RUNNING
+        self.started_at = timezone.now()
+        self.save(update_fields=["status", "started_at"])
+
+    def record_progress(
+        self,
+        processed: int,
+        total: int,
+        success_count: int,
+        failures: List[dict],
+    ) -> None:
+        """
+        Publish live progress for a background job.
+
+        The counters are written to the row and mirrored to the cache: an
+        all-or-nothing import runs inside one transaction, so pollers on other
+        connections only see its progress through the cache. Ticks are plain
+        ``UPDATE``s: no save signals, so no history or activity log rows.
+        """
+        self.processed_items = processed
+        self.total_items = total
+        self.success_count = success_count
+        self.failure_count = len(failures)
+        type(self).objects.filter(pk=self.pk).update(
+            processed_items=processed,
+            total_items=total,
+            success_count=success_count,
+            failure_count=len(failures),
+        )
+        cache.set(
+            self.progress_cache_key,
+            {
+                "processed_items": processed,
+                "total_items": total,
+                "success_count": success_count,
+                "failure_count": len(failures),
+                "failures": failures[-PROGRESS_FAILURE_SAMPLE:],
+            },
+            PROGRESS_CACHE_TTL,
+        )
+
+    def live_progress(self) -> Dict[str, Any]:
+        """Progress counters for polling, preferring the cache while a job runs."""
+        progress = {
+            "processed_items": self.processed_items,
+            "total_items": self.total_items,
+            "success_count": self.success_count,
+            "failure_count": self.failure_count,
+        }
+        if self.status == self.STATUS_RUNNING:
+            progress.update(cache.get(self.progress_cache_key) or {})
+        return progress
+
     def mark_completed(
         self, success_count: int, failure_count: int, details: Dict[str, Any]
     ) -> None:
         self.success_count = success_count
         self.failure_count = failure_count
         self.total_items = success_count + failure_count
+        self.processed_items = self.total_items
         self.details = details
         self.status = self.STATUS_COMPLETED
         self.completed_at = timezone.now()
@@ -64,6 +142,7 @@ class BulkOperation(models.Model):
                 "success_count",
                 "failure_count",
                 "total_items",
+                "processed_items",
                 "details",
                 "status",
                 "completed_at",
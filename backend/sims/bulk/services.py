@@ -4,21 +4,34 @@ from __future__ import annotations
 
 import csv
 import io
+import itertools
+import logging
 import re
 import secrets
 import string
+import tempfile
+import uuid
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
-from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from functools import partial
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+from django.conf import settings
 from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.files import File
 from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
-from openpyxl import Workbook, load_workbook
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font
 
+from sims.audit.writer import buffered_activity_log
 from sims.bulk.models import BulkOperation
+from sims.bulk.tabular import TabularReader, normalize_header, normalized_key
 from sims.bulk.userbase_engine import (
+    EXPORT_CHUNK_SIZE as USERBASE_EXPORT_CHUNK_SIZE,
     SUPPORTED_EXPORT_RESOURCES as USERBASE_BULK_EXPORT_RESOURCES,
     export_rows_for as export_userbase_rows,
     import_entity as import_userbase_entity,
@@ -35,6 +48,13 @@ except ImportError:
     Hospital = None
     HospitalDepartment = None
 
+logger = logging.getLogger(__name__)
+
+# Streaming exports flush CSV in blocks of this size; XLSX workbooks are
+# spooled in memory up to _EXPORT_SPOOL_MAX_BYTES, then on disk.
+_EXPORT_BLOCK_SIZE = 64 * 1024
+_EXPORT_SPOOL_MAX_BYTES = 5 * 1024 * 1024
+
 
 @dataclass
 class BulkResult:
@@ -44,9 +64,27 @@ class BulkResult:
 
 @dataclass
 class BulkExportFile:
+    """
+    A rendered export. Small files carry ``content``; dataset exports carry
+    either a lazy ``stream`` of CSV bytes or a spooled XLSX ``file``.
+    """
+
     filename: str
-    content: bytes
     content_type: str
+    content: bytes = b""
+    stream: Optional[Iterable[bytes]] = None
+    file: Optional[IO[bytes]] = None
+
+    def iter_bytes(self, block_size: int = _EXPORT_BLOCK_SIZE) -> Iterator[bytes]:
+        if self.file is not None:
+            try:
+                yield from iter(lambda: self.file.read(block_size), b"")
+            finally:
+                self.file.close()
+        elif self.stream is not None:
+            yield from self.stream
+        else:
+            yield self.content
 
 
 # Template rows for resources not covered by userbase_engine.TEMPLATE_ROWS. Keyed by the
@@ -77,11 +115,148 @@ class BulkProcessingError(Exception):
 
 
 class BulkService:
-    def __init__(self, actor: User, chunk_size: int = 50):
+    def __init__(self, actor: User, chunk_size: int = 50, operation: Optional[BulkOperation] = None):
         self.actor = actor
         self.chunk_size = chunk_size
+        # Set when the service runs a staged background job (see enqueue_import);
+        # import methods then report into that operation instead of creating one.
+        self.operation = operation
         self._validate_permissions()
 
+    def _start_operation(self, operation_type: str) -> BulkOperation:
+        if self.operation is not None:
+            return self.operation
+        return BulkOperation.objects.create(user=self.actor, operation=operation_type)
+
+    def _report_progress(self, operation: BulkOperation, processed: int, total: int, successes: List[dict], failures: List[dict]) -> None:
+        if operation.is_background:
+            operation.record_progress(processed, total, len(successes), failures)
+
+    def _run_rows(
+        self,
+        operation: BulkOperation,
+        rows: Iterable[dict],
+        process_row: Callable[[dict], None],
+        *,
+        successes: List[dict],
+        failures: List[dict],
+        atomic: bool,
+        has_errors: Callable[[], bool],
+        prepare_chunk: Optional[Callable[[List[dict]], None]] = None,
+        finish_feed: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """
+        Feed ``rows`` to ``process_row`` in ``chunk_size`` batches.
+
+        ``rows`` may be a streaming reader; only one batch is held at a time and
+        ``prepare_chunk`` (if given) sees each batch first so lookups can be
+        resolved per batch rather than per row. ``finish_feed`` runs after the
+        last row, inside the same transaction, to flush any buffered writes.
+        Returns False when an
+        all-or-nothing import hit an error and was rolled back. Background jobs
+        publish progress after every batch. Activity log entries are buffered
+        and bulk-inserted rather than saved row by row.
+        """
+        estimated_total = getattr(rows, "estimated_total", None)
+        if estimated_total is None and isinstance(rows, Sequence):
+            estimated_total = len(rows)
+
+        def feed() -> None:
+            processed = 0
+            with buffered_activity_log(asynchronous=False):
+                for chunk in _chunked(rows, self.chunk_size):
+                    if prepare_chunk is not None:
+                        prepare_chunk(chunk)
+                    for row in chunk:
+                        process_row(row)
+                    processed += len(chunk)
+                    total = max(estimated_total or 0, processed)
+                    self._report_progress(operation, processed, total, successes, failures)
+                if finish_feed is not None:
+                    finish_feed()
+
+        if not atomic:
+            feed()
+            return True
+        try:
+            with transaction.atomic():
+                feed()
+                if has_errors():
+                    raise BulkProcessingError("Import failed; rolling back")
+        except BulkProcessingError:
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Background imports
+
+    def enqueue_import(
+        self,
+        method_name: str,
+        uploaded_file,
+        *,
+        dry_run: bool = True,
+        allow_partial: bool = False,
+        resource: str = "",
+    ) -> BulkOperation:
+        """
+        Stage ``uploaded_file`` to disk and queue ``method_name`` as a Celery job.
+
+        The returned operation stays ``pending`` until a worker picks it up; poll
+        it through the bulk operation status endpoint.
+        """
+        if not method_name.startswith("import_") or not callable(getattr(self, method_name, None)):
+            raise ValidationError(f"Unsupported import '{method_name}'.")
+
+        staging_dir = Path(settings.BULK_IMPORT_STAGING_DIR)
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        file_name = getattr(uploaded_file, "name", "upload.csv")
+        staged_path = staging_dir / f"{uuid.uuid4().hex}{Path(file_name).suffix.lower()}"
+        with open(staged_path, "wb") as handle:
+            if hasattr(uploaded_file, "chunks"):
+                for chunk in uploaded_file.chunks():
+                    handle.write(chunk)
+            else:
+                content = uploaded_file.read()
+                handle.write(content.encode("utf-8") if isinstance(content, str) else content)
+
+        operation = BulkOperation.objects.create(
+            user=self.actor,
+            operation=BulkOperation.OP_IMPORT,
+            options={
+                "method": method_name,
+                "resource": resource,
+                "file_name": file_name,
+                "staged_path": str(staged_path),
+                "dry_run": dry_run,
+                "allow_partial": allow_partial,
+            },
+        )
+
+        from sims.bulk.tasks import run_bulk_import
+
+        transaction.on_commit(lambda: run_bulk_import.delay(operation.pk))
+        return operation
+
+    def run_staged_import(self) -> BulkOperation:
+        """Execute the background job this service is bound to (called by the worker)."""
+        operation = self.operation
+        options = operation.options
+        operation.mark_running()
+        try:
+            with open(options["staged_path"], "rb") as handle:
+                getattr(self, options["method"])(
+                    File(handle, name=options["file_name"]),
+                    dry_run=options["dry_run"],
+                    allow_partial=options["allow_partial"],
+                )
+        except Exception as exc:
+            logger.exception("Bulk import job %s failed", operation.pk)
+            operation.mark_failed({"error": str(exc)})
+        finally:
+            Path(options["staged_path"]).unlink(missing_ok=True)
+        return operation
+
     def _validate_permissions(self) -> None:
         if not (
             self.actor.is_superuser
@@ -97,13 +272,15 @@ class BulkService:
         dry_run: bool = True,
         allow_partial: bool = False,
     ) -> BulkOperation:
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
         details = import_userbase_entity(
             self.actor,
             entity,
             uploaded_file,
             dry_run=dry_run,
             allow_partial=allow_partial,
+            chunk_size=self.chunk_size,
+            progress=partial(self._report_progress, operation) if operation.is_background else None,
         )
         operation.mark_completed(
             len(details.get("successes", [])),
@@ -142,7 +319,7 @@ class BulkService:
         rendered = _render_export_rows(rows, f"{resource}_template", "csv")
         return BulkExportFile(
             filename=f"{resource}_template.csv",
-            content=rendered.content,
+            content=b"".join(rendered.iter_bytes()),
             content_type=rendered.content_type,
         )
 
@@ -210,20 +387,52 @@ class BulkService:
         dry_run: bool = True,
         allow_partial: bool = False,
     ) -> BulkOperation:
+        from simple_history.utils import bulk_create_with_history
+
+        from sims.training.eligibility import mark_eligibility_stale
+        from sims.training.inbox import apply_bulk_created, source_for
         from sims.training.models import ResidentTrainingRecord
-        import secrets
 
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
-        rows = list(_parse_rows(uploaded_file))
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
+        rows = _parse_rows(uploaded_file)
         successes: List[dict] = []
         failures: List[dict] = []
+        pending: List[LogbookEntry] = []
         errors_triggered = False
 
+        residents: dict = {}
+        training_records: dict = {}
+        resolved_usernames: set = set()
+
+        def resolve_chunk(chunk: List[dict]) -> None:
+            # Resolve the batch's residents and training records in two queries
+            # so the per-row work below never touches the database.
+            usernames = {row.get("pg_username") for row in chunk if row.get("pg_username")} - resolved_usernames
+            if not usernames:
+                return
+            resolved_usernames.update(usernames)
+            found = list(User.objects.filter(username__in=usernames, role="RESIDENT"))
+            residents.update((user.username, user) for user in found)
+            for record in ResidentTrainingRecord.objects.filter(resident_user__in=found):
+                training_records.setdefault(record.resident_user_id, record)
+
+        def flush_pending() -> None:
+            # One INSERT for the entries and one for their history rows; the
+            # per-row post_save hooks (audit mirror, inbox counters,
+            # eligibility) are replaced by their batch equivalents.
+            if not pending:
+                return
+            with buffered_activity_log(asynchronous=False), transaction.atomic():
+                created = bulk_create_with_history(pending, LogbookEntry, default_user=self.actor)
+                _announce_bulk_history(LogbookEntry, created)
+                apply_bulk_created(source_for("training.LogbookEntry"), created)
+                mark_eligibility_stale({entry.resident_training_record_id for entry in pending})
+            pending.clear()
+
         def process_row(row: dict) -> None:
             nonlocal errors_triggered
-            try:
-                pg = User.objects.get(username=row["pg_username"], role="RESIDENT")
-            except User.DoesNotExist:
+            pg = residents.get(row.get("pg_username"))
+            if pg is None:
                 failures.append({"row": row, "error": "invalid-pg"})
                 errors_triggered = True
                 return
@@ -234,7 +443,7 @@ class BulkService:
                 errors_triggered = True
                 return
 
-            rtr = ResidentTrainingRecord.objects.filter(resident_user=pg).first()
+            rtr = training_records.get(pg.pk)
             if not rtr:
                 failures.append({"row": row, "error": "no-training-record"})
                 errors_triggered = True
@@ -259,7 +468,9 @@ class BulkService:
                     entry = LogbookEntry(**payload)
                     entry.full_clean()
                 else:
-                    entry = LogbookEntry.objects.create(**payload, created_by=self.actor)
+                    pending.append(LogbookEntry(**payload, created_by=self.actor))
+                    if len(pending) >= self.chunk_size:
+                        flush_pending()
                 successes.append(
                     {
                         "RESIDENT": pg.username,
@@ -271,19 +482,19 @@ class BulkService:
                 failures.append({"row": row, "error": exc.message_dict})
                 errors_triggered = True
 
-        if dry_run or allow_partial:
-            for row in rows:
-                process_row(row)
-        else:
-            try:
-                with transaction.atomic():
-                    for row in rows:
-                        process_row(row)
-                    if errors_triggered:
-                        raise BulkProcessingError("Import failed; rolling back")
-            except BulkProcessingError:
-                operation.mark_failed({"failures": failures})
-                return operation
+        if not self._run_rows(
+            operation,
+            rows,
+            process_row,
+            successes=successes,
+            failures=failures,
+            atomic=not (dry_run or allow_partial),
+            has_errors=lambda: errors_triggered,
+            prepare_chunk=resolve_chunk,
+            finish_feed=flush_pending,
+        ):
+            operation.mark_failed({"failures": failures})
+            return operation
 
         operation.mark_completed(
             len(successes),
@@ -314,15 +525,13 @@ class BulkService:
 
         Creates accounts with role 'SUPERVISOR' and generates secure passwords.
         """
-        operation = BulkOperation.objects.create(
-            user=self.actor, operation=BulkOperation.OP_IMPORT
-        )
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
 
         # Required columns (flexible matching)
         # required_cols = {"name", "specialty"}  # Flexible - can be "first name" + "last name"
 
         try:
-            rows = list(_parse_csv_rows(uploaded_file, required_columns=None))
+            rows = _parse_csv_rows(uploaded_file, required_columns=None)
         except ValidationError as e:
             operation.mark_failed({"error": str(e)})
             return operation
@@ -534,19 +743,17 @@ class BulkService:
                 errors_triggered = True
 
         # Process rows
-        if dry_run or allow_partial:
-            for row in rows:
-                process_row(row)
-        else:
-            try:
-                with transaction.atomic():
-                    for row in rows:
-                        process_row(row)
-                    if errors_triggered:
-                        raise BulkProcessingError("Import failed; rolling back")
-            except BulkProcessingError:
-                operation.mark_failed({"failures": failures})
-                return operation
+        if not self._run_rows(
+            operation,
+            rows,
+            process_row,
+            successes=successes,
+            failures=failures,
+            atomic=not (dry_run or allow_partial),
+            has_errors=lambda: errors_triggered,
+        ):
+            operation.mark_failed({"failures": failures})
+            return operation
 
         # Prepare operation details
         details = {
@@ -587,12 +794,10 @@ class BulkService:
         Creates accounts with role 'RESIDENT' and links to supervisors.
         Handles cases where supervisors don't exist (creates warning/error based on allow_partial).
         """
-        operation = BulkOperation.objects.create(
-            user=self.actor, operation=BulkOperation.OP_IMPORT
-        )
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
 
         try:
-            rows = list(_parse_csv_rows(uploaded_file, required_columns=None))
+            rows = _parse_csv_rows(uploaded_file, required_columns=None)
         except ValidationError as e:
             operation.mark_failed({"error": str(e)})
             return operation
@@ -932,19 +1137,17 @@ class BulkService:
                 errors_triggered = True
 
         # Process rows
-        if dry_run or allow_partial:
-            for row in rows:
-                process_row(row)
-        else:
-            try:
-                with transaction.atomic():
-                    for row in rows:
-                        process_row(row)
-                    if errors_triggered:
-                        raise BulkProcessingError("Import failed; rolling back")
-            except BulkProcessingError:
-                operation.mark_failed({"failures": failures})
-                return operation
+        if not self._run_rows(
+            operation,
+            rows,
+            process_row,
+            successes=successes,
+            failures=failures,
+            atomic=not (dry_run or allow_partial),
+            has_errors=lambda: errors_triggered,
+        ):
+            operation.mark_failed({"failures": failures})
+            return operation
 
         # Prepare operation details
         details = {
@@ -977,10 +1180,8 @@ class BulkService:
         - MS/FCPS (optional)
         - Supervisor Name (optional, will create if not found)
         """
-        operation = BulkOperation.objects.create(
-            user=self.actor, operation=BulkOperation.OP_IMPORT
-        )
-        rows = list(_parse_trainee_rows(uploaded_file))
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
+        rows = _parse_trainee_rows(uploaded_file)
         successes: List[dict] = []
         failures: List[dict] = []
         errors_triggered = False
@@ -1174,19 +1375,17 @@ class BulkService:
                 errors_triggered = True
 
         # Process rows
-        if dry_run or allow_partial:
-            for row in rows:
-                process_row(row)
-        else:
-            try:
-                with transaction.atomic():
-                    for row in rows:
-                        process_row(row)
-                    if errors_triggered:
-                        raise BulkProcessingError("Import failed; rolling back")
-            except BulkProcessingError:
-                operation.mark_failed({"failures": failures})
-                return operation
+        if not self._run_rows(
+            operation,
+            rows,
+            process_row,
+            successes=successes,
+            failures=failures,
+            atomic=not (dry_run or allow_partial),
+            has_errors=lambda: errors_triggered,
+        ):
+            operation.mark_failed({"failures": failures})
+            return operation
 
         # Prepare operation details
         details = {
@@ -1209,7 +1408,7 @@ class BulkService:
         dry_run: bool = True,
         allow_partial: bool = False,
     ) -> BulkOperation:
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
         if Department is None or Hospital is None or HospitalDepartment is None:
             operation.mark_failed({"error": "Department/Hospital models unavailable."})
             return operation
@@ -1220,7 +1419,7 @@ class BulkService:
             return operation
 
         try:
-            rows = list(_parse_csv_rows(uploaded_file, required_columns=None))
+            rows = _parse_csv_rows(uploaded_file, required_columns=None)
         except ValidationError as exc:
             operation.mark_failed({"error": str(exc)})
             return operation
@@ -1287,19 +1486,17 @@ class BulkService:
                 )
                 errors_triggered = True
 
-        if dry_run or allow_partial:
-            for row in rows:
-                process_row(row)
-        else:
-            try:
-                with transaction.atomic():
-                    for row in rows:
-                        process_row(row)
-                    if errors_triggered:
-                        raise BulkProcessingError("Department import failed; rolling back")
-            except BulkProcessingError:
-                operation.mark_failed({"failures": failures})
-                return operation
+        if not self._run_rows(
+            operation,
+            rows,
+            process_row,
+            successes=successes,
+            failures=failures,
+            atomic=not (dry_run or allow_partial),
+            has_errors=lambda: errors_triggered,
+        ):
+            operation.mark_failed({"failures": failures})
+            return operation
 
         operation.mark_completed(
             len(successes),
@@ -1318,13 +1515,13 @@ class BulkService:
         dry_run: bool = True,
         allow_partial: bool = False,
     ) -> BulkOperation:
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
         if Hospital is None:
             operation.mark_failed({"error": "Hospital model unavailable."})
             return operation
 
         try:
-            rows = list(_parse_csv_rows(uploaded_file, required_columns=None))
+            rows = _parse_csv_rows(uploaded_file, required_columns=None)
         except ValidationError as exc:
             operation.mark_failed({"error": str(exc)})
             return operation
@@ -1368,19 +1565,17 @@ class BulkService:
                 )
                 errors_triggered = True
 
-        if dry_run or allow_partial:
-            for row in rows:
-                process_row(row)
-        else:
-            try:
-                with transaction.atomic():
-                    for row in rows:
-                        process_row(row)
-                    if errors_triggered:
-                        raise BulkProcessingError("Hospital import failed; rolling back")
-            except BulkProcessingError:
-                operation.mark_failed({"failures": failures})
-                return operation
+        if not self._run_rows(
+            operation,
+            rows,
+            process_row,
+            successes=successes,
+            failures=failures,
+            atomic=not (dry_run or allow_partial),
+            has_errors=lambda: errors_triggered,
+        ):
+            operation.mark_failed({"failures": failures})
+            return operation
 
         operation.mark_completed(len(successes), len(failures), {"successes": successes, "failures": failures})
         return operation
@@ -1395,13 +1590,13 @@ class BulkService:
         dry_run: bool = True,
         allow_partial: bool = False,
     ) -> BulkOperation:
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
         if Hospital is None or Department is None or HospitalDepartment is None:
             operation.mark_failed({"error": "Hospital/Department models unavailable."})
             return operation
 
         try:
-            rows = list(_parse_csv_rows(uploaded_file, required_columns=None))
+            rows = _parse_csv_rows(uploaded_file, required_columns=None)
         except ValidationError as exc:
             operation.mark_failed({"error": str(exc)})
             return operation
@@ -1449,19 +1644,17 @@ class BulkService:
                 failures.append({"row": row_num, "error": str(exc), "data": row})
                 errors_triggered = True
 
-        if dry_run or allow_partial:
-            for row in rows:
-                process_row(row)
-        else:
-            try:
-                with transaction.atomic():
-                    for row in rows:
-                        process_row(row)
-                    if errors_triggered:
-                        raise BulkProcessingError("Matrix import failed; rolling back")
-            except BulkProcessingError:
-                operation.mark_failed({"failures": failures})
-                return operation
+        if not self._run_rows(
+            operation,
+            rows,
+            process_row,
+            successes=successes,
+            failures=failures,
+            atomic=not (dry_run or allow_partial),
+            has_errors=lambda: errors_triggered,
+        ):
+            operation.mark_failed({"failures": failures})
+            return operation
 
         operation.mark_completed(len(successes), len(failures), {"successes": successes, "failures": failures})
         return operation
@@ -1479,10 +1672,10 @@ class BulkService:
         from sims.supervision.models import ResidentSupervisorAssignment
         from sims.supervision.services import create_supervisor_assignment
 
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
 
         try:
-            rows = list(_parse_csv_rows(uploaded_file, required_columns=None))
+            rows = _parse_csv_rows(uploaded_file, required_columns=None)
         except ValidationError as exc:
             operation.mark_failed({"error": str(exc)})
             return operation
@@ -1560,19 +1753,17 @@ class BulkService:
                 failures.append({"row": row_num, "error": str(exc), "data": row})
                 errors_triggered = True
 
-        if dry_run or allow_partial:
-            for row in rows:
-                process_row(row)
-        else:
-            try:
-                with transaction.atomic():
-                    for row in rows:
-                        process_row(row)
-                    if errors_triggered:
-                        raise BulkProcessingError("Supervision link import failed; rolling back")
-            except BulkProcessingError:
-                operation.mark_failed({"failures": failures})
-                return operation
+        if not self._run_rows(
+            operation,
+            rows,
+            process_row,
+            successes=successes,
+            failures=failures,
+            atomic=not (dry_run or allow_partial),
+            has_errors=lambda: errors_triggered,
+        ):
+            operation.mark_failed({"failures": failures})
+            return operation
 
         operation.mark_completed(len(successes), len(failures), {"successes": successes, "failures": failures})
         return operation
@@ -1590,9 +1781,9 @@ class BulkService:
     ) -> BulkOperation:
         from sims.training.models import TrainingProgram
 
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
         try:
-            rows = list(_parse_csv_rows(uploaded_file, required_columns=None))
+            rows = _parse_csv_rows(uploaded_file, required_columns=None)
         except ValidationError as exc:
             operation.mark_failed({"error": str(exc)})
             return operation
@@ -1636,9 +1827,9 @@ class BulkService:
     ) -> BulkOperation:
         from sims.academics.models import AcademicSession
 
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
         try:
-            rows = list(_parse_csv_rows(uploaded_file, required_columns=None))
+            rows = _parse_csv_rows(uploaded_file, required_columns=None)
         except ValidationError as exc:
             operation.mark_failed({"error": str(exc)})
             return operation
@@ -1683,9 +1874,9 @@ class BulkService:
         except ImportError:
             Department = None
 
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
         try:
-            rows = list(_parse_csv_rows(uploaded_file, required_columns=None))
+            rows = _parse_csv_rows(uploaded_file, required_columns=None)
         except ValidationError as exc:
             operation.mark_failed({"error": str(exc)})
             return operation
@@ -1735,9 +1926,9 @@ class BulkService:
     ) -> BulkOperation:
         from sims.training.models import TrainingProgram, ResidentTrainingRecord
 
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
+        operation = self._start_operation(BulkOperation.OP_IMPORT)
         try:
-            rows = list(_parse_csv_rows(uploaded_file, required_columns=None))
+            rows = _parse_csv_rows(uploaded_file, required_columns=None)
         except ValidationError as exc:
             operation.mark_failed({"error": str(exc)})
             return operation
@@ -1781,185 +1972,362 @@ class BulkService:
         operation.mark_completed(len(successes), len(failures), {"successes": successes, "failures": failures})
         return operation
 
-    def export_dataset(self, resource: str, export_format: str = "xlsx") -> BulkExportFile:
+    def export_dataset(
+        self,
+        resource: str,
+        export_format: str = "xlsx",
+        *,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> BulkExportFile:
+        """
+        Export ``resource`` as CSV or XLSX without materializing the dataset.
+
+        Rows are read with ``.iterator(chunk_size=...)``; CSV comes back as a
+        lazy byte stream and XLSX is written in openpyxl write-only mode to a
+        spooled temporary file. ``progress(rows_written)`` is called every
+        ``chunk_size`` rows.
+        """
         if export_format not in {"xlsx", "csv"}:
             raise ValidationError("Unsupported export format. Use xlsx or csv.")
+        resource = _normalize_export_resource(resource)
+        rows = _dataset_rows(resource)
+        if progress is not None:
+            rows = _with_progress(rows, progress, self.chunk_size)
+        return _render_export_rows(rows, resource, export_format)
 
-        # Normalize hyphenated entity keys (as used by the unified import endpoint's
-        # _ENTITY_METHOD_MAP) to the underscore form this method's branches below use.
-        resource = {
-            "training-programs": "training_programs",
-            "academic-sessions": "academic_sessions",
-        }.get(resource, resource)
-
-        if resource in USERBASE_BULK_EXPORT_RESOURCES:
-            return _render_export_rows(export_userbase_rows(resource), resource, export_format)
-
-        if resource == "residents":
-            queryset = User.objects.filter(role="RESIDENT").select_related("supervisor", "home_department")
-            rows = [
-                {
-                    "username": user.username,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                    "email": user.email,
-                    "specialty": user.specialty or "",
-                    "year": user.year or "",
-                    "supervisor": user.supervisor.username if user.supervisor else "",
-                    "department": user.home_department.name if user.home_department else "",
-                }
-                for user in queryset
-            ]
-        elif resource == "supervisors":
-            queryset = User.objects.filter(role="SUPERVISOR")
-            rows = [
-                {
-                    "username": user.username,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                    "email": user.email,
-                    "specialty": user.specialty or "",
-                    "phone_number": user.phone_number or "",
-                    "registration_number": user.registration_number or "",
-                }
-                for user in queryset
-            ]
-        elif resource == "departments":
-            if Department is None:
-                raise ValidationError("Department model unavailable.")
-            rows = []
-            for dept in Department.objects.all().order_by("code"):
-                hospitals = []
-                if HospitalDepartment is not None:
-                    hospitals = list(
-                        HospitalDepartment.objects.filter(department=dept, is_active=True)
-                        .select_related("hospital")
-                        .values_list("hospital__code", flat=True)
-                    )
-                rows.append(
-                    {
-                        "code": dept.code,
-                        "name": dept.name,
-                        "active": dept.active,
-                        "hospitals": ",".join(hospitals),
-                    }
-                )
-        elif resource == "hospitals":
-            if Hospital is None:
-                raise ValidationError("Hospital model unavailable.")
-            rows = [
-                {
-                    "hospital_code": h.code,
-                    "hospital_name": h.name,
-                    "active": h.is_active,
-                }
-                for h in Hospital.objects.all().order_by("code")
-            ]
-        elif resource == "matrix":
-            if HospitalDepartment is None:
-                raise ValidationError("HospitalDepartment model unavailable.")
-            rows = [
-                {
-                    "hospital_code": hd.hospital.code,
-                    "department_code": hd.department.code,
-                    "active": hd.is_active,
-                }
-                for hd in HospitalDepartment.objects.all().select_related("hospital", "department").order_by("hospital__code", "department__code")
-            ]
-        elif resource == "supervision_links":
-            from sims.supervision.models import ResidentSupervisorAssignment
-            rows = [
-                {
-                    "supervisor_email": link.supervisor.user.email,
-                    "resident_email": link.resident.user.email,
-                    "department_code": link.resident.department_ref.code if link.resident.department_ref else "",
-                    "start_date": str(link.start_date) if link.start_date else "",
-                    "end_date": str(link.end_date) if link.end_date else "",
-                    "active": link.is_active,
-                }
-                for link in ResidentSupervisorAssignment.objects.all().select_related(
-                    "supervisor__user", "resident__user", "resident__department_ref"
-                )
-            ]
-        elif resource == "training_programs":
-            from sims.training.models import TrainingProgram
-            rows = [
-                {"program_code": p.code, "program_name": p.name, "duration_months": p.duration_months, "active": p.active}
-                for p in TrainingProgram.objects.all().order_by("code")
-            ]
-        elif resource == "academic_sessions":
-            from sims.academics.models import AcademicSession
-            rows = [
-                {"session_code": s.code, "session_name": s.name, "description": s.description, "active": s.active}
-                for s in AcademicSession.objects.all().order_by("code")
-            ]
-        elif resource == "rotation_templates":
-            from sims.training.models import ProgramRotationTemplate
-            rows = [
-                {
-                    "program_code": t.program.code,
-                    "template_name": t.name,
-                    "department_code": t.department.code,
-                    "duration_weeks": t.duration_weeks,
-                    "required": t.required,
-                    "sequence_order": t.sequence_order,
-                }
-                for t in ProgramRotationTemplate.objects.select_related("program", "department").order_by("program__code", "sequence_order")
-            ]
-        elif resource == "resident_training_records":
-            from sims.training.models import ResidentTrainingRecord
-            rows = [
-                {
-                    "resident_email": r.resident_user.email,
-                    "program_code": r.program.code,
-                    "start_date": str(r.start_date),
-                    "expected_end_date": str(r.expected_end_date) if r.expected_end_date else "",
-                    "current_level": r.current_level,
-                    "active": r.active,
-                }
-                for r in ResidentTrainingRecord.objects.select_related("resident_user", "program").order_by("-start_date")
-            ]
-        else:
-            raise ValidationError("Unsupported export resource.")
+    def enqueue_export(self, resource: str, export_format: str = "xlsx") -> BulkOperation:
+        """
+        Queue a dataset export as a Celery job, for resources too large to
+        stream within one request.
 
-        return _render_export_rows(rows, resource, export_format)
+        Once the operation completes its details carry a ``download_url``
+        served by the bulk operation download endpoint.
+        """
+        if export_format not in {"xlsx", "csv"}:
+            raise ValidationError("Unsupported export format. Use xlsx or csv.")
+        resource = _normalize_export_resource(resource)
+        _dataset_rows(resource)  # reject unknown resources before queueing
+
+        operation = BulkOperation.objects.create(
+            user=self.actor,
+            operation=BulkOperation.OP_EXPORT,
+            options={
+                "method": "export_dataset",
+                "resource": resource,
+                "export_format": export_format,
+            },
+        )
+
+        from sims.bulk.tasks import run_bulk_export
+
+        transaction.on_commit(lambda: run_bulk_export.delay(operation.pk))
+        return operation
+
+    def run_export_job(self) -> BulkOperation:
+        """Render the export this service is bound to into BULK_EXPORT_DIR (called by the worker)."""
+        operation = self.operation
+        options = operation.options
+        operation.mark_running()
+        written = 0
+
+        def progress(count: int) -> None:
+            nonlocal written
+            written = count
+            operation.record_progress(count, count, count, [])
+
+        try:
+            export_dir = Path(settings.BULK_EXPORT_DIR)
+            export_dir.mkdir(parents=True, exist_ok=True)
+            export_file = self.export_dataset(options["resource"], options["export_format"], progress=progress)
+            export_path = export_dir / f"{uuid.uuid4().hex}{Path(export_file.filename).suffix}"
+            with open(export_path, "wb") as handle:
+                for block in export_file.iter_bytes():
+                    handle.write(block)
+        except Exception as exc:
+            logger.exception("Bulk export job %s failed", operation.pk)
+            operation.mark_failed({"error": str(exc)})
+            return operation
+
+        operation.options = {**options, "export_path": str(export_path), "file_name": export_file.filename}
+        operation.save(update_fields=["options"])
+        operation.mark_completed(
+            written,
+            0,
+            {
+                "file_name": export_file.filename,
+                "content_type": export_file.content_type,
+                "download_url": f"/api/bulk/operations/{operation.pk}/download/",
+            },
+        )
+        return operation
+
+
+def _normalize_export_resource(resource: str) -> str:
+    # Normalize hyphenated entity keys (as used by the unified import endpoint's
+    # _ENTITY_METHOD_MAP) to the underscore form _dataset_rows uses.
+    return {
+        "training-programs": "training_programs",
+        "academic-sessions": "academic_sessions",
+    }.get(resource, resource)
+
+
+def _dataset_rows(resource: str) -> Iterator[dict]:
+    """
+    Lazily yield the export rows for ``resource``.
+
+    Every branch walks its queryset with ``.iterator()`` (over ``values()``
+    where no model behaviour is needed); unknown resources raise before any
+    query runs.
+    """
+    chunk_size = USERBASE_EXPORT_CHUNK_SIZE
+
+    if resource in USERBASE_BULK_EXPORT_RESOURCES:
+        return export_userbase_rows(resource)
+
+    if resource == "residents":
+        queryset = User.objects.filter(role="RESIDENT").values(
+            "username", "first_name", "last_name", "email", "specialty", "year",
+            "supervisor__username", "home_department__name",
+        )
+        return (
+            {
+                "username": user["username"],
+                "first_name": user["first_name"],
+                "last_name": user["last_name"],
+                "email": user["email"],
+                "specialty": user["specialty"] or "",
+                "year": user["year"] or "",
+                "supervisor": user["supervisor__username"] or "",
+                "department": user["home_department__name"] or "",
+            }
+            for user in queryset.iterator(chunk_size=chunk_size)
+        )
+    if resource == "supervisors":
+        queryset = User.objects.filter(role="SUPERVISOR").values(
+            "username", "first_name", "last_name", "email", "specialty", "phone_number", "registration_number",
+        )
+        return (
+            {
+                "username": user["username"],
+                "first_name": user["first_name"],
+                "last_name": user["last_name"],
+                "email": user["email"],
+                "specialty": user["specialty"] or "",
+                "phone_number": user["phone_number"] or "",
+                "registration_number": user["registration_number"] or "",
+            }
+            for user in queryset.iterator(chunk_size=chunk_size)
+        )
+    if resource == "departments":
+        if Department is None:
+            raise ValidationError("Department model unavailable.")
+        return _department_export_rows(chunk_size)
+    if resource == "hospitals":
+        if Hospital is None:
+            raise ValidationError("Hospital model unavailable.")
+        return (
+            {
+                "hospital_code": h["code"],
+                "hospital_name": h["name"],
+                "active": h["is_active"],
+            }
+            for h in Hospital.objects.order_by("code").values("code", "name", "is_active").iterator(chunk_size=chunk_size)
+        )
+    if resource == "matrix":
+        if HospitalDepartment is None:
+            raise ValidationError("HospitalDepartment model unavailable.")
+        return (
+            {
+                "hospital_code": hd["hospital__code"],
+                "department_code": hd["department__code"],
+                "active": hd["is_active"],
+            }
+            for hd in HospitalDepartment.objects.order_by("hospital__code", "department__code")
+            .values("hospital__code", "department__code", "is_active")
+            .iterator(chunk_size=chunk_size)
+        )
+    if resource == "supervision_links":
+        from sims.supervision.models import ResidentSupervisorAssignment
+        return (
+            {
+                "supervisor_email": link["supervisor__user__email"],
+                "resident_email": link["resident__user__email"],
+                "department_code": link["resident__department_ref__code"] or "",
+                "start_date": str(link["start_date"]) if link["start_date"] else "",
+                "end_date": str(link["end_date"]) if link["end_date"] else "",
+                "active": link["is_active"],
+            }
+            for link in ResidentSupervisorAssignment.objects.values(
+                "supervisor__user__email",
+                "resident__user__email",
+                "resident__department_ref__code",
+                "start_date",
+                "end_date",
+                "is_active",
+            ).iterator(chunk_size=chunk_size)
+        )
+    if resource == "training_programs":
+        from sims.training.models import TrainingProgram
+        return (
+            {"program_code": p["code"], "program_name": p["name"], "duration_months": p["duration_months"], "active": p["active"]}
+            for p in TrainingProgram.objects.order_by("code")
+            .values("code", "name", "duration_months", "active")
+            .iterator(chunk_size=chunk_size)
+        )
+    if resource == "academic_sessions":
+        from sims.academics.models import AcademicSession
+        return (
+            {"session_code": s["code"], "session_name": s["name"], "description": s["description"], "active": s["active"]}
+            for s in AcademicSession.objects.order_by("code")
+            .values("code", "name", "description", "active")
+            .iterator(chunk_size=chunk_size)
+        )
+    if resource == "rotation_templates":
+        from sims.training.models import ProgramRotationTemplate
+        return (
+            {
+                "program_code": t["program__code"],
+                "template_name": t["name"],
+                "department_code": t["department__code"],
+                "duration_weeks": t["duration_weeks"],
+                "required": t["required"],
+                "sequence_order": t["sequence_order"],
+            }
+            for t in ProgramRotationTemplate.objects.order_by("program__code", "sequence_order")
+            .values("program__code", "name", "department__code", "duration_weeks", "required", "sequence_order")
+            .iterator(chunk_size=chunk_size)
+        )
+    if resource == "resident_training_records":
+        from sims.training.models import ResidentTrainingRecord
+        return (
+            {
+                "resident_email": r["resident_user__email"],
+                "program_code": r["program__code"],
+                "start_date": str(r["start_date"]),
+                "expected_end_date": str(r["expected_end_date"]) if r["expected_end_date"] else "",
+                "current_level": r["current_level"],
+                "active": r["active"],
+            }
+            for r in ResidentTrainingRecord.objects.order_by("-start_date")
+            .values("resident_user__email", "program__code", "start_date", "expected_end_date", "current_level", "active")
+            .iterator(chunk_size=chunk_size)
+        )
+    raise ValidationError("Unsupported export resource.")
+
+
+def _department_export_rows(chunk_size: int) -> Iterator[dict]:
+    # Active hospital codes are prefetched per chunk of departments instead of
+    # being queried once per department.
+    queryset = Department.objects.order_by("code")
+    if HospitalDepartment is not None:
+        queryset = queryset.prefetch_related(
+            Prefetch(
+                "hospital_departments",
+                queryset=HospitalDepartment.objects.filter(is_active=True).select_related("hospital").order_by("pk"),
+                to_attr="active_hospital_links",
+            )
+        )
+    for dept in queryset.iterator(chunk_size=chunk_size):
+        hospitals = [link.hospital.code for link in getattr(dept, "active_hospital_links", [])]
+        yield {
+            "code": dept.code,
+            "name": dept.name,
+            "active": dept.active,
+            "hospitals": ",".join(hospitals),
+        }
+
+
+def _announce_bulk_history(model, objs) -> None:
+    """
+    Send ``post_create_historical_record`` for history rows written by
+    ``bulk_create_with_history``, which skips the signal, so the audit mirror
+    records bulk-created objects like individually saved ones.
+    """
+    from simple_history.signals import post_create_historical_record
 
+    by_pk = {obj.pk: obj for obj in objs if obj.pk is not None}
+    if not by_pk:
+        return
+    history_rows = model.history.filter(id__in=list(by_pk), history_type="+").select_related("history_user")
+    for history_row in history_rows:
+        post_create_historical_record.send(
+            sender=history_row.__class__,
+            instance=by_pk[history_row.id],
+            history_instance=history_row,
+            history_date=history_row.history_date,
+            history_user=history_row.history_user,
+            history_change_reason=history_row.history_change_reason,
+            using=history_row._state.db,
+        )
+
+
+def _with_progress(rows: Iterable[dict], progress: Callable[[int], None], every: int) -> Iterator[dict]:
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % every == 0:
+            progress(count)
+    progress(count)
+
+
+def _render_export_rows(rows: Iterable[dict], resource: str, export_format: str) -> BulkExportFile:
+    """
+    Render ``rows`` lazily; columns come from the first row (none when empty).
+
+    CSV is returned as a byte stream flushed every ``_EXPORT_BLOCK_SIZE`` bytes;
+    XLSX is written in write-only mode to a spooled temporary file.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    headers = list(first.keys()) if first is not None else []
+    if first is not None:
+        rows = itertools.chain([first], rows)
 
-def _render_export_rows(rows: List[dict], resource: str, export_format: str) -> BulkExportFile:
     if export_format == "csv":
-        output = io.StringIO()
-        fieldnames = list(rows[0].keys()) if rows else []
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        if fieldnames:
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(row)
-        content = output.getvalue().encode("utf-8")
         return BulkExportFile(
             filename=f"{resource}_export.csv",
-            content=content,
             content_type="text/csv",
+            stream=_iter_csv_blocks(headers, rows),
         )
 
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Export"
-    headers = list(rows[0].keys()) if rows else []
-    for col_idx, header in enumerate(headers, start=1):
-        cell = sheet.cell(row=1, column=col_idx, value=header)
-        cell.font = Font(bold=True)
-    for row_idx, row in enumerate(rows, start=2):
-        for col_idx, header in enumerate(headers, start=1):
-            sheet.cell(row=row_idx, column=col_idx, value=row.get(header, ""))
-    stream = io.BytesIO()
-    workbook.save(stream)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Export")
+    if headers:
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(sheet, value=header)
+            cell.font = Font(bold=True)
+            header_cells.append(cell)
+        sheet.append(header_cells)
+        for row in rows:
+            sheet.append([row.get(header, "") for header in headers])
+    spool = tempfile.SpooledTemporaryFile(max_size=_EXPORT_SPOOL_MAX_BYTES)
+    workbook.save(spool)
+    spool.seek(0)
     return BulkExportFile(
         filename=f"{resource}_export.xlsx",
-        content=stream.getvalue(),
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        file=spool,
     )
 
 
+def _iter_csv_blocks(headers: List[str], rows: Iterable[dict]) -> Iterator[bytes]:
+    if not headers:
+        return
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=headers)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= _EXPORT_BLOCK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
 def _chunked(items: Sequence[int], chunk_size: int) -> Iterator[List[int]]:
     chunk: List[int] = []
     for item in items:
@@ -1974,34 +2342,19 @@ def _chunked(items: Sequence[int], chunk_size: int) -> Iterator[List[int]]:
 REQUIRED_COLUMNS = {"pg_username", "case_title", "date", "status"}
 
 
-def _parse_rows(uploaded_file) -> Iterator[dict]:
-    name = getattr(uploaded_file, "name", "uploaded")
-    content = uploaded_file.read()
-    if isinstance(content, bytes):
-        stream = io.BytesIO(content)
-    else:
-        stream = io.StringIO(content)
-    stream.seek(0)
-    if name.endswith(".csv"):
-        text_stream = (
-            io.TextIOWrapper(stream, encoding="utf-8") if isinstance(stream, io.BytesIO) else stream
-        )
-        reader = csv.DictReader(text_stream)
-        _validate_headers(reader.fieldnames)
-        for row in reader:
-            yield {key: (value or "").strip() for key, value in row.items() if key}
-    elif name.endswith(".xlsx"):
-        workbook = load_workbook(stream)
-        sheet = workbook.active
-        headers = [cell.value for cell in next(sheet.iter_rows(max_row=1))]
-        _validate_headers(headers)
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            payload = {
-                headers[idx]: (value or "") for idx, value in enumerate(row) if idx < len(headers)
-            }
-            yield {key: str(value).strip() for key, value in payload.items()}
-    else:
-        raise ValidationError("Unsupported file format")
+def _parse_rows(uploaded_file) -> TabularReader:
+    reader = TabularReader(
+        uploaded_file,
+        header_key=lambda label, index: label.strip(),
+        row_numbers=False,
+        unsupported_message="Unsupported file format",
+    )
+    try:
+        _validate_headers(reader.headers)
+    except ValidationError:
+        reader.close()
+        raise
+    return reader
 
 
 def _validate_headers(headers: Iterable[str]) -> None:
@@ -2298,100 +2651,29 @@ def _generate_password_from_username(username: str, year: Optional[str] = None)
     return f"{username}@123!"
 
 
-def _parse_csv_rows(uploaded_file, required_columns: Optional[set] = None) -> Iterator[dict]:
+def _parse_csv_rows(uploaded_file, required_columns: Optional[set] = None) -> TabularReader:
     """
-    Parse CSV file and yield row dictionaries.
-    Supports both CSV and Excel files.
+    Open a CSV or Excel upload for streaming row-by-row parsing.
 
     Args:
-        uploaded_file: File object
+        uploaded_file: File object, or a ``MappedUpload`` for flexible imports
         required_columns: Set of required column names (case-insensitive)
 
-    Yields:
-        dict: Row data with lowercase keys
+    Returns:
+        TabularReader yielding row dicts with normalized lowercase keys and a
+        ``_row_number``. Headers are validated before any row is read.
     """
-    name = getattr(uploaded_file, "name", "uploaded")
-    content = uploaded_file.read()
-
-    # Reset file pointer
-    if isinstance(content, bytes):
-        stream = io.BytesIO(content)
-    else:
-        stream = io.StringIO(content)
-    stream.seek(0)
-
-    def _normalize_header(header: str) -> str:
-        normalized = re.sub(r"[^a-z0-9]+", "_", (header or "").strip().lower())
-        return normalized.strip("_")
-
-    # Handle CSV files
-    if name.endswith(".csv"):
-        text_stream = (
-            io.TextIOWrapper(stream, encoding="utf-8")
-            if isinstance(stream, io.BytesIO)
-            else stream
-        )
-        reader = csv.DictReader(text_stream)
-
-        if reader.fieldnames:
-            # Normalize headers (strip, lowercase)
-            headers = [_normalize_header(h) if h else f"col_{i}"
-                      for i, h in enumerate(reader.fieldnames)]
-            reader.fieldnames = headers
-
-            # Validate required columns
-            if required_columns:
-                missing = required_columns - {h.lower() for h in headers}
-                if missing:
-                    raise ValidationError(
-                        f"Missing required columns: {', '.join(sorted(missing))}"
-                    )
-
-        for row_idx, row in enumerate(reader, start=2):
-            # Normalize row values
-            normalized_row = {
-                _normalize_header(k): (v.strip() if v else "")
-                for k, v in row.items() if k
-            }
-            normalized_row["_row_number"] = row_idx
-            yield normalized_row
-
-    # Handle Excel files
-    elif name.endswith((".xlsx", ".xls")):
-        workbook = load_workbook(stream)
-        sheet = workbook.active
-
-        # Get headers from first row
-        headers = [
-            _normalize_header(str(cell.value)) if cell.value else f"col_{idx}"
-            for idx, cell in enumerate(next(sheet.iter_rows(max_row=1)))
-        ]
-
-        # Validate required columns
-        if required_columns:
-            missing = required_columns - {h.lower() for h in headers}
-            if missing:
-                raise ValidationError(
-                    f"Missing required columns: {', '.join(sorted(missing))}"
-                )
-
-        # Parse data rows
-        for row_idx, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-            if not any(row):  # Skip empty rows
-                continue
-
-            payload = {
-                headers[idx] if idx < len(headers) else f"col_{idx}": (
-                    str(value).strip() if value is not None else ""
-                )
-                for idx, value in enumerate(row)
-                if idx < len(headers)
-            }
-            payload["_row_number"] = row_idx
-            yield payload
-
-    else:
-        raise ValidationError("Unsupported file format. Please upload CSV or Excel file.")
+    reader = TabularReader(
+        uploaded_file,
+        header_key=normalized_key,
+        unsupported_message="Unsupported file format. Please upload CSV or Excel file.",
+    )
+    if required_columns:
+        missing = required_columns - set(reader.headers)
+        if missing:
+            reader.close()
+            raise ValidationError(f"Missing required columns: {', '.join(sorted(missing))}")
+    return reader
 
 
 def _parse_trainee_rows(uploaded_file) -> Iterator[dict]:
@@ -2399,16 +2681,9 @@ def _parse_trainee_rows(uploaded_file) -> Iterator[dict]:
     Parse Excel file with trainee data.
     Expected columns: Sr. No., Name of Trainee, Date of Joining, MS/FCPS, Supervisor Name
     """
-    name = getattr(uploaded_file, "name", "uploaded")
-    content = uploaded_file.read()
-    if isinstance(content, bytes):
-        stream = io.BytesIO(content)
-    else:
-        stream = io.StringIO(content)
-    stream.seek(0)
 
     def _header_alias(header: str) -> str:
-        norm = re.sub(r"[^a-z0-9]+", "_", (header or "").strip().lower()).strip("_")
+        norm = normalize_header(header)
         if norm in {"name", "name_of_trainee"}:
             return "name"
         if norm in {"date", "date_of_joining", "date_joining"}:
@@ -2421,45 +2696,34 @@ def _parse_trainee_rows(uploaded_file) -> Iterator[dict]:
             return "sr_no"
         return norm
 
-    if name.endswith(".csv"):
-        text_stream = io.TextIOWrapper(stream, encoding="utf-8")
-        reader = csv.DictReader(text_stream)
-        aliases = {h: _header_alias(h or "") for h in (reader.fieldnames or [])}
-        if "name" not in aliases.values() or "date" not in aliases.values():
-            raise ValidationError("Missing required columns: 'Name of Trainee' and 'Date of Joining'")
-        for row_idx, row in enumerate(reader, start=2):
-            if not any(row.values()):
-                continue
-            normalized = {_header_alias(k or ""): (v.strip() if isinstance(v, str) else v) for k, v in row.items()}
-            yield {
-                "name": (normalized.get("name") or "").strip(),
-                "date_joining": normalized.get("date"),
-                "qualification": (normalized.get("qualification") or "").strip(),
-                "supervisor_name": (normalized.get("SUPERVISOR") or "").strip(),
-                "_row_number": row_idx,
-            }
-        return
-
-    if not name.endswith((".xlsx", ".xls")):
-        raise ValidationError("Trainee import supports CSV or Excel files (.csv, .xlsx, .xls)")
-
-    workbook = load_workbook(stream)
-    sheet = workbook.active
-    headers = [str(cell.value).strip() if cell.value else "" for cell in next(sheet.iter_rows(max_row=1))]
-    col_map = {_header_alias(header): idx for idx, header in enumerate(headers)}
+    reader = TabularReader(
+        uploaded_file,
+        unsupported_message="Trainee import supports CSV or Excel files (.csv, .xlsx, .xls)",
+    )
+    col_map = {_header_alias(label): idx for idx, label in enumerate(reader.labels)}
     if "name" not in col_map or "date" not in col_map:
+        reader.close()
         raise ValidationError("Missing required columns: 'Name of Trainee' and 'Date of Joining'")
-    for row_idx, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-        if not any(row):
-            continue
-        row_data = {
-            "name": str(row[col_map["name"]]).strip() if col_map["name"] < len(row) and row[col_map["name"]] else "",
-            "date_joining": row[col_map["date"]] if col_map["date"] < len(row) else "",
-            "qualification": str(row[col_map["qualification"]]).strip() if "qualification" in col_map and col_map["qualification"] < len(row) and row[col_map["qualification"]] else "",
-            "supervisor_name": str(row[col_map["SUPERVISOR"]]).strip() if "SUPERVISOR" in col_map and col_map["SUPERVISOR"] < len(row) and row[col_map["SUPERVISOR"]] else "",
+
+    def _cell(values, column: str):
+        idx = col_map.get(column)
+        if idx is None or idx >= len(values):
+            return None
+        value = values[idx]
+        return value.strip() if isinstance(value, str) else value
+
+    def _text(values, column: str) -> str:
+        value = _cell(values, column)
+        return str(value).strip() if value else ""
+
+    for row_idx, values in reader.iter_values():
+        yield {
+            "name": _text(values, "name"),
+            "date_joining": _cell(values, "date") or "",
+            "qualification": _text(values, "qualification"),
+            "supervisor_name": _text(values, "SUPERVISOR"),
             "_row_number": row_idx,
         }
-        yield row_data
 
 
 def generate_trainee_template() -> io.BytesIO:
@@ -2509,26 +2773,16 @@ def convert_excel_to_trainee_format(uploaded_file) -> io.BytesIO:
     Attempts to intelligently map columns from the uploaded file to the required format.
     Returns a BytesIO object containing the converted Excel file.
     """
-    name = getattr(uploaded_file, "name", "uploaded")
-    content = uploaded_file.read()
-    if isinstance(content, bytes):
-        stream = io.BytesIO(content)
-    else:
-        stream = io.StringIO(content)
-    stream.seek(0)
-
+    name = (getattr(uploaded_file, "name", None) or "uploaded").lower()
     if not name.endswith((".xlsx", ".xls")):
         raise ValidationError("Only Excel files (.xlsx, .xls) are supported")
 
-    # Load the uploaded workbook
-    source_workbook = load_workbook(stream)
-    source_sheet = source_workbook.active
-
-    # Get headers from first row
-    source_headers = []
-    for cell in next(source_sheet.iter_rows(max_row=1)):
-        header = str(cell.value).strip() if cell.value else ""
-        source_headers.append(header)
+    # Stream the uploaded workbook (read-only)
+    reader = TabularReader(uploaded_file)
+    source_headers = [
+        "" if label == f"col_{idx}" else label.strip()
+        for idx, label in enumerate(reader.labels)
+    ]
 
     # Create new workbook with required format
     output_workbook = Workbook()
@@ -2589,9 +2843,7 @@ def convert_excel_to_trainee_format(uploaded_file) -> io.BytesIO:
 
     # Copy data rows
     output_row = 2
-    for source_row_idx, source_row in enumerate(source_sheet.iter_rows(min_row=2, values_only=True), start=2):
-        if not any(source_row):  # Skip empty rows
-            continue
+    for _, source_row in reader.iter_values():
 
         # Map columns
         for col_idx, req_header in enumerate(required_headers, start=1):
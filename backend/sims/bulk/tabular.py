@@ -0,0 +1,224 @@
+"""
+Streaming reader shared by every CSV/Excel bulk upload parser.
+
+Uploads are read straight from their own file handle (Django spools large
+uploads to a temporary file) and workbooks are opened ``read_only``, so rows
+are produced one at a time and memory stays flat whatever the file size.
+Header normalization and flexible-import column mapping are applied per row.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from openpyxl import load_workbook
+
+CSV_EXTENSIONS = (".csv",)
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+
+_COUNT_CHUNK_SIZE = 1024 * 1024
+
+
+def normalize_header(header: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", (header or "").strip().lower()).strip("_")
+
+
+def normalized_key(label: str, index: int) -> str:
+    """Header key used by the import parsers: normalized, ``col_<n>`` when blank."""
+    return normalize_header(label) if label else f"col_{index}"
+
+
+def clean_value(value: Any) -> str:
+    return str(value).strip() if value is not None else ""
+
+
+@dataclass
+class MappedUpload:
+    """
+    An upload read through a flexible-import column mapping.
+
+    Rows come out keyed by ``fields`` (the target schema), each taking the
+    value of the source column named in ``mapping``; unmapped fields are blank.
+    """
+
+    file: Any
+    mapping: Dict[str, str]
+    fields: Sequence[str] = field(default_factory=list)
+    sheet_name: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return getattr(self.file, "name", None) or "uploaded"
+
+
+class TabularReader:
+    """
+    Single-pass row iterator over a CSV or Excel upload.
+
+    Headers are read when the reader is built, so callers can validate them
+    before any row is processed; iterating yields one dict per non-blank data
+    row. ``header_key(label, index)`` turns raw header labels into row keys
+    (labels are kept as-is by default) and ``row_numbers`` adds the 1-based
+    spreadsheet row as ``_row_number``.
+    """
+
+    def __init__(
+        self,
+        upload,
+        *,
+        header_key: Optional[Callable[[str, int], str]] = None,
+        row_numbers: bool = True,
+        skip_blank: bool = True,
+        sheet_name: Optional[str] = None,
+        unsupported_message: str = "Unsupported file format. Upload CSV or Excel.",
+    ):
+        mapping = None
+        fields: Sequence[str] = ()
+        if isinstance(upload, MappedUpload):
+            mapping, fields = upload.mapping or {}, upload.fields or list(upload.mapping or {})
+            sheet_name = sheet_name or upload.sheet_name
+            upload = upload.file
+
+        self.row_numbers = row_numbers
+        self.skip_blank = skip_blank
+        self.sheet_names: List[str] = []
+        self.estimated_total: Optional[int] = None
+        self._text = None
+        self._csv_rows = None
+        self._workbook = None
+        self._sheet = None
+
+        name = (getattr(upload, "name", None) or "uploaded").lower()
+        if name.endswith(CSV_EXTENSIONS):
+            labels = self._open_csv(upload)
+        elif name.endswith(EXCEL_EXTENSIONS):
+            labels = self._open_workbook(upload, sheet_name)
+        else:
+            raise ValidationError(unsupported_message)
+
+        # Raw labels as the file presents them; these are what a flexible
+        # mapping refers to.
+        self.labels: List[str] = labels
+        if mapping is not None:
+            positions = {label: index for index, label in enumerate(labels)}
+            columns = [(target, positions.get(mapping.get(target))) for target in fields]
+        else:
+            columns = [(label, index) for index, label in enumerate(labels)]
+        if header_key is not None:
+            columns = [(header_key(label, position), index) for position, (label, index) in enumerate(columns)]
+        self._columns: List[Tuple[str, Optional[int]]] = [(key, index) for key, index in columns if key]
+        self.headers: List[str] = [key for key, _ in self._columns]
+
+    # -- opening -------------------------------------------------------------------
+
+    def _open_csv(self, upload) -> List[str]:
+        stream = getattr(upload, "file", None) or upload
+        if hasattr(stream, "seek"):
+            stream.seek(0)
+        probe = stream.read(0)
+        if isinstance(probe, str):
+            self.estimated_total = _count_lines(stream, "\n")
+            self._csv_rows = csv.reader(stream)
+        else:
+            self.estimated_total = _count_lines(stream, b"\n")
+            self._text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+            self._csv_rows = csv.reader(self._text)
+        try:
+            labels = next(self._csv_rows)
+        except StopIteration:
+            labels = []
+        except UnicodeDecodeError as exc:
+            self.close()
+            raise ValidationError(f"File is not valid UTF-8 text: {exc}")
+        if self.estimated_total is not None:
+            self.estimated_total = max(self.estimated_total - 1, 0)
+        return list(labels)
+
+    def _open_workbook(self, upload, sheet_name: Optional[str]) -> List[str]:
+        stream = getattr(upload, "file", None) or upload
+        if hasattr(stream, "seek"):
+            stream.seek(0)
+        self._workbook = load_workbook(stream, read_only=True)
+        self.sheet_names = list(self._workbook.sheetnames)
+        if sheet_name and sheet_name in self.sheet_names:
+            self._sheet = self._workbook[sheet_name]
+        else:
+            self._sheet = self._workbook.active or self._workbook[self.sheet_names[0]]
+        if self._sheet.max_row:
+            self.estimated_total = max(self._sheet.max_row - 1, 0)
+        header_row = next(self._sheet.iter_rows(max_row=1, values_only=True), ()) or ()
+        return [str(value) if value is not None else f"col_{index}" for index, value in enumerate(header_row)]
+
+    # -- iteration -----------------------------------------------------------------
+
+    def iter_values(self) -> Iterator[Tuple[int, Sequence[Any]]]:
+        """Yield ``(row_number, raw_values)`` for each data row, raw cell types intact."""
+        try:
+            if self._csv_rows is not None:
+                source = self._csv_rows
+            else:
+                source = self._sheet.iter_rows(min_row=2, values_only=True)
+            for row_number, values in enumerate(source, start=2):
+                if self.skip_blank and _is_blank(values):
+                    continue
+                yield row_number, values
+        except UnicodeDecodeError as exc:
+            raise ValidationError(f"File is not valid UTF-8 text: {exc}")
+        finally:
+            self.close()
+
+    def __iter__(self) -> Iterator[dict]:
+        columns = self._columns
+        for row_number, values in self.iter_values():
+            width = len(values)
+            row = {
+                key: clean_value(values[index]) if index is not None and index < width else ""
+                for key, index in columns
+            }
+            if self.row_numbers:
+                row["_row_number"] = row_number
+            yield row
+
+    def close(self) -> None:
+        """Release the workbook and hand the upload's file handle back untouched."""
+        if self._text is not None:
+            if not self._text.closed:
+                self._text.detach()
+            self._text = None
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+    def __enter__(self) -> "TabularReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _is_blank(values: Sequence[Any]) -> bool:
+    return not any(value is not None and str(value).strip() for value in values)
+
+
+def _count_lines(stream, newline) -> Optional[int]:
+    """Cheap row estimate for progress reporting: count newlines, then rewind."""
+    if not (hasattr(stream, "seekable") and stream.seekable()):
+        return None
+    start = stream.tell()
+    count = 0
+    last = None
+    while True:
+        chunk = stream.read(_COUNT_CHUNK_SIZE)
+        if not chunk:
+            break
+        count += chunk.count(newline)
+        last = chunk[-1:]
+    stream.seek(start)
+    if last is not None and last != newline:
+        count += 1
+    return count
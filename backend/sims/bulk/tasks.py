@@ -0,0 +1,41 @@
+"""
+Celery tasks for the bulk app.
+"""
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def run_bulk_import(operation_id):
+    """Run a staged bulk import job queued by ``BulkService.enqueue_import``."""
+    from sims.bulk.models import BulkOperation
+    from sims.bulk.services import BulkService
+
+    operation = BulkOperation.objects.select_related("user").filter(pk=operation_id).first()
+    if operation is None or operation.status != BulkOperation.STATUS_PENDING:
+        logger.info("Skipping bulk import job %s; not pending", operation_id)
+        return
+    service = BulkService(
+        operation.user,
+        chunk_size=settings.BULK_IMPORT_CHUNK_SIZE,
+        operation=operation,
+    )
+    service.run_staged_import()
+
+
+@shared_task(ignore_result=True)
+def run_bulk_export(operation_id):
+    """Render a dataset export queued by ``BulkService.enqueue_export``."""
+    from sims.bulk.models import BulkOperation
+    from sims.bulk.services import BulkService
+
+    operation = BulkOperation.objects.select_related("user").filter(pk=operation_id).first()
+    if operation is None or operation.status != BulkOperation.STATUS_PENDING:
+        logger.info("Skipping bulk export job %s; not pending", operation_id)
+        return
+    service = BulkService(operation.user, operation=operation)
+    service.run_export_job()
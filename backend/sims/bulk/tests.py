@@ -1,9 +1,13 @@
+import os
+from unittest import mock
+
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
 
 from sims.academics.models import Department
 from sims.bulk.models import BulkOperation, MappingPreset
+from sims.bulk.tabular import MappedUpload, TabularReader, normalized_key
 from sims.rotations.models import Hospital, HospitalDepartment
 from sims.training.models import ResidentTrainingRecord
 from sims.supervision.models import ResidentSupervisorAssignment
@@ -137,10 +141,76 @@ class ActiveUserbaseBulkEngineTests(TestCase):
         self.client.force_authenticate(self.admin)
         response = self.client.get("/api/bulk/exports/hospitals/?file_format=csv")
         self.assertEqual(response.status_code, 200)
-        body = response.content.decode("utf-8")
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content).decode("utf-8")
         self.assertIn("hospital_code,hospital_name,address,phone,email,active", body)
         self.assertIn("AH,Allied Hospital,Faisalabad", body)
 
+    def test_bulk_export_xlsx_is_written_in_write_only_mode(self):
+        from io import BytesIO
+
+        from openpyxl import load_workbook
+
+        Hospital.objects.create(name="Allied Hospital", code="AH", is_active=True)
+        self.client.force_authenticate(self.admin)
+        response = self.client.get("/api/bulk/exports/hospitals/")
+        self.assertEqual(response.status_code, 200)
+        workbook = load_workbook(BytesIO(b"".join(response.streaming_content)))
+        rows = list(workbook["Export"].iter_rows(values_only=True))
+        self.assertEqual(rows[0][:2], ("hospital_code", "hospital_name"))
+        self.assertEqual(rows[1][:2], ("AH", "Allied Hospital"))
+
+    def test_department_export_query_count_is_constant(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from sims.bulk.services import BulkService
+
+        def export_query_count():
+            with CaptureQueriesContext(connection) as queries:
+                export_file = BulkService(self.admin).export_dataset("departments", "csv")
+                body = b"".join(export_file.iter_bytes()).decode("utf-8")
+            return len(queries), body
+
+        hospital = Hospital.objects.create(name="Allied Hospital", code="AH", is_active=True)
+        first = Department.objects.create(name="Medicine", code="MED")
+        HospitalDepartment.objects.create(hospital=hospital, department=first, is_active=True)
+        baseline, body = export_query_count()
+        self.assertIn("MED,Medicine,,true", body)
+
+        for index in range(5):
+            department = Department.objects.create(name=f"Dept {index}", code=f"D{index}")
+            HospitalDepartment.objects.create(hospital=hospital, department=department, is_active=True)
+        count, body = export_query_count()
+        self.assertEqual(count, baseline)
+        self.assertIn("D4,Dept 4,,true", body)
+
+    def test_async_export_hands_back_download_link(self):
+        Hospital.objects.create(name="Allied Hospital", code="AH", is_active=True)
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get("/api/bulk/exports/hospitals/?file_format=csv&async=true")
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.data["status"], BulkOperation.STATUS_PENDING)
+
+        status_response = self.client.get(response.data["status_url"])
+        self.assertEqual(status_response.data["status"], BulkOperation.STATUS_COMPLETED)
+        self.assertEqual(status_response.data["success_count"], Hospital.objects.count())
+        download = self.client.get(status_response.data["download_url"])
+        self.assertEqual(download.status_code, 200)
+        self.assertIn('filename="hospitals_export.csv"', download["Content-Disposition"])
+        self.assertIn(b"AH,Allied Hospital", b"".join(download.streaming_content))
+        download.close()
+
+        self.client.force_authenticate(self.supervisor)
+        self.assertEqual(self.client.get(status_response.data["download_url"]).status_code, 404)
+
+    def test_async_export_rejects_unknown_resource(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get("/api/bulk/exports/unknown/?async=true")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(BulkOperation.objects.filter(operation=BulkOperation.OP_EXPORT).exists())
+
     def test_bulk_import_faculty_supervisors_creates_profiles_and_memberships(self):
         hospital = Hospital.objects.create(name="Allied Hospital", code="AH", is_active=True)
         department = Department.objects.create(name="Internal Medicine", code="MED")
@@ -291,6 +361,70 @@ class ActiveUserbaseBulkEngineTests(TestCase):
             ).exists()
         )
 
+    @override_settings(BULK_IMPORT_CHUNK_SIZE=2)
+    def test_async_import_runs_in_background_with_progress(self):
+        self.client.force_authenticate(self.admin)
+        content = (
+            "hospital_code,hospital_name,address,phone,email,active\n"
+            "AH,Allied Hospital,,,,true\n"
+            "MH,,,,,true\n"
+            "CH,City Hospital,,,,true\n"
+        )
+        progress_calls = []
+        record_progress = BulkOperation.record_progress
+
+        def spy(operation, processed, total, success_count, failures):
+            progress_calls.append((processed, total, success_count, len(failures)))
+            record_progress(operation, processed, total, success_count, failures)
+
+        with mock.patch.object(BulkOperation, "record_progress", spy):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    "/api/bulk/import/hospitals/apply/",
+                    {"file": self._upload("hospitals.csv", content), "async": "true"},
+                    format="multipart",
+                )
+                self.assertEqual(response.status_code, 202)
+                self.assertEqual(response.data["status"], BulkOperation.STATUS_PENDING)
+                staged_path = BulkOperation.objects.get(pk=response.data["id"]).options["staged_path"]
+                self.assertTrue(os.path.exists(staged_path))
+
+        self.assertEqual(progress_calls, [(2, 3, 1, 1), (3, 3, 2, 1)])
+        self.assertFalse(os.path.exists(staged_path))
+        status_response = self.client.get(response.data["status_url"])
+        self.assertEqual(status_response.status_code, 200)
+        self.assertEqual(status_response.data["status"], BulkOperation.STATUS_COMPLETED)
+        self.assertEqual(status_response.data["processed_items"], 3)
+        self.assertEqual(status_response.data["success_count"], 2)
+        self.assertEqual(status_response.data["failure_count"], 1)
+        self.assertEqual(status_response.data["details"]["failures"][0]["row"], 3)
+        self.assertTrue(Hospital.objects.filter(code="CH").exists())
+
+    def test_progress_ticks_are_plain_updates(self):
+        from django.db import connection
+        from django.db.models.signals import post_save
+        from django.test.utils import CaptureQueriesContext
+
+        operation = BulkOperation.objects.create(user=self.admin, operation=BulkOperation.OP_IMPORT)
+        saves = mock.Mock()
+        post_save.connect(saves, sender=BulkOperation)
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                operation.record_progress(2, 3, 1, [{"row": 3}])
+        finally:
+            post_save.disconnect(saves, sender=BulkOperation)
+
+        saves.assert_not_called()
+        self.assertEqual([query["sql"].split()[0] for query in queries.captured_queries], ["UPDATE"])
+        operation.refresh_from_db()
+        self.assertEqual((operation.processed_items, operation.failure_count), (2, 1))
+
+    def test_operation_status_is_scoped_to_owner(self):
+        operation = BulkOperation.objects.create(user=self.admin, operation=BulkOperation.OP_IMPORT)
+        self.client.force_authenticate(self.supervisor)
+        response = self.client.get(f"/api/bulk/operations/{operation.pk}/")
+        self.assertEqual(response.status_code, 404)
+
     def test_dry_run_reports_missing_prerequisite_without_writing(self):
         self.client.force_authenticate(self.admin)
         before_count = HospitalDepartment.objects.count()
@@ -568,3 +702,59 @@ class FlexibleColumnMappingTests(TestCase):
         response = self.client.delete(f"/api/bulk/flexible/presets/{preset_id}/")
         self.assertEqual(response.status_code, 204)
         self.assertFalse(MappingPreset.objects.filter(pk=preset_id).exists())
+
+
+class TabularReaderTests(TestCase):
+    def _workbook_upload(self, rows, name="rows.xlsx"):
+        from io import BytesIO
+
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Data"
+        for row in rows:
+            sheet.append(row)
+        buffer = BytesIO()
+        workbook.save(buffer)
+        return SimpleUploadedFile(name, buffer.getvalue())
+
+    def test_csv_rows_stream_with_normalized_headers_and_leave_upload_open(self):
+        upload = SimpleUploadedFile(
+            "rows.csv",
+            "\ufeffHospital Code,Hospital Name\n AH , Allied \n,\nMH,Mayo\n".encode("utf-8"),
+        )
+        reader = TabularReader(upload, header_key=normalized_key)
+        self.assertEqual(reader.headers, ["hospital_code", "hospital_name"])
+        rows = list(reader)
+        self.assertEqual(
+            rows,
+            [
+                {"hospital_code": "AH", "hospital_name": "Allied", "_row_number": 2},
+                {"hospital_code": "MH", "hospital_name": "Mayo", "_row_number": 4},
+            ],
+        )
+        self.assertFalse(upload.closed)
+        upload.seek(0)
+        self.assertTrue(upload.read().startswith(b"\xef\xbb\xbf"))
+
+    def test_close_tolerates_an_upload_that_was_already_closed(self):
+        upload = SimpleUploadedFile("rows.csv", b"a,b\n1,2\n")
+        with TabularReader(upload) as reader:
+            self.assertEqual(reader.headers, ["a", "b"])
+            upload.close()
+        reader.close()
+
+    def test_workbook_is_read_through_column_mapping(self):
+        upload = self._workbook_upload([["Name", "Mail", "Ignored"], ["Dr. Ali", "ali@example.com", "x"], [None, None, None]])
+        mapped = MappedUpload(upload, {"full_name": "Name", "email": "Mail"}, fields=["full_name", "email", "year"])
+        reader = TabularReader(mapped)
+        self.assertEqual(reader.sheet_names, ["Data"])
+        self.assertEqual(reader.headers, ["full_name", "email", "year"])
+        self.assertEqual(list(reader), [{"full_name": "Dr. Ali", "email": "ali@example.com", "year": "", "_row_number": 2}])
+
+    def test_unsupported_extension_is_rejected(self):
+        from django.core.exceptions import ValidationError
+
+        with self.assertRaises(ValidationError):
+            TabularReader(SimpleUploadedFile("rows.txt", b"a,b\n"))
@@ -13,6 +13,8 @@ from sims.bulk.views import (
     BulkSupervisorImportView,
     BulkTraineeImportView,
     BulkImportEntityView,
+    BulkOperationStatusView,
+    BulkOperationDownloadView,
     FlexibleSchemasView,
     FlexibleDetectHeadersView,
     FlexibleValidateMappingView,
@@ -35,6 +37,8 @@ urlpatterns = [
     path("templates/<str:resource>/", BulkTemplateView.as_view(), name="templates"),
     # New unified import endpoint
     path("import/<str:entity>/<str:action>/", BulkImportEntityView.as_view(), name="import_entity"),
+    path("operations/<int:pk>/", BulkOperationStatusView.as_view(), name="operation_status"),
+    path("operations/<int:pk>/download/", BulkOperationDownloadView.as_view(), name="operation_download"),
     # Flexible mapping import endpoints
     path("flexible/schemas/", FlexibleSchemasView.as_view(), name="flexible_schemas"),
     path("flexible/detect-headers/", FlexibleDetectHeadersView.as_view(), name="flexible_detect_headers"),
@@ -2,20 +2,22 @@
 
 from __future__ import annotations
 
-import csv
-import io
+import copy
 import re
 import secrets
 import string
 from datetime import date, datetime
-from typing import Iterable, List, Tuple
+from typing import Callable, Iterable, Iterator, List, Tuple
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from openpyxl import load_workbook
+from django.db.models import Prefetch, Q
+from django.db.models.functions import Lower
 
 from sims.academics.models import Department
+from sims.audit.writer import buffered_activity_log
+from sims.bulk.tabular import TabularReader, normalized_key
 from sims.rotations.models import Hospital, HospitalDepartment
 from sims.users.models import (
     DepartmentMembership,
@@ -30,6 +32,11 @@ from sims.users.models import (
 
 User = get_user_model()
 
+# Rows handed to an entity handler (and covered by one lookup context) at a time.
+IMPORT_CHUNK_SIZE = 500
+# Rows fetched per database round trip when streaming an export.
+EXPORT_CHUNK_SIZE = 2000
+
 SUPPORTED_IMPORT_ENTITIES = {
     "hospitals",
     "departments",
@@ -130,51 +137,17 @@ TEMPLATE_ROWS = {
 }
 
 
-def parse_tabular_rows(uploaded_file) -> List[dict]:
-    name = getattr(uploaded_file, "name", "uploaded")
-    content = uploaded_file.read()
-    stream = io.BytesIO(content) if isinstance(content, bytes) else io.StringIO(content)
-    stream.seek(0)
-
-    if name.endswith(".csv"):
-        text_stream = io.TextIOWrapper(stream, encoding="utf-8") if isinstance(stream, io.BytesIO) else stream
-        reader = csv.DictReader(text_stream)
-        headers = [_normalize_header(header or "") for header in (reader.fieldnames or [])]
-        reader.fieldnames = headers
-        return [
-            {
-                **{
-                    _normalize_header(key or ""): (value.strip() if isinstance(value, str) else str(value or "").strip())
-                    for key, value in row.items()
-                    if key
-                },
-                "_row_number": index,
-            }
-            for index, row in enumerate(reader, start=2)
-            if any((value or "").strip() for value in row.values())
-        ]
-
-    if name.endswith((".xlsx", ".xls")):
-        workbook = load_workbook(stream)
-        sheet = workbook.active
-        headers = [
-            _normalize_header(str(cell.value)) if cell.value is not None else f"col_{index}"
-            for index, cell in enumerate(next(sheet.iter_rows(max_row=1)))
-        ]
-        rows: List[dict] = []
-        for index, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-            if not any(row):
-                continue
-            payload = {
-                headers[idx]: (str(value).strip() if value is not None else "")
-                for idx, value in enumerate(row)
-                if idx < len(headers)
-            }
-            payload["_row_number"] = index
-            rows.append(payload)
-        return rows
+def iter_tabular_rows(uploaded_file) -> TabularReader:
+    """Stream normalized, non-blank rows (with ``_row_number``) from a CSV or Excel upload."""
+    return TabularReader(
+        uploaded_file,
+        header_key=normalized_key,
+        unsupported_message="Unsupported file format. Upload CSV or Excel.",
+    )
 
-    raise ValidationError("Unsupported file format. Upload CSV or Excel.")
+
+def parse_tabular_rows(uploaded_file) -> List[dict]:
+    return list(iter_tabular_rows(uploaded_file))
 
 
 def template_rows_for(resource: str) -> List[dict]:
@@ -183,9 +156,17 @@ def template_rows_for(resource: str) -> List[dict]:
     return TEMPLATE_ROWS[resource]
 
 
-def export_rows_for(resource: str) -> List[dict]:
+def export_rows_for(resource: str) -> Iterator[dict]:
+    """
+    Lazily yield export rows for ``resource``.
+
+    Querysets are walked with ``.iterator(chunk_size=EXPORT_CHUNK_SIZE)`` and
+    per-user memberships/assignments are prefetched per chunk, so exporting a
+    whole table runs in a fixed number of queries per chunk and flat memory.
+    Unknown resources raise immediately, before any row is read.
+    """
     if resource == "hospitals":
-        return [
+        return (
             {
                 "hospital_code": hospital.code or "",
                 "hospital_name": hospital.name,
@@ -194,22 +175,22 @@ def export_rows_for(resource: str) -> List[dict]:
                 "email": hospital.email or "",
                 "active": _bool_str(hospital.is_active),
             }
-            for hospital in Hospital.objects.all().order_by("name")
-        ]
+            for hospital in Hospital.objects.all().order_by("name").iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
 
     if resource == "departments":
-        return [
+        return (
             {
                 "department_code": department.code,
                 "department_name": department.name,
                 "description": department.description or "",
                 "active": _bool_str(department.active),
             }
-            for department in Department.objects.all().order_by("name")
-        ]
+            for department in Department.objects.all().order_by("name").iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
 
     if resource == "matrix":
-        return [
+        return (
             {
                 "hospital_code": item.hospital.code or "",
                 "department_code": item.department.code,
@@ -218,67 +199,18 @@ def export_rows_for(resource: str) -> List[dict]:
             for item in HospitalDepartment.objects.select_related("hospital", "department").order_by(
                 "hospital__name",
                 "department__name",
-            )
-        ]
+            ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
 
     if resource == "faculty-supervisors":
-        rows: List[dict] = []
-        staff_users = User.objects.filter(role__in=["SUPERVISOR", "SUPERVISOR"]).order_by("last_name", "first_name")
-        for user in staff_users:
-            membership = _primary_membership_for(user, {"SUPERVISOR", "SUPERVISOR"})
-            assignment = _active_assignment_for(user, HospitalAssignment.ASSIGNMENT_FACULTY_SITE)
-            profile = getattr(user, "staff_profile", None)
-            rows.append(
-                {
-                    "email": user.email,
-                    "full_name": user.get_full_name(),
-                    "phone_number": user.phone_number or "",
-                    "role": user.role,
-                    "specialty": user.specialty or "",
-                    "department_code": membership.department.code if membership else "",
-                    "hospital_code": assignment.hospital_department.hospital.code if assignment else "",
-                    "designation": profile.designation if profile else "",
-                    "registration_number": user.registration_number or "",
-                    "username": user.username,
-                    "password": "",
-                    "active": _bool_str(user.is_active),
-                    "start_date": membership.start_date.isoformat() if membership else "",
-                }
-            )
-        return rows
+        return _export_faculty_rows()
 
     if resource == "residents":
-        rows: List[dict] = []
-        resident_users = User.objects.filter(role__in=["RESIDENT", "RESIDENT"]).order_by("last_name", "first_name")
-        for user in resident_users:
-            membership = _primary_membership_for(user, {"RESIDENT"})
-            assignment = _active_assignment_for(user, HospitalAssignment.ASSIGNMENT_PRIMARY_TRAINING)
-            profile = getattr(user, "resident_profile", None)
-            rows.append(
-                {
-                    "email": user.email,
-                    "full_name": user.get_full_name(),
-                    "phone_number": user.phone_number or "",
-                    "role": user.role,
-                    "specialty": user.specialty or "",
-                    "year": user.year or "",
-                    "pgr_id": profile.pgr_id if profile else "",
-                    "training_start": profile.training_start.isoformat() if profile else "",
-                    "training_end": profile.training_end.isoformat() if profile and profile.training_end else "",
-                    "training_level": profile.training_level if profile else "",
-                    "department_code": membership.department.code if membership else "",
-                    "hospital_code": assignment.hospital_department.hospital.code if assignment else "",
-                    "supervisor_email": user.supervisor.email if user.supervisor else "",
-                    "username": user.username,
-                    "password": "",
-                    "active": _bool_str(user.is_active),
-                }
-            )
-        return rows
+        return _export_resident_rows()
 
     if resource == "supervision-links":
         from sims.supervision.models import ResidentSupervisorAssignment
-        return [
+        return (
             {
                 "supervisor_email": link.supervisor.user.email,
                 "resident_email": link.resident.user.email,
@@ -291,14 +223,12 @@ def export_rows_for(resource: str) -> List[dict]:
                 "supervisor__user",
                 "resident__user",
                 "resident__department_ref",
-            ).order_by("resident__user__last_name", "resident__user__first_name")
-        ]
-
-
+            ).order_by("resident__user__last_name", "resident__user__first_name").iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
 
     if resource == "rotation-assignments":
         from sims.training.models import RotationAssignment
-        return [
+        return (
             {
                 "resident_email": item.resident_training.resident_user.email,
                 "hospital_code": item.hospital_department.hospital.code,
@@ -312,18 +242,128 @@ def export_rows_for(resource: str) -> List[dict]:
                 "resident_training__resident_user",
                 "hospital_department__hospital",
                 "hospital_department__department"
-            ).all().order_by("-start_date")
-        ]
+            ).all().order_by("-start_date").iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
 
     raise ValidationError(f"Unsupported export resource '{resource}'.")
 
 
-def import_entity(actor: User, entity: str, uploaded_file, *, dry_run: bool, allow_partial: bool) -> dict:
+def _primary_membership_prefetch(member_types: set[str]) -> Prefetch:
+    return Prefetch(
+        "department_memberships",
+        queryset=DepartmentMembership.objects.filter(active=True, is_primary=True, member_type__in=member_types)
+        .select_related("department")
+        .order_by("-start_date"),
+        to_attr="export_memberships",
+    )
+
+
+def _active_assignment_prefetch(assignment_type: str) -> Prefetch:
+    return Prefetch(
+        "hospital_assignments",
+        queryset=HospitalAssignment.objects.filter(active=True, assignment_type=assignment_type)
+        .select_related("hospital_department__hospital")
+        .order_by("-start_date"),
+        to_attr="export_assignments",
+    )
+
+
+def _export_faculty_rows() -> Iterator[dict]:
+    staff_users = (
+        User.objects.filter(role__in=["SUPERVISOR", "SUPERVISOR"])
+        .select_related("supervisor_profile")
+        .prefetch_related(
+            _primary_membership_prefetch({"SUPERVISOR", "SUPERVISOR"}),
+            _active_assignment_prefetch(HospitalAssignment.ASSIGNMENT_FACULTY_SITE),
+        )
+        .order_by("last_name", "first_name")
+    )
+    for user in staff_users.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        membership = user.export_memberships[0] if user.export_memberships else None
+        assignment = user.export_assignments[0] if user.export_assignments else None
+        profile = getattr(user, "supervisor_profile", None)
+        yield {
+            "email": user.email,
+            "full_name": user.get_full_name(),
+            "phone_number": user.phone_number or "",
+            "role": user.role,
+            "specialty": user.specialty or "",
+            "department_code": membership.department.code if membership else "",
+            "hospital_code": assignment.hospital_department.hospital.code if assignment else "",
+            "designation": (profile.designation_ref or "") if profile else "",
+            "registration_number": user.registration_number or "",
+            "username": user.username,
+            "password": "",
+            "active": _bool_str(user.is_active),
+            "start_date": membership.start_date.isoformat() if membership else "",
+        }
+
+
+def _export_resident_rows() -> Iterator[dict]:
+    from sims.training.models import ResidentTrainingRecord
+
+    resident_users = (
+        User.objects.filter(role__in=["RESIDENT", "RESIDENT"])
+        .select_related("supervisor", "resident_profile")
+        .prefetch_related(
+            _primary_membership_prefetch({"RESIDENT"}),
+            _active_assignment_prefetch(HospitalAssignment.ASSIGNMENT_PRIMARY_TRAINING),
+            Prefetch(
+                "training_records",
+                queryset=ResidentTrainingRecord.objects.filter(active=True).order_by("-start_date"),
+                to_attr="export_training_records",
+            ),
+        )
+        .order_by("last_name", "first_name")
+    )
+    for user in resident_users.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        membership = user.export_memberships[0] if user.export_memberships else None
+        assignment = user.export_assignments[0] if user.export_assignments else None
+        record = user.export_training_records[0] if user.export_training_records else None
+        profile = getattr(user, "resident_profile", None)
+        yield {
+            "email": user.email,
+            "full_name": user.get_full_name(),
+            "phone_number": user.phone_number or "",
+            "role": user.role,
+            "specialty": user.specialty or "",
+            "year": user.year or "",
+            "pgr_id": (profile.registration_no or "") if profile else "",
+            "training_start": record.start_date.isoformat() if record else "",
+            "training_end": record.expected_end_date.isoformat() if record and record.expected_end_date else "",
+            "training_level": (record.current_level or "") if record else "",
+            "department_code": membership.department.code if membership else "",
+            "hospital_code": assignment.hospital_department.hospital.code if assignment else "",
+            "supervisor_email": user.supervisor.email if user.supervisor else "",
+            "username": user.username,
+            "password": "",
+            "active": _bool_str(user.is_active),
+        }
+
+
+def import_entity(
+    actor: User,
+    entity: str,
+    uploaded_file,
+    *,
+    dry_run: bool,
+    allow_partial: bool,
+    chunk_size: int | None = None,
+    progress: Callable[[int, int, List[dict], List[dict]], None] | None = None,
+) -> dict:
+    """
+    Import ``uploaded_file`` rows for ``entity``.
+
+    Rows are streamed from the upload and handed to the entity handler in
+    ``chunk_size`` batches; with ``progress`` set, ``progress(processed, total,
+    successes, failures)`` is called after each one (``total`` is an estimate
+    until the file is exhausted). Handlers commit per row, so batching does not
+    change the outcome; without ``allow_partial`` the import still stops at the
+    first failing batch. Activity log entries are buffered and bulk-inserted.
+    """
     if entity not in SUPPORTED_IMPORT_ENTITIES:
         raise ValidationError(f"Unsupported import entity '{entity}'.")
-    rows = parse_tabular_rows(uploaded_file)
-    if not rows:
-        raise ValidationError("No data rows found in file.")
+    rows = iter_tabular_rows(uploaded_file)
 
     handlers = {
         "hospitals": _import_hospitals,
@@ -334,10 +374,306 @@ def import_entity(actor: User, entity: str, uploaded_file, *, dry_run: bool, all
         "supervision-links": _import_supervision_links,
         "rotation-assignments": _import_rotation_assignments,
     }
-    return handlers[entity](actor, rows, dry_run=dry_run, allow_partial=allow_partial)
+    handler = handlers[entity]
+    chunk_size = max(chunk_size or IMPORT_CHUNK_SIZE, 1)
+    context: _ImportContext | None = None
+    successes: List[dict] = []
+    failures: List[dict] = []
+    processed = 0
+    with buffered_activity_log(asynchronous=False):
+        for chunk in _chunked_rows(rows, chunk_size):
+            if context is None:
+                context = _ImportContext(chunk)
+            else:
+                context.load(chunk)
+            result = handler(actor, chunk, dry_run=dry_run, allow_partial=allow_partial, context=context)
+            successes.extend(result["successes"])
+            failures.extend(result["failures"])
+            processed += len(chunk)
+            if progress is not None:
+                progress(processed, max(rows.estimated_total or 0, processed), successes, failures)
+            if result["failures"] and not allow_partial:
+                break
+    if not processed:
+        raise ValidationError("No data rows found in file.")
+    return {"successes": successes, "failures": failures}
+
+
+def _chunked_rows(rows: Iterable[dict], chunk_size: int) -> Iterator[List[dict]]:
+    chunk: List[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _ImportContext:
+    """
+    Lookup cache shared by every row of one import batch.
+
+    Each referenced table is loaded once per batch, with ``__in`` queries over
+    the codes and emails that appear anywhere in the batch, the first time a
+    handler asks for it. Users written by the import are fed back in via
+    ``remember_user`` so later rows see them exactly as a fresh query would.
+    Generated usernames stay reserved across batches.
+    """
+
+    # Keep OR-ed prefix scans well inside SQLite's expression-depth limit.
+    _PREFIX_SCAN_BATCH = 200
+
+    def __init__(self, rows: List[dict]):
+        self._taken_usernames: set = set()
+        self._scanned_bases: set = set()
+        self._baseline_program = None
+        self.load(rows)
+
+    def load(self, rows: List[dict]) -> None:
+        """Point the context at the next batch, dropping the previous batch's lookups."""
+        self.rows = rows
+        self._departments: dict | None = None
+        self._hospitals: dict | None = None
+        self._hospital_departments: dict | None = None
+        self._users_by_email: dict | None = None
+        self._users_by_username: dict | None = None
+        self._user_keys: dict = {}
+        self._usernames_scanned = False
+        self._training_records: dict | None = None
+        self._active_matrix_links: dict | None = None
+        self._rotation_windows: dict | None = None
+
+    def _column_values(self, *fields: str, upper: bool = False, lower: bool = False) -> set:
+        values = set()
+        for row in self.rows:
+            for field in fields:
+                value = (row.get(field) or "").strip()
+                if value:
+                    values.add(value.upper() if upper else value.lower() if lower else value)
+        return values
+
+    # -- departments / hospitals -------------------------------------------------
+
+    @property
+    def departments(self) -> dict:
+        if self._departments is None:
+            codes = self._column_values("department_code", upper=True)
+            self._departments = {dept.code: dept for dept in Department.objects.filter(code__in=codes)}
+        return self._departments
+
+    @property
+    def hospitals(self) -> dict:
+        if self._hospitals is None:
+            codes = self._column_values("hospital_code", upper=True)
+            self._hospitals = {hospital.code: hospital for hospital in Hospital.objects.filter(code__in=codes)}
+        return self._hospitals
+
+    @property
+    def hospital_departments(self) -> dict:
+        if self._hospital_departments is None:
+            self._hospital_departments = {}
+            queryset = HospitalDepartment.objects.filter(
+                hospital__in=self.hospitals.values(),
+                department__in=self.departments.values(),
+            ).select_related("hospital", "department")
+            for item in queryset:
+                self._hospital_departments.setdefault((item.hospital_id, item.department_id), item)
+        return self._hospital_departments
+
+    def department(self, code: str) -> Department:
+        department = self.departments.get(code)
+        if not department:
+            raise ValidationError({"department_code": f"Department '{code}' not found."})
+        return department
+
+    def department_or_none(self, raw_code: str | None) -> Department | None:
+        code = (raw_code or "").strip().upper()
+        if not code:
+            return None
+        return self.department(code)
+
+    def hospital_department(self, *, hospital_code: str | None, department: Department | None) -> HospitalDepartment | None:
+        code = (hospital_code or "").strip().upper()
+        if not code:
+            return None
+        if not department:
+            raise ValidationError({"hospital_code": "hospital_code requires department_code so the active matrix site can be resolved."})
+        hospital = self.hospitals.get(code)
+        if not hospital:
+            raise ValidationError({"hospital_code": f"Hospital '{code}' not found."})
+        hospital_department = self.hospital_departments.get((hospital.pk, department.pk))
+        if not hospital_department:
+            raise ValidationError({"hospital_code": f"Hospital '{code}' is not linked to department '{department.code}' in the matrix."})
+        return hospital_department
+
+    # -- users -------------------------------------------------------------------
+
+    def _load_users(self) -> None:
+        self._users_by_email = {}
+        self._users_by_username = {}
+        emails = self._column_values("email", "supervisor_email", "resident_email", lower=True)
+        usernames = self._column_values("username")
+        queryset = (
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(Q(email_lower__in=emails) | Q(username__in=usernames))
+            .select_related("resident_profile", "supervisor_profile")
+            .order_by(*(User._meta.ordering or []), "pk")
+        )
+        for user in queryset:
+            self._index_user(user)
+
+    def _index_user(self, user: User) -> None:
+        email_key = (user.email or "").lower()
+        if email_key:
+            self._users_by_email.setdefault(email_key, user)
+        self._users_by_username[user.username] = user
+        self._user_keys[user.pk] = (user.username, email_key)
+
+    def remember_user(self, user: User) -> None:
+        """Re-index a user the import just created or updated."""
+        if self._users_by_email is None:
+            self._load_users()
+        old_username, old_email = self._user_keys.get(user.pk, (None, None))
+        if old_username and self._users_by_username.get(old_username) is user:
+            del self._users_by_username[old_username]
+        if old_email and self._users_by_email.get(old_email) is user:
+            del self._users_by_email[old_email]
+        self._index_user(user)
+        self._taken_usernames.add(user.username)
+
+    def user_by_email(self, email: str) -> User | None:
+        if self._users_by_email is None:
+            self._load_users()
+        return self._users_by_email.get(email.lower())
+
+    def user_by_username(self, username: str) -> User | None:
+        if self._users_by_username is None:
+            self._load_users()
+        return self._users_by_username.get(username)
+
+    def build_or_load_user(self, *, email: str, username: str) -> User | None:
+        """Return a private copy so a failed or dry-run row cannot leak edits into the cache."""
+        user = self.user_by_username(username) if username else None
+        if user is None and email:
+            user = self.user_by_email(email)
+        return copy.copy(user) if user is not None else None
+
+    def assert_username_available(self, user: User | None, username: str) -> None:
+        owner = self.user_by_username(username)
+        if owner is not None and (user is None or owner.pk != user.pk):
+            raise ValidationError({"username": f"Username '{username}' is already in use."})
+
+    def resolve_user_by_email(self, email: str, field: str, allowed_roles: set[str]) -> User:
+        user = self.user_by_email(email)
+        if not user:
+            raise ValidationError({field: f"User '{email}' not found."})
+        if user.role not in allowed_roles:
+            raise ValidationError({field: f"User '{email}' must have one of: {', '.join(sorted(allowed_roles))}."})
+        return user
+
+    def required_user_by_email(self, row: dict, field: str, allowed_roles: set[str]) -> User:
+        return self.resolve_user_by_email(_require_text(row, field), field, allowed_roles)
+
+    def user_by_email_or_none(self, raw_email: str | None, allowed_roles: set[str]) -> User | None:
+        email = (raw_email or "").strip().lower()
+        if not email:
+            return None
+        return self.resolve_user_by_email(email, "email", allowed_roles)
+
+    def generate_username(self, first_name: str, last_name: str) -> str:
+        """Like ``_generate_username`` but reserves the result for the rest of the import."""
+        if not self._usernames_scanned:
+            self._taken_usernames.update(self._scan_taken_usernames())
+            self._usernames_scanned = True
+        base = _username_base(first_name, last_name)
+        candidate = base
+        counter = 1
+        while candidate in self._taken_usernames:
+            counter += 1
+            candidate = f"{base}{counter}"
+        self._taken_usernames.add(candidate)
+        return candidate
+
+    def _scan_taken_usernames(self) -> set:
+        bases = set()
+        for row in self.rows:
+            if (row.get("username") or "").strip():
+                continue
+            try:
+                bases.add(_username_base(*_parse_person_name(row)))
+            except ValidationError:
+                continue
+        taken: set = set()
+        ordered = sorted(bases - self._scanned_bases)
+        self._scanned_bases.update(ordered)
+        for start in range(0, len(ordered), self._PREFIX_SCAN_BATCH):
+            prefix_filter = Q()
+            for base in ordered[start:start + self._PREFIX_SCAN_BATCH]:
+                prefix_filter |= Q(username__startswith=base)
+            taken.update(User.objects.filter(prefix_filter).values_list("username", flat=True))
+        return taken
+
+    # -- training ------------------------------------------------------------------
+
+    @property
+    def training_records_by_email(self) -> dict:
+        if self._training_records is None:
+            from sims.training.models import ResidentTrainingRecord
+
+            self._training_records = {}
+            emails = self._column_values("resident_email")
+            for record in ResidentTrainingRecord.objects.filter(resident_user__email__in=emails, active=True).select_related("resident_user"):
+                self._training_records.setdefault(record.resident_user.email, record)
+        return self._training_records
+
+    @property
+    def active_matrix_links(self) -> dict:
+        if self._active_matrix_links is None:
+            self._active_matrix_links = {}
+            queryset = HospitalDepartment.objects.filter(
+                hospital__code__in=self._column_values("hospital_code", upper=True),
+                department__code__in=self._column_values("department_code", upper=True),
+                is_active=True,
+            ).select_related("hospital", "department")
+            for item in queryset:
+                self._active_matrix_links.setdefault((item.hospital.code, item.department.code), item)
+        return self._active_matrix_links
+
+    def rotation_windows(self, overlap_statuses: set[str]) -> dict:
+        """Blocking rotation windows per training record, keyed by record id."""
+        if self._rotation_windows is None:
+            from sims.training.models import RotationAssignment
+
+            self._rotation_windows = {}
+            record_ids = [record.pk for record in self.training_records_by_email.values()]
+            windows = RotationAssignment.objects.filter(
+                resident_training_id__in=record_ids,
+                status__in=overlap_statuses,
+            ).values_list("resident_training_id", "start_date", "end_date")
+            for record_id, start, end in windows:
+                self._rotation_windows.setdefault(record_id, []).append((start, end))
+        return self._rotation_windows
+
+    def baseline_program(self):
+        if self._baseline_program is None:
+            from sims.training.models import TrainingProgram
+
+            self._baseline_program, _ = TrainingProgram.objects.get_or_create(
+                code="PILOT-BASELINE",
+                defaults={"name": "Pilot Baseline Program", "duration_months": 60},
+            )
+        return self._baseline_program
 
 
-def _import_hospitals(actor: User, rows: List[dict], *, dry_run: bool, allow_partial: bool) -> dict:
+def _import_hospitals(
+    actor: User,
+    rows: List[dict],
+    *,
+    dry_run: bool,
+    allow_partial: bool,
+    context: _ImportContext | None = None,
+) -> dict:
     successes: List[dict] = []
     failures: List[dict] = []
     for row in rows:
@@ -369,7 +705,14 @@ def _import_hospitals(actor: User, rows: List[dict], *, dry_run: bool, allow_par
     return {"successes": successes, "failures": failures}
 
 
-def _import_departments(actor: User, rows: List[dict], *, dry_run: bool, allow_partial: bool) -> dict:
+def _import_departments(
+    actor: User,
+    rows: List[dict],
+    *,
+    dry_run: bool,
+    allow_partial: bool,
+    context: _ImportContext | None = None,
+) -> dict:
     successes: List[dict] = []
     failures: List[dict] = []
     for row in rows:
@@ -404,7 +747,15 @@ def _import_departments(actor: User, rows: List[dict], *, dry_run: bool, allow_p
     return {"successes": successes, "failures": failures}
 
 
-def _import_matrix(actor: User, rows: List[dict], *, dry_run: bool, allow_partial: bool) -> dict:
+def _import_matrix(
+    actor: User,
+    rows: List[dict],
+    *,
+    dry_run: bool,
+    allow_partial: bool,
+    context: _ImportContext | None = None,
+) -> dict:
+    context = context or _ImportContext(rows)
     successes: List[dict] = []
     failures: List[dict] = []
     for row in rows:
@@ -416,8 +767,8 @@ def _import_matrix(actor: User, rows: List[dict], *, dry_run: bool, allow_partia
             if not allow_partial:
                 break
             continue
-        hospital = Hospital.objects.filter(code=hospital_code).first()
-        department = Department.objects.filter(code=department_code).first()
+        hospital = context.hospitals.get(hospital_code)
+        department = context.departments.get(department_code)
         if not hospital or not department:
             missing = []
             if not hospital:
@@ -438,7 +789,15 @@ def _import_matrix(actor: User, rows: List[dict], *, dry_run: bool, allow_partia
     return {"successes": successes, "failures": failures}
 
 
-def _import_faculty_supervisors(actor: User, rows: List[dict], *, dry_run: bool, allow_partial: bool) -> dict:
+def _import_faculty_supervisors(
+    actor: User,
+    rows: List[dict],
+    *,
+    dry_run: bool,
+    allow_partial: bool,
+    context: _ImportContext | None = None,
+) -> dict:
+    context = context or _ImportContext(rows)
     successes: List[dict] = []
     failures: List[dict] = []
     for row in rows:
@@ -448,18 +807,18 @@ def _import_faculty_supervisors(actor: User, rows: List[dict], *, dry_run: bool,
             specialty = _normalize_specialty(row.get("specialty"))
             first_name, last_name = _parse_person_name(row)
             email = _require_text(row, "email")
-            username = (row.get("username") or _generate_username(first_name, last_name)).strip()
+            username = (row.get("username") or context.generate_username(first_name, last_name)).strip()
             active = _parse_bool(row.get("active"), default=True)
             start_date = _parse_date_value(row.get("start_date")) or date.today()
-            department = _department_or_none(row.get("department_code"))
-            hospital_department = _resolve_hospital_department(
+            department = context.department_or_none(row.get("department_code"))
+            hospital_department = context.hospital_department(
                 hospital_code=row.get("hospital_code"),
                 department=department,
             )
 
             with transaction.atomic():
-                user = _build_or_load_user(email=email, username=username)
-                _assert_username_available(user, username)
+                user = context.build_or_load_user(email=email, username=username)
+                context.assert_username_available(user, username)
                 if dry_run:
                     candidate = user or User(username=username)
                     candidate.email = email
@@ -515,6 +874,8 @@ def _import_faculty_supervisors(actor: User, rows: List[dict], *, dry_run: bool,
                 if not dry_run and generated_password:
                     success["temporary_password"] = generated_password
                 successes.append(success)
+            if not dry_run:
+                context.remember_user(user)
         except ValidationError as exc:
             failures.append({"row": row_number, "error": _error_text(exc)})
             if not allow_partial:
@@ -522,7 +883,15 @@ def _import_faculty_supervisors(actor: User, rows: List[dict], *, dry_run: bool,
     return {"successes": successes, "failures": failures}
 
 
-def _import_residents(actor: User, rows: List[dict], *, dry_run: bool, allow_partial: bool) -> dict:
+def _import_residents(
+    actor: User,
+    rows: List[dict],
+    *,
+    dry_run: bool,
+    allow_partial: bool,
+    context: _ImportContext | None = None,
+) -> dict:
+    context = context or _ImportContext(rows)
     successes: List[dict] = []
     failures: List[dict] = []
     for row in rows:
@@ -535,18 +904,18 @@ def _import_residents(actor: User, rows: List[dict], *, dry_run: bool, allow_par
             training_end = _parse_date_value(row.get("training_end"))
             first_name, last_name = _parse_person_name(row)
             email = _require_text(row, "email")
-            username = (row.get("username") or _generate_username(first_name, last_name)).strip()
+            username = (row.get("username") or context.generate_username(first_name, last_name)).strip()
             active = _parse_bool(row.get("active"), default=True)
-            department = _department_or_none(row.get("department_code"))
-            hospital_department = _resolve_hospital_department(
+            department = context.department_or_none(row.get("department_code"))
+            hospital_department = context.hospital_department(
                 hospital_code=row.get("hospital_code"),
                 department=department,
             )
-            supervisor = _user_by_email_or_none(row.get("supervisor_email"), {"SUPERVISOR", "SUPERVISOR"})
+            supervisor = context.user_by_email_or_none(row.get("supervisor_email"), {"SUPERVISOR", "SUPERVISOR"})
 
             with transaction.atomic():
-                user = _build_or_load_user(email=email, username=username)
-                _assert_username_available(user, username)
+                user = context.build_or_load_user(email=email, username=username)
+                context.assert_username_available(user, username)
                 if dry_run:
                     candidate = user or User(username=username)
                     candidate.email = email
@@ -584,6 +953,7 @@ def _import_residents(actor: User, rows: List[dict], *, dry_run: bool, allow_par
                         supervisor=supervisor,
                         password=(row.get("password") or "").strip(),
                         active=active,
+                        program=context.baseline_program(),
                     )
                     if department:
                         _sync_primary_membership(
@@ -613,6 +983,8 @@ def _import_residents(actor: User, rows: List[dict], *, dry_run: bool, allow_par
                 if not dry_run and generated_password:
                     success["temporary_password"] = generated_password
                 successes.append(success)
+            if not dry_run:
+                context.remember_user(user)
         except ValidationError as exc:
             failures.append({"row": row_number, "error": _error_text(exc)})
             if not allow_partial:
@@ -620,7 +992,15 @@ def _import_residents(actor: User, rows: List[dict], *, dry_run: bool, allow_par
     return {"successes": successes, "failures": failures}
 
 
-def _import_supervision_links(actor: User, rows: List[dict], *, dry_run: bool, allow_partial: bool) -> dict:
+def _import_supervision_links(
+    actor: User,
+    rows: List[dict],
+    *,
+    dry_run: bool,
+    allow_partial: bool,
+    context: _ImportContext | None = None,
+) -> dict:
+    context = context or _ImportContext(rows)
     from sims.supervision.models import ResidentSupervisorAssignment
     from sims.supervision.services import create_supervisor_assignment
     successes: List[dict] = []
@@ -628,9 +1008,9 @@ def _import_supervision_links(actor: User, rows: List[dict], *, dry_run: bool, a
     for row in rows:
         row_number = row["_row_number"]
         try:
-            supervisor = _required_user_by_email(row, "supervisor_email", {"SUPERVISOR", "SUPERVISOR"})
-            resident = _required_user_by_email(row, "resident_email", {"RESIDENT", "RESIDENT"})
-            department = _department_or_none(row.get("department_code"))
+            supervisor = context.required_user_by_email(row, "supervisor_email", {"SUPERVISOR", "SUPERVISOR"})
+            resident = context.required_user_by_email(row, "resident_email", {"RESIDENT", "RESIDENT"})
+            department = context.department_or_none(row.get("department_code"))
             start_date = _parse_required_date(row, "start_date") if row.get("start_date") else date.today()
             end_date = _parse_date_value(row.get("end_date"))
             active = _parse_bool(row.get("active"), default=True)
@@ -667,9 +1047,6 @@ def _import_supervision_links(actor: User, rows: List[dict], *, dry_run: bool, a
     return {"successes": successes, "failures": failures}
 
 
-
-
-
 def _upsert_staff_user(
     *,
     actor: User,
@@ -761,6 +1138,7 @@ def _upsert_resident_user(
     supervisor: User | None,
     password: str,
     active: bool,
+    program=None,
 ) -> Tuple[User, str | None]:
     generated_password = None
     user = existing or User(username=username)
@@ -803,10 +1181,11 @@ def _upsert_resident_user(
     try:
         from sims.training.models import ResidentTrainingRecord, TrainingProgram
 
-        program, _ = TrainingProgram.objects.get_or_create(
-            code="PILOT-BASELINE",
-            defaults={"name": "Pilot Baseline Program", "duration_months": 60},
-        )
+        if program is None:
+            program, _ = TrainingProgram.objects.get_or_create(
+                code="PILOT-BASELINE",
+                defaults={"name": "Pilot Baseline Program", "duration_months": 60},
+            )
         ResidentTrainingRecord.objects.update_or_create(
             resident_user=user,
             program=program,
@@ -898,95 +1277,6 @@ def _sync_assignment(
     )
 
 
-def _primary_membership_for(user: User, member_types: set[str]) -> DepartmentMembership | None:
-    return (
-        user.department_memberships.filter(active=True, is_primary=True, member_type__in=member_types)
-        .select_related("department")
-        .order_by("-start_date")
-        .first()
-    )
-
-
-def _active_assignment_for(user: User, assignment_type: str) -> HospitalAssignment | None:
-    return (
-        user.hospital_assignments.filter(active=True, assignment_type=assignment_type)
-        .select_related("hospital_department", "hospital_department__hospital")
-        .order_by("-start_date")
-        .first()
-    )
-
-
-def _build_or_load_user(*, email: str, username: str) -> User | None:
-    if username:
-        user = User.objects.filter(username=username).first()
-        if user:
-            return user
-    if email:
-        return User.objects.filter(email__iexact=email).first()
-    return None
-
-
-def _assert_username_available(user: User | None, username: str) -> None:
-    conflict = User.objects.filter(username=username)
-    if user:
-        conflict = conflict.exclude(pk=user.pk)
-    if conflict.exists():
-        raise ValidationError({"username": f"Username '{username}' is already in use."})
-
-
-def _required_department(row: dict) -> Department:
-    return _resolve_department(_require_text(row, "department_code"))
-
-
-def _department_or_none(raw_code: str | None) -> Department | None:
-    code = (raw_code or "").strip().upper()
-    if not code:
-        return None
-    return _resolve_department(code)
-
-
-def _resolve_department(code: str) -> Department:
-    department = Department.objects.filter(code=code).first()
-    if not department:
-        raise ValidationError({"department_code": f"Department '{code}' not found."})
-    return department
-
-
-def _resolve_hospital_department(*, hospital_code: str | None, department: Department | None) -> HospitalDepartment | None:
-    code = (hospital_code or "").strip().upper()
-    if not code:
-        return None
-    if not department:
-        raise ValidationError({"hospital_code": "hospital_code requires department_code so the active matrix site can be resolved."})
-    hospital = Hospital.objects.filter(code=code).first()
-    if not hospital:
-        raise ValidationError({"hospital_code": f"Hospital '{code}' not found."})
-    hospital_department = HospitalDepartment.objects.filter(hospital=hospital, department=department).first()
-    if not hospital_department:
-        raise ValidationError({"hospital_code": f"Hospital '{code}' is not linked to department '{department.code}' in the matrix."})
-    return hospital_department
-
-
-def _required_user_by_email(row: dict, field: str, allowed_roles: set[str]) -> User:
-    return _resolve_user_by_email(_require_text(row, field), field, allowed_roles)
-
-
-def _user_by_email_or_none(raw_email: str | None, allowed_roles: set[str]) -> User | None:
-    email = (raw_email or "").strip().lower()
-    if not email:
-        return None
-    return _resolve_user_by_email(email, "email", allowed_roles)
-
-
-def _resolve_user_by_email(email: str, field: str, allowed_roles: set[str]) -> User:
-    user = User.objects.filter(email__iexact=email).first()
-    if not user:
-        raise ValidationError({field: f"User '{email}' not found."})
-    if user.role not in allowed_roles:
-        raise ValidationError({field: f"User '{email}' must have one of: {', '.join(sorted(allowed_roles))}."})
-    return user
-
-
 def _parse_person_name(row: dict) -> Tuple[str, str]:
     full_name = (row.get("full_name") or "").strip()
     if full_name:
@@ -1081,7 +1371,7 @@ def _bool_str(value: bool) -> str:
 
 
 def _generate_username(first_name: str, last_name: str) -> str:
-    base = ".".join(part for part in [_slug(first_name), _slug(last_name)] if part) or "user"
+    base = _username_base(first_name, last_name)
     candidate = base
     counter = 1
     while User.objects.filter(username=candidate).exists():
@@ -1090,6 +1380,10 @@ def _generate_username(first_name: str, last_name: str) -> str:
     return candidate
 
 
+def _username_base(first_name: str, last_name: str) -> str:
+    return ".".join(part for part in [_slug(first_name), _slug(last_name)] if part) or "user"
+
+
 def _slug(value: str) -> str:
     return re.sub(r"[^a-z0-9]+", "", value.lower())
 
@@ -1106,10 +1400,6 @@ def _require_text(row: dict, field: str) -> str:
     return value
 
 
-def _normalize_header(header: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "_", header.strip().lower()).strip("_")
-
-
 def _error_text(exc: ValidationError) -> str:
     if hasattr(exc, "message_dict"):
         parts: List[str] = []
@@ -1124,9 +1414,16 @@ def _error_text(exc: ValidationError) -> str:
     return str(exc)
 
 
-def _import_rotation_assignments(actor: User, rows: List[dict], *, dry_run: bool, allow_partial: bool) -> dict:
-    from sims.training.models import ResidentTrainingRecord, RotationAssignment
-    from sims.rotations.models import HospitalDepartment
+def _import_rotation_assignments(
+    actor: User,
+    rows: List[dict],
+    *,
+    dry_run: bool,
+    allow_partial: bool,
+    context: _ImportContext | None = None,
+) -> dict:
+    context = context or _ImportContext(rows)
+    from sims.training.models import RotationAssignment
 
     successes: List[dict] = []
     failures: List[dict] = []
@@ -1142,17 +1439,11 @@ def _import_rotation_assignments(actor: User, rows: List[dict], *, dry_run: bool
             notes = (row.get("notes") or "").strip()
 
             # Validation checks
-            rtr = ResidentTrainingRecord.objects.filter(
-                resident_user__email=resident_email, active=True
-            ).first()
+            rtr = context.training_records_by_email.get(resident_email)
             if not rtr:
                 raise ValidationError(f"Active training record for resident '{resident_email}' not found.")
 
-            hd = HospitalDepartment.objects.filter(
-                hospital__code=hospital_code,
-                department__code=department_code,
-                is_active=True
-            ).first()
+            hd = context.active_matrix_links.get((hospital_code, department_code))
             if not hd:
                 raise ValidationError(f"Active matrix link for Hospital '{hospital_code}' and Department '{department_code}' not found.")
 
@@ -1170,14 +1461,9 @@ def _import_rotation_assignments(actor: User, rows: List[dict], *, dry_run: bool
                 RotationAssignment.STATUS_APPROVED,
                 RotationAssignment.STATUS_ACTIVE
             }
+            windows = context.rotation_windows(overlap_statuses).setdefault(rtr.pk, [])
             if status_val in overlap_statuses:
-                qs = RotationAssignment.objects.filter(
-                    resident_training=rtr,
-                    status__in=overlap_statuses,
-                    start_date__lt=end_date,
-                    end_date__gt=start_date,
-                )
-                if qs.exists():
+                if any(start < end_date and end > start_date for start, end in windows):
                     raise ValidationError("Overlapping rotation assignment already exists for this resident.")
 
             if not dry_run:
@@ -1190,6 +1476,8 @@ def _import_rotation_assignments(actor: User, rows: List[dict], *, dry_run: bool
                     notes=notes,
                     requested_by=actor
                 )
+                if status_val in overlap_statuses:
+                    windows.append((start_date, end_date))
             successes.append({
                 "row": row_number,
                 "resident_email": resident_email,
@@ -7,7 +7,7 @@ from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, serializers, status, viewsets
 from rest_framework.request import Request
@@ -27,6 +27,7 @@ from sims.bulk.serializers import (
     MappingPresetSerializer,
 )
 from sims.bulk.services import BulkService
+from sims.bulk.tabular import CSV_EXTENSIONS, EXCEL_EXTENSIONS, MappedUpload, TabularReader
 
 User = get_user_model()
 
@@ -47,6 +48,30 @@ def _operation_payload(operation: BulkOperation) -> dict:
     }
 
 
+def _job_payload(operation: BulkOperation) -> dict:
+    """Status payload for a background bulk job, including live progress."""
+    payload = _operation_payload(operation)
+    payload.update(operation.live_progress())
+    payload.update({
+        "id": operation.pk,
+        "resource": operation.options.get("resource", ""),
+        "file_name": operation.options.get("file_name", ""),
+        "dry_run": operation.options.get("dry_run"),
+        "started_at": operation.started_at,
+        "status_url": f"/api/bulk/operations/{operation.pk}/",
+    })
+    if operation.operation == BulkOperation.OP_EXPORT and operation.status == BulkOperation.STATUS_COMPLETED:
+        payload["download_url"] = f"/api/bulk/operations/{operation.pk}/download/"
+    if operation.status in {BulkOperation.STATUS_PENDING, BulkOperation.STATUS_RUNNING}:
+        # Successes are only materialized once the job finishes.
+        payload["details"] = {}
+    return payload
+
+
+def _wants_async(request: Request) -> bool:
+    return str(request.data.get("async", request.query_params.get("async", ""))).lower() in ("true", "1", "yes")
+
+
 def _track_bulk_event(request, *, event_type, resource, operation=None, error_code=None):
     pass  # analytics module removed
 
@@ -365,6 +390,13 @@ class BulkExportView(APIView):
         export_format = request.query_params.get("file_format", "xlsx").lower()
         service = BulkService(request.user)
         _track_bulk_event(request, event_type="data.export.started", resource=resource)
+        if _wants_async(request):
+            # Very large datasets: render on a worker and poll for a download link.
+            try:
+                operation = service.enqueue_export(resource=resource, export_format=export_format)
+            except DjangoValidationError as exc:
+                return Response({"detail": str(exc)}, status=400)
+            return Response(_job_payload(operation), status=status.HTTP_202_ACCEPTED)
         try:
             export_file = service.export_dataset(resource=resource, export_format=export_format)
         except DjangoValidationError as exc:
@@ -376,7 +408,10 @@ class BulkExportView(APIView):
             )
             return Response({"detail": str(exc)}, status=400)
         _track_bulk_event(request, event_type="data.export.completed", resource=resource)
-        response = HttpResponse(export_file.content, content_type=export_file.content_type)
+        if export_file.file is not None:
+            response = FileResponse(export_file.file, content_type=export_file.content_type)
+        else:
+            response = StreamingHttpResponse(export_file.iter_bytes(), content_type=export_file.content_type)
         response["Content-Disposition"] = f'attachment; filename="{export_file.filename}"'
         return response
 
@@ -462,6 +497,15 @@ class BulkImportEntityView(APIView):
             return Response({"detail": str(exc)}, status=status.HTTP_403_FORBIDDEN)
 
         _track_bulk_event(request, event_type="data.import.started", resource=entity)
+        if _wants_async(request):
+            operation = service.enqueue_import(
+                method_name,
+                uploaded_file,
+                dry_run=dry_run,
+                allow_partial=True,
+                resource=entity,
+            )
+            return Response(_job_payload(operation), status=status.HTTP_202_ACCEPTED)
         try:
             operation = getattr(service, method_name)(
                 uploaded_file,
@@ -481,12 +525,51 @@ class BulkImportEntityView(APIView):
         return Response(payload, status=status_code)
 
 
-        status_code = (
-            status.HTTP_200_OK
-            if operation.status == BulkOperation.STATUS_COMPLETED
-            else status.HTTP_400_BAD_REQUEST
+@extend_schema(responses={200: None})
+class BulkOperationStatusView(APIView):
+    """Poll a bulk operation (typically a background import) for live progress.
+
+    GET /api/bulk/operations/<id>/
+    """
+
+    serializer_class = BulkEmptySchemaSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request: Request, pk: int) -> Response:
+        queryset = BulkOperation.objects.all()
+        if not (request.user.is_superuser or getattr(request.user, "role", None) in _ALLOWED_ROLES):
+            queryset = queryset.filter(user=request.user)
+        operation = get_object_or_404(queryset, pk=pk)
+        return Response(_job_payload(operation))
+
+
+class BulkOperationDownloadView(APIView):
+    """Download the file produced by a completed background export.
+
+    GET /api/bulk/operations/<id>/download/
+    """
+
+    serializer_class = BulkEmptySchemaSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request: Request, pk: int) -> HttpResponse:
+        queryset = BulkOperation.objects.filter(
+            operation=BulkOperation.OP_EXPORT, status=BulkOperation.STATUS_COMPLETED
+        )
+        if not (request.user.is_superuser or getattr(request.user, "role", None) in _ALLOWED_ROLES):
+            queryset = queryset.filter(user=request.user)
+        operation = get_object_or_404(queryset, pk=pk)
+        export_path = operation.options.get("export_path")
+        try:
+            handle = open(export_path, "rb")
+        except (TypeError, OSError):
+            raise Http404("Export file is no longer available.")
+        return FileResponse(
+            handle,
+            as_attachment=True,
+            filename=operation.options.get("file_name") or "export",
+            content_type=(operation.details or {}).get("content_type"),
         )
-        return Response(payload, status=status_code)
 
 
 # ---------------------------------------------------------------------------
@@ -598,73 +681,17 @@ FLEXIBLE_SCHEMAS = {
 }
 
 
-def _transform_custom_file_to_standard_csv(uploaded_file, entity, mapping_dict, sheet_name=None):
-    import io
-    import csv
-    from openpyxl import load_workbook
-
-    # 1. Parse uploaded_file into list of rows (dicts)
-    uploaded_file.seek(0)
-    name = getattr(uploaded_file, "name", "uploaded").lower()
-    content = uploaded_file.read()
-    stream = io.BytesIO(content) if isinstance(content, bytes) else io.StringIO(content)
-    stream.seek(0)
-
-    rows = []
-    if name.endswith(".csv"):
-        text_stream = io.TextIOWrapper(stream, encoding="utf-8") if isinstance(stream, io.BytesIO) else stream
-        reader = csv.DictReader(text_stream)
-        rows = list(reader)
-    elif name.endswith((".xlsx", ".xls")):
-        workbook = load_workbook(stream, read_only=True)
-        if not sheet_name or sheet_name not in workbook.sheetnames:
-            sheet_name = workbook.sheetnames[0]
-        sheet = workbook[sheet_name]
-
-        row_iterator = sheet.iter_rows(values_only=True)
-        try:
-            header_row = next(row_iterator)
-            headers = [str(cell) if cell is not None else f"col_{idx}" for idx, cell in enumerate(header_row)]
-        except StopIteration:
-            headers = []
-
-        for row in row_iterator:
-            if not any(cell is not None for cell in row):
-                continue
-            payload = {}
-            for idx, val in enumerate(row):
-                if idx < len(headers):
-                    payload[headers[idx]] = str(val).strip() if val is not None else ""
-            rows.append(payload)
-    else:
+def _mapped_upload(uploaded_file, entity, mapping_dict, sheet_name=None) -> MappedUpload:
+    """
+    Wrap ``uploaded_file`` so the import parsers read it through ``mapping_dict``
+    (target field -> source column), streaming rows instead of rewriting the
+    file into the standard template first.
+    """
+    name = (getattr(uploaded_file, "name", None) or "uploaded").lower()
+    if not name.endswith(CSV_EXTENSIONS + EXCEL_EXTENSIONS):
         raise DjangoValidationError("Unsupported file format.")
-
-    # 2. Map and transform rows to target schema keys
-    schema = FLEXIBLE_SCHEMAS[entity]
-    target_fields = [f["name"] for f in schema["fields"]]
-
-    transformed_rows = []
-    for row in rows:
-        transformed_row = {}
-        for field in target_fields:
-            custom_col = mapping_dict.get(field)
-            val = ""
-            if custom_col and custom_col in row:
-                val = str(row[custom_col]).strip()
-            transformed_row[field] = val
-        transformed_rows.append(transformed_row)
-
-    # 3. Write transformed rows to in-memory CSV
-    out_stream = io.StringIO()
-    writer = csv.DictWriter(out_stream, fieldnames=target_fields)
-    writer.writeheader()
-    for row in transformed_rows:
-        writer.writerow(row)
-
-    out_content = out_stream.getvalue().encode("utf-8")
-
-    from django.core.files.uploadedfile import SimpleUploadedFile
-    return SimpleUploadedFile(f"{entity}_transformed.csv", out_content, content_type="text/csv")
+    target_fields = [f["name"] for f in FLEXIBLE_SCHEMAS[entity]["fields"]]
+    return MappedUpload(uploaded_file, dict(mapping_dict or {}), fields=target_fields, sheet_name=sheet_name)
 
 
 @extend_schema(responses={200: None})
@@ -686,57 +713,20 @@ class FlexibleDetectHeadersView(APIView):
         if not uploaded_file:
             return Response({"detail": "No file provided."}, status=400)
 
-        name = getattr(uploaded_file, "name", "uploaded").lower()
         sheet_name = request.data.get("sheet_name")
 
-        import io
-        content = uploaded_file.read()
-        stream = io.BytesIO(content) if isinstance(content, bytes) else io.StringIO(content)
-        stream.seek(0)
-
-        headers = []
-        sample_rows = []
-        total_rows = 0
-        sheets = []
-
         try:
-            if name.endswith(".csv"):
-                import csv
-                text_stream = io.TextIOWrapper(stream, encoding="utf-8") if isinstance(stream, io.BytesIO) else stream
-                reader = csv.DictReader(text_stream)
-                headers = list(reader.fieldnames or [])
-                rows = list(reader)
-                total_rows = len(rows)
-                sample_rows = rows[:10]
-            elif name.endswith((".xlsx", ".xls")):
-                from openpyxl import load_workbook
-                workbook = load_workbook(stream, read_only=True)
-                sheets = workbook.sheetnames
-                if not sheet_name or sheet_name not in sheets:
-                    sheet_name = sheets[0]
-                sheet = workbook[sheet_name]
-
-                row_iterator = sheet.iter_rows(values_only=True)
-                try:
-                    header_row = next(row_iterator)
-                    headers = [str(cell) if cell is not None else f"col_{idx}" for idx, cell in enumerate(header_row)]
-                except StopIteration:
-                    headers = []
-
-                rows = []
-                for row in row_iterator:
-                    if not any(cell is not None for cell in row):
-                        continue
-                    payload = {}
-                    for idx, val in enumerate(row):
-                        if idx < len(headers):
-                            payload[headers[idx]] = str(val).strip() if val is not None else ""
-                    rows.append(payload)
-
-                total_rows = len(rows)
-                sample_rows = rows[:10]
-            else:
-                return Response({"detail": "Unsupported file format. Upload CSV or Excel."}, status=400)
+            with TabularReader(uploaded_file, row_numbers=False, sheet_name=sheet_name) as reader:
+                headers = reader.labels
+                sheets = reader.sheet_names
+                sample_rows = []
+                total_rows = 0
+                for row in reader:
+                    if total_rows < 10:
+                        sample_rows.append(row)
+                    total_rows += 1
+        except DjangoValidationError as e:
+            return Response({"detail": " ".join(e.messages)}, status=400)
         except Exception as e:
             return Response({"detail": f"Failed to parse file: {str(e)}"}, status=400)
 
@@ -815,7 +805,7 @@ class FlexibleDryRunView(APIView):
             return Response({"detail": "Invalid mapping JSON format."}, status=400)
 
         try:
-            transformed_file = _transform_custom_file_to_standard_csv(uploaded_file, entity, mapping, sheet_name)
+            mapped_file = _mapped_upload(uploaded_file, entity, mapping, sheet_name)
         except DjangoValidationError as e:
             return Response({"detail": str(e)}, status=400)
         except Exception as e:
@@ -828,25 +818,16 @@ class FlexibleDryRunView(APIView):
         try:
             service = BulkService(request.user)
             operation = getattr(service, method_name)(
-                transformed_file,
+                mapped_file,
                 dry_run=True,
                 allow_partial=True,
             )
         except Exception as exc:
             return Response({"detail": str(exc)}, status=400)
 
-        transformed_file.seek(0)
-        import csv
-        import io
-        text_stream = io.StringIO(transformed_file.read().decode("utf-8"))
-        reader = csv.DictReader(text_stream)
-        transformed_rows = list(reader)
-        for idx, row in enumerate(transformed_rows, start=2):
-            row["_row_number"] = idx
-
         payload = _operation_payload(operation)
         payload["dry_run"] = True
-        payload["rows"] = transformed_rows
+        payload["rows"] = list(TabularReader(mapped_file))
 
         return Response(payload, status=status.HTTP_200_OK)
 
@@ -876,7 +857,7 @@ class FlexibleImportApplyView(APIView):
             return Response({"detail": "Invalid mapping JSON format."}, status=400)
 
         try:
-            transformed_file = _transform_custom_file_to_standard_csv(uploaded_file, entity, mapping, sheet_name)
+            mapped_file = _mapped_upload(uploaded_file, entity, mapping, sheet_name)
         except DjangoValidationError as e:
             return Response({"detail": str(e)}, status=400)
         except Exception as e:
@@ -898,9 +879,8 @@ class FlexibleImportApplyView(APIView):
             service = BulkService(request.user)
 
             if import_mode == "strict":
-                transformed_file.seek(0)
                 dry_run_op = getattr(service, method_name)(
-                    transformed_file,
+                    mapped_file,
                     dry_run=True,
                     allow_partial=True,
                 )
@@ -916,18 +896,16 @@ class FlexibleImportApplyView(APIView):
                         "details": dry_run_op.details
                     }, status=status.HTTP_400_BAD_REQUEST)
 
-                transformed_file.seek(0)
                 with transaction.atomic():
                     operation = getattr(service, method_name)(
-                        transformed_file,
+                        mapped_file,
                         dry_run=False,
                         allow_partial=False,
                     )
             else:
-                transformed_file.seek(0)
                 with transaction.atomic():
                     operation = getattr(service, method_name)(
-                        transformed_file,
+                        mapped_file,
                         dry_run=False,
                         allow_partial=True,
                     )
@@ -3,13 +3,14 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import timedelta
-from typing import Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import get_template, render_to_string
 from django.utils import timezone
 
 from sims.notifications.models import Notification, NotificationPreference
@@ -26,11 +27,33 @@ class NotificationResult:
     error: Optional[str] = None
 
 
+@dataclass
+class NotificationMessage:
+    """One recipient of a fan-out, with its own title and template context."""
+
+    recipient: User
+    title: str
+    context: dict = field(default_factory=dict)
+
+
+@dataclass
+class FanOutResult:
+    in_app: int = 0
+    email: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+
+def email_batch_size() -> int:
+    return max(int(getattr(settings, "SIMS_SETTINGS", {}).get("NOTIFICATION_BATCH_SIZE", 50)), 1)
+
+
 class NotificationService:
     """Encapsulates the delivery logic for notifications."""
 
     def __init__(self, actor: Optional[User] = None):
         self.actor = actor
+        self._templates: Dict[str, Any] = {}
 
     def send(
         self,
@@ -89,6 +112,106 @@ class NotificationService:
         email.attach_alternative(html_body, "text/html")
         email.send(fail_silently=False)
 
+    # Bulk fan-out ------------------------------------------------------
+
+    def send_bulk(
+        self,
+        messages: Sequence[NotificationMessage],
+        verb: str,
+        template: str,
+        channels: Optional[Iterable[str]] = None,
+    ) -> FanOutResult:
+        """
+        Deliver ``messages`` in one pass: preferences are loaded with one
+        query, each template is compiled once, in-app notifications are
+        written with ``bulk_create`` in a single transaction and emails go out
+        over one SMTP connection in ``NOTIFICATION_BATCH_SIZE`` batches.
+        """
+        channels = tuple(channels or (Notification.CHANNEL_IN_APP, Notification.CHANNEL_EMAIL))
+        result = FanOutResult()
+        if not messages:
+            return result
+        preferences = self._preferences_for([message.recipient for message in messages])
+        now = timezone.now()
+        notifications: List[Notification] = []
+        emails: List[EmailMultiAlternatives] = []
+        for message in messages:
+            preference = preferences[message.recipient.pk]
+            context = {"recipient": message.recipient, **message.context}
+            for channel in channels:
+                if not preference.allows_channel(channel, now):
+                    result.skipped += 1
+                    continue
+                try:
+                    if channel == Notification.CHANNEL_IN_APP:
+                        notifications.append(self._build_in_app(message, verb, template, context))
+                    elif channel == Notification.CHANNEL_EMAIL:
+                        emails.append(self._build_email(message, template, context))
+                except Exception as exc:  # pragma: no cover - defensive logging
+                    logger.exception("Notification rendering failed", exc_info=exc)
+                    result.failed += 1
+
+        if notifications:
+            with transaction.atomic():
+                Notification.objects.bulk_create(notifications, batch_size=500)
+            result.in_app = len(notifications)
+        if emails:
+            batch_size = email_batch_size()
+            try:
+                with get_connection(fail_silently=False) as connection:
+                    for start in range(0, len(emails), batch_size):
+                        try:
+                            result.email += connection.send_messages(emails[start : start + batch_size]) or 0
+                        except Exception as exc:
+                            logger.exception(
+                                "Bulk notification email batch %s-%s failed", start, start + batch_size, exc_info=exc
+                            )
+                            # Drop a possibly broken session; the next batch opens a fresh one.
+                            connection.close()
+            except Exception as exc:
+                logger.exception("Bulk notification email delivery failed", exc_info=exc)
+            result.failed += len(emails) - result.email
+        return result
+
+    def _preferences_for(self, recipients: Iterable[User]) -> Dict[int, NotificationPreference]:
+        recipient_ids = {recipient.pk for recipient in recipients}
+        preferences = {
+            preference.user_id: preference
+            for preference in NotificationPreference.objects.filter(user_id__in=recipient_ids)
+        }
+        missing = [NotificationPreference(user_id=user_id) for user_id in recipient_ids - preferences.keys()]
+        if missing:
+            NotificationPreference.objects.bulk_create(missing, ignore_conflicts=True)
+            preferences.update({preference.user_id: preference for preference in missing})
+        return preferences
+
+    def _render(self, name: str, context: dict) -> str:
+        compiled = self._templates.get(name)
+        if compiled is None:
+            compiled = self._templates[name] = get_template(name)
+        return compiled.render(context)
+
+    def _build_in_app(self, message: NotificationMessage, verb: str, template: str, context: dict) -> Notification:
+        return Notification(
+            recipient=message.recipient,
+            actor=self.actor,
+            verb=verb,
+            title=message.title,
+            body=self._render(f"notifications/{template}.txt", context),
+            channel=Notification.CHANNEL_IN_APP,
+            metadata=self._serialise_metadata(context),
+        )
+
+    def _build_email(self, message: NotificationMessage, template: str, context: dict) -> EmailMultiAlternatives:
+        email = EmailMultiAlternatives(
+            subject=message.title,
+            body=self._render(f"notifications/{template}.txt", context),
+            from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@example.com"),
+            to=[message.recipient.email],
+        )
+        email.attach_alternative(self._render(f"notifications/{template}.html", context), "text/html")
+        return email
+
     def _serialise_metadata(self, context: dict) -> dict:
         serialised: dict[str, object] = {}
         for key, value in context.items():
@@ -111,24 +234,31 @@ class NotificationService:
             status__in=[RotationAssignment.STATUS_ACTIVE, RotationAssignment.STATUS_APPROVED],
             end_date__range=(today, threshold),
         ).select_related("resident_training__resident_user")
-        count = 0
-        for rotation in rotations:
-            resident = rotation.resident_training.resident_user
-            context = {"rotation": rotation, "days": (rotation.end_date - today).days}
-            self.send(
-                recipient=resident,
-                verb="rotation-ending",
+        messages = [
+            NotificationMessage(
+                recipient=rotation.resident_training.resident_user,
                 title=f"Rotation ending on {rotation.end_date:%d %b %Y}",
-                template="emails/rotation_deadline",
-                context=context,
-                channels=(Notification.CHANNEL_IN_APP,),
+                context={"rotation": rotation, "days": (rotation.end_date - today).days},
             )
-            count += 1
-        return count
+            for rotation in rotations
+        ]
+        self.send_bulk(
+            messages,
+            verb="rotation-ending",
+            template="emails/rotation_deadline",
+            channels=(Notification.CHANNEL_IN_APP,),
+        )
+        return len(messages)
 
 
 def ensure_preferences_exist(user: User) -> NotificationPreference:
     return NotificationPreference.for_user(user)
 
 
-__all__ = ["NotificationService", "NotificationResult", "ensure_preferences_exist"]
+__all__ = [
+    "FanOutResult",
+    "NotificationMessage",
+    "NotificationResult",
+    "NotificationService",
+    "ensure_preferences_exist",
+]
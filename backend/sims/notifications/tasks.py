@@ -0,0 +1,12 @@
+"""
+Celery tasks for the notifications app.
+"""
+from celery import shared_task
+
+
+@shared_task(ignore_result=True)
+def send_rotation_deadline_reminders(days=3):
+    """Daily sweep: remind residents whose rotations end within ``days`` days."""
+    from sims.notifications.services import NotificationService
+
+    NotificationService().upcoming_rotation_deadlines(days=days)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SupervisionConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sims.supervision"
+
+    def ready(self):
+        import sims.supervision.signals  # noqa: F401  – register signal handlers
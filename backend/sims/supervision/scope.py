@@ -0,0 +1,130 @@
+"""
+A supervisor's resident and department scope, computed once and cached.
+
+``SupervisionScope.for_user`` gathers every id a supervisor-scoped queryset
+filters on: residents reached through active ``ResidentSupervisorAssignment``
+rows (as user ids for the training app and as resident profile ids for
+academics), residents still linked through the legacy ``User.supervisor`` FK,
+and the departments the user heads or is a member of.
+
+The result is memoised on the user object for the rest of the request and
+stored in the cache for ``SUPERVISION_SCOPE_CACHE_TTL`` seconds. Both copies
+are keyed by a shared version that ``sims.supervision.signals`` bumps
+whenever an assignment, department membership, supervisor profile or legacy
+supervisor link changes, so a scope is never served past such a write.
+Bulk ``QuerySet.update`` calls on those models bypass signals and must call
+``invalidate_supervision_scopes`` themselves.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import FrozenSet, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+SCOPE_VERSION_KEY = "supervision:scope:version"
+# Bump when the cached payload shape changes.
+SCOPE_SCHEMA = 2
+HOD_DESIGNATION = "HOD"
+_MEMO_ATTR = "_supervision_scope"
+
+
+def _scope_version() -> int:
+    version = cache.get(SCOPE_VERSION_KEY)
+    if version is None:
+        cache.add(SCOPE_VERSION_KEY, 1, None)
+        version = cache.get(SCOPE_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_supervision_scopes() -> None:
+    """Retire every cached scope by bumping the shared version."""
+    try:
+        cache.incr(SCOPE_VERSION_KEY)
+    except ValueError:
+        cache.add(SCOPE_VERSION_KEY, 2, None)
+
+
+@dataclass(frozen=True)
+class SupervisionScope:
+    user_id: int
+    supervisor_profile_id: Optional[int]
+    # Users supervised through active assignments or the legacy User.supervisor FK.
+    resident_user_ids: FrozenSet[int]
+    # ResidentProfile ids with an ACTIVE assignment to this supervisor.
+    resident_profile_ids: FrozenSet[int]
+    # Departments the user heads (HOD designation) or holds an active membership in.
+    department_ids: FrozenSet[int]
+    # The department the user heads, if any.
+    hod_department_ids: FrozenSet[int] = frozenset()
+
+    @classmethod
+    def for_user(cls, user) -> "SupervisionScope":
+        version = _scope_version()
+        memo = getattr(user, _MEMO_ATTR, None)
+        if memo is not None and memo[0] == version:
+            return memo[1]
+
+        ttl = getattr(settings, "SUPERVISION_SCOPE_CACHE_TTL", 0)
+        key = f"supervision:scope:{SCOPE_SCHEMA}:v{version}:{user.pk}"
+        cached = cache.get(key) if ttl > 0 else None
+        if cached is not None:
+            scope = cls._from_cache(cached)
+        else:
+            scope = cls.build(user)
+            if ttl > 0:
+                cache.set(key, scope._to_cache(), ttl)
+        # Through __dict__ so a lazy request principal is not loaded just to hold the memo.
+        vars(user)[_MEMO_ATTR] = (version, scope)
+        return scope
+
+    @classmethod
+    def build(cls, user) -> "SupervisionScope":
+        from sims.users.models import DepartmentMembership, SupervisorProfile, User
+
+        from .models import ResidentSupervisorAssignment
+
+        profile = (
+            SupervisorProfile.objects.filter(user_id=user.pk)
+            .values("id", "designation_ref_id", "department_ref_id")
+            .first()
+        )
+        resident_user_ids = set(
+            User.objects.filter(supervisor_id=user.pk, role="RESIDENT").values_list("id", flat=True)
+        )
+        resident_profile_ids = set()
+        hod_department_ids = set()
+        department_ids = set(
+            DepartmentMembership.objects.filter(user_id=user.pk, active=True).values_list("department_id", flat=True)
+        )
+        if profile:
+            assignments = ResidentSupervisorAssignment.objects.filter(
+                Q(is_active=True) | Q(status=ResidentSupervisorAssignment.STATUS_ACTIVE),
+                supervisor_id=profile["id"],
+            ).values_list("resident_id", "resident__user_id", "is_active", "status")
+            for resident_id, resident_user_id, is_active, status in assignments:
+                if is_active:
+                    resident_user_ids.add(resident_user_id)
+                if status == ResidentSupervisorAssignment.STATUS_ACTIVE:
+                    resident_profile_ids.add(resident_id)
+            if profile["designation_ref_id"] == HOD_DESIGNATION and profile["department_ref_id"]:
+                hod_department_ids.add(profile["department_ref_id"])
+        department_ids |= hod_department_ids
+
+        return cls(
+            user_id=user.pk,
+            supervisor_profile_id=profile["id"] if profile else None,
+            resident_user_ids=frozenset(resident_user_ids),
+            resident_profile_ids=frozenset(resident_profile_ids),
+            department_ids=frozenset(department_ids),
+            hod_department_ids=frozenset(hod_department_ids),
+        )
+
+    def _to_cache(self) -> dict:
+        return {name: sorted(value) if isinstance(value, frozenset) else value for name, value in asdict(self).items()}
+
+    @classmethod
+    def _from_cache(cls, payload: dict) -> "SupervisionScope":
+        return cls(**{name: frozenset(value) if isinstance(value, list) else value for name, value in payload.items()})
@@ -0,0 +1,184 @@
+"""
+Row-level scoping for training and academics querysets.
+
+Each scoped model registers an ``AccessRule`` describing how its rows reach a
+resident (and, optionally, a department or an assigned supervisor).
+``scope_queryset`` compiles the rule against the requesting user's role and
+``SupervisionScope`` into a single ``WHERE`` predicate:
+
+* admins (``ADMIN`` role or superusers) see every row;
+* residents see rows whose resident is themselves;
+* supervisors see rows of the residents they supervise, rows in the
+  departments they head or belong to, and rows assigned to them directly,
+  as far as the rule declares those paths;
+* support staff see every row or none, per rule;
+* everyone else sees nothing.
+
+Every path in a rule must follow forward foreign keys only, so a row matches
+at most once and no ``DISTINCT`` is needed. Reaching residents through the
+reverse ``supervisor_assignments`` relation is compiled to a correlated
+``EXISTS`` on ``ResidentSupervisorAssignment`` instead of a join. Id sets come
+from the cached ``SupervisionScope`` and are matched with ``IN`` on the
+(indexed) FK columns of the scoped table.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.db.models import Exists, OuterRef, Q
+
+from sims.users.authentication import principal_claim
+
+from .scope import SupervisionScope
+
+ALL = "all"
+NONE = "none"
+MISSING = object()
+
+# How a supervisor reaches residents:
+# user ids supervised through active assignments or the legacy User.supervisor FK,
+SUPERVISED_USERS = "users"
+# resident profiles with an ACTIVE-status assignment,
+ASSIGNED_PROFILES = "profiles"
+# or resident profiles with an ``is_active`` assignment, checked with EXISTS.
+ACTIVE_ASSIGNMENT = "active_assignment"
+
+
+@dataclass(frozen=True)
+class AccessRule:
+    # Path to the resident's User id (training) or ResidentProfile id (academics).
+    resident_user: Optional[str] = None
+    resident_profile: Optional[str] = None
+    supervised: Optional[str] = None
+    # Paths matched against the user's HOD and member departments...
+    departments: Tuple[str, ...] = ()
+    # ...or against the department the user heads only.
+    hod_departments: Tuple[str, ...] = ()
+    # Path to the SupervisorProfile a row is assigned to.
+    supervisor_profile: Optional[str] = None
+    support_staff: str = NONE
+
+
+def _training(path: str, **kwargs) -> AccessRule:
+    return AccessRule(resident_user=path, supervised=SUPERVISED_USERS, **kwargs)
+
+
+ACCESS_RULES: Dict[str, AccessRule] = {
+    "training.ResidentTrainingRecord": _training("resident_user_id"),
+    "training.RotationAssignment": _training(
+        "resident_training__resident_user_id",
+        departments=("hospital_department__department_id",),
+    ),
+    "training.LeaveRequest": _training("resident_training__resident_user_id"),
+    "training.DeputationPosting": _training("resident_training__resident_user_id"),
+    "training.ResidentSubmission": _training(
+        "resident_training_record__resident_user_id",
+        hod_departments=("resident_training_record__resident_user__home_department_id",),
+        support_staff=ALL,
+    ),
+    "training.SubmissionCertificate": _training(
+        "submission__resident_training_record__resident_user_id",
+        hod_departments=("submission__resident_training_record__resident_user__home_department_id",),
+        support_staff=ALL,
+    ),
+    "training.RotationCompletion": _training(
+        "rotation__resident_training__resident_user_id",
+        hod_departments=(
+            "rotation__resident_training__resident_user__home_department_id",
+            "rotation__hospital_department__department_id",
+        ),
+        support_staff=ALL,
+    ),
+    "academics.ResidentTrainingRecord": AccessRule(
+        resident_profile="resident_id", supervised=ACTIVE_ASSIGNMENT, support_staff=ALL
+    ),
+    "academics.SupervisorReviewQueueItem": AccessRule(
+        resident_profile="resident_id", supervisor_profile="supervisor_id", support_staff=ALL
+    ),
+    "academics.EvaluationSubmission": AccessRule(
+        resident_profile="resident_id", supervised=ASSIGNED_PROFILES, supervisor_profile="supervisor_id"
+    ),
+    "academics.LogbookEntry": AccessRule(
+        resident_profile="resident_id", supervised=ASSIGNED_PROFILES, supervisor_profile="supervisor_id"
+    ),
+}
+
+
+def rule_for(model) -> AccessRule:
+    return ACCESS_RULES[model._meta.label]
+
+
+def is_admin(user) -> bool:
+    return getattr(user, "role", None) == "ADMIN" or getattr(user, "is_superuser", False)
+
+
+def _resident_predicate(user, rule: AccessRule) -> Optional[Q]:
+    if rule.resident_user:
+        return Q(**{rule.resident_user: user.pk})
+    profile_id = principal_claim(user, "resident_profile_id", MISSING)
+    if profile_id is MISSING:
+        profile = getattr(user, "resident_profile", None)
+        profile_id = profile.pk if profile is not None else None
+    if profile_id is None:
+        return None
+    return Q(**{rule.resident_profile: profile_id})
+
+
+def _supervisor_predicate(user, rule: AccessRule) -> Optional[Q]:
+    from .models import ResidentSupervisorAssignment
+
+    scope = SupervisionScope.for_user(user)
+    profile_id = scope.supervisor_profile_id
+    clauses = []
+    if rule.supervised == SUPERVISED_USERS and scope.resident_user_ids:
+        clauses.append(Q(**{f"{rule.resident_user}__in": scope.resident_user_ids}))
+    elif rule.supervised == ASSIGNED_PROFILES and scope.resident_profile_ids:
+        clauses.append(Q(**{f"{rule.resident_profile}__in": scope.resident_profile_ids}))
+    elif rule.supervised == ACTIVE_ASSIGNMENT and profile_id:
+        clauses.append(
+            Q(
+                Exists(
+                    ResidentSupervisorAssignment.objects.filter(
+                        resident_id=OuterRef(rule.resident_profile), supervisor_id=profile_id, is_active=True
+                    )
+                )
+            )
+        )
+    if scope.department_ids:
+        clauses.extend(Q(**{f"{path}__in": scope.department_ids}) for path in rule.departments)
+    if scope.hod_department_ids:
+        clauses.extend(Q(**{f"{path}__in": scope.hod_department_ids}) for path in rule.hod_departments)
+    if rule.supervisor_profile and profile_id:
+        clauses.append(Q(**{rule.supervisor_profile: profile_id}))
+    if not clauses:
+        return None
+    predicate = clauses[0]
+    for clause in clauses[1:]:
+        predicate |= clause
+    return predicate
+
+
+def compile_access(user, rule: AccessRule) -> Optional[Q]:
+    """
+    The predicate limiting ``rule``'s model to rows ``user`` may see: an empty
+    ``Q`` for unrestricted access, ``None`` when no row is visible.
+    """
+    role = getattr(user, "role", None)
+    if is_admin(user):
+        return Q()
+    if role == "RESIDENT":
+        return _resident_predicate(user, rule)
+    if role == "SUPERVISOR":
+        return _supervisor_predicate(user, rule)
+    if role == "SUPPORT_STAFF" and rule.support_staff == ALL:
+        return Q()
+    return None
+
+
+def scope_queryset(queryset, user, rule: Optional[AccessRule] = None):
+    """Limit ``queryset`` to the rows ``user`` may see under its model's rule."""
+    predicate = compile_access(user, rule or rule_for(queryset.model))
+    if predicate is None:
+        return queryset.none()
+    return queryset.filter(predicate) if predicate else queryset
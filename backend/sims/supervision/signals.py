@@ -0,0 +1,53 @@
+"""Cache-invalidation signals for supervision scopes (see sims.supervision.scope)."""
+
+from django.apps import apps
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .scope import invalidate_supervision_scopes
+
+SCOPE_MODELS = (
+    "supervision.ResidentSupervisorAssignment",
+    "users.DepartmentMembership",
+    "users.SupervisorProfile",
+)
+# User columns that decide whether a user sits in someone's legacy scope.
+LEGACY_SCOPE_FIELDS = ("supervisor_id", "role")
+
+
+def _invalidate_scopes(sender, **kwargs):
+    invalidate_supervision_scopes()
+
+
+def _remember_legacy_link(sender, instance, **kwargs):
+    instance._supervision_legacy_link = tuple(instance.__dict__.get(name) for name in LEGACY_SCOPE_FIELDS)
+
+
+def _invalidate_on_legacy_link_change(sender, instance, created, update_fields=None, **kwargs):
+    """Most user saves (logins, profile edits) leave the legacy supervisor link alone."""
+    current = tuple(getattr(instance, name) for name in LEGACY_SCOPE_FIELDS)
+    previous = getattr(instance, "_supervision_legacy_link", None)
+    instance._supervision_legacy_link = current
+    if created:
+        if instance.supervisor_id:
+            invalidate_supervision_scopes()
+        return
+    if update_fields is not None and not {"supervisor", "role"} & set(update_fields):
+        return
+    if current != previous:
+        invalidate_supervision_scopes()
+
+
+def _invalidate_on_user_delete(sender, instance, **kwargs):
+    if instance.supervisor_id:
+        invalidate_supervision_scopes()
+
+
+for _label in SCOPE_MODELS:
+    _model = apps.get_model(_label)
+    post_save.connect(_invalidate_scopes, sender=_model, dispatch_uid=f"supervision-scope-save-{_label}")
+    post_delete.connect(_invalidate_scopes, sender=_model, dispatch_uid=f"supervision-scope-delete-{_label}")
+
+_user_model = apps.get_model("users.User")
+post_init.connect(_remember_legacy_link, sender=_user_model, dispatch_uid="supervision-scope-user-init")
+post_save.connect(_invalidate_on_legacy_link_change, sender=_user_model, dispatch_uid="supervision-scope-user-save")
+post_delete.connect(_invalidate_on_user_delete, sender=_user_model, dispatch_uid="supervision-scope-user-delete")
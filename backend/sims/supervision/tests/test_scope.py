@@ -0,0 +1,98 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from sims.academics.models import Department
+from sims.supervision.models import ResidentSupervisorAssignment
+from sims.supervision.scope import SupervisionScope
+from sims.users.models import DepartmentMembership, ResidentProfile, SupervisorProfile
+
+User = get_user_model()
+
+
+@pytest.fixture
+def department():
+    return Department.objects.create(name="Surgery", code="SURG", active=True)
+
+
+@pytest.fixture
+def supervisor():
+    user = User.objects.create_user(username="scope_sup", password="x", role="SUPERVISOR")
+    SupervisorProfile.objects.update_or_create(user=user, defaults={"profile_status": "COMPLETE"})
+    return User.objects.get(pk=user.pk)
+
+
+@pytest.fixture
+def resident():
+    user = User.objects.create_user(username="scope_res", password="x", role="RESIDENT")
+    ResidentProfile.objects.update_or_create(user=user, defaults={"profile_status": "COMPLETE"})
+    return user
+
+
+def _assign(resident, supervisor):
+    return ResidentSupervisorAssignment.objects.create(
+        resident=resident.resident_profile,
+        supervisor=supervisor.supervisor_profile,
+        assignment_type=ResidentSupervisorAssignment.ASSIGNMENT_PRIMARY,
+        start_date=date.today(),
+        is_active=True,
+        status=ResidentSupervisorAssignment.STATUS_ACTIVE,
+    )
+
+
+@pytest.mark.django_db
+class TestSupervisionScope:
+    def test_scope_collects_assignments_memberships_and_hod_department(self, supervisor, resident, department):
+        _assign(resident, supervisor)
+        other = User.objects.create_user(username="scope_legacy", password="x", role="RESIDENT", supervisor=supervisor)
+        DepartmentMembership.objects.create(
+            user=supervisor, department=department, member_type="supervisor", start_date=date.today()
+        )
+        profile = supervisor.supervisor_profile
+        profile.designation_ref = "HOD"
+        profile.department_ref = department
+        profile.save()
+
+        scope = SupervisionScope.for_user(supervisor)
+
+        assert scope.resident_user_ids == {resident.pk, other.pk}
+        assert scope.resident_profile_ids == {resident.resident_profile.pk}
+        assert scope.department_ids == {department.pk}
+
+    def test_scope_is_computed_once_until_a_supervision_write(self, supervisor, resident):
+        SupervisionScope.for_user(supervisor)
+        with CaptureQueriesContext(connection) as queries:
+            assert SupervisionScope.for_user(supervisor).resident_user_ids == frozenset()
+        assert len(queries) == 0
+
+        _assign(resident, supervisor)
+
+        assert SupervisionScope.for_user(supervisor).resident_user_ids == {resident.pk}
+
+    def test_legacy_supervisor_link_invalidates_but_logins_do_not(self, supervisor, resident):
+        SupervisionScope.for_user(supervisor)
+
+        resident.last_login = resident.date_joined
+        resident.save(update_fields=["last_login"])
+        with CaptureQueriesContext(connection) as queries:
+            SupervisionScope.for_user(supervisor)
+        assert len(queries) == 0
+
+        resident.supervisor = supervisor
+        resident.save()
+        assert SupervisionScope.for_user(supervisor).resident_user_ids == {resident.pk}
+
+    def test_scope_is_shared_across_requests_through_the_cache(self, supervisor, resident, settings):
+        settings.SUPERVISION_SCOPE_CACHE_TTL = 60
+        _assign(resident, supervisor)
+        SupervisionScope.for_user(supervisor)
+
+        fresh_user = User.objects.get(pk=supervisor.pk)
+        with CaptureQueriesContext(connection) as queries:
+            scope = SupervisionScope.for_user(fresh_user)
+
+        assert len(queries) == 0
+        assert scope.resident_profile_ids == {resident.resident_profile.pk}
@@ -0,0 +1,91 @@
+import csv
+import gzip
+import io
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from sims.audit.models import ActivityLog
+from sims.bulk.models import BulkOperation
+
+User = get_user_model()
+
+
+@override_settings(AUDIT_EXPORT_PAGE_SIZE=2)
+class ActivityLogExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="export_admin", password="x", email="e@example.com")
+        ActivityLog.objects.all().delete()
+        base = timezone.now() - timedelta(days=1)
+        self.logs = []
+        for index in range(5):
+            # Rows 1 and 2 share a timestamp, so pages must break ties on id.
+            created_at = base + timedelta(minutes=min(index, 1) if index < 3 else index)
+            self.logs.append(
+                ActivityLog.objects.create(
+                    actor=self.admin,
+                    action="update",
+                    verb=f"edit_{index}",
+                    target_repr=f'Ward {index}, "north"\nwing',
+                    metadata={"index": index},
+                    created_at=created_at,
+                )
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse("activity-log-export-csv")
+
+    def _get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_csv_export_streams_every_row_with_proper_quoting(self):
+        rows = list(csv.DictReader(io.StringIO(self._get().decode("utf-8"))))
+
+        self.assertEqual([int(row["id"]) for row in rows], [log.pk for log in self.logs])
+        self.assertEqual(rows[0]["target"], 'Ward 0, "north"\nwing')
+        self.assertEqual(json.loads(rows[4]["metadata"]), {"index": 4})
+
+    def test_cursor_resumes_after_the_row_that_carried_it(self):
+        rows = list(csv.DictReader(io.StringIO(self._get().decode("utf-8"))))
+
+        resumed = list(csv.DictReader(io.StringIO(self._get(cursor=rows[1]["cursor"]).decode("utf-8"))))
+
+        self.assertEqual([row["id"] for row in resumed], [row["id"] for row in rows[2:]])
+
+    def test_gzipped_jsonl_export_with_filters(self):
+        content = self._get(file_format="jsonl", compress="gzip", search="edit_3")
+        lines = gzip.decompress(content).decode("utf-8").splitlines()
+
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row["verb"], "edit_3")
+        self.assertEqual(row["metadata"], {"index": 3})
+        self.assertIn("cursor", row)
+
+    def test_invalid_parameters_are_rejected(self):
+        self.assertEqual(self.client.get(self.url, {"file_format": "xml"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"cursor": "not-a-cursor"}).status_code, 400)
+
+    def test_background_export_is_served_by_the_bulk_download_endpoint(self):
+        export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, export_dir, ignore_errors=True)
+
+        with override_settings(BULK_EXPORT_DIR=export_dir), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(self.url, {"async": "true", "file_format": "jsonl"})
+        self.assertEqual(response.status_code, 202)
+
+        operation = BulkOperation.objects.get(pk=response.data["id"])
+        self.assertEqual(operation.status, BulkOperation.STATUS_COMPLETED)
+        self.assertEqual(operation.success_count, 5)
+        download = self.client.get(f"/api/bulk/operations/{operation.pk}/download/")
+        lines = b"".join(download.streaming_content).decode("utf-8").splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], [log.pk for log in self.logs])
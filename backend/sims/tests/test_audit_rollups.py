@@ -0,0 +1,198 @@
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from sims.audit.models import ActivityLog, ActivityLogDailyRollup, AuditReport
+from sims.audit.partitions import Partition, RangeDeleteBackend, archive_partitions, add_months
+from sims.audit.rollups import rollup_pending_days, summarize_activity
+
+User = get_user_model()
+
+
+def _raw_summary(start, end, include_sensitive=False):
+    queryset = ActivityLog.objects.filter(created_at__range=(start, end))
+    if not include_sensitive:
+        queryset = queryset.filter(is_sensitive=False)
+    by_action = {}
+    by_actor = {}
+    for log in queryset:
+        by_action[log.action] = by_action.get(log.action, 0) + 1
+        if log.actor_id:
+            by_actor[log.actor_id] = by_actor.get(log.actor_id, 0) + 1
+    return queryset.count(), by_action, by_actor
+
+
+class ActivityLogRollupTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username="rollup_alice")
+        self.bob = User.objects.create_user(username="rollup_bob")
+        ActivityLog.objects.all().delete()
+        self.today = timezone.localdate()
+        self.midnight = timezone.make_aware(datetime.combine(self.today, datetime.min.time()))
+
+    def _log(self, days_ago, hour, *, actor=None, action="update", verb="User:1", sensitive=False):
+        return ActivityLog.objects.create(
+            actor=actor,
+            action=action,
+            verb=verb,
+            is_sensitive=sensitive,
+            created_at=self.midnight - timedelta(days=days_ago) + timedelta(hours=hour),
+        )
+
+    def _seed(self):
+        self._log(5, 1, actor=self.alice, verb="User:10")
+        self._log(5, 2, actor=self.alice, verb="User:11")
+        self._log(5, 3, actor=self.bob, action="view", verb="viewed_home")
+        self._log(3, 23, actor=self.bob, action="create", verb="Hospital:4")
+        self._log(3, 4, actor=self.alice, sensitive=True)
+        self._log(1, 12, actor=self.alice, action="export", verb="export_csv")
+        self._log(0, 1, actor=self.bob)
+
+    def test_closed_days_roll_up_by_verb_family_and_today_is_left_raw(self):
+        self._seed()
+
+        self.assertEqual(rollup_pending_days(), 3)
+
+        day = self.today - timedelta(days=5)
+        rows = {
+            (row.action, row.actor_id, row.verb): row.count
+            for row in ActivityLogDailyRollup.objects.filter(day=day)
+        }
+        self.assertEqual(rows, {("update", self.alice.id, "User"): 2, ("view", self.bob.id, "viewed_home"): 1})
+        self.assertFalse(ActivityLogDailyRollup.objects.filter(day=self.today).exists())
+        self.assertEqual(rollup_pending_days(), 0)
+
+    def test_summary_from_rollups_matches_raw_rows(self):
+        self._seed()
+        ranges = [
+            (self.midnight - timedelta(days=6), self.midnight + timedelta(hours=2)),
+            (self.midnight - timedelta(days=5, hours=-2), self.midnight - timedelta(days=3, hours=-5)),
+            (self.midnight - timedelta(days=3), self.midnight - timedelta(microseconds=1)),
+        ]
+        expected = {}
+        for start, end in ranges:
+            for sensitive in (False, True):
+                expected[(start, end, sensitive)] = summarize_activity(start, end, include_sensitive=sensitive)
+
+        rollup_pending_days()
+
+        for (start, end, sensitive), before in expected.items():
+            after = summarize_activity(start, end, include_sensitive=sensitive)
+            self.assertEqual(after, before)
+            total, by_action, by_actor = _raw_summary(start, end, sensitive)
+            self.assertEqual(after["total"], total)
+            self.assertEqual(after["by_action"], by_action)
+            self.assertEqual({row["actor_id"]: row["count"] for row in after["top_users"]}, by_actor)
+
+    def test_rolled_up_days_are_not_scanned_raw(self):
+        self._seed()
+        rollup_pending_days()
+        start, end = self.midnight - timedelta(days=6), self.midnight - timedelta(microseconds=1)
+        # Raw rows of rolled-up days no longer matter to the summary.
+        ActivityLog.objects.filter(created_at__lt=self.midnight).update(action="delete")
+
+        summary = summarize_activity(start, end)
+
+        self.assertEqual(summary["total"], 5)
+        self.assertNotIn("delete", summary["by_action"])
+
+    def test_report_generation_uses_rollups(self):
+        self._seed()
+        rollup_pending_days()
+        start, end = self.midnight - timedelta(days=6), self.midnight + timedelta(hours=2)
+
+        report = AuditReport.generate(start=start, end=end, created_by=self.alice)
+
+        self.assertEqual(report.payload["total"], 6)
+        self.assertEqual(report.payload["by_action"], {"create": 1, "export": 1, "update": 3, "view": 1})
+        self.assertEqual(report.payload["top_users"][0], {"actor_id": self.alice.id, "count": 3})
+
+
+class ActivityLogArchiveTests(TestCase):
+    def setUp(self):
+        ActivityLog.objects.all().delete()
+        self.archive_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        this_month = timezone.localdate().replace(day=1)
+        self.old_month = add_months(this_month, -3)
+        self.kept_month = add_months(this_month, -1)
+        for month, count in ((self.old_month, 3), (self.kept_month, 2)):
+            for index in range(count):
+                ActivityLog.objects.create(
+                    action="view",
+                    verb=f"viewed_{index}",
+                    metadata={"index": index},
+                    created_at=timezone.make_aware(datetime.combine(month, datetime.min.time()))
+                    + timedelta(days=1, hours=index),
+                )
+
+    def test_range_delete_backend_lists_months_as_partitions(self):
+        self.assertEqual(
+            RangeDeleteBackend().partitions(),
+            [Partition.for_month(self.old_month), Partition.for_month(self.kept_month)],
+        )
+
+    def test_dry_run_reports_without_archiving(self):
+        archived = archive_partitions(retain_months=2, archive_dir=self.archive_dir, dry_run=True)
+
+        self.assertEqual([(item.partition.start, item.rows) for item in archived], [(self.old_month, 3)])
+        self.assertEqual(ActivityLog.objects.count(), 5)
+        self.assertEqual(list(self.archive_dir.iterdir()), [])
+
+    def test_cold_months_move_to_compressed_jsonl_and_stay_in_reports(self):
+        start = timezone.make_aware(datetime.combine(self.old_month, datetime.min.time()))
+        end = timezone.now()
+        before = summarize_activity(start, end)
+
+        archived = archive_partitions(retain_months=2, archive_dir=self.archive_dir)
+
+        self.assertEqual(len(archived), 1)
+        self.assertEqual(archived[0].path.name, f"audit_activitylog_y{self.old_month:%Y}m{self.old_month:%m}.jsonl.gz")
+        with gzip.open(archived[0].path, "rt", encoding="utf-8") as handle:
+            rows = [json.loads(line) for line in handle]
+        self.assertEqual([row["verb"] for row in rows], ["viewed_0", "viewed_1", "viewed_2"])
+        self.assertEqual(rows[2]["metadata"], {"index": 2})
+        self.assertEqual(ActivityLog.objects.count(), 2)
+        self.assertEqual(summarize_activity(start, end), before)
+
+
+class ActivityLogMetadataFilterTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="audit_admin", password="x", email="a@example.com")
+        ActivityLog.objects.all().delete()
+        ActivityLog.objects.create(action="update", verb="User:1", metadata={"history_id": 7, "field": "email"})
+        ActivityLog.objects.create(action="update", verb="User:2", metadata={"history_id": 8, "field": "name"})
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _verbs(self, **params):
+        response = self.client.get(reverse("activity-log-list"), params)
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"] if isinstance(response.data, dict) else response.data
+        return sorted(row["verb"] for row in results)
+
+    def test_filters_by_metadata_key_and_json_value(self):
+        self.assertEqual(self._verbs(metadata_key="field", metadata_value="email"), ["User:1"])
+        self.assertEqual(self._verbs(metadata_key="history_id", metadata_value="8"), ["User:2"])
+
+    def test_double_underscore_key_is_matched_literally(self):
+        ActivityLog.objects.create(action="update", verb="User:3", metadata={"field__icontains": "mail"})
+
+        self.assertEqual(self._verbs(metadata_key="field__icontains", metadata_value="mail"), ["User:3"])
+        self.assertEqual(self._verbs(metadata_key="field__icontains", metadata_value="x"), [])
+
+    def test_lookup_named_keys_match_literally(self):
+        ActivityLog.objects.create(action="update", verb="User:3", metadata={"has_keys": 5, "isnull": True})
+
+        self.assertEqual(self._verbs(metadata_key="has_keys", metadata_value="5"), ["User:3"])
+        self.assertEqual(self._verbs(metadata_key="contains", metadata_value="5"), [])
+        self.assertEqual(self._verbs(metadata_key="isnull", metadata_value="false"), [])
@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from sims.audit.middleware import ActivityLogBufferMiddleware
+from sims.audit.models import ActivityLog
+from sims.audit.writer import buffered_activity_log, current_buffer
+
+User = get_user_model()
+
+
+class BufferedActivityLogTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="audit_writer_user")
+        ActivityLog.objects.all().delete()
+
+    def _log(self, verb):
+        return ActivityLog.log(actor=self.user, action="update", verb=verb)
+
+    def test_entries_are_written_in_one_insert_when_the_block_exits(self):
+        with buffered_activity_log(asynchronous=False):
+            with self.assertNumQueries(0):
+                for index in range(5):
+                    self._log(f"buffered-{index}")
+            self.assertEqual(ActivityLog.objects.count(), 0)
+            with self.assertNumQueries(1):
+                current_buffer().flush()
+
+        self.assertEqual(
+            sorted(ActivityLog.objects.values_list("verb", flat=True)),
+            [f"buffered-{index}" for index in range(5)],
+        )
+
+    def test_without_a_buffer_entries_are_saved_immediately(self):
+        self._log("immediate")
+        self.assertTrue(ActivityLog.objects.filter(verb="immediate").exists())
+
+    def test_entries_from_a_rolled_back_savepoint_are_dropped(self):
+        with buffered_activity_log(asynchronous=False):
+            self._log("kept")
+            try:
+                with transaction.atomic():
+                    self._log("rolled-back")
+                    raise RuntimeError("abort")
+            except RuntimeError:
+                pass
+            with transaction.atomic():
+                self._log("kept-savepoint")
+
+        self.assertEqual(
+            sorted(ActivityLog.objects.values_list("verb", flat=True)),
+            ["kept", "kept-savepoint"],
+        )
+
+    @override_settings(AUDIT_LOG_BATCH_SIZE=2)
+    def test_buffer_flushes_every_batch_size_entries(self):
+        with buffered_activity_log(asynchronous=False):
+            for index in range(3):
+                self._log(f"batch-{index}")
+            self.assertEqual(ActivityLog.objects.count(), 2)
+        self.assertEqual(ActivityLog.objects.count(), 3)
+
+    def test_nested_blocks_share_the_outer_buffer(self):
+        with buffered_activity_log(asynchronous=False) as outer:
+            with buffered_activity_log() as inner:
+                self._log("nested")
+            self.assertIs(inner, outer)
+            self.assertEqual(ActivityLog.objects.count(), 0)
+        self.assertEqual(ActivityLog.objects.count(), 1)
+
+    def test_asynchronous_mode_hands_the_batch_to_celery_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with buffered_activity_log(asynchronous=True):
+                self._log("async")
+            self.assertEqual(ActivityLog.objects.count(), 0)
+
+        self.assertTrue(callbacks)
+        entry = ActivityLog.objects.get(verb="async")
+        self.assertEqual(entry.actor, self.user)
+        self.assertEqual(entry.action, "update")
+
+    def test_middleware_writes_the_request_batch_before_returning(self):
+        def view(request):
+            self._log("request-1")
+            self._log("request-2")
+            self.assertEqual(ActivityLog.objects.count(), 0)
+            return HttpResponse("ok")
+
+        response = ActivityLogBufferMiddleware(view)(RequestFactory().get("/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ActivityLog.objects.count(), 2)
+        self.assertIsNone(current_buffer())
@@ -1,4 +1,6 @@
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from sims.bulk.services import BulkService
 from sims.training.models import (
@@ -90,3 +92,54 @@ class BulkServicesTests(TestCase):
         file.name = "logbook.csv"
         operation = self.service.import_logbook_entries(file, dry_run=False)
         self.assertEqual(operation.success_count, 1)
+
+    def test_import_logbook_entries_query_count_is_constant(self):
+        def run(count):
+            body = "".join(f"{self.pg.username},Case {i},2026-01-01,draft\n" for i in range(count))
+            file = io.BytesIO(("pg_username,case_title,date,status\n" + body).encode('utf-8'))
+            file.name = "logbook.csv"
+            with CaptureQueriesContext(connection) as ctx:
+                operation = self.service.import_logbook_entries(file, dry_run=False)
+            self.assertEqual(operation.success_count, count)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run(2), run(6))
+        self.assertEqual(LogbookEntry.objects.filter(resident_training_record=self.rtr).count(), 8)
+        self.assertEqual(LogbookEntry.history.filter(resident_training_record=self.rtr).count(), 8)
+
+    def test_import_logbook_entries_mirrors_history_to_activity_log(self):
+        from sims.audit.models import ActivityLog
+
+        csv_content = f"pg_username,case_title,date,status\n{self.pg.username},Case A,2026-01-01,draft\n{self.pg.username},Case B,2026-01-02,draft\n"
+        file = io.BytesIO(csv_content.encode('utf-8'))
+        file.name = "logbook.csv"
+        self.service.import_logbook_entries(file, dry_run=False)
+
+        history_ids = set(LogbookEntry.history.filter(resident_training_record=self.rtr).values_list("history_id", flat=True))
+        logs = ActivityLog.objects.filter(action="create", verb__startswith="HistoricalLogbookEntry:")
+        self.assertEqual({log.metadata["history_id"] for log in logs}, history_ids)
+        self.assertTrue(all(log.actor_id == self.admin.pk for log in logs))
+
+    def test_all_or_nothing_import_rolls_back_when_the_last_chunk_fails(self):
+        from unittest import mock
+        from django.db import IntegrityError
+        from simple_history.utils import bulk_create_with_history
+
+        calls = []
+
+        def failing_on_remainder(objs, model, **kwargs):
+            calls.append(len(objs))
+            if len(calls) == 2:
+                raise IntegrityError("remainder rejected")
+            return bulk_create_with_history(objs, model, **kwargs)
+
+        body = "".join(f"{self.pg.username},Case {i},2026-01-01,draft\n" for i in range(3))
+        file = io.BytesIO(("pg_username,case_title,date,status\n" + body).encode('utf-8'))
+        file.name = "logbook.csv"
+        service = BulkService(self.admin, chunk_size=2)
+        with mock.patch("simple_history.utils.bulk_create_with_history", failing_on_remainder):
+            with self.assertRaises(IntegrityError):
+                service.import_logbook_entries(file, dry_run=False)
+
+        self.assertEqual(calls, [2, 1])
+        self.assertFalse(LogbookEntry.objects.filter(resident_training_record=self.rtr).exists())
@@ -1,6 +1,8 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from sims.bulk.userbase_engine import (
     import_entity, parse_tabular_rows, _generate_username, _split_name, _normalize_specialty
 )
@@ -92,6 +94,34 @@ class BulkUserbaseEngineExtendedTests(TestCase):
             ).exists()
         )
 
+    def test_dry_run_lookups_do_not_scale_with_rows(self):
+        def run(count):
+            header = "supervisor_email,resident_email,department_code,active\n"
+            body = "".join("sup1@test.com,res1@test.com,D1,true\n" for _ in range(count))
+            file = io.BytesIO((header + body).encode("utf-8"))
+            file.name = "links.csv"
+            with CaptureQueriesContext(connection) as ctx:
+                result = import_entity(self.admin, "supervision-links", file, dry_run=True, allow_partial=False)
+            self.assertEqual(len(result["successes"]), count)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run(2), run(12))
+
+    def test_generated_usernames_are_reserved_within_one_import(self):
+        User.objects.create_user(username="sam.lee")
+        csv_content = "email,full_name,role,specialty,year,training_start,department_code\n" \
+                      "sam1@test.com,Sam Lee,resident,medicine,1,2026-01-01,D1\n" \
+                      "sam2@test.com,Sam Lee,resident,medicine,1,2026-01-01,D1\n"
+        file = io.BytesIO(csv_content.encode('utf-8'))
+        file.name = "res.csv"
+
+        result = import_entity(self.admin, "residents", file, dry_run=False, allow_partial=False)
+        self.assertEqual(len(result["successes"]), 2)
+        self.assertEqual(
+            set(User.objects.filter(email__in=["sam1@test.com", "sam2@test.com"]).values_list("username", flat=True)),
+            {"sam.lee2", "sam.lee3"},
+        )
+
     def test_excel_parsing(self):
         df = pd.DataFrame([
             {"hospital_code": "H2", "hospital_name": "Hospital Two", "active": "true"}
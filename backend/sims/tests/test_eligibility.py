@@ -54,3 +54,312 @@ class EligibilityTests(TestCase):
         self.assertTrue(ResidentMilestoneEligibility.objects.filter(
             resident_training_record=self.rtr, milestone=self.milestone_imm
         ).exists())
+
+
+class CohortEligibilityTests(TestCase):
+    """The cohort engine must match per-record results in a fixed query budget."""
+
+    def setUp(self):
+        from django.utils import timezone
+        from sims.academics.models import Department
+        from sims.rotations.models import Hospital, HospitalDepartment
+        from sims.training.models import (
+            LogbookEntry,
+            LogbookThresholdConfig,
+            ProgramMilestoneLogbookRequirement,
+            ProgramMilestoneResearchRequirement,
+            ProgramMilestoneWorkshopRequirement,
+            ProgramRotationRequirement,
+            ResidentSubmission,
+            ResidentWorkshopCompletion,
+            RotationAssignment,
+            RotationCompletion,
+            Workshop,
+        )
+
+        self.department = Department.objects.create(name="Surgery", code="SUR-COH")
+        hospital = Hospital.objects.create(name="Cohort Hospital", code="COH-H")
+        hospital_department = HospitalDepartment.objects.create(
+            hospital=hospital, department=self.department
+        )
+        self.program = TrainingProgram.objects.create(
+            name="Surgery", code="SUR_COH", duration_months=48
+        )
+        imm = ProgramMilestone.objects.create(program=self.program, name="IMM", code="IMM")
+        final = ProgramMilestone.objects.create(program=self.program, name="Final", code="FINAL")
+        ProgramMilestoneResearchRequirement.objects.create(
+            milestone=imm,
+            requires_synopsis_approved=True,
+            requires_synopsis_submitted_to_university=True,
+        )
+        ProgramMilestoneResearchRequirement.objects.create(
+            milestone=final, requires_thesis_submitted=True
+        )
+        workshop = Workshop.objects.create(name="Basic Surgical Skills", code="BSS-COH")
+        ProgramMilestoneWorkshopRequirement.objects.create(
+            milestone=imm, workshop=workshop, required_count=2
+        )
+        ProgramMilestoneLogbookRequirement.objects.create(
+            milestone=imm, procedure_key="appendicectomy", min_entries=2
+        )
+        ProgramRotationRequirement.objects.create(program=self.program, department=self.department)
+        LogbookThresholdConfig.objects.create(
+            name="Monthly", mode=LogbookThresholdConfig.MODE_PER_PERIOD,
+            period_days=30, min_approved_entries=2,
+        )
+        LogbookThresholdConfig.objects.create(
+            name="Per rotation", min_approved_entries=1, program=self.program,
+            department=self.department,
+        )
+
+        self.records = []
+        for index in range(4):
+            user = User.objects.create_user(
+                username=f"pg_cohort_{index}", role="RESIDENT",
+                home_department=self.department if index % 2 == 0 else None,
+            )
+            rtr = ResidentTrainingRecord.objects.create(
+                resident_user=user, program=self.program,
+                start_date=date.today() - timedelta(days=400), active=True,
+            )
+            self.records.append(rtr)
+            for _ in range(index):
+                ResidentWorkshopCompletion.objects.create(
+                    resident_training_record=rtr, workshop=workshop, completed_at=date.today()
+                )
+            if index >= 1:
+                rotation = RotationAssignment.objects.create(
+                    resident_training=rtr, hospital_department=hospital_department,
+                    start_date=date.today() - timedelta(days=60), end_date=date.today(),
+                    status=RotationAssignment.STATUS_COMPLETED,
+                )
+                for _ in range(index - 1):
+                    LogbookEntry.objects.create(
+                        resident_training_record=rtr, rotation_assignment=rotation,
+                        patient_id_number="P-1", diagnosis="Acute Appendicectomy case",
+                        patient_seen_at=timezone.now(), status=LogbookEntry.STATUS_APPROVED,
+                        approved_at=timezone.now(),
+                    )
+                if index == 3:
+                    RotationCompletion.objects.create(
+                        rotation=rotation, status=RotationCompletion.STATUS_VERIFIED
+                    )
+            if index == 2:
+                ResidentSubmission.objects.create(
+                    resident_training_record=rtr,
+                    submission_type=ResidentSubmission.TYPE_SYNOPSIS,
+                    status=ResidentSubmission.STATUS_CERTIFICATE_ISSUED,
+                )
+
+    def test_cohort_matches_single_record_results(self):
+        from sims.training.eligibility import recompute_for_records
+
+        expected = {
+            rtr.pk: [
+                compute_milestone_eligibility(rtr, milestone)
+                for milestone in ProgramMilestone.objects.filter(program=self.program)
+            ]
+            for rtr in self.records
+        }
+        results = recompute_for_records(self.records)
+        for rtr in self.records:
+            self.assertEqual(
+                [{"status": r["status"], "reasons": r["reasons"]} for r in results[rtr.pk]],
+                expected[rtr.pk],
+            )
+            rows = ResidentMilestoneEligibility.objects.filter(
+                resident_training_record=rtr
+            ).order_by("milestone__code")
+            self.assertEqual(
+                {row.milestone.code: row.reasons_json for row in rows},
+                {r["milestone_code"]: r["reasons"] for r in results[rtr.pk]},
+            )
+
+        first = results[self.records[0].pk]
+        self.assertEqual(first[0]["milestone_code"], "FINAL")
+        self.assertEqual(
+            first[0]["reasons"],
+            [
+                "Thesis submission not yet verified",
+                "Logbook threshold 'Monthly' not met: 0/2",
+                "Logbook threshold 'Per rotation' not met: no eligible rotation found",
+                "Verified rotations: 0/1 mandatory completed",
+            ],
+        )
+        self.assertEqual(
+            results[self.records[2].pk][1]["reasons"],
+            [
+                "Logbook requirement 'appendicectomy': 1/2 approved entries",
+                "Logbook threshold 'Monthly' not met: 1/2",
+            ],
+        )
+
+    def test_recompute_is_idempotent_upsert(self):
+        from sims.training.eligibility import recompute_for_records
+
+        recompute_for_records(self.records)
+        recompute_for_records(self.records)
+        self.assertEqual(
+            ResidentMilestoneEligibility.objects.filter(
+                resident_training_record__in=self.records
+            ).count(),
+            len(self.records) * 2,
+        )
+
+    def test_query_count_is_independent_of_cohort_size(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from sims.training.eligibility import recompute_for_records
+
+        with CaptureQueriesContext(connection) as single:
+            recompute_for_records(self.records[:1])
+        with CaptureQueriesContext(connection) as cohort:
+            recompute_for_records(self.records)
+        self.assertEqual(len(cohort.captured_queries), len(single.captured_queries))
+
+
+class EligibilityRecomputeQueueTests(TestCase):
+    """Signals only mark records stale; the task drains the queue."""
+
+    def setUp(self):
+        self.pg = User.objects.create_user(username="pg_queue", role="RESIDENT")
+        self.program = TrainingProgram.objects.create(name="Queue", code="QUEUE", duration_months=48)
+        self.rtr = ResidentTrainingRecord.objects.create(
+            resident_user=self.pg, program=self.program,
+            start_date=date.today() - timedelta(days=100), active=True,
+        )
+        self.milestone = ProgramMilestone.objects.create(
+            program=self.program, name="IMM", code="IMM"
+        )
+        from sims.training.models import ProgramMilestoneResearchRequirement
+        ProgramMilestoneResearchRequirement.objects.create(
+            milestone=self.milestone, requires_synopsis_approved=True
+        )
+
+    def _is_marked(self):
+        from sims.training.models import EligibilityRecomputeMark
+        return EligibilityRecomputeMark.objects.filter(resident_training_record=self.rtr).exists()
+
+    def test_research_save_marks_stale_without_recomputing(self):
+        recompute_for_record(self.rtr)
+        self.assertFalse(self._is_marked())
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            ResidentResearchProject.objects.create(
+                resident_training_record=self.rtr, title="Queued",
+                status=ResidentResearchProject.STATUS_APPROVED_SUPERVISOR,
+            )
+        self.assertTrue(self._is_marked())
+        self.assertEqual(len(callbacks), 1)
+        row = ResidentMilestoneEligibility.objects.get(resident_training_record=self.rtr)
+        self.assertEqual(row.status, ResidentMilestoneEligibility.STATUS_NOT_READY)
+
+    def test_task_recomputes_marked_records_once(self):
+        from django.core.cache import cache
+        from sims.training.eligibility import RECOMPUTE_SCHEDULED_CACHE_KEY
+
+        recompute_for_record(self.rtr)
+        cache.delete(RECOMPUTE_SCHEDULED_CACHE_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            ResidentResearchProject.objects.create(
+                resident_training_record=self.rtr, title="Queued",
+                status=ResidentResearchProject.STATUS_APPROVED_SUPERVISOR,
+            )
+        self.assertFalse(self._is_marked())
+        row = ResidentMilestoneEligibility.objects.get(resident_training_record=self.rtr)
+        self.assertEqual(row.status, ResidentMilestoneEligibility.STATUS_ELIGIBLE)
+
+    def test_burst_schedules_a_single_task(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from sims.training.eligibility import (
+            RECOMPUTE_SCHEDULED_CACHE_KEY,
+            schedule_stale_recompute,
+        )
+
+        cache.delete(RECOMPUTE_SCHEDULED_CACHE_KEY)
+        with mock.patch("sims.training.tasks.recompute_stale_eligibility.apply_async") as apply_async:
+            self.assertTrue(schedule_stale_recompute())
+            self.assertFalse(schedule_stale_recompute())
+        apply_async.assert_called_once()
+        cache.delete(RECOMPUTE_SCHEDULED_CACHE_KEY)
+
+    def test_eligibility_view_serves_snapshot_with_stale_flag(self):
+        from rest_framework.test import APIClient
+
+        recompute_for_record(self.rtr)
+        ResidentResearchProject.objects.create(
+            resident_training_record=self.rtr, title="Queued",
+            status=ResidentResearchProject.STATUS_APPROVED_SUPERVISOR,
+        )
+        client = APIClient()
+        client.force_authenticate(self.pg)
+        response = client.get("/api/my/eligibility/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["eligibility_stale"])
+        self.assertEqual(
+            response.data["eligibilities"][0]["status"],
+            ResidentMilestoneEligibility.STATUS_NOT_READY,
+        )
+
+    def _assert_edit_marks_stale(self, edit):
+        from sims.training.models import EligibilityRecomputeMark
+
+        recompute_for_record(self.rtr)
+        EligibilityRecomputeMark.objects.all().delete()
+        edit()
+        self.assertTrue(self._is_marked())
+
+    def test_program_edit_marks_records_stale(self):
+        self.program.name = "Queue (renamed)"
+        self._assert_edit_marks_stale(self.program.save)
+
+    def test_milestone_edit_marks_records_stale(self):
+        self.milestone.recommended_month = 12
+        self._assert_edit_marks_stale(self.milestone.save)
+
+    def test_record_program_change_marks_record_stale(self):
+        other = TrainingProgram.objects.create(name="Other", code="QUEUE2", duration_months=36)
+
+        def move():
+            self.rtr.program = other
+            self.rtr.save()
+
+        self._assert_edit_marks_stale(move)
+
+    def test_workshop_requirement_change_marks_records_stale(self):
+        from sims.training.models import ProgramMilestoneWorkshopRequirement, Workshop
+
+        workshop = Workshop.objects.create(name="BLS", code="BLS_Q")
+        self._assert_edit_marks_stale(
+            lambda: ProgramMilestoneWorkshopRequirement.objects.create(
+                milestone=self.milestone, workshop=workshop, required_count=1
+            )
+        )
+
+    def test_research_requirement_change_marks_records_stale(self):
+        requirement = self.milestone.research_requirement
+        requirement.requires_thesis_submitted = True
+        self._assert_edit_marks_stale(requirement.save)
+
+    def test_logbook_requirement_change_marks_records_stale(self):
+        from sims.training.models import ProgramMilestoneLogbookRequirement
+
+        self._assert_edit_marks_stale(
+            lambda: ProgramMilestoneLogbookRequirement.objects.create(
+                milestone=self.milestone, category="Procedures", min_entries=5
+            )
+        )
+
+    def test_threshold_config_change_marks_records_stale(self):
+        from sims.training.models import LogbookThresholdConfig
+
+        config = LogbookThresholdConfig.objects.create(name="Scoped", program=self.program)
+        self._assert_edit_marks_stale(lambda: config.delete())
+
+    def test_global_threshold_config_marks_every_program_stale(self):
+        from sims.training.models import LogbookThresholdConfig
+
+        self._assert_edit_marks_stale(
+            lambda: LogbookThresholdConfig.objects.create(name="Global", min_approved_entries=3)
+        )
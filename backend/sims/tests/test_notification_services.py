@@ -82,8 +82,8 @@ class NotificationServicesTests(TestCase):
         self.assertEqual(serialised["obj_id"], self.user.pk)
         self.assertIsInstance(serialised["date"], str)
 
-    @patch("sims.notifications.services.NotificationService.send")
-    def test_upcoming_rotation_deadlines(self, mock_send):
+    @patch("sims.notifications.services.NotificationService.send_bulk")
+    def test_upcoming_rotation_deadlines(self, mock_send_bulk):
         from sims.training.models import TrainingProgram, ResidentTrainingRecord, RotationAssignment
         from sims.rotations.models import Hospital, HospitalDepartment
         from sims.academics.models import Department
@@ -106,6 +106,104 @@ class NotificationServicesTests(TestCase):
         
         count = self.service.upcoming_rotation_deadlines(days=3)
         self.assertEqual(count, 1)
-        mock_send.assert_called_once()
+        mock_send_bulk.assert_called_once()
+        messages = mock_send_bulk.call_args.args[0]
+        self.assertEqual([message.recipient for message in messages], [self.user])
+        self.assertEqual(messages[0].context["rotation"], rotation)
         
 from django.utils import timezone
+
+
+class NotificationFanOutTests(TestCase):
+    def setUp(self):
+        self.actor = User.objects.create_user(username="fanout_actor")
+        self.recipients = [
+            User.objects.create_user(username=f"fanout_{index}", email=f"fanout{index}@example.com")
+            for index in range(4)
+        ]
+        pref = NotificationPreference.for_user(self.recipients[0])
+        pref.email_enabled = False
+        pref.save()
+        self.service = NotificationService(actor=self.actor)
+
+    def _messages(self):
+        from sims.notifications.services import NotificationMessage
+
+        return [
+            NotificationMessage(recipient=user, title=f"Reminder {user.username}", context={"days": 2})
+            for user in self.recipients
+        ]
+
+    def test_send_bulk_writes_in_app_rows_in_one_insert(self):
+        messages = self._messages()
+        # preference lookup, missing-preference insert, bulk insert (+ savepoint pair)
+        with self.assertNumQueries(5):
+            result = self.service.send_bulk(
+                messages,
+                verb="rotation-ending",
+                template="emails/rotation_deadline",
+                channels=[Notification.CHANNEL_IN_APP],
+            )
+
+        self.assertEqual(result.in_app, 4)
+        notifications = Notification.objects.filter(verb="rotation-ending")
+        self.assertEqual(
+            sorted(notifications.values_list("title", flat=True)),
+            sorted(message.title for message in messages),
+        )
+        self.assertIn("Days remaining: 2", notifications.first().body)
+        self.assertEqual(NotificationPreference.objects.filter(user__in=self.recipients).count(), 4)
+
+    def test_send_bulk_emails_share_one_connection_and_respect_preferences(self):
+        from django.core import mail
+
+        with patch("sims.notifications.services.get_connection", wraps=mail.get_connection) as connections:
+            result = self.service.send_bulk(
+                self._messages(),
+                verb="rotation-ending",
+                template="emails/rotation_deadline",
+                channels=[Notification.CHANNEL_EMAIL],
+            )
+
+        self.assertEqual(connections.call_count, 1)
+        self.assertEqual(result.email, 3)
+        self.assertEqual(result.skipped, 1)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [f"fanout{index}@example.com" for index in range(1, 4)],
+        )
+        self.assertTrue(all(message.alternatives for message in mail.outbox))
+
+    def test_send_bulk_keeps_going_after_a_failed_email_batch(self):
+        from django.core import mail
+        from django.core.mail.backends.locmem import EmailBackend
+
+        send_messages = EmailBackend.send_messages
+        batches = []
+
+        def flaky(backend, messages):
+            batches.append(len(messages))
+            if len(batches) == 1:
+                raise ConnectionError("smtp dropped")
+            return send_messages(backend, messages)
+
+        with patch("sims.notifications.services.email_batch_size", return_value=1), patch.object(
+            EmailBackend, "send_messages", flaky
+        ):
+            result = self.service.send_bulk(
+                self._messages(),
+                verb="rotation-ending",
+                template="emails/rotation_deadline",
+                channels=[Notification.CHANNEL_EMAIL],
+            )
+
+        self.assertEqual(batches, [1, 1, 1])
+        self.assertEqual(result.email, 2)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_deadline_sweep_is_scheduled_in_celery_beat(self):
+        from sims_project.celery import app
+
+        tasks = {entry["task"] for entry in app.conf.beat_schedule.values()}
+        self.assertIn("sims.notifications.tasks.send_rotation_deadline_reminders", tasks)
@@ -0,0 +1,108 @@
+"""
+Materialized resident dashboard snapshots.
+
+``ResidentSummaryView`` assembles its payload from many queries. The result is
+persisted per training record in ``ResidentDashboardSnapshot`` and served as a
+single indexed read until a domain event (see ``sims.training.signals``) bumps
+the snapshot version. Each payload carries a content-derived ETag so clients
+can revalidate with ``If-None-Match`` and receive 304s.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Callable, Iterable
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+
+# Bump when the payload shape changes so existing snapshots are rebuilt.
+SNAPSHOT_SCHEMA_VERSION = 1
+
+
+def _compute_etag(payload: dict) -> str:
+    digest = hashlib.sha256(
+        json.dumps(payload, sort_keys=True, cls=DjangoJSONEncoder).encode("utf-8")
+    ).hexdigest()[:32]
+    return f'"v{SNAPSHOT_SCHEMA_VERSION}-{digest}"'
+
+
+def mark_dashboard_stale(rtr_ids: Iterable[int]) -> int:
+    """Bump the snapshot version of the given training records."""
+    from sims.training.models import ResidentDashboardSnapshot
+
+    ids = {rtr_id for rtr_id in rtr_ids if rtr_id}
+    if not ids:
+        return 0
+    return ResidentDashboardSnapshot.objects.filter(
+        resident_training_record_id__in=ids
+    ).update(version=F("version") + 1)
+
+
+def mark_program_dashboards_stale(program_id) -> int:
+    """Bump every snapshot for residents of a programme (milestone/requirement edits)."""
+    from sims.training.models import ResidentDashboardSnapshot
+
+    if not program_id:
+        return 0
+    return ResidentDashboardSnapshot.objects.filter(
+        resident_training_record__program_id=program_id
+    ).update(version=F("version") + 1)
+
+
+def mark_user_dashboards_stale(user_ids: Iterable[int]) -> int:
+    """Bump snapshots for the training records of the given resident users."""
+    from sims.training.models import ResidentDashboardSnapshot
+
+    ids = {user_id for user_id in user_ids if user_id}
+    if not ids:
+        return 0
+    return ResidentDashboardSnapshot.objects.filter(
+        resident_training_record__resident_user_id__in=ids
+    ).update(version=F("version") + 1)
+
+
+def mark_all_dashboards_stale() -> int:
+    """Bump every snapshot (renamed reference data embedded in many payloads)."""
+    from sims.training.models import ResidentDashboardSnapshot
+
+    return ResidentDashboardSnapshot.objects.update(version=F("version") + 1)
+
+
+def get_resident_dashboard(rtr, build: Callable[[], dict]) -> tuple[dict, str]:
+    """
+    Return ``(payload, etag)`` for a training record's dashboard.
+
+    Serves the stored snapshot when it is current; otherwise calls ``build``
+    and persists the result against the version observed before building, so
+    an event that lands mid-build still forces the next read to rebuild.
+    """
+    from sims.training.models import ResidentDashboardSnapshot
+
+    today = timezone.now().date()
+    snapshot = ResidentDashboardSnapshot.objects.filter(resident_training_record=rtr).first()
+    if (
+        snapshot is not None
+        and snapshot.built_version == snapshot.version
+        and snapshot.schema_version == SNAPSHOT_SCHEMA_VERSION
+        and snapshot.built_on == today
+    ):
+        return snapshot.payload, snapshot.etag
+
+    if snapshot is None:
+        snapshot, _ = ResidentDashboardSnapshot.objects.get_or_create(resident_training_record=rtr)
+    start_version = snapshot.version
+
+    # Round-trip through JSON so fresh and stored responses are identical.
+    payload = json.loads(json.dumps(build(), cls=DjangoJSONEncoder))
+    etag = _compute_etag(payload)
+    ResidentDashboardSnapshot.objects.filter(resident_training_record=rtr).update(
+        payload=payload,
+        etag=etag,
+        built_version=start_version,
+        schema_version=SNAPSHOT_SCHEMA_VERSION,
+        built_on=today,
+        updated_at=timezone.now(),
+    )
+    return payload, etag
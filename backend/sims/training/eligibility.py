@@ -4,55 +4,269 @@ Eligibility computation engine for residency milestones.
 Deterministic, pure-function-based computation of whether a resident
 is ready for a given milestone (IMM / FINAL).
 
+Inputs for a whole cohort of training records are loaded up front in a
+fixed number of grouped/aggregated queries (``EligibilityInputs``) and every
+milestone is then evaluated in memory, so recomputing a full programme costs
+the same handful of round-trips as recomputing a single resident.
+
 Trigger points:
-  - On save of ResidentResearchProject or ResidentThesis
-  - On save of ResidentWorkshopCompletion
+  - Changes to research, thesis, workshop, logbook, submission and rotation
+    records mark the training record stale (``mark_eligibility_stale``); a
+    debounced Celery task recomputes every marked record once per burst
   - Via nightly management command: recompute_eligibility
+
+Read endpoints serve the persisted ResidentMilestoneEligibility rows plus a
+staleness flag (``load_eligibility_snapshot``) instead of recomputing inline.
 """
 from __future__ import annotations
 
 import logging
+from collections import defaultdict
 from datetime import timedelta
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.utils import timezone
 
-from django.db import models
+from sims.training.dashboard import mark_dashboard_stale
 
 logger = logging.getLogger(__name__)
 
+RECOMPUTE_SCHEDULED_CACHE_KEY = "training:eligibility:recompute-scheduled"
+
 if TYPE_CHECKING:
     from sims.training.models import ResidentTrainingRecord, ProgramMilestone
 
 
-def compute_milestone_eligibility(
+def _logbook_requirement_key(lb_req) -> str:
+    return (lb_req.procedure_key or lb_req.category or f"logbook_req_{lb_req.pk}").strip()
+
+
+def _logbook_key_filter(key: str) -> models.Q:
+    return (
+        models.Q(disease_area__icontains=key)
+        | models.Q(diagnosis__icontains=key)
+        | models.Q(clinical_presentation__icontains=key)
+        | models.Q(management_plan__icontains=key)
+    )
+
+
+class EligibilityInputs:
+    """
+    Pre-aggregated eligibility inputs for a cohort of training records.
+
+    ``load()`` issues a constant number of queries regardless of how many
+    records or milestones are involved; lookups afterwards are dict reads.
+    """
+
+    def __init__(self, today=None):
+        self.today = today or timezone.now().date()
+        self.home_department_ids: dict[int, int | None] = {}
+        self.research_status: dict[int, str] = {}
+        self.thesis_status: dict[int, str] = {}
+        self.certificate_types: dict[int, set[str]] = defaultdict(set)
+        self.workshop_counts: dict[tuple[int, int], int] = {}
+        self.logbook_key_counts: dict[tuple[int, str], int] = {}
+        self.logbook_period_counts: dict[tuple[int, int], int] = {}
+        self.rotation_logbook_counts: dict[int, list[int]] = defaultdict(list)
+        self.threshold_configs: list = []
+        self.mandatory_rotation_counts: dict[int, int] = {}
+        self.verified_rotation_counts: dict[int, int] = {}
+
+    @classmethod
+    def load(
+        cls,
+        records: Iterable["ResidentTrainingRecord"],
+        milestones: Iterable["ProgramMilestone"],
+        today=None,
+    ) -> "EligibilityInputs":
+        from sims.training.models import (
+            LogbookEntry,
+            LogbookThresholdConfig,
+            ProgramRotationRequirement,
+            ResidentResearchProject,
+            ResidentSubmission,
+            ResidentThesis,
+            ResidentTrainingRecord,
+            ResidentWorkshopCompletion,
+            RotationAssignment,
+            RotationCompletion,
+        )
+
+        inputs = cls(today=today)
+        records = list(records)
+        milestones = list(milestones)
+        rtr_ids = [rtr.pk for rtr in records]
+        if not rtr_ids:
+            return inputs
+        program_ids = {rtr.program_id for rtr in records}
+
+        inputs.home_department_ids = dict(
+            ResidentTrainingRecord.objects.filter(pk__in=rtr_ids).values_list(
+                "pk", "resident_user__home_department_id"
+            )
+        )
+        inputs.research_status = dict(
+            ResidentResearchProject.objects.filter(
+                resident_training_record_id__in=rtr_ids
+            ).values_list("resident_training_record_id", "status")
+        )
+        inputs.thesis_status = dict(
+            ResidentThesis.objects.filter(
+                resident_training_record_id__in=rtr_ids
+            ).values_list("resident_training_record_id", "status")
+        )
+        for rtr_id, submission_type in (
+            ResidentSubmission.objects.filter(
+                resident_training_record_id__in=rtr_ids,
+                status=ResidentSubmission.STATUS_CERTIFICATE_ISSUED,
+            )
+            .values_list("resident_training_record_id", "submission_type")
+            .distinct()
+        ):
+            inputs.certificate_types[rtr_id].add(submission_type)
+
+        for row in (
+            ResidentWorkshopCompletion.objects.filter(resident_training_record_id__in=rtr_ids)
+            .values("resident_training_record_id", "workshop_id")
+            .annotate(total=models.Count("pk"))
+            .order_by()
+        ):
+            inputs.workshop_counts[
+                (row["resident_training_record_id"], row["workshop_id"])
+            ] = row["total"]
+
+        # Threshold configs are evaluated in their DB ordering; scoping by
+        # program/department happens in memory per record.
+        inputs.threshold_configs = list(
+            LogbookThresholdConfig.objects.filter(is_active=True).filter(
+                models.Q(program__isnull=True) | models.Q(program_id__in=program_ids)
+            )
+        )
+
+        # One grouped query over approved logbook entries yields every
+        # keyword-requirement count and every per-period window count.
+        logbook_keys = sorted(
+            {
+                _logbook_requirement_key(lb_req)
+                for milestone in milestones
+                for lb_req in milestone.logbook_requirements.all()
+            }
+        )
+        period_days = sorted(
+            {
+                cfg.period_days or 30
+                for cfg in inputs.threshold_configs
+                if cfg.mode == LogbookThresholdConfig.MODE_PER_PERIOD
+            }
+        )
+        aggregates = {}
+        for index, key in enumerate(logbook_keys):
+            aggregates[f"key_{index}"] = models.Count(
+                "pk", filter=_logbook_key_filter(key) if key else None
+            )
+        for days in period_days:
+            window_start = inputs.today - timedelta(days=days - 1)
+            aggregates[f"period_{days}"] = models.Count(
+                "pk",
+                filter=models.Q(
+                    approved_at__date__gte=window_start,
+                    approved_at__date__lte=inputs.today,
+                ),
+            )
+        if aggregates:
+            for row in (
+                LogbookEntry.objects.filter(
+                    resident_training_record_id__in=rtr_ids,
+                    status=LogbookEntry.STATUS_APPROVED,
+                )
+                .values("resident_training_record_id")
+                .annotate(**aggregates)
+                .order_by()
+            ):
+                rtr_id = row["resident_training_record_id"]
+                for index, key in enumerate(logbook_keys):
+                    inputs.logbook_key_counts[(rtr_id, key)] = row[f"key_{index}"]
+                for days in period_days:
+                    inputs.logbook_period_counts[(rtr_id, days)] = row[f"period_{days}"]
+
+        if any(
+            cfg.mode != LogbookThresholdConfig.MODE_PER_PERIOD
+            for cfg in inputs.threshold_configs
+        ):
+            for rtr_id, approved_count in (
+                RotationAssignment.objects.filter(
+                    resident_training_id__in=rtr_ids,
+                    status__in=[
+                        RotationAssignment.STATUS_ACTIVE,
+                        RotationAssignment.STATUS_APPROVED,
+                        RotationAssignment.STATUS_COMPLETED,
+                    ],
+                )
+                .annotate(
+                    approved_logbooks=models.Count(
+                        "logbook_entries",
+                        filter=models.Q(
+                            logbook_entries__status=LogbookEntry.STATUS_APPROVED,
+                            logbook_entries__resident_training_record_id=models.F(
+                                "resident_training_id"
+                            ),
+                        ),
+                    )
+                )
+                .values_list("resident_training_id", "approved_logbooks")
+            ):
+                inputs.rotation_logbook_counts[rtr_id].append(approved_count)
+
+        if any(milestone.code == "FINAL" for milestone in milestones):
+            inputs.mandatory_rotation_counts = dict(
+                ProgramRotationRequirement.objects.filter(
+                    program_id__in=program_ids, is_mandatory=True
+                )
+                .values("program_id")
+                .annotate(total=models.Count("pk"))
+                .order_by()
+                .values_list("program_id", "total")
+            )
+            inputs.verified_rotation_counts = dict(
+                RotationCompletion.objects.filter(
+                    rotation__resident_training_id__in=rtr_ids,
+                    status=RotationCompletion.STATUS_VERIFIED,
+                )
+                .values("rotation__resident_training_id")
+                .annotate(total=models.Count("pk"))
+                .order_by()
+                .values_list("rotation__resident_training_id", "total")
+            )
+
+        return inputs
+
+
+def evaluate_milestone(
     rtr: "ResidentTrainingRecord",
     milestone: "ProgramMilestone",
+    inputs: EligibilityInputs,
 ) -> dict:
     """
-    Pure function: compute eligibility status for a resident + milestone.
+    Evaluate one milestone for one record against pre-loaded ``inputs``.
 
-    Returns a dict with keys:
-        status: "NOT_READY" | "PARTIALLY_READY" | "ELIGIBLE"
-        reasons: list[str]  – unmet requirements in deterministic order
+    Issues no queries of its own when the milestone's requirement relations
+    were prefetched.
     """
     from sims.training.models import (
-        LogbookEntry,
         LogbookThresholdConfig,
         ProgramMilestoneResearchRequirement,
-        ProgramRotationRequirement,
         ResidentMilestoneEligibility,
         ResidentResearchProject,
         ResidentSubmission,
         ResidentThesis,
-        RotationAssignment,
-        RotationCompletion,
     )
 
     unmet: list[str] = []
     requirement_checks = 0
-    resident = rtr.resident_user
-    # Deterministic day reference for time-window checks.
-    from django.utils import timezone
-    today = timezone.now().date()
+    rtr_id = rtr.pk
 
     # ---------------------------------------------------------------
     # 1. Research requirements
@@ -62,33 +276,19 @@ def compute_milestone_eligibility(
     except ProgramMilestoneResearchRequirement.DoesNotExist:
         req_research = None
 
-    synopsis_certificate_issued = ResidentSubmission.objects.filter(
-        resident_training_record=rtr,
-        submission_type=ResidentSubmission.TYPE_SYNOPSIS,
-        status=ResidentSubmission.STATUS_CERTIFICATE_ISSUED,
-    ).exists()
-    thesis_certificate_issued = ResidentSubmission.objects.filter(
-        resident_training_record=rtr,
-        submission_type=ResidentSubmission.TYPE_THESIS,
-        status=ResidentSubmission.STATUS_CERTIFICATE_ISSUED,
-    ).exists()
+    certificate_types = inputs.certificate_types.get(rtr_id, set())
+    synopsis_certificate_issued = ResidentSubmission.TYPE_SYNOPSIS in certificate_types
+    thesis_certificate_issued = ResidentSubmission.TYPE_THESIS in certificate_types
 
     if req_research:
-        try:
-            project = rtr.research_project
-        except ResidentResearchProject.DoesNotExist:
-            project = None
+        project_status = inputs.research_status.get(rtr_id)
 
         if req_research.requires_synopsis_approved:
             requirement_checks += 1
-            approved = (
-                project is not None
-                and project.status
-                in (
-                    ResidentResearchProject.STATUS_APPROVED_SUPERVISOR,
-                    ResidentResearchProject.STATUS_SUBMITTED_UNIVERSITY,
-                    ResidentResearchProject.STATUS_ACCEPTED_UNIVERSITY,
-                )
+            approved = project_status in (
+                ResidentResearchProject.STATUS_APPROVED_SUPERVISOR,
+                ResidentResearchProject.STATUS_SUBMITTED_UNIVERSITY,
+                ResidentResearchProject.STATUS_ACCEPTED_UNIVERSITY,
             )
             approved = approved or synopsis_certificate_issued
             if not approved:
@@ -96,7 +296,7 @@ def compute_milestone_eligibility(
 
         if req_research.requires_synopsis_submitted_to_university:
             requirement_checks += 1
-            submitted = project is not None and project.status in (
+            submitted = project_status in (
                 ResidentResearchProject.STATUS_SUBMITTED_UNIVERSITY,
                 ResidentResearchProject.STATUS_ACCEPTED_UNIVERSITY,
             )
@@ -106,11 +306,7 @@ def compute_milestone_eligibility(
 
         if req_research.requires_thesis_submitted:
             requirement_checks += 1
-            try:
-                thesis = rtr.thesis
-                thesis_ok = thesis.status == ResidentThesis.STATUS_SUBMITTED
-            except ResidentThesis.DoesNotExist:
-                thesis_ok = False
+            thesis_ok = inputs.thesis_status.get(rtr_id) == ResidentThesis.STATUS_SUBMITTED
             thesis_ok = thesis_ok or thesis_certificate_issued
             if not thesis_ok:
                 unmet.append("Thesis submission not yet verified")
@@ -118,11 +314,9 @@ def compute_milestone_eligibility(
     # ---------------------------------------------------------------
     # 2. Workshop requirements
     # ---------------------------------------------------------------
-    for w_req in milestone.workshop_requirements.select_related("workshop").all():
+    for w_req in milestone.workshop_requirements.all():
         requirement_checks += 1
-        completed_count = rtr.workshop_completions.filter(
-            workshop=w_req.workshop
-        ).count()
+        completed_count = inputs.workshop_counts.get((rtr_id, w_req.workshop_id), 0)
         if completed_count < w_req.required_count:
             shortfall = w_req.required_count - completed_count
             unmet.append(
@@ -134,22 +328,10 @@ def compute_milestone_eligibility(
     # ---------------------------------------------------------------
     # 3. Logbook requirements (placeholder — check if requirement defined)
     # ---------------------------------------------------------------
-    approved_logbook_qs = LogbookEntry.objects.filter(
-        resident_training_record=rtr,
-        status=LogbookEntry.STATUS_APPROVED,
-    )
     for lb_req in milestone.logbook_requirements.all():
         requirement_checks += 1
-        key = (lb_req.procedure_key or lb_req.category or f"logbook_req_{lb_req.pk}").strip()
-        scoped_qs = approved_logbook_qs
-        if key:
-            scoped_qs = scoped_qs.filter(
-                models.Q(disease_area__icontains=key)
-                | models.Q(diagnosis__icontains=key)
-                | models.Q(clinical_presentation__icontains=key)
-                | models.Q(management_plan__icontains=key)
-            )
-        approved_count = scoped_qs.count()
+        key = _logbook_requirement_key(lb_req)
+        approved_count = inputs.logbook_key_counts.get((rtr_id, key), 0)
         if approved_count < lb_req.min_entries:
             unmet.append(
                 f"Logbook requirement '{key}': {approved_count}/{lb_req.min_entries} approved entries"
@@ -158,43 +340,29 @@ def compute_milestone_eligibility(
     # ---------------------------------------------------------------
     # 4. Logbook threshold configs (rotation + period based)
     # ---------------------------------------------------------------
-    threshold_configs = LogbookThresholdConfig.objects.filter(is_active=True).filter(
-        models.Q(program__isnull=True) | models.Q(program=rtr.program)
-    ).filter(
-        models.Q(department__isnull=True) | models.Q(department=resident.home_department)
-    )
-    for cfg in threshold_configs:
+    home_department_id = inputs.home_department_ids.get(rtr_id)
+    for cfg in inputs.threshold_configs:
+        if cfg.program_id is not None and cfg.program_id != rtr.program_id:
+            continue
+        if cfg.department_id is not None and cfg.department_id != home_department_id:
+            continue
         requirement_checks += 1
         if cfg.mode == LogbookThresholdConfig.MODE_PER_PERIOD:
-            days = cfg.period_days or 30
-            window_start = today - timedelta(days=days - 1)
-            count = approved_logbook_qs.filter(
-                approved_at__date__gte=window_start,
-                approved_at__date__lte=today,
-            ).count()
+            count = inputs.logbook_period_counts.get((rtr_id, cfg.period_days or 30), 0)
             if count < cfg.min_approved_entries:
                 unmet.append(
                     f"Logbook threshold '{cfg.name}' not met: {count}/{cfg.min_approved_entries}"
                 )
             continue
 
-        rotations = RotationAssignment.objects.filter(
-            resident_training=rtr,
-            status__in=[
-                RotationAssignment.STATUS_ACTIVE,
-                RotationAssignment.STATUS_APPROVED,
-                RotationAssignment.STATUS_COMPLETED,
-            ],
-        )
-        if not rotations.exists():
+        rotation_counts = inputs.rotation_logbook_counts.get(rtr_id)
+        if not rotation_counts:
             unmet.append(f"Logbook threshold '{cfg.name}' not met: no eligible rotation found")
             continue
 
-        unmet_per_rotation = 0
-        for rotation in rotations:
-            count = approved_logbook_qs.filter(rotation_assignment=rotation).count()
-            if count < cfg.min_approved_entries:
-                unmet_per_rotation += 1
+        unmet_per_rotation = sum(
+            1 for count in rotation_counts if count < cfg.min_approved_entries
+        )
         if unmet_per_rotation:
             unmet.append(
                 f"Logbook threshold '{cfg.name}' not met for {unmet_per_rotation} rotation(s)"
@@ -204,16 +372,10 @@ def compute_milestone_eligibility(
     # 5. Rotation verification hook for FINAL readiness
     # ---------------------------------------------------------------
     if milestone.code == "FINAL":
-        mandatory_rotations = ProgramRotationRequirement.objects.filter(
-            program=rtr.program,
-            is_mandatory=True,
-        ).count()
+        mandatory_rotations = inputs.mandatory_rotation_counts.get(rtr.program_id, 0)
         if mandatory_rotations > 0:
             requirement_checks += 1
-            verified_rotations = RotationCompletion.objects.filter(
-                rotation__resident_training=rtr,
-                status=RotationCompletion.STATUS_VERIFIED,
-            ).count()
+            verified_rotations = inputs.verified_rotation_counts.get(rtr_id, 0)
             if verified_rotations < mandatory_rotations:
                 unmet.append(
                     f"Verified rotations: {verified_rotations}/{mandatory_rotations} mandatory completed"
@@ -235,45 +397,236 @@ def compute_milestone_eligibility(
     return {"status": status, "reasons": unmet}
 
 
-def recompute_for_record(rtr: "ResidentTrainingRecord") -> list[dict]:
+def compute_milestone_eligibility(
+    rtr: "ResidentTrainingRecord",
+    milestone: "ProgramMilestone",
+) -> dict:
     """
-    Recompute eligibility for all active milestones of the resident's program.
-    Creates or updates ResidentMilestoneEligibility rows.
-    Returns list of result dicts.
+    Pure function: compute eligibility status for a resident + milestone.
+
+    Returns a dict with keys:
+        status: "NOT_READY" | "PARTIALLY_READY" | "ELIGIBLE"
+        reasons: list[str]  – unmet requirements in deterministic order
     """
-    from sims.training.models import ProgramMilestone, ResidentMilestoneEligibility
+    inputs = EligibilityInputs.load([rtr], [milestone])
+    return evaluate_milestone(rtr, milestone, inputs)
+
+
+def _active_milestones_by_program(program_ids) -> dict[int, list]:
+    from sims.training.models import ProgramMilestone
 
-    results = []
+    by_program: dict[int, list] = defaultdict(list)
     milestones = ProgramMilestone.objects.filter(
-        program=rtr.program, is_active=True
+        program_id__in=program_ids, is_active=True
     ).prefetch_related(
         "research_requirement",
         "workshop_requirements__workshop",
         "logbook_requirements",
     )
-
     for milestone in milestones:
-        result = compute_milestone_eligibility(rtr, milestone)
-        obj, created = ResidentMilestoneEligibility.objects.update_or_create(
-            resident_training_record=rtr,
-            milestone=milestone,
-            defaults={
-                "status": result["status"],
-                "reasons_json": result["reasons"],
-            },
+        by_program[milestone.program_id].append(milestone)
+    return by_program
+
+
+def recompute_for_records(
+    records: Iterable["ResidentTrainingRecord"],
+) -> dict[int, list[dict]]:
+    """
+    Recompute eligibility for a cohort of training records in one pass.
+
+    Loads milestones and inputs with a fixed number of queries, evaluates
+    everything in memory and bulk-upserts ResidentMilestoneEligibility rows.
+    Returns ``{rtr_id: [result dict, ...]}`` in milestone order.
+    """
+    from sims.training.models import EligibilityRecomputeMark, ResidentMilestoneEligibility
+
+    records = list(records)
+    if not records:
+        return {}
+
+    now = timezone.now()
+    milestones_by_program = _active_milestones_by_program({rtr.program_id for rtr in records})
+    all_milestones = [m for ms in milestones_by_program.values() for m in ms]
+    inputs = EligibilityInputs.load(records, all_milestones)
+
+    results: dict[int, list[dict]] = {}
+    rows = []
+    for rtr in records:
+        results[rtr.pk] = []
+        for milestone in milestones_by_program.get(rtr.program_id, []):
+            result = evaluate_milestone(rtr, milestone, inputs)
+            rows.append(
+                ResidentMilestoneEligibility(
+                    resident_training_record_id=rtr.pk,
+                    milestone_id=milestone.pk,
+                    status=result["status"],
+                    reasons_json=result["reasons"],
+                    computed_at=now,
+                )
+            )
+            results[rtr.pk].append(
+                {
+                    "milestone_code": milestone.code,
+                    "status": result["status"],
+                    "reasons": result["reasons"],
+                }
+            )
+
+    with transaction.atomic():
+        if rows:
+            ResidentMilestoneEligibility.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["resident_training_record", "milestone"],
+                update_fields=["status", "reasons_json", "computed_at"],
+            )
+        # Marks set after ``now`` describe changes this pass may not have seen.
+        EligibilityRecomputeMark.objects.filter(
+            resident_training_record_id__in=[rtr.pk for rtr in records],
+            marked_at__lte=now,
+        ).delete()
+        mark_dashboard_stale([rtr.pk for rtr in records])
+    logger.debug(
+        "Eligibility recomputed: records=%d rows=%d", len(records), len(rows)
+    )
+    return results
+
+
+def recompute_for_record(rtr: "ResidentTrainingRecord") -> list[dict]:
+    """
+    Recompute eligibility for all active milestones of the resident's program.
+    Creates or updates ResidentMilestoneEligibility rows.
+    Returns list of result dicts.
+    """
+    return recompute_for_records([rtr])[rtr.pk]
+
+
+# ---------------------------------------------------------------------------
+# Dirty-mark queue
+# ---------------------------------------------------------------------------
+
+def mark_eligibility_stale(rtr_ids: Iterable[int]) -> None:
+    """
+    Record that the given training records need their eligibility recomputed.
+
+    Cheap enough to call from signals: one upsert, plus a debounced Celery
+    task scheduled once the surrounding transaction commits. The records'
+    dashboards embed the stale flag, so their snapshots are bumped too.
+    """
+    from sims.training.models import EligibilityRecomputeMark
+
+    ids = {rtr_id for rtr_id in rtr_ids if rtr_id}
+    if not ids:
+        return
+    now = timezone.now()
+    with transaction.atomic():
+        EligibilityRecomputeMark.objects.bulk_create(
+            [
+                EligibilityRecomputeMark(resident_training_record_id=rtr_id, marked_at=now)
+                for rtr_id in ids
+            ],
+            update_conflicts=True,
+            unique_fields=["resident_training_record"],
+            update_fields=["marked_at"],
         )
-        results.append(
-            {
-                "milestone_code": milestone.code,
-                "status": obj.status,
-                "reasons": obj.reasons_json,
-            }
+        mark_dashboard_stale(ids)
+    transaction.on_commit(schedule_stale_recompute)
+
+
+def mark_programs_eligibility_stale(program_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Mark every active record of the given programmes stale (milestone and
+    requirement edits); ``None`` means every programme (global threshold configs).
+    """
+    from sims.training.models import ResidentTrainingRecord
+
+    records = ResidentTrainingRecord.objects.filter(active=True)
+    if program_ids is not None:
+        ids = {program_id for program_id in program_ids if program_id}
+        if not ids:
+            return
+        records = records.filter(program_id__in=ids)
+    mark_eligibility_stale(records.values_list("pk", flat=True))
+
+
+def schedule_stale_recompute() -> bool:
+    """
+    Enqueue one recompute task per debounce window.
+
+    Bursts of marks collapse into a single task; when async recompute is
+    disabled the queue is drained inline instead.
+    """
+    if not getattr(settings, "ELIGIBILITY_RECOMPUTE_ASYNC", True):
+        recompute_stale_records()
+        return True
+
+    debounce = getattr(settings, "ELIGIBILITY_RECOMPUTE_DEBOUNCE_SECONDS", 30)
+    # The key expires on its own if a worker dies before clearing it.
+    if not cache.add(RECOMPUTE_SCHEDULED_CACHE_KEY, True, timeout=debounce * 2 + 60):
+        return False
+    try:
+        from sims.training.tasks import recompute_stale_eligibility
+
+        recompute_stale_eligibility.apply_async(countdown=debounce)
+    except Exception as exc:
+        cache.delete(RECOMPUTE_SCHEDULED_CACHE_KEY)
+        logger.warning("Could not enqueue eligibility recompute (nightly run will catch up): %s", exc)
+        return False
+    return True
+
+
+def recompute_stale_records(batch_size: int = 500) -> int:
+    """Recompute every record marked stale so far, in cohort batches. Returns records recomputed."""
+    from sims.training.models import EligibilityRecomputeMark, ResidentTrainingRecord
+
+    cutoff = timezone.now()
+    total = 0
+    while True:
+        ids = list(
+            EligibilityRecomputeMark.objects.filter(marked_at__lte=cutoff)
+            .order_by("marked_at")
+            .values_list("resident_training_record_id", flat=True)[:batch_size]
         )
-        logger.debug(
-            "Eligibility recomputed: rtr=%d milestone=%s status=%s",
-            rtr.pk,
-            milestone.code,
-            obj.status,
+        if not ids:
+            break
+        records = list(
+            ResidentTrainingRecord.objects.filter(pk__in=ids, active=True).select_related("program")
         )
+        recompute_for_records(records)
+        # Inactive records are never recomputed; drop their marks.
+        EligibilityRecomputeMark.objects.filter(
+            resident_training_record_id__in=set(ids) - {rtr.pk for rtr in records},
+            marked_at__lte=cutoff,
+        ).delete()
+        total += len(records)
+    return total
 
-    return results
+
+def load_eligibility_snapshot(rtr: "ResidentTrainingRecord"):
+    """
+    Return ``(rows, stale)`` for a record's persisted eligibility snapshot.
+
+    Only computes inline on cold start, when a record with active milestones
+    has never been evaluated; otherwise this is a pure read.
+    """
+    from sims.training.models import (
+        EligibilityRecomputeMark,
+        ProgramMilestone,
+        ResidentMilestoneEligibility,
+    )
+
+    def _rows():
+        return list(
+            ResidentMilestoneEligibility.objects.filter(
+                resident_training_record=rtr
+            ).select_related("milestone")
+        )
+
+    rows = _rows()
+    if not rows and ProgramMilestone.objects.filter(
+        program_id=rtr.program_id, is_active=True
+    ).exists():
+        recompute_for_record(rtr)
+        rows = _rows()
+    stale = EligibilityRecomputeMark.objects.filter(resident_training_record=rtr).exists()
+    return rows, stale
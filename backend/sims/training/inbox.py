@@ -0,0 +1,254 @@
+"""
+Denormalized inbox counters for supervisor and admin badges.
+
+Each approver has one ``InboxCounter`` row holding their pending logbooks,
+rotations, leaves, submissions, research approvals and evaluations, so a
+badge or summary count is a single primary-key read. The row is built from
+scratch on first read and then moved by ``apply_transition``, which the
+status-transition signals in ``sims.training.signals`` call inside the same
+transaction as the save that changed an item's pending state.
+
+An item of a resident counts for the resident's supervisors (active
+assignments plus the legacy ``User.supervisor`` link, as in
+``SupervisionScope``) and for every global (admin) row, as long as its
+training record is active and the resident's account is active; an
+evaluation counts for the supervisor it is assigned to. Rows of supervisors
+whose scope changes are dropped and rebuilt on their next read. Bulk inserts
+skip the signals and call ``apply_bulk_created`` instead.
+``reconcile_inbox_counters`` (scheduled in Celery beat) recounts every row
+to correct drift from bulk ``QuerySet.update`` calls or races between a
+first build and a concurrent transition.
+"""
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.apps import apps
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class InboxSource:
+    counter: str
+    model_label: str
+    pending_statuses: frozenset
+    # FK to ResidentTrainingRecord for items reviewed by the resident's supervisors...
+    record_field: Optional[str] = None
+    # ...or FK to the SupervisorProfile the item is assigned to.
+    supervisor_field: Optional[str] = None
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def key_attname(self) -> str:
+        return f"{self.record_field or self.supervisor_field}_id"
+
+
+INBOX_SOURCES = (
+    InboxSource("pending_logbooks", "training.LogbookEntry", frozenset({"SUBMITTED"}), record_field="resident_training_record"),
+    InboxSource("pending_rotations", "training.RotationAssignment", frozenset({"SUBMITTED"}), record_field="resident_training"),
+    InboxSource("pending_leaves", "training.LeaveRequest", frozenset({"SUBMITTED"}), record_field="resident_training"),
+    InboxSource("pending_submissions", "training.ResidentSubmission", frozenset({"SUBMITTED"}), record_field="resident_training_record"),
+    InboxSource(
+        "pending_research",
+        "training.ResidentResearchProject",
+        frozenset({"SUBMITTED_TO_SUPERVISOR"}),
+        record_field="resident_training_record",
+    ),
+    InboxSource(
+        "pending_evaluations",
+        "academics.EvaluationSubmission",
+        frozenset({"SUBMITTED", "UNDER_REVIEW"}),
+        supervisor_field="supervisor",
+    ),
+)
+COUNTER_FIELDS = tuple(source.counter for source in INBOX_SOURCES)
+
+
+def counts_everything(user) -> bool:
+    return getattr(user, "role", None) == "ADMIN" or getattr(user, "is_superuser", False)
+
+
+def compute_inbox_counts(user, *, is_global: bool, resident_user_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """Count ``user``'s pending items from the source tables."""
+    if not is_global and resident_user_ids is None:
+        from sims.supervision.scope import SupervisionScope
+
+        resident_user_ids = SupervisionScope.for_user(user).resident_user_ids
+    counts = {}
+    for source in INBOX_SOURCES:
+        queryset = source.model.objects.filter(status__in=source.pending_statuses)
+        if not is_global:
+            if source.record_field:
+                queryset = queryset.filter(**{f"{source.record_field}__resident_user_id__in": resident_user_ids})
+            else:
+                queryset = queryset.filter(**{f"{source.supervisor_field}__user_id": user.pk})
+        if source.record_field:
+            queryset = queryset.filter(
+                **{f"{source.record_field}__active": True, f"{source.record_field}__resident_user__is_active": True}
+            )
+        counts[source.counter] = queryset.count()
+    return counts
+
+
+def get_inbox_counter(user):
+    """The user's ``InboxCounter``, built on first read (or after a role change)."""
+    from sims.training.models import InboxCounter
+
+    is_global = counts_everything(user)
+    counter = InboxCounter.objects.filter(pk=user.pk).first()
+    if counter is not None and counter.is_global == is_global:
+        return counter
+    counts = compute_inbox_counts(user, is_global=is_global)
+    counter, _ = InboxCounter.objects.update_or_create(
+        user_id=user.pk,
+        defaults={"is_global": is_global, "reconciled_at": timezone.now(), **counts},
+    )
+    return counter
+
+
+# -- transitions -----------------------------------------------------------------------
+
+def _resident_approver_ids(resident_user_id) -> set:
+    from sims.supervision.models import ResidentSupervisorAssignment
+    from sims.users.models import User
+
+    approver_ids = set(
+        ResidentSupervisorAssignment.objects.filter(resident__user_id=resident_user_id, is_active=True)
+        .values_list("supervisor__user_id", flat=True)
+    )
+    legacy = User.objects.filter(pk=resident_user_id, role="RESIDENT").values_list("supervisor_id", flat=True).first()
+    if legacy:
+        approver_ids.add(legacy)
+    return approver_ids
+
+
+def _record_approver_ids(record_id) -> Optional[set]:
+    from sims.training.models import ResidentTrainingRecord
+
+    record = (
+        ResidentTrainingRecord.objects.filter(pk=record_id)
+        .values("resident_user_id", "active", "resident_user__is_active")
+        .first()
+    )
+    if record is None or not (record["active"] and record["resident_user__is_active"]):
+        return None
+    return _resident_approver_ids(record["resident_user_id"])
+
+
+def _supervisor_approver_ids(supervisor_profile_id) -> set:
+    from sims.users.models import SupervisorProfile
+
+    return set(SupervisorProfile.objects.filter(pk=supervisor_profile_id).values_list("user_id", flat=True))
+
+
+def approver_ids(source: InboxSource, key) -> Optional[set]:
+    """Users whose counters include an item keyed by ``key``; ``None`` if it counts nowhere."""
+    if key is None:
+        return None
+    if source.record_field:
+        return _record_approver_ids(key)
+    return _supervisor_approver_ids(key)
+
+
+def apply_transition(source: InboxSource, old: Optional[Tuple[str, object]], new: Optional[Tuple[str, object]]) -> None:
+    """
+    Move counters for an item whose ``(status, key)`` went from ``old`` to
+    ``new`` (``None`` when the item did not / no longer exists).
+    """
+    from sims.training.models import InboxCounter
+
+    was_pending = old is not None and old[0] in source.pending_statuses
+    is_pending = new is not None and new[0] in source.pending_statuses
+    if was_pending and is_pending and old[1] == new[1]:
+        return
+    for pending, state, delta in ((was_pending, old, -1), (is_pending, new, 1)):
+        if not pending:
+            continue
+        approvers = approver_ids(source, state[1])
+        if approvers is None:
+            continue
+        InboxCounter.objects.filter(Q(pk__in=approvers) | Q(is_global=True)).update(
+            **{source.counter: Greatest(F(source.counter) + delta, 0)}
+        )
+
+
+def apply_bulk_created(source: InboxSource, instances: Iterable) -> None:
+    """Count items inserted with ``bulk_create``, which sends no ``post_save``."""
+    from sims.training.models import InboxCounter
+
+    pending = Counter(
+        getattr(instance, source.key_attname)
+        for instance in instances
+        if instance.status in source.pending_statuses
+    )
+    total = 0
+    for key, delta in pending.items():
+        approvers = approver_ids(source, key)
+        if approvers is None:
+            continue
+        total += delta
+        InboxCounter.objects.filter(pk__in=approvers, is_global=False).update(
+            **{source.counter: F(source.counter) + delta}
+        )
+    if total:
+        InboxCounter.objects.filter(is_global=True).update(**{source.counter: F(source.counter) + total})
+
+
+def source_for(model_label: str) -> InboxSource:
+    return next(source for source in INBOX_SOURCES if source.model_label == model_label)
+
+
+def drop_inbox_counters(user_ids: Iterable[int]) -> int:
+    """Discard counters whose scope changed; they are rebuilt on the next read."""
+    from sims.training.models import InboxCounter
+
+    ids = {user_id for user_id in user_ids or () if user_id}
+    if not ids:
+        return 0
+    deleted, _ = InboxCounter.objects.filter(pk__in=ids).delete()
+    return deleted
+
+
+def drop_resident_inbox_counters(resident_user_id) -> int:
+    """Discard every counter that may include the resident's items (their approvers and admins)."""
+    from sims.training.models import InboxCounter
+
+    return drop_inbox_counters(
+        _resident_approver_ids(resident_user_id)
+        | set(InboxCounter.objects.filter(is_global=True).values_list("pk", flat=True))
+    )
+
+
+# -- reconciliation --------------------------------------------------------------------
+
+def reconcile_inbox_counters(batch_size: int = 500) -> int:
+    """Recount every counter row; returns how many had drifted."""
+    from sims.supervision.scope import SupervisionScope
+    from sims.training.models import InboxCounter
+
+    corrected = 0
+    for counter in InboxCounter.objects.select_related("user").order_by("pk").iterator(chunk_size=batch_size):
+        user = counter.user
+        is_global = counts_everything(user)
+        resident_user_ids = None if is_global else SupervisionScope.build(user).resident_user_ids
+        counts = compute_inbox_counts(user, is_global=is_global, resident_user_ids=resident_user_ids)
+        drift = {name: (getattr(counter, name), value) for name, value in counts.items() if getattr(counter, name) != value}
+        if counter.is_global != is_global:
+            drift["is_global"] = (counter.is_global, is_global)
+        InboxCounter.objects.filter(pk=counter.pk).update(
+            is_global=is_global, reconciled_at=timezone.now(), **counts
+        )
+        if drift:
+            corrected += 1
+            logger.info("Corrected inbox counter drift for user %s: %s", counter.pk, drift)
+    return corrected
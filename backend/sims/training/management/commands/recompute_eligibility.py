@@ -4,9 +4,14 @@ Management command: recompute_eligibility
 Recomputes all ResidentMilestoneEligibility rows for all active training records.
 Safe to run repeatedly (idempotent). Intended as a nightly backstop.
 
+Records are processed in batches through the cohort engine, so each batch
+costs a fixed number of queries regardless of its size.
+
 Usage:
     python manage.py recompute_eligibility
     python manage.py recompute_eligibility --rtr-id 42   # single record
+    python manage.py recompute_eligibility --batch-size 1000
+    python manage.py recompute_eligibility --stale-only  # drain the dirty-mark queue
 """
 from django.core.management.base import BaseCommand
 
@@ -21,29 +26,78 @@ class Command(BaseCommand):
             default=None,
             help="If provided, only recompute for the given ResidentTrainingRecord ID.",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of training records evaluated per cohort batch (default: 500).",
+        )
+        parser.add_argument(
+            "--stale-only",
+            action="store_true",
+            help="Only recompute records currently marked stale by change signals.",
+        )
 
     def handle(self, *args, **options):
         from sims.training.models import ResidentTrainingRecord
-        from sims.training.eligibility import recompute_for_record
+        from sims.training.eligibility import recompute_for_record, recompute_for_records
 
         rtr_id = options.get("rtr_id")
+        batch_size = max(1, options.get("batch_size") or 500)
+
+        if options.get("stale_only"):
+            from sims.training.eligibility import recompute_stale_records
+
+            count = recompute_stale_records(batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Recomputed {count} stale record(s)."))
+            return
 
         if rtr_id:
             qs = ResidentTrainingRecord.objects.filter(pk=rtr_id, active=True)
         else:
-            qs = ResidentTrainingRecord.objects.filter(active=True).select_related("program")
+            qs = ResidentTrainingRecord.objects.filter(active=True)
+        qs = qs.select_related("program", "resident_user").order_by("pk")
 
         total = qs.count()
         self.stdout.write(f"Recomputing eligibility for {total} record(s)…")
 
         success = 0
         errors = 0
-        for rtr in qs.iterator():
+        batch = []
+        for rtr in qs.iterator(chunk_size=batch_size):
+            batch.append(rtr)
+            if len(batch) >= batch_size:
+                ok, failed = self._process_batch(batch, recompute_for_records, recompute_for_record)
+                success += ok
+                errors += failed
+                batch = []
+        if batch:
+            ok, failed = self._process_batch(batch, recompute_for_records, recompute_for_record)
+            success += ok
+            errors += failed
+
+        self.stdout.write(
+            self.style.SUCCESS(f"\nDone. Success={success}  Errors={errors}")
+        )
+
+    def _process_batch(self, batch, recompute_for_records, recompute_for_record):
+        try:
+            results = recompute_for_records(batch)
+        except Exception as exc:
+            # Fall back to per-record recompute so one bad record is isolated.
+            self.stderr.write(
+                self.style.WARNING(f"  Batch of {len(batch)} failed ({exc}); retrying per record")
+            )
+            results = None
+
+        success = 0
+        errors = 0
+        for rtr in batch:
             try:
-                results = recompute_for_record(rtr)
+                rows = results[rtr.pk] if results is not None else recompute_for_record(rtr)
                 self.stdout.write(
                     self.style.SUCCESS(
-                        f"  ✓ RTR {rtr.pk} ({rtr}) — {len(results)} milestone(s) updated"
+                        f"  ✓ RTR {rtr.pk} ({rtr}) — {len(rows)} milestone(s) updated"
                     )
                 )
                 success += 1
@@ -52,7 +106,4 @@ class Command(BaseCommand):
                     self.style.ERROR(f"  ✗ RTR {rtr.pk} ({rtr}) — ERROR: {exc}")
                 )
                 errors += 1
-
-        self.stdout.write(
-            self.style.SUCCESS(f"\nDone. Success={success}  Errors={errors}")
-        )
+        return success, errors
@@ -0,0 +1,30 @@
+"""
+Management command: reconcile_inbox_counters
+
+Recounts every InboxCounter row from the source tables and corrects any
+drift (e.g. from bulk QuerySet.update calls that bypass status signals).
+Safe to run repeatedly; schedule it alongside the nightly eligibility run.
+
+Usage:
+    python manage.py reconcile_inbox_counters
+    python manage.py reconcile_inbox_counters --batch-size 1000
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Recount supervisor/admin inbox counters and correct drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of counter rows fetched per chunk (default: 500).",
+        )
+
+    def handle(self, *args, **options):
+        from sims.training.inbox import reconcile_inbox_counters
+
+        corrected = reconcile_inbox_counters(batch_size=max(1, options.get("batch_size") or 500))
+        self.stdout.write(self.style.SUCCESS(f"Done. Corrected {corrected} drifted counter(s)."))
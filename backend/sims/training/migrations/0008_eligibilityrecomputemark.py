@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("training", "0007_alter_historicalresidentresearchproject_supervisor_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EligibilityRecomputeMark",
+            fields=[
+                (
+                    "resident_training_record",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="eligibility_recompute_mark",
+                        serialize=False,
+                        to="training.residenttrainingrecord",
+                    ),
+                ),
+                ("marked_at", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "verbose_name": "Eligibility Recompute Mark",
+                "verbose_name_plural": "Eligibility Recompute Marks",
+            },
+        ),
+    ]
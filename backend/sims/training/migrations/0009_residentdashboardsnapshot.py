@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("training", "0008_eligibilityrecomputemark"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResidentDashboardSnapshot",
+            fields=[
+                (
+                    "resident_training_record",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="dashboard_snapshot",
+                        serialize=False,
+                        to="training.residenttrainingrecord",
+                    ),
+                ),
+                ("version", models.PositiveBigIntegerField(default=1)),
+                ("built_version", models.PositiveBigIntegerField(default=0)),
+                ("schema_version", models.PositiveIntegerField(default=0)),
+                ("built_on", models.DateField(blank=True, null=True)),
+                ("payload", models.JSONField(default=dict)),
+                ("etag", models.CharField(blank=True, max_length=80)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Resident Dashboard Snapshot",
+                "verbose_name_plural": "Resident Dashboard Snapshots",
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("training", "0009_residentdashboardsnapshot"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="leaverequest",
+            index=models.Index(
+                fields=["status", "created_at", "id"], name="training_le_status_41e2a2_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rotationassignment",
+            index=models.Index(
+                fields=["status", "created_at", "id"], name="training_ro_status_242834_idx"
+            ),
+        ),
+    ]
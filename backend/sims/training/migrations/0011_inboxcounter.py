@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0009_delete_supervisorresidentlink"),
+        ("training", "0010_inbox_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InboxCounter",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="inbox_counter",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("is_global", models.BooleanField(default=False)),
+                ("pending_logbooks", models.IntegerField(default=0)),
+                ("pending_rotations", models.IntegerField(default=0)),
+                ("pending_leaves", models.IntegerField(default=0)),
+                ("pending_submissions", models.IntegerField(default=0)),
+                ("pending_research", models.IntegerField(default=0)),
+                ("pending_evaluations", models.IntegerField(default=0)),
+                ("reconciled_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Inbox Counter",
+                "verbose_name_plural": "Inbox Counters",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("is_global", True)),
+                        fields=["is_global"],
+                        name="training_inbox_global_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -6,6 +6,7 @@ Replaces the legacy sims.rotations.Rotation with a full state-machine workflow.
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from simple_history.models import HistoricalRecords
 
 User = get_user_model()
@@ -274,6 +275,7 @@ class RotationAssignment(models.Model):
             models.Index(fields=["resident_training", "status"]),
             models.Index(fields=["status"]),
             models.Index(fields=["start_date", "end_date"]),
+            models.Index(fields=["status", "created_at", "id"]),
         ]
         constraints = [
             models.CheckConstraint(
@@ -368,6 +370,9 @@ class LeaveRequest(models.Model):
         ordering = ["-start_date"]
         verbose_name = "Leave Request"
         verbose_name_plural = "Leave Requests"
+        indexes = [
+            models.Index(fields=["status", "created_at", "id"]),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(end_date__gte=models.F("start_date")),
@@ -858,6 +863,91 @@ class ResidentMilestoneEligibility(models.Model):
         )
 
 
+class EligibilityRecomputeMark(models.Model):
+    """Dirty mark: the record's eligibility snapshot is stale and queued for recompute."""
+
+    resident_training_record = models.OneToOneField(
+        ResidentTrainingRecord,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="eligibility_recompute_mark",
+    )
+    marked_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Eligibility Recompute Mark"
+        verbose_name_plural = "Eligibility Recompute Marks"
+
+    def __str__(self):
+        return f"Stale eligibility: rtr={self.resident_training_record_id} since {self.marked_at}"
+
+
+class ResidentDashboardSnapshot(models.Model):
+    """
+    Materialized resident command-center payload.
+
+    Domain events bump ``version``; the payload is rebuilt on the next read
+    whenever ``built_version`` lags behind, the schema changes or the day rolls
+    over (current/next rotation and month index are date-dependent).
+    """
+
+    resident_training_record = models.OneToOneField(
+        ResidentTrainingRecord,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="dashboard_snapshot",
+    )
+    version = models.PositiveBigIntegerField(default=1)
+    built_version = models.PositiveBigIntegerField(default=0)
+    schema_version = models.PositiveIntegerField(default=0)
+    built_on = models.DateField(null=True, blank=True)
+    payload = models.JSONField(default=dict)
+    etag = models.CharField(max_length=80, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Resident Dashboard Snapshot"
+        verbose_name_plural = "Resident Dashboard Snapshots"
+
+    def __str__(self):
+        return f"Dashboard snapshot: rtr={self.resident_training_record_id} v{self.built_version}"
+
+
+class InboxCounter(models.Model):
+    """
+    Denormalized pending-item counts behind a supervisor's or admin's badges.
+
+    Built on first read, then moved by status-transition signals (see
+    ``sims.training.inbox``); ``is_global`` rows count items institution-wide.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="inbox_counter",
+    )
+    is_global = models.BooleanField(default=False)
+    pending_logbooks = models.IntegerField(default=0)
+    pending_rotations = models.IntegerField(default=0)
+    pending_leaves = models.IntegerField(default=0)
+    pending_submissions = models.IntegerField(default=0)
+    pending_research = models.IntegerField(default=0)
+    pending_evaluations = models.IntegerField(default=0)
+    reconciled_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Inbox Counter"
+        verbose_name_plural = "Inbox Counters"
+        indexes = [
+            models.Index(fields=["is_global"], condition=models.Q(is_global=True), name="training_inbox_global_idx"),
+        ]
+
+    def __str__(self):
+        return f"Inbox counter: user={self.user_id}"
+
+
 # ---------------------------------------------------------------------------
 # Logbook (feature-layer active runtime)
 # ---------------------------------------------------------------------------
@@ -0,0 +1,187 @@
+"""
+Keyset pagination for the training approval inboxes and "my" lists.
+
+Those endpoints are plain APIViews, so instead of DRF's ``pagination_class``
+hook they hand their queryset to ``KeysetPaginator.paginate``. Rows are
+ordered on a stable key (``created_at, id`` unless the view says otherwise)
+and later pages are reached through an opaque ``?cursor=`` token rather than
+an OFFSET, so every page is one indexed range scan however deep the inbox
+is. ``?limit=`` sets the page size (``INBOX_PAGE_SIZE``, capped at
+``INBOX_MAX_PAGE_SIZE``).
+
+``count`` is only filled in when it comes for free (the last page has been
+reached) unless the caller opts in: ``?include_total=true`` adds a
+``COUNT(*) OVER ()`` window to the page query itself, and
+``?include_total=estimate`` reads the planner's row estimate on PostgreSQL
+(falling back to the windowed count elsewhere).
+"""
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Count, Q, QuerySet, Window
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+TOTAL_EXACT = "exact"
+TOTAL_ESTIMATE = "estimate"
+_TOTAL_ANNOTATION = "_keyset_total"
+
+
+@dataclass
+class KeysetPage:
+    rows: List
+    next_cursor: Optional[str]
+    count: Optional[int]
+    count_is_estimate: bool = False
+
+
+def _positive_int(value, default: int, cutoff: int) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return default
+    if number <= 0:
+        return default
+    return min(number, cutoff)
+
+
+class KeysetPaginator:
+    """Cursor pagination over a fixed ``ordering`` whose last field is unique."""
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    total_query_param = "include_total"
+
+    def __init__(self, ordering: Sequence[str] = ("created_at", "id")):
+        descending = {field.startswith("-") for field in ordering}
+        if len(descending) != 1:
+            raise ValueError("Keyset ordering fields must all sort in the same direction.")
+        self.ordering = tuple(ordering)
+        self.descending = descending.pop()
+        self.fields = tuple(field.lstrip("-") for field in ordering)
+
+    # -- cursors ------------------------------------------------------------------------
+
+    def encode_cursor(self, obj, seen: int) -> str:
+        model = type(obj)
+        key = [model._meta.get_field(name).value_to_string(obj) for name in self.fields]
+        raw = json.dumps({"k": key, "n": seen}, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, token: str, model) -> Tuple[list, int]:
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            payload = json.loads(raw.decode("utf-8"))
+            key = payload["k"]
+            if len(key) != len(self.fields):
+                raise ValueError(token)
+            values = [model._meta.get_field(name).to_python(value) for name, value in zip(self.fields, key)]
+            return values, max(int(payload.get("n", 0)), 0)
+        except (ValueError, TypeError, KeyError, UnicodeDecodeError, ValidationError):
+            raise NotFound("Invalid cursor.")
+
+    def _after(self, values: list) -> Q:
+        """Rows strictly after ``values`` in ``self.ordering``."""
+        lookup = "lt" if self.descending else "gt"
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            step = Q(**{f"{name}__{lookup}": values[index]})
+            for prior, value in zip(self.fields[:index], values[:index]):
+                step &= Q(**{prior: value})
+            condition |= step
+        return condition
+
+    # -- totals -------------------------------------------------------------------------
+
+    def _requested_total(self, request) -> Optional[str]:
+        value = (request.query_params.get(self.total_query_param) or "").lower()
+        if value == TOTAL_ESTIMATE:
+            return TOTAL_ESTIMATE
+        if value in ("true", "1", "yes"):
+            return TOTAL_EXACT
+        return None
+
+    @staticmethod
+    def estimate_count(queryset: QuerySet) -> Optional[int]:
+        """The planner's row estimate for ``queryset`` (PostgreSQL only)."""
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    # -- paging -------------------------------------------------------------------------
+
+    def get_limit(self, request) -> int:
+        return _positive_int(
+            request.query_params.get(self.limit_query_param),
+            settings.INBOX_PAGE_SIZE,
+            settings.INBOX_MAX_PAGE_SIZE,
+        )
+
+    def paginate_queryset(self, request, queryset: QuerySet) -> KeysetPage:
+        limit = self.get_limit(request)
+        total = self._requested_total(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        estimate = None
+        if total == TOTAL_ESTIMATE:
+            estimate = self.estimate_count(queryset)
+            if estimate is None:
+                total = TOTAL_EXACT
+
+        seen = 0
+        page_qs = queryset
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            values, seen = self.decode_cursor(token, queryset.model)
+            page_qs = page_qs.filter(self._after(values))
+        if total == TOTAL_EXACT:
+            # Counts every row from the cursor on, in the same query as the page.
+            page_qs = page_qs.annotate(**{_TOTAL_ANNOTATION: Window(Count("pk"))})
+
+        rows = list(page_qs[: limit + 1])
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = self.encode_cursor(rows[-1], seen + len(rows)) if has_next else None
+
+        if total == TOTAL_ESTIMATE:
+            return KeysetPage(rows, next_cursor, estimate, count_is_estimate=True)
+        if total == TOTAL_EXACT:
+            remaining = getattr(rows[0], _TOTAL_ANNOTATION) if rows else 0
+            return KeysetPage(rows, next_cursor, seen + remaining)
+        return KeysetPage(rows, next_cursor, None if has_next else seen + len(rows))
+
+    def get_paginated_response(self, request, page: KeysetPage, data) -> Response:
+        next_url = None
+        if page.next_cursor:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), self.cursor_query_param, page.next_cursor
+            )
+        payload = {
+            "count": page.count,
+            "next": next_url,
+            "next_cursor": page.next_cursor,
+            "results": data,
+        }
+        if page.count_is_estimate:
+            payload["count_is_estimate"] = True
+        return Response(payload)
+
+    def paginate(self, request, queryset: QuerySet, serializer_class) -> Response:
+        page = self.paginate_queryset(request, queryset)
+        serializer = serializer_class(page.rows, many=True, context={"request": request})
+        return self.get_paginated_response(request, page, serializer.data)
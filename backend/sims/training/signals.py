@@ -1,37 +1,405 @@
 """
 Django signals for the training app.
 
-Triggers eligibility recomputation whenever research project,
-thesis, or workshop completion records change.
+Changes to a training record's inputs (research project, thesis, workshop
+completion, logbook entry, submission, rotation, leave, posting) do two cheap
+things instead of recomputing inline:
+
+  - mark the record's eligibility snapshot stale; a debounced Celery task
+    recomputes it (see ``sims.training.eligibility``)
+  - bump the record's resident dashboard snapshot version so the next read
+    rebuilds it (see ``sims.training.dashboard``)
+
+Programme, milestone, requirement and logbook-threshold edits do the same for
+every active record of the affected programme.
+Renaming a hospital, department, workshop or user whose name a dashboard
+payload embeds bumps the affected snapshots.
+
+Status transitions of reviewable items also move the approvers' inbox
+counters in the same transaction (see ``sims.training.inbox``).
 """
 import logging
+from functools import partial
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 
 logger = logging.getLogger(__name__)
 
 
-def _recompute_if_record_active(rtr):
-    if rtr is None:
+def _is_cascade_delete(sender, kwargs):
+    """True when a post_delete was triggered by deleting some parent object."""
+    origin = kwargs.get("origin")
+    if origin is None:
+        return False
+    return (getattr(origin, "model", None) or type(origin)) is not sender
+
+
+def _mark_record_stale(rtr_id):
+    if rtr_id is None:
         return
     try:
-        from sims.training.eligibility import recompute_for_record
-        recompute_for_record(rtr)
+        from sims.training.eligibility import mark_eligibility_stale
+        mark_eligibility_stale([rtr_id])
     except Exception as exc:
-        logger.warning("Eligibility recompute failed for rtr=%s: %s", rtr, exc)
+        logger.warning("Eligibility stale-mark failed for rtr=%s: %s", rtr_id, exc)
+
+
+def _mark_dashboard_stale(rtr_id):
+    from sims.training.dashboard import mark_dashboard_stale
+    mark_dashboard_stale([rtr_id])
+
+
+def _mark_program_stale(program_id):
+    from sims.training.dashboard import mark_program_dashboards_stale
+    from sims.training.eligibility import mark_programs_eligibility_stale
+
+    mark_program_dashboards_stale(program_id)
+    mark_programs_eligibility_stale([program_id])
+
+
+def _milestone_program_id(milestone_id):
+    from sims.training.models import ProgramMilestone
+
+    return (
+        ProgramMilestone.objects.filter(pk=milestone_id)
+        .values_list("program_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender="training.ResidentTrainingRecord")
+def on_training_record_save(sender, instance, created, **kwargs):
+    # Programme, dates and activation all feed eligibility.
+    _mark_record_stale(instance.pk)
+    if not created:
+        _mark_dashboard_stale(instance.pk)
+
+
+@receiver(post_save, sender="training.TrainingProgram")
+def on_training_program_save(sender, instance, created, **kwargs):
+    if not created:
+        _mark_program_stale(instance.pk)
+
+
+@receiver(post_init, sender="training.ProgramMilestone")
+def remember_milestone_program(sender, instance, **kwargs):
+    instance._program_id_at_load = instance.__dict__.get("program_id")
+
+
+@receiver(post_save, sender="training.ProgramMilestone")
+@receiver(post_delete, sender="training.ProgramMilestone")
+def on_program_milestone_change(sender, instance, **kwargs):
+    _mark_program_stale(instance.program_id)
+    previous = getattr(instance, "_program_id_at_load", None)
+    if previous and previous != instance.program_id:
+        _mark_program_stale(previous)
+
+
+@receiver(post_save, sender="training.ProgramMilestoneWorkshopRequirement")
+@receiver(post_delete, sender="training.ProgramMilestoneWorkshopRequirement")
+@receiver(post_save, sender="training.ProgramMilestoneResearchRequirement")
+@receiver(post_delete, sender="training.ProgramMilestoneResearchRequirement")
+@receiver(post_save, sender="training.ProgramMilestoneLogbookRequirement")
+@receiver(post_delete, sender="training.ProgramMilestoneLogbookRequirement")
+def on_milestone_requirement_change(sender, instance, **kwargs):
+    if _is_cascade_delete(sender, kwargs):
+        # The milestone (or programme) delete marks the programme itself.
+        return
+    _mark_program_stale(_milestone_program_id(instance.milestone_id))
+
+
+@receiver(post_init, sender="training.LogbookThresholdConfig")
+def remember_threshold_program(sender, instance, **kwargs):
+    instance._program_id_at_load = instance.__dict__.get("program_id")
+
+
+@receiver(post_save, sender="training.LogbookThresholdConfig")
+@receiver(post_delete, sender="training.LogbookThresholdConfig")
+def on_logbook_threshold_config_change(sender, instance, **kwargs):
+    from sims.training.eligibility import mark_programs_eligibility_stale
+
+    program_ids = {instance.program_id, getattr(instance, "_program_id_at_load", None)}
+    # A config without a programme applies to every programme.
+    mark_programs_eligibility_stale(None if None in program_ids else program_ids)
 
 
 @receiver(post_save, sender="training.ResidentResearchProject")
-def on_research_project_save(sender, instance, **kwargs):
-    _recompute_if_record_active(instance.resident_training_record)
+@receiver(post_delete, sender="training.ResidentResearchProject")
+def on_research_project_change(sender, instance, **kwargs):
+    _mark_dashboard_stale(instance.resident_training_record_id)
+    if _is_cascade_delete(sender, kwargs):
+        return
+    _mark_record_stale(instance.resident_training_record_id)
 
 
 @receiver(post_save, sender="training.ResidentThesis")
-def on_thesis_save(sender, instance, **kwargs):
-    _recompute_if_record_active(instance.resident_training_record)
+@receiver(post_delete, sender="training.ResidentThesis")
+def on_thesis_change(sender, instance, **kwargs):
+    _mark_dashboard_stale(instance.resident_training_record_id)
+    if _is_cascade_delete(sender, kwargs):
+        return
+    _mark_record_stale(instance.resident_training_record_id)
 
 
 @receiver(post_save, sender="training.ResidentWorkshopCompletion")
-def on_workshop_completion_save(sender, instance, **kwargs):
-    _recompute_if_record_active(instance.resident_training_record)
+@receiver(post_delete, sender="training.ResidentWorkshopCompletion")
+def on_workshop_completion_change(sender, instance, **kwargs):
+    _mark_dashboard_stale(instance.resident_training_record_id)
+    if _is_cascade_delete(sender, kwargs):
+        return
+    _mark_record_stale(instance.resident_training_record_id)
+
+
+@receiver(post_save, sender="training.LogbookEntry")
+@receiver(post_delete, sender="training.LogbookEntry")
+def on_logbook_entry_change(sender, instance, **kwargs):
+    if _is_cascade_delete(sender, kwargs):
+        return
+    _mark_record_stale(instance.resident_training_record_id)
+
+
+@receiver(post_save, sender="training.ResidentSubmission")
+@receiver(post_delete, sender="training.ResidentSubmission")
+def on_submission_change(sender, instance, **kwargs):
+    if _is_cascade_delete(sender, kwargs):
+        return
+    _mark_record_stale(instance.resident_training_record_id)
+
+
+@receiver(post_save, sender="training.RotationAssignment")
+@receiver(post_delete, sender="training.RotationAssignment")
+def on_rotation_assignment_change(sender, instance, **kwargs):
+    _mark_dashboard_stale(instance.resident_training_id)
+    if _is_cascade_delete(sender, kwargs):
+        return
+    _mark_record_stale(instance.resident_training_id)
+
+
+@receiver(post_save, sender="training.RotationCompletion")
+@receiver(post_delete, sender="training.RotationCompletion")
+def on_rotation_completion_change(sender, instance, **kwargs):
+    if _is_cascade_delete(sender, kwargs):
+        return
+    from sims.training.models import RotationAssignment
+
+    rtr_id = (
+        RotationAssignment.objects.filter(pk=instance.rotation_id)
+        .values_list("resident_training_id", flat=True)
+        .first()
+    )
+    _mark_record_stale(rtr_id)
+
+
+@receiver(post_save, sender="training.LeaveRequest")
+@receiver(post_delete, sender="training.LeaveRequest")
+def on_leave_request_change(sender, instance, **kwargs):
+    _mark_dashboard_stale(instance.resident_training_id)
+
+
+@receiver(post_save, sender="training.DeputationPosting")
+@receiver(post_delete, sender="training.DeputationPosting")
+def on_deputation_posting_change(sender, instance, **kwargs):
+    _mark_dashboard_stale(instance.resident_training_id)
+
+
+@receiver(post_save, sender="supervision.ResidentSupervisorAssignment")
+@receiver(post_delete, sender="supervision.ResidentSupervisorAssignment")
+def on_supervisor_assignment_change(sender, instance, **kwargs):
+    from sims.training.dashboard import mark_user_dashboards_stale
+    from sims.users.models import ResidentProfile
+
+    user_id = (
+        ResidentProfile.objects.filter(pk=instance.resident_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    mark_user_dashboards_stale([user_id])
+
+
+# Names copied into dashboard payloads: rotation hospitals and departments,
+# completed workshops, research and assigned supervisors.
+_DASHBOARD_NAME_FIELDS = {
+    "rotations.Hospital": ("name",),
+    "academics.Department": ("name",),
+    "training.Workshop": ("name",),
+    "users.User": ("first_name", "last_name", "username", "email"),
+}
+
+
+def _dashboard_names(instance, fields):
+    return tuple(instance.__dict__.get(field) for field in fields)
+
+
+@receiver(post_init, sender="rotations.Hospital")
+@receiver(post_init, sender="academics.Department")
+@receiver(post_init, sender="training.Workshop")
+@receiver(post_init, sender="users.User")
+def remember_dashboard_names(sender, instance, **kwargs):
+    instance._dashboard_names = _dashboard_names(instance, _DASHBOARD_NAME_FIELDS[sender._meta.label])
+
+
+def _dashboard_names_changed(sender, instance, created, update_fields):
+    fields = _DASHBOARD_NAME_FIELDS[sender._meta.label]
+    previous = getattr(instance, "_dashboard_names", None)
+    instance._dashboard_names = _dashboard_names(instance, fields)
+    if created or (update_fields is not None and not set(fields) & set(update_fields)):
+        return False
+    return previous != instance._dashboard_names
+
+
+@receiver(post_save, sender="rotations.Hospital")
+@receiver(post_save, sender="academics.Department")
+@receiver(post_save, sender="training.Workshop")
+def on_reference_rename(sender, instance, created, update_fields=None, **kwargs):
+    # Rare admin edits whose names appear in rotations and profiles of any dashboard.
+    if _dashboard_names_changed(sender, instance, created, update_fields):
+        from sims.training.dashboard import mark_all_dashboards_stale
+        mark_all_dashboards_stale()
+
+
+@receiver(post_save, sender="users.User")
+def on_user_rename(sender, instance, created, update_fields=None, **kwargs):
+    if not _dashboard_names_changed(sender, instance, created, update_fields):
+        return
+    from sims.supervision.models import ResidentSupervisorAssignment
+    from sims.training.dashboard import mark_dashboard_stale, mark_user_dashboards_stale
+    from sims.training.models import ResidentResearchProject
+
+    supervised = ResidentSupervisorAssignment.objects.filter(supervisor__user_id=instance.pk).values_list(
+        "resident__user_id", flat=True
+    )
+    mark_user_dashboards_stale({instance.pk, *supervised})
+    mark_dashboard_stale(
+        ResidentResearchProject.objects.filter(supervisor_id=instance.pk).values_list(
+            "resident_training_record_id", flat=True
+        )
+    )
+
+
+# ---------------------------------------------------------------------------
+# Inbox counters
+# ---------------------------------------------------------------------------
+
+_UNKNOWN = object()
+
+
+def _inbox_state(source, instance):
+    """``(status, key)`` as loaded, or ``_UNKNOWN`` when either field was deferred."""
+    values = instance.__dict__
+    if "status" not in values or source.key_attname not in values:
+        return _UNKNOWN
+    return values["status"], values[source.key_attname]
+
+
+def _remember_inbox_state(source, sender, instance, **kwargs):
+    instance._inbox_state = _inbox_state(source, instance)
+
+
+def _on_inbox_item_save(source, sender, instance, created, **kwargs):
+    from sims.training.inbox import apply_transition, approver_ids, drop_inbox_counters
+
+    old = None if created else getattr(instance, "_inbox_state", _UNKNOWN)
+    new = (instance.status, getattr(instance, source.key_attname))
+    instance._inbox_state = new
+    if old is _UNKNOWN:
+        # The previous state was never loaded; let the affected counters rebuild.
+        from sims.training.models import InboxCounter
+
+        drop_inbox_counters(approver_ids(source, new[1]))
+        drop_inbox_counters(InboxCounter.objects.filter(is_global=True).values_list("pk", flat=True))
+        return
+    apply_transition(source, old, new)
+
+
+def _on_inbox_item_delete(source, sender, instance, **kwargs):
+    from sims.training.inbox import apply_transition
+
+    old = getattr(instance, "_inbox_state", _UNKNOWN)
+    if old is _UNKNOWN:
+        old = (instance.status, getattr(instance, source.key_attname))
+    apply_transition(source, old, None)
+
+
+def _connect_inbox_sources():
+    from sims.training.inbox import INBOX_SOURCES
+
+    for source in INBOX_SOURCES:
+        uid = f"inbox-counter-{source.model_label}"
+        post_init.connect(partial(_remember_inbox_state, source), sender=source.model_label, weak=False, dispatch_uid=f"{uid}-init")
+        post_save.connect(partial(_on_inbox_item_save, source), sender=source.model_label, weak=False, dispatch_uid=f"{uid}-save")
+        post_delete.connect(partial(_on_inbox_item_delete, source), sender=source.model_label, weak=False, dispatch_uid=f"{uid}-delete")
+
+
+_connect_inbox_sources()
+
+
+@receiver(post_init, sender="supervision.ResidentSupervisorAssignment")
+def remember_assignment_supervisor(sender, instance, **kwargs):
+    instance._inbox_supervisor_id = instance.__dict__.get("supervisor_id")
+
+
+@receiver(post_save, sender="supervision.ResidentSupervisorAssignment")
+@receiver(post_delete, sender="supervision.ResidentSupervisorAssignment")
+def on_assignment_change_drop_inbox_counters(sender, instance, **kwargs):
+    from sims.training.inbox import drop_inbox_counters
+    from sims.users.models import SupervisorProfile
+
+    profile_ids = {instance.supervisor_id, getattr(instance, "_inbox_supervisor_id", None)}
+    instance._inbox_supervisor_id = instance.supervisor_id
+    drop_inbox_counters(
+        SupervisorProfile.objects.filter(pk__in=[pk for pk in profile_ids if pk]).values_list("user_id", flat=True)
+    )
+
+
+@receiver(post_init, sender="users.User")
+def remember_legacy_supervisor(sender, instance, **kwargs):
+    instance._inbox_legacy_link = (instance.__dict__.get("supervisor_id"), instance.__dict__.get("role"))
+
+
+@receiver(post_save, sender="users.User")
+def on_legacy_supervisor_change_drop_inbox_counters(sender, instance, created, update_fields=None, **kwargs):
+    """A resident moving between legacy supervisors (or leaving the role) changes their scopes."""
+    from sims.training.inbox import drop_inbox_counters
+
+    previous = getattr(instance, "_inbox_legacy_link", (None, None))
+    current = (instance.supervisor_id, instance.role)
+    instance._inbox_legacy_link = current
+    if update_fields is not None and not {"supervisor", "role"} & set(update_fields):
+        return
+    if created or previous != current:
+        drop_inbox_counters({previous[0], current[0]})
+
+
+@receiver(post_init, sender="training.ResidentTrainingRecord")
+def remember_record_active(sender, instance, **kwargs):
+    instance._inbox_active = instance.__dict__.get("active")
+
+
+@receiver(post_save, sender="training.ResidentTrainingRecord")
+def on_record_activation_drop_inbox_counters(sender, instance, created, **kwargs):
+    """Only items of active records count, so (de)activating one changes its approvers' counts."""
+    from sims.training.inbox import drop_resident_inbox_counters
+
+    previous = getattr(instance, "_inbox_active", None)
+    instance._inbox_active = instance.active
+    if not created and previous != instance.active:
+        drop_resident_inbox_counters(instance.resident_user_id)
+
+
+@receiver(post_init, sender="users.User")
+def remember_user_active(sender, instance, **kwargs):
+    instance._inbox_is_active = instance.__dict__.get("is_active")
+
+
+@receiver(post_save, sender="users.User")
+def on_resident_activation_drop_inbox_counters(sender, instance, created, update_fields=None, **kwargs):
+    """Items of deactivated residents drop out of every inbox count."""
+    from sims.training.inbox import drop_resident_inbox_counters
+
+    previous = getattr(instance, "_inbox_is_active", None)
+    instance._inbox_is_active = instance.is_active
+    if created or instance.role != "RESIDENT" or (update_fields is not None and "is_active" not in update_fields):
+        return
+    if previous != instance.is_active:
+        drop_resident_inbox_counters(instance.pk)
@@ -0,0 +1,31 @@
+"""
+Celery tasks for the training app.
+"""
+import logging
+
+from celery import shared_task
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def recompute_stale_eligibility():
+    """Drain the eligibility dirty-mark queue, recomputing each marked record once."""
+    from sims.training.eligibility import RECOMPUTE_SCHEDULED_CACHE_KEY, recompute_stale_records
+
+    # Clear the debounce key first so marks arriving mid-run schedule a follow-up.
+    cache.delete(RECOMPUTE_SCHEDULED_CACHE_KEY)
+    count = recompute_stale_records()
+    logger.info("Recomputed eligibility for %d stale training record(s)", count)
+    return count
+
+
+@shared_task(ignore_result=True)
+def reconcile_inbox_counters():
+    """Periodic backstop: recount every inbox counter and correct drift."""
+    from sims.training.inbox import reconcile_inbox_counters as reconcile
+
+    corrected = reconcile()
+    logger.info("Reconciled inbox counters; %d row(s) had drifted", corrected)
+    return corrected
@@ -0,0 +1,143 @@
+"""Tests for the denormalized supervisor/admin inbox counters."""
+import io
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .inbox import compute_inbox_counts, get_inbox_counter, reconcile_inbox_counters
+from .models import InboxCounter, LeaveRequest, LogbookEntry, ResidentTrainingRecord, TrainingProgram
+from .tests import TODAY, make_user
+
+
+class InboxCounterTest(TestCase):
+    def setUp(self):
+        self.supervisor = make_user("count_sup", "SUPERVISOR")
+        self.other_supervisor = make_user("count_sup2", "SUPERVISOR")
+        self.admin = make_user("count_admin", "ADMIN")
+        self.resident = make_user("count_res", "RESIDENT", supervisor=self.supervisor)
+        program = TrainingProgram.objects.create(name="Medicine", code="MEDC", duration_months=48)
+        self.record = ResidentTrainingRecord.objects.create(
+            resident_user=self.resident, program=program, start_date=TODAY, active=True,
+        )
+
+    def _leave(self, status=LeaveRequest.STATUS_SUBMITTED, offset=0):
+        return LeaveRequest.objects.create(
+            resident_training=self.record,
+            leave_type=LeaveRequest.TYPE_ANNUAL,
+            start_date=TODAY + timedelta(days=offset),
+            end_date=TODAY + timedelta(days=offset + 1),
+            status=status,
+        )
+
+    def _assert_in_sync(self, user):
+        counter = InboxCounter.objects.get(pk=user.pk)
+        expected = compute_inbox_counts(user, is_global=counter.is_global)
+        self.assertEqual({name: getattr(counter, name) for name in expected}, expected)
+
+    def test_transitions_move_supervisor_and_admin_counters(self):
+        self._leave(offset=0)
+        self.assertEqual(get_inbox_counter(self.supervisor).pending_leaves, 1)
+        self.assertEqual(get_inbox_counter(self.admin).pending_leaves, 1)
+
+        second = self._leave(offset=10)
+        draft = self._leave(status=LeaveRequest.STATUS_DRAFT, offset=20)
+        draft.status = LeaveRequest.STATUS_SUBMITTED
+        draft.save()
+        second.status = LeaveRequest.STATUS_APPROVED
+        second.save()
+
+        self.assertEqual(get_inbox_counter(self.supervisor).pending_leaves, 2)
+        self.assertEqual(self.supervisor.get_documents_pending_count(), 2)
+        self._assert_in_sync(self.supervisor)
+        self._assert_in_sync(self.admin)
+
+        draft.delete()
+        self.assertEqual(InboxCounter.objects.get(pk=self.admin.pk).pending_leaves, 1)
+
+    def test_counts_are_a_single_primary_key_read_once_built(self):
+        get_inbox_counter(self.supervisor)
+        with CaptureQueriesContext(connection) as queries:
+            get_inbox_counter(self.supervisor)
+        self.assertEqual(len(queries), 1)
+
+    def test_scope_changes_rebuild_the_affected_counters(self):
+        self._leave()
+        get_inbox_counter(self.supervisor)
+        get_inbox_counter(self.other_supervisor)
+
+        self.resident.supervisor = self.other_supervisor
+        self.resident.save()
+
+        self.assertFalse(InboxCounter.objects.filter(pk__in=[self.supervisor.pk, self.other_supervisor.pk]).exists())
+        self.assertEqual(get_inbox_counter(self.supervisor).pending_leaves, 0)
+        self.assertEqual(get_inbox_counter(self.other_supervisor).pending_leaves, 1)
+
+    def test_reconciliation_corrects_drift_from_bulk_updates(self):
+        self._leave()
+        get_inbox_counter(self.supervisor)
+        LeaveRequest.objects.update(status=LeaveRequest.STATUS_APPROVED)
+        self.assertEqual(InboxCounter.objects.get(pk=self.supervisor.pk).pending_leaves, 1)
+
+        self.assertEqual(reconcile_inbox_counters(), 1)
+
+        self.assertEqual(InboxCounter.objects.get(pk=self.supervisor.pk).pending_leaves, 0)
+        self.assertEqual(reconcile_inbox_counters(), 0)
+
+    def test_supervisor_summary_reads_pending_counts_from_the_counter(self):
+        self._leave()
+        self.client.force_login(self.supervisor)
+
+        response = self.client.get(reverse("supervisor-summary"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["pending"]["leave_approvals"], 1)
+        self.assertTrue(InboxCounter.objects.filter(pk=self.supervisor.pk).exists())
+
+    def test_bulk_logbook_import_counts_submitted_entries(self):
+        from sims.bulk.services import BulkService
+
+        get_inbox_counter(self.supervisor)
+        get_inbox_counter(self.admin)
+        rows = "".join(
+            f"{self.resident.username},Case {i},2026-01-0{i + 1},{status}\n"
+            for i, status in enumerate(["submitted", "submitted", "draft"])
+        )
+        upload = io.BytesIO(("pg_username,case_title,date,status\n" + rows).encode("utf-8"))
+        upload.name = "logbook.csv"
+
+        operation = BulkService(self.admin).import_logbook_entries(upload, dry_run=False)
+
+        self.assertEqual(operation.success_count, 3)
+        self.assertEqual(LogbookEntry.objects.filter(status="SUBMITTED").count(), 2)
+        self.assertEqual(InboxCounter.objects.get(pk=self.supervisor.pk).pending_logbooks, 2)
+        self.assertEqual(InboxCounter.objects.get(pk=self.admin.pk).pending_logbooks, 2)
+        self._assert_in_sync(self.supervisor)
+        self._assert_in_sync(self.admin)
+
+    def test_items_of_inactive_records_and_residents_are_not_counted(self):
+        self._leave()
+        self.assertEqual(get_inbox_counter(self.supervisor).pending_leaves, 1)
+
+        self.record.active = False
+        self.record.save()
+        self.assertEqual(get_inbox_counter(self.supervisor).pending_leaves, 0)
+        self.assertEqual(get_inbox_counter(self.admin).pending_leaves, 0)
+        self._leave(offset=10)
+        self.assertEqual(InboxCounter.objects.get(pk=self.supervisor.pk).pending_leaves, 0)
+
+        self.record.active = True
+        self.record.save()
+        self.assertEqual(get_inbox_counter(self.supervisor).pending_leaves, 2)
+        self.resident.is_active = False
+        self.resident.save(update_fields=["is_active"])
+        self.assertEqual(get_inbox_counter(self.supervisor).pending_leaves, 0)
+        self.assertEqual(get_inbox_counter(self.admin).pending_leaves, 0)
+
+    def test_reconciliation_is_scheduled_in_celery_beat(self):
+        from sims_project.celery import app
+
+        tasks = {entry["task"] for entry in app.conf.beat_schedule.values()}
+        self.assertIn("sims.training.tasks.reconcile_inbox_counters", tasks)
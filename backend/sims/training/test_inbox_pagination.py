@@ -0,0 +1,92 @@
+"""Tests for keyset pagination of the training inboxes."""
+from datetime import timedelta
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import LeaveRequest, ResidentTrainingRecord, TrainingProgram
+from .tests import TODAY, make_user
+
+
+@override_settings(INBOX_PAGE_SIZE=2)
+class InboxKeysetPaginationTest(APITestCase):
+    def setUp(self):
+        self.admin = make_user("inbox_admin", "ADMIN")
+        self.resident = make_user("inbox_res", "RESIDENT")
+        program = TrainingProgram.objects.create(name="Surgery", code="SURG9", duration_months=48)
+        rec = ResidentTrainingRecord.objects.create(
+            resident_user=self.resident, program=program, start_date=TODAY, active=True,
+        )
+        base = timezone.now() - timedelta(days=1)
+        self.leaves = []
+        for index in range(5):
+            leave = LeaveRequest.objects.create(
+                resident_training=rec,
+                leave_type=LeaveRequest.TYPE_ANNUAL,
+                start_date=TODAY + timedelta(days=10 * index),
+                end_date=TODAY + timedelta(days=10 * index + 2),
+                status=LeaveRequest.STATUS_SUBMITTED,
+            )
+            # Leaves 1 and 2 share a timestamp, so pages must break ties on id.
+            LeaveRequest.objects.filter(pk=leave.pk).update(
+                created_at=base + timedelta(minutes=min(index, 1) if index < 3 else index)
+            )
+            self.leaves.append(leave)
+        self.url = reverse("leave-approvals-inbox")
+
+    def _walk(self, **params):
+        self.client.force_authenticate(self.admin)
+        pages = []
+        response = self.client.get(self.url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            if not response.data["next_cursor"]:
+                return pages
+            response = self.client.get(self.url, {**params, "cursor": response.data["next_cursor"]})
+
+    def test_pages_follow_created_at_then_id_without_gaps(self):
+        pages = self._walk()
+
+        self.assertEqual([len(page["results"]) for page in pages], [2, 2, 1])
+        ids = [row["id"] for page in pages for row in page["results"]]
+        self.assertEqual(ids, [leave.pk for leave in self.leaves])
+        self.assertIn("cursor=", pages[0]["next"])
+
+    def test_count_is_opt_in_until_the_last_page(self):
+        pages = self._walk()
+        self.assertEqual([page["count"] for page in pages], [None, None, 5])
+
+        totals = self._walk(include_total="true")
+        self.assertEqual([page["count"] for page in totals], [5, 5, 5])
+
+    def test_estimate_falls_back_to_exact_count_off_postgres(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url, {"include_total": "estimate", "limit": 1})
+
+        self.assertEqual(response.data["count"], 5)
+        self.assertLessEqual(len(response.data["results"]), 1)
+
+    def test_my_leaves_lists_newest_first(self):
+        self.client.force_authenticate(self.resident)
+        response = self.client.get(reverse("my-leaves"), {"limit": 10})
+
+        self.assertEqual([row["id"] for row in response.data["results"]], [leave.pk for leave in reversed(self.leaves)])
+        self.assertEqual(response.data["count"], 5)
+
+    def test_my_leaves_follow_start_date_not_creation_time(self):
+        # An imported leave: created last, but the earliest by start date.
+        LeaveRequest.objects.filter(pk=self.leaves[0].pk).update(created_at=timezone.now())
+        self.client.force_authenticate(self.resident)
+
+        first = self.client.get(reverse("my-leaves"), {"limit": 3})
+        rest = self.client.get(reverse("my-leaves"), {"limit": 3, "cursor": first.data["next_cursor"]})
+
+        ids = [row["id"] for row in first.data["results"] + rest.data["results"]]
+        self.assertEqual(ids, [leave.pk for leave in reversed(self.leaves)])
+
+    def test_invalid_cursor_is_rejected(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get(self.url, {"cursor": "not-a-cursor"}).status_code, 404)
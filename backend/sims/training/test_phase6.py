@@ -22,6 +22,8 @@ from sims.training.models import (
     Workshop,
     ResidentWorkshopCompletion,
     ResidentMilestoneEligibility,
+    LeaveRequest,
+    ResidentDashboardSnapshot,
 )
 from sims.training.eligibility import compute_milestone_eligibility, recompute_for_record
 
@@ -587,6 +589,90 @@ class ResidentSummaryTests(APITestCase):
         # Supervisor role is rejected by RBAC check before RTR lookup
         self.assertEqual(resp.status_code, 403)
 
+    def test_summary_served_from_snapshot_with_etag(self):
+        # The first read cold-starts eligibility, which itself invalidates the snapshot.
+        self.client.get("/api/residents/me/summary/")
+        resp = self.client.get("/api/residents/me/summary/")
+        etag = resp["ETag"]
+        self.assertTrue(etag)
+        snapshot = ResidentDashboardSnapshot.objects.get(resident_training_record=self.rtr)
+        self.assertEqual(snapshot.built_version, snapshot.version)
+
+        resp = self.client.get("/api/residents/me/summary/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_summary_snapshot_rebuilt_after_change(self):
+        first = self.client.get("/api/residents/me/summary/")
+        LeaveRequest.objects.create(
+            resident_training=self.rtr,
+            leave_type=LeaveRequest.LEAVE_TYPE_CHOICES[0][0],
+            start_date=date.today() + timedelta(days=5),
+            end_date=date.today() + timedelta(days=7),
+            status=LeaveRequest.STATUS_SUBMITTED,
+        )
+        resp = self.client.get("/api/residents/me/summary/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], first["ETag"])
+        self.assertEqual(resp.data["leaves"]["pending_count"], 1)
+
+    def _warm_summary(self):
+        # The first read cold-starts eligibility, which itself invalidates the snapshot.
+        self.client.get("/api/residents/me/summary/")
+        return self.client.get("/api/residents/me/summary/")
+
+    def test_summary_rebuilt_after_hospital_and_department_rename(self):
+        from sims.training.models import RotationAssignment
+
+        RotationAssignment.objects.create(
+            resident_training=self.rtr,
+            hospital_department=self.hd,
+            start_date=date.today() - timedelta(days=10),
+            end_date=date.today() + timedelta(days=20),
+            status=RotationAssignment.STATUS_ACTIVE,
+        )
+        self._warm_summary()
+        self.hd.hospital.name = "Renamed Hospital"
+        self.hd.hospital.save()
+        self.hd.department.name = "Renamed Medicine"
+        self.hd.department.save()
+
+        resp = self.client.get("/api/residents/me/summary/")
+        self.assertEqual(resp.data["schedule"][0]["hospital"], "Renamed Hospital")
+        self.assertEqual(resp.data["schedule"][0]["department"], "Renamed Medicine")
+
+    def test_summary_rebuilt_after_workshop_rename(self):
+        workshop = Workshop.objects.create(name="BLS", code="BLS_SUM")
+        ResidentWorkshopCompletion.objects.create(
+            resident_training_record=self.rtr, workshop=workshop, completed_at=date.today()
+        )
+        self._warm_summary()
+        workshop.name = "Basic Life Support"
+        workshop.save()
+
+        resp = self.client.get("/api/residents/me/summary/")
+        self.assertEqual(resp.data["workshops"]["completed_list"][0]["workshop_name"], "Basic Life Support")
+
+    def test_summary_rebuilt_after_supervisor_rename(self):
+        supervisor = _make_user("sup_rename", "SUPERVISOR", first_name="Old", last_name="Name")
+        ResidentResearchProject.objects.create(
+            resident_training_record=self.rtr, title="Renamed", supervisor=supervisor
+        )
+        self._warm_summary()
+        supervisor.first_name = "New"
+        supervisor.save()
+
+        resp = self.client.get("/api/residents/me/summary/")
+        self.assertEqual(resp.data["research"]["supervisor_name"], "New Name")
+
+    def test_summary_tracks_eligibility_stale_flag(self):
+        from sims.training.eligibility import mark_eligibility_stale, recompute_stale_records
+
+        self.assertFalse(self._warm_summary().data["eligibility"]["stale"])
+        mark_eligibility_stale([self.rtr.pk])
+        self.assertTrue(self.client.get("/api/residents/me/summary/").data["eligibility"]["stale"])
+        recompute_stale_records()
+        self.assertFalse(self.client.get("/api/residents/me/summary/").data["eligibility"]["stale"])
+
 
 class SupervisorSummaryTests(APITestCase):
     """Tests for GET /api/supervisors/me/summary/"""
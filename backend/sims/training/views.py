@@ -10,7 +10,7 @@ RBAC summary:
 from datetime import timedelta
 
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, Q
 from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
@@ -18,6 +18,8 @@ from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError as DRFValidationError
 
 from sims.rotations.services import evaluate_rotation_override_policy
+from sims.supervision.scoping import scope_queryset
+from sims.users.authentication import principal_claim
 
 from .models import (
     TrainingProgram,
@@ -58,49 +60,10 @@ class TrainingEmptySchemaSerializer(serializers.Serializer):
 
 
 def _get_supervised_resident_ids(user):
-    from sims.supervision.models import ResidentSupervisorAssignment
-    from sims.users.models import User as SIMSUser
-
-    resident_ids = set()
-
-    # 1. New spine assignments (via ResidentSupervisorAssignment)
-    try:
-        profile = user.supervisor_profile
-        if profile:
-            new_ids = ResidentSupervisorAssignment.objects.filter(
-                supervisor=profile,
-                is_active=True
-            ).values_list("resident__user_id", flat=True)
-            resident_ids.update(new_ids)
-    except Exception:
-        pass
+    """User ids of residents supervised by ``user`` (cached; see SupervisionScope)."""
+    from sims.supervision.scope import SupervisionScope
 
-    # 2. Legacy direct User.supervisor FK is retained only as a narrow compatibility fallback.
-    direct_ids = SIMSUser.objects.filter(
-        supervisor=user,
-        role="RESIDENT"
-    ).values_list("id", flat=True)
-    resident_ids.update(direct_ids)
-
-    return resident_ids
-
-
-def _get_rotation_scope(user):
-    from sims.users.models import DepartmentMembership, SupervisorProfile
-
-    supervised_ids = _get_supervised_resident_ids(user)
-    hod_dept_ids = []
-    try:
-        profile = user.supervisor_profile
-        if profile.designation_ref == "HOD" and profile.department_ref_id:
-            hod_dept_ids = [profile.department_ref_id]
-    except SupervisorProfile.DoesNotExist:
-        pass
-    member_dept_ids = DepartmentMembership.objects.filter(
-        user=user, active=True
-    ).values_list("department_id", flat=True)
-    dept_ids = set(hod_dept_ids).union(set(member_dept_ids))
-    return supervised_ids, dept_ids
+    return SupervisionScope.for_user(user).resident_user_ids
 
 
 def _serialize_supervisor_profile(profile):
@@ -233,15 +196,7 @@ class ResidentTrainingRecordViewSet(viewsets.ModelViewSet):
         qs = ResidentTrainingRecord.objects.select_related(
             "resident_user", "program", "created_by"
         )
-        if _is_resident(user):
-            return qs.filter(resident_user=user)
-        if _is_admin_or_utrmc_admin(user):
-            return qs.all()
-        # supervisors see residents they supervise
-        if _is_supervisor_or_hod(user):
-            supervised_ids = _get_supervised_resident_ids(user)
-            return qs.filter(resident_user_id__in=supervised_ids)
-        return qs.none()
+        return scope_queryset(qs, user)
 
     def check_write_permissions(self, request):
         if not _is_admin_or_utrmc_admin(request.user):
@@ -299,17 +254,7 @@ class RotationAssignmentViewSet(viewsets.ModelViewSet):
         if qp.get("start_date_to"):
             qs = qs.filter(start_date__lte=qp["start_date_to"])
 
-        if _is_resident(user):
-            return qs.filter(resident_training__resident_user=user)
-        if _is_admin_or_utrmc_admin(user):
-            return qs.all()
-        if _is_supervisor_or_hod(user):
-            supervised_ids, dept_ids = _get_rotation_scope(user)
-            return qs.filter(
-                Q(resident_training__resident_user_id__in=supervised_ids)
-                | Q(hospital_department__department_id__in=dept_ids)
-            ).distinct()
-        return qs.none()
+        return scope_queryset(qs, user)
 
     def perform_create(self, serializer):
         serializer.save(
@@ -636,14 +581,7 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         qp = self.request.query_params
         if qp.get("status"):
             qs = qs.filter(status=qp["status"])
-        if _is_resident(user):
-            return qs.filter(resident_training__resident_user=user)
-        if _is_admin_or_utrmc_admin(user):
-            return qs.all()
-        if _is_supervisor_or_hod(user):
-            supervised_ids = _get_supervised_resident_ids(user)
-            return qs.filter(resident_training__resident_user_id__in=supervised_ids)
-        return qs.none()
+        return scope_queryset(qs, user)
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -729,14 +667,7 @@ class DeputationPostingViewSet(viewsets.ModelViewSet):
         qp = self.request.query_params
         if qp.get("status"):
             qs = qs.filter(status=qp["status"])
-        if _is_resident(user):
-            return qs.filter(resident_training__resident_user=user)
-        if _is_admin_or_utrmc_admin(user):
-            return qs.all()
-        if _is_supervisor_or_hod(user):
-            supervised_ids = _get_supervised_resident_ids(user)
-            return qs.filter(resident_training__resident_user_id__in=supervised_ids)
-        return qs.none()
+        return scope_queryset(qs, user)
 
     def create(self, request, *args, **kwargs):
         if not (_is_resident(request.user) or _is_admin_or_utrmc_admin(request.user)):
@@ -797,6 +728,15 @@ class DeputationPostingViewSet(viewsets.ModelViewSet):
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
 
+from .pagination import KeysetPaginator
+
+# Approval queues are worked oldest first; a resident's own history is
+# chronological, latest start first (imported rows keep their place).
+INBOX_PAGINATOR = KeysetPaginator(("created_at", "id"))
+HISTORY_PAGINATOR = KeysetPaginator(("-start_date", "-id"))
+# Eligibility rows are recomputed in place, so only the id is a stable key.
+ELIGIBILITY_PAGINATOR = KeysetPaginator(("id",))
+
 
 @extend_schema(responses={200: None})
 class RotationApprovalInboxView(APIView):
@@ -818,15 +758,10 @@ class RotationApprovalInboxView(APIView):
                 status__in=[RotationAssignment.STATUS_SUBMITTED, RotationAssignment.STATUS_APPROVED]
             )
         elif _is_supervisor_or_hod(user):
-            supervised_ids, dept_ids = _get_rotation_scope(user)
-            qs = qs.filter(status=RotationAssignment.STATUS_SUBMITTED).filter(
-                Q(resident_training__resident_user_id__in=supervised_ids)
-                | Q(hospital_department__department_id__in=dept_ids)
-            ).distinct()
+            qs = scope_queryset(qs.filter(status=RotationAssignment.STATUS_SUBMITTED), user)
         else:
             return Response({"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
-        serializer = RotationAssignmentSerializer(qs, many=True, context={"request": request})
-        return Response({"count": qs.count(), "results": serializer.data})
+        return INBOX_PAGINATOR.paginate(request, qs, RotationAssignmentSerializer)
 
 
 @extend_schema(responses={200: None})
@@ -843,12 +778,10 @@ class LeaveApprovalInboxView(APIView):
         if _is_admin_or_utrmc_admin(user):
             pass  # see all
         elif _is_supervisor_or_hod(user):
-            supervised_ids = _get_supervised_resident_ids(user)
-            qs = qs.filter(resident_training__resident_user_id__in=supervised_ids)
+            qs = scope_queryset(qs, user)
         else:
             return Response({"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
-        serializer = LeaveRequestSerializer(qs, many=True, context={"request": request})
-        return Response({"count": qs.count(), "results": serializer.data})
+        return INBOX_PAGINATOR.paginate(request, qs, LeaveRequestSerializer)
 
 
 @extend_schema(responses={200: None})
@@ -865,9 +798,8 @@ class MyRotationsView(APIView):
             "hospital_department__hospital",
             "hospital_department__department",
             "template",
-        ).order_by("-start_date")
-        serializer = RotationAssignmentSerializer(qs, many=True, context={"request": request})
-        return Response({"count": qs.count(), "results": serializer.data})
+        )
+        return HISTORY_PAGINATOR.paginate(request, qs, RotationAssignmentSerializer)
 
 
 @extend_schema(responses={200: None})
@@ -880,9 +812,8 @@ class MyLeavesView(APIView):
             return Response({"detail": "Residents only."}, status=status.HTTP_403_FORBIDDEN)
         qs = LeaveRequest.objects.filter(
             resident_training__resident_user=request.user
-        ).order_by("-start_date")
-        serializer = LeaveRequestSerializer(qs, many=True, context={"request": request})
-        return Response({"count": qs.count(), "results": serializer.data})
+        )
+        return HISTORY_PAGINATOR.paginate(request, qs, LeaveRequestSerializer)
 
 
 @extend_schema(responses={200: None})
@@ -894,25 +825,15 @@ class SupervisorPendingRotationsView(APIView):
         user = request.user
         if not (_is_supervisor_or_hod(user) or _is_admin_or_utrmc_admin(user)):
             return Response({"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
-        if _is_admin_or_utrmc_admin(user):
-            qs = RotationAssignment.objects.filter(
-                status=RotationAssignment.STATUS_SUBMITTED
-            )
-        else:
-            supervised_ids, dept_ids = _get_rotation_scope(user)
-            qs = RotationAssignment.objects.filter(
-                status=RotationAssignment.STATUS_SUBMITTED,
-            ).filter(
-                Q(resident_training__resident_user_id__in=supervised_ids)
-                | Q(hospital_department__department_id__in=dept_ids)
-            ).distinct()
+        qs = scope_queryset(
+            RotationAssignment.objects.filter(status=RotationAssignment.STATUS_SUBMITTED), user
+        )
         qs = qs.select_related(
             "resident_training__resident_user",
             "hospital_department__hospital",
             "hospital_department__department",
         )
-        serializer = RotationAssignmentSerializer(qs, many=True, context={"request": request})
-        return Response({"count": qs.count(), "results": serializer.data})
+        return INBOX_PAGINATOR.paginate(request, qs, RotationAssignmentSerializer)
 
 
 # =============================================================================
@@ -1092,6 +1013,12 @@ def _get_active_rtr_or_none(user):
     return ResidentTrainingRecord.objects.filter(resident_user=user, active=True).first()
 
 
+def _parse_if_none_match(request):
+    """Entity tags listed in the request's If-None-Match header."""
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+
 @extend_schema(responses={200: None})
 class ResidentResearchProjectView(APIView):
     """
@@ -1351,23 +1278,17 @@ class MyEligibilityView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        rtr = _get_active_rtr(request.user)
-        # Trigger recompute on-demand for freshness
-        try:
-            from sims.training.eligibility import recompute_for_record
-            recompute_for_record(rtr)
-        except Exception:
-            pass
+        from sims.training.eligibility import load_eligibility_snapshot
 
-        qs = ResidentMilestoneEligibility.objects.filter(
-            resident_training_record=rtr
-        ).select_related("milestone")
-        serializer = ResidentMilestoneEligibilitySerializer(qs, many=True, context={"request": request})
+        rtr = _get_active_rtr(request.user)
+        rows, stale = load_eligibility_snapshot(rtr)
+        serializer = ResidentMilestoneEligibilitySerializer(rows, many=True, context={"request": request})
         return Response({
             "resident_training_record": rtr.id,
             "program": {"id": rtr.program_id, "code": rtr.program.code, "name": rtr.program.name},
             "current_month_index": rtr.current_month_index(),
             "eligibilities": serializer.data,
+            "eligibility_stale": stale,
         })
 
 
@@ -1399,8 +1320,7 @@ class UTRMCEligibilityView(APIView):
         if eli_status:
             qs = qs.filter(status=eli_status)
 
-        serializer = ResidentMilestoneEligibilitySerializer(qs, many=True, context={"request": request})
-        return Response({"count": qs.count(), "results": serializer.data})
+        return ELIGIBILITY_PAGINATOR.paginate(request, qs, ResidentMilestoneEligibilitySerializer)
 
 
 @extend_schema(responses={200: None})
@@ -1455,7 +1375,6 @@ class ResidentSummaryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        from django.utils import timezone
         user = request.user
         if not _is_resident(user) and not _is_admin_or_utrmc_admin(user):
             return Response({"detail": "Resident access required."}, status=403)
@@ -1487,6 +1406,7 @@ class ResidentSummaryView(APIView):
                 "eligibility": {
                     "IMM": {"status": None, "reasons": []},
                     "FINAL": {"status": None, "reasons": []},
+                    "stale": False,
                 },
                 "supervision": {
                     "active_primary": _serialize_assignment(resident_supervision["active_primary"]),
@@ -1498,6 +1418,20 @@ class ResidentSummaryView(APIView):
                     ],
                 },
             })
+
+        from sims.training.dashboard import get_resident_dashboard
+
+        payload, etag = get_resident_dashboard(rtr, lambda: self._build_payload(user, rtr))
+        if etag in _parse_if_none_match(request):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(payload)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def _build_payload(self, user, rtr):
+        """Assemble the full dashboard payload; persisted by get_resident_dashboard."""
         today = timezone.now().date()
 
         # --- Training record ---
@@ -1529,47 +1463,31 @@ class ResidentSummaryView(APIView):
 
         current_rotation = None
         next_rotation = None
+        all_rotations = []  # full schedule (chronological)
         for r in rotations_qs:
-            active = r.status in {RotationAssignment.STATUS_ACTIVE, RotationAssignment.STATUS_APPROVED}
-            if active and r.start_date <= today and r.end_date >= today:
-                current_rotation = {
-                    "id": r.id,
-                    "department": r.hospital_department.department.name,
-                    "hospital": r.hospital_department.hospital.name,
-                    "start_date": r.start_date.isoformat(),
-                    "end_date": r.end_date.isoformat(),
-                    "status": r.status,
-                }
-            elif active and r.start_date > today and next_rotation is None:
-                next_rotation = {
-                    "id": r.id,
-                    "department": r.hospital_department.department.name,
-                    "hospital": r.hospital_department.hospital.name,
-                    "start_date": r.start_date.isoformat(),
-                    "end_date": r.end_date.isoformat(),
-                    "status": r.status,
-                }
-
-        # All rotations for schedule (chronological)
-        all_rotations = []
-        for r in rotations_qs:
-            all_rotations.append({
+            item = {
                 "id": r.id,
                 "department": r.hospital_department.department.name,
                 "hospital": r.hospital_department.hospital.name,
                 "start_date": r.start_date.isoformat(),
                 "end_date": r.end_date.isoformat(),
                 "status": r.status,
-            })
+            }
+            all_rotations.append(item)
+            active = r.status in {RotationAssignment.STATUS_ACTIVE, RotationAssignment.STATUS_APPROVED}
+            if active and r.start_date <= today and r.end_date >= today:
+                current_rotation = dict(item)
+            elif active and r.start_date > today and next_rotation is None:
+                next_rotation = dict(item)
 
         # --- Leaves ---
-        leaves_qs = LeaveRequest.objects.filter(resident_training=rtr)
-        leaves_active = leaves_qs.filter(status=LeaveRequest.STATUS_APPROVED).count()
-        leaves_pending = leaves_qs.filter(status=LeaveRequest.STATUS_SUBMITTED).count()
         leaves_list = list(
-            leaves_qs.values("id", "leave_type", "start_date", "end_date", "status")
+            LeaveRequest.objects.filter(resident_training=rtr)
+            .values("id", "leave_type", "start_date", "end_date", "status")
             .order_by("-start_date")
         )
+        leaves_active = sum(1 for item in leaves_list if item["status"] == LeaveRequest.STATUS_APPROVED)
+        leaves_pending = sum(1 for item in leaves_list if item["status"] == LeaveRequest.STATUS_SUBMITTED)
         for item in leaves_list:
             if item["start_date"]:
                 item["start_date"] = item["start_date"].isoformat()
@@ -1577,9 +1495,12 @@ class ResidentSummaryView(APIView):
                 item["end_date"] = item["end_date"].isoformat()
 
         # --- Postings ---
-        postings_qs = DeputationPosting.objects.filter(resident_training=rtr)
-        postings_active = postings_qs.filter(status=DeputationPosting.STATUS_APPROVED).count()
-        postings_pending = postings_qs.filter(status=DeputationPosting.STATUS_SUBMITTED).count()
+        posting_counts = DeputationPosting.objects.filter(resident_training=rtr).aggregate(
+            active=Count("id", filter=Q(status=DeputationPosting.STATUS_APPROVED)),
+            pending=Count("id", filter=Q(status=DeputationPosting.STATUS_SUBMITTED)),
+        )
+        postings_active = posting_counts["active"]
+        postings_pending = posting_counts["pending"]
 
         # --- Research ---
         try:
@@ -1645,20 +1566,13 @@ class ResidentSummaryView(APIView):
             ],
         }
 
-        # --- Eligibility (recompute + snapshot) ---
-        try:
-            from sims.training.eligibility import recompute_for_record
-            recompute_for_record(rtr)
-        except Exception:
-            pass
-
-        eligibility_qs = ResidentMilestoneEligibility.objects.filter(
-            resident_training_record=rtr
-        ).select_related("milestone")
+        # --- Eligibility (persisted snapshot; recompute is queued on change) ---
+        from sims.training.eligibility import load_eligibility_snapshot
+        eligibility_rows, eligibility_stale = load_eligibility_snapshot(rtr)
 
         imm_eli = {"status": None, "reasons": []}
         final_eli = {"status": None, "reasons": []}
-        for eli in eligibility_qs:
+        for eli in eligibility_rows:
             reasons = sorted(eli.reasons_json) if isinstance(eli.reasons_json, list) else []
             entry = {"status": eli.status, "reasons": reasons}
             if eli.milestone.code == "IMM":
@@ -1679,7 +1593,7 @@ class ResidentSummaryView(APIView):
             ],
         }
 
-        return Response({
+        return {
             "training_record": training_data,
             "rotation": {"current": current_rotation, "next": next_rotation},
             "schedule": all_rotations,
@@ -1692,9 +1606,9 @@ class ResidentSummaryView(APIView):
             "research": research_data,
             "thesis": thesis_data,
             "workshops": workshops_data,
-            "eligibility": {"IMM": imm_eli, "FINAL": final_eli},
+            "eligibility": {"IMM": imm_eli, "FINAL": final_eli, "stale": eligibility_stale},
             "supervision": supervision_data,
-        })
+        }
 
 
 @extend_schema(responses={200: None})
@@ -1732,25 +1646,9 @@ class SupervisorSummaryView(APIView):
         rtr_by_id = {r.id: r for r in rtrs}
 
         # ---- Pending approval counts ----
-        pending_rotations = RotationAssignment.objects.filter(
-            resident_training_id__in=rtr_ids,
-            status=RotationAssignment.STATUS_SUBMITTED,
-        ).count()
+        from sims.training.inbox import get_inbox_counter
 
-        pending_leaves = LeaveRequest.objects.filter(
-            resident_training_id__in=rtr_ids,
-            status=LeaveRequest.STATUS_SUBMITTED,
-        ).count()
-
-        if _is_admin_or_utrmc_admin(user):
-            pending_research = ResidentResearchProject.objects.filter(
-                status=ResidentResearchProject.STATUS_SUBMITTED_SUPERVISOR,
-            ).count()
-        else:
-            pending_research = ResidentResearchProject.objects.filter(
-                status=ResidentResearchProject.STATUS_SUBMITTED_SUPERVISOR,
-                resident_training_record_id__in=rtr_ids,
-            ).count()
+        counter = get_inbox_counter(user)
 
         # ---- Current rotations ----
         today = timezone.now().date()
@@ -1819,9 +1717,9 @@ class SupervisorSummaryView(APIView):
 
         return Response({
             "pending": {
-                "rotation_approvals": pending_rotations,
-                "leave_approvals": pending_leaves,
-                "research_approvals": pending_research,
+                "rotation_approvals": counter.pending_rotations,
+                "leave_approvals": counter.pending_leaves,
+                "research_approvals": counter.pending_research,
             },
             "residents": residents_list,
             "supervision": supervision_data,
@@ -1889,15 +1787,9 @@ class SupervisorResidentProgressView(APIView):
         # Workshops
         ws_count = ResidentWorkshopCompletion.objects.filter(resident_training_record=rtr).count()
 
-        # Eligibility
-        try:
-            from sims.training.eligibility import recompute_for_record
-            recompute_for_record(rtr)
-        except Exception:
-            pass
-        eligibilities = ResidentMilestoneEligibility.objects.filter(
-            resident_training_record=rtr
-        ).select_related("milestone")
+        # Eligibility (persisted snapshot; recompute is queued on change)
+        from sims.training.eligibility import load_eligibility_snapshot
+        eligibilities, eligibility_stale = load_eligibility_snapshot(rtr)
         imm_eli = {"status": None, "reasons": []}
         final_eli = {"status": None, "reasons": []}
         for eli in eligibilities:
@@ -1919,12 +1811,15 @@ class SupervisorResidentProgressView(APIView):
             "research": research_data,
             "thesis": thesis_data,
             "workshops": {"total_completed": ws_count},
-            "eligibility": {"IMM": imm_eli, "FINAL": final_eli},
+            "eligibility": {"IMM": imm_eli, "FINAL": final_eli, "stale": eligibility_stale},
         })
 
 
 def _is_hod(user):
     from sims.users.models import SupervisorProfile
+    is_hod = principal_claim(user, "is_hod")
+    if is_hod is not None:
+        return is_hod
     try:
         profile = user.supervisor_profile
         return profile.designation_ref == "HOD"
@@ -1934,6 +1829,9 @@ def _is_hod(user):
 
 def _get_hod_department_ids(user):
     from sims.users.models import SupervisorProfile
+    hod_department_ids = principal_claim(user, "hod_department_ids")
+    if hod_department_ids is not None:
+        return set(hod_department_ids)
     try:
         profile = user.supervisor_profile
         if profile.designation_ref == "HOD" and profile.department_ref_id:
@@ -2354,12 +2252,7 @@ class _SubmissionReviewQueueBaseView(APIView):
         if _is_admin_or_utrmc_admin(user) or user.role == "SUPPORT_STAFF":
             pass
         elif _is_supervisor_or_hod(user):
-            supervised_ids = _get_supervised_resident_ids(user)
-            dept_ids = _get_hod_department_ids(user)
-            qs = qs.filter(
-                Q(resident_training_record__resident_user_id__in=supervised_ids)
-                | Q(resident_training_record__resident_user__home_department_id__in=dept_ids)
-            ).distinct()
+            qs = scope_queryset(qs, user)
         else:
             return Response({"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
 
@@ -2510,12 +2403,7 @@ class SubmissionCertificatesView(APIView):
         elif _is_admin_or_utrmc_admin(user) or user.role == "SUPPORT_STAFF":
             pass
         elif _is_supervisor_or_hod(user):
-            supervised_ids = _get_supervised_resident_ids(user)
-            dept_ids = _get_hod_department_ids(user)
-            qs = qs.filter(
-                Q(submission__resident_training_record__resident_user_id__in=supervised_ids)
-                | Q(submission__resident_training_record__resident_user__home_department_id__in=dept_ids)
-            ).distinct()
+            qs = scope_queryset(qs, user)
         else:
             return Response({"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
 
@@ -2578,13 +2466,7 @@ class RotationCompletionsView(APIView):
         elif _is_admin_or_utrmc_admin(user) or user.role == "SUPPORT_STAFF":
             pass
         elif _is_supervisor_or_hod(user):
-            supervised_ids = _get_supervised_resident_ids(user)
-            dept_ids = _get_hod_department_ids(user)
-            qs = qs.filter(
-                Q(rotation__resident_training__resident_user_id__in=supervised_ids)
-                | Q(rotation__resident_training__resident_user__home_department_id__in=dept_ids)
-                | Q(rotation__hospital_department__department_id__in=dept_ids)
-            ).distinct()
+            qs = scope_queryset(qs, user)
         else:
             return Response({"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
 
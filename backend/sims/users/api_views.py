@@ -25,6 +25,7 @@ from django.core.mail import send_mail
 from django.conf import settings
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from .authentication import add_principal_claims
 from .models import User
 from .serializers import AssignedPGSerializer, UserSerializer, UserRegistrationSerializer
 from .permissions import IsSupervisor
@@ -52,6 +53,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token["email"] = user.email
         token["role"] = user.role
         token["full_name"] = user.get_full_name()
+        add_principal_claims(token, user)
 
         return token
 
@@ -122,7 +124,7 @@ def register_view(request):
         user = serializer.save()
 
         # Generate tokens for immediate login
-        refresh = RefreshToken.for_user(user)
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
 
         return Response(
             {
@@ -0,0 +1,203 @@
+"""
+Stateless JWT authentication backed by versioned per-user principal claims.
+
+Access tokens minted at login carry the claims most views branch on: role,
+the user's resident/supervisor profile ids, the HOD flag and department ids
+(see ``PRINCIPAL_CLAIMS``), stamped with the user's current principal version.
+``PrincipalJWTAuthentication`` serves a request straight from those claims
+when the token's version still matches the one in the cache, so an
+authenticated request costs one cache read instead of a ``User`` query plus
+profile lookups. On a mismatch the claims are rebuilt from the database and
+cached under the new version.
+
+``revoke_principal`` moves a user to a fresh version; the signals in
+``sims.users.signals`` call it whenever a field or profile behind the claims
+changes, so a role change or deactivation takes effect on the next request
+even for unexpired tokens. Versions are random tokens rather than counters,
+so a cache flush can never make an old token match again.
+
+Versions only reach other processes through a shared cache. With a
+per-process cache (the local-memory fallback used when Redis is not
+configured) a revocation in one worker is invisible to the others, so every
+request additionally re-reads ``role`` and ``is_active`` from the database
+and rebuilds the claims when they moved (see ``principal_cache_is_shared``).
+
+``request.user`` is a ``RequestPrincipal``: a lazy ``User`` that answers the
+claim attributes directly and loads the row only when a view needs anything
+else (including FK assignment and ``isinstance`` checks).
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+HOD_DESIGNATION = "HOD"
+VERSION_CLAIM = "pv"
+# Claims re-checked against the database when the cache is per-process.
+REVOCABLE_CLAIMS = ("role", "is_active")
+# Plain User columns mirrored onto the principal.
+USER_CLAIMS = ("username", "role", "is_active", "is_staff", "is_superuser", "home_department_id")
+PRINCIPAL_CLAIMS = USER_CLAIMS + (
+    "resident_profile_id",
+    "supervisor_profile_id",
+    "is_hod",
+    "hod_department_ids",
+    "department_ids",
+)
+
+
+def _version_key(user_id) -> str:
+    return f"auth:principal:version:{user_id}"
+
+
+def principal_version(user_id) -> str:
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def revoke_principal(user_id) -> None:
+    """Retire every token-borne and cached claim set of ``user_id``."""
+    if user_id:
+        cache.set(_version_key(user_id), uuid.uuid4().hex, None)
+
+
+def build_principal_claims(user_id) -> Optional[dict]:
+    """Read a user's claims from the database; ``None`` if the user is gone."""
+    from .models import DepartmentMembership, ResidentProfile, SupervisorProfile, User
+
+    claims = User.objects.filter(pk=user_id).values(*USER_CLAIMS).first()
+    if claims is None:
+        return None
+    supervisor = (
+        SupervisorProfile.objects.filter(user_id=user_id)
+        .values("id", "designation_ref_id", "department_ref_id")
+        .first()
+    )
+    is_hod = bool(supervisor and supervisor["designation_ref_id"] == HOD_DESIGNATION)
+    hod_department_ids = [supervisor["department_ref_id"]] if is_hod and supervisor["department_ref_id"] else []
+    department_ids = set(
+        DepartmentMembership.objects.filter(user_id=user_id, active=True).values_list("department_id", flat=True)
+    )
+    claims.update(
+        resident_profile_id=ResidentProfile.objects.filter(user_id=user_id).values_list("id", flat=True).first(),
+        supervisor_profile_id=supervisor["id"] if supervisor else None,
+        is_hod=is_hod,
+        hod_department_ids=hod_department_ids,
+        department_ids=sorted(department_ids.union(hod_department_ids)),
+    )
+    return claims
+
+
+def add_principal_claims(token, user) -> None:
+    """Stamp ``token`` with ``user``'s current claims and principal version."""
+    version = principal_version(user.pk)
+    claims = build_principal_claims(user.pk) or {}
+    for name in PRINCIPAL_CLAIMS:
+        token[name] = claims.get(name)
+    token[VERSION_CLAIM] = version
+
+
+def principal_cache_is_shared() -> bool:
+    """Whether principal versions are seen by every process (``AUTH_PRINCIPAL_SHARED_CACHE``)."""
+    shared = getattr(settings, "AUTH_PRINCIPAL_SHARED_CACHE", None)
+    if shared is None:
+        return not isinstance(caches["default"], (LocMemCache, DummyCache))
+    return shared
+
+
+def _cached_principal_claims(user_id, token) -> Optional[dict]:
+    version = principal_version(user_id)
+    if token is not None and token.get(VERSION_CLAIM) == version and all(name in token for name in PRINCIPAL_CLAIMS):
+        return {name: token[name] for name in PRINCIPAL_CLAIMS}
+
+    ttl = getattr(settings, "AUTH_PRINCIPAL_CACHE_TTL", 0)
+    key = f"auth:principal:{user_id}:{version}"
+    claims = cache.get(key) if ttl > 0 else None
+    if claims is None:
+        claims = build_principal_claims(user_id)
+        if claims is not None and ttl > 0:
+            cache.set(key, claims, ttl)
+    return claims
+
+
+def get_principal_claims(user_id, token=None) -> Optional[dict]:
+    """
+    The user's current claims: taken from ``token`` when its version is
+    current, else from the per-user cache, else rebuilt from the database.
+    Without a shared cache, ``REVOCABLE_CLAIMS`` are verified against the row.
+    """
+    from .models import User
+
+    claims = _cached_principal_claims(user_id, token)
+    if claims is None or principal_cache_is_shared():
+        return claims
+    current = User.objects.filter(pk=user_id).values(*REVOCABLE_CLAIMS).first()
+    if current is None:
+        return None
+    if any(claims[name] != current[name] for name in REVOCABLE_CLAIMS):
+        return build_principal_claims(user_id)
+    return claims
+
+
+def principal_claim(user, name, default=None):
+    """A claim of ``user`` when it is a ``RequestPrincipal``, else ``default``."""
+    claims = getattr(user, "principal_claims", None)
+    if claims is None:
+        return default
+    return claims.get(name, default)
+
+
+class RequestPrincipal(SimpleLazyObject):
+    """A ``User`` that answers claim attributes without loading the row."""
+
+    def __init__(self, user_id, claims: dict):
+        from .models import User
+
+        super().__init__(lambda: User.objects.get(pk=user_id))
+        self.__dict__.update(
+            {name: claims[name] for name in USER_CLAIMS},
+            id=user_id,
+            pk=user_id,
+            is_authenticated=True,
+            is_anonymous=False,
+            principal_claims=claims,
+        )
+
+    def __setattr__(self, name, value):
+        # A write to the real user must not be shadowed by a stale claim.
+        if name not in ("_wrapped", "_setupfunc"):
+            self.__dict__.pop(name, None)
+        super().__setattr__(name, value)
+
+
+class PrincipalJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that resolves the user from principal claims."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from exc
+        # Tokens carry the id as a string; the principal's pk must compare equal to real ones.
+        user_id = self.user_model._meta.pk.to_python(user_id)
+
+        claims = get_principal_claims(user_id, validated_token)
+        if claims is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not claims["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return RequestPrincipal(user_id, claims)
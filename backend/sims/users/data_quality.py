@@ -5,6 +5,7 @@ from typing import Any
 from django.contrib.auth import get_user_model
 from django.db import transaction
 
+from sims.audit.writer import buffered_activity_log
 from sims.training.models import ResidentTrainingRecord
 from sims.users.models import DataCorrectionAudit, ResidentProfile
 
@@ -117,20 +118,21 @@ def recompute_all() -> dict[str, int]:
     placeholders = 0
     users_with_missing_dates = 0
     default_records = 0
-    for user in User.objects.filter(role="RESIDENT").iterator():
-        total += 1
-        result = recompute_flags_for_user(user)
-        if not user.is_complete_profile:
-            incomplete += 1
-        if user.has_placeholder_email:
-            placeholders += 1
-        has_missing_dates = (
-            "missing_training_dates" in (result.get("issues") or [])
-            or "missing_supervision_dates" in (result.get("issues") or [])
-        )
-        if has_missing_dates:
-            users_with_missing_dates += 1
-        default_records += user.training_records.filter(has_default_dates=True).count()
+    with buffered_activity_log(asynchronous=False):
+        for user in User.objects.filter(role="RESIDENT").iterator():
+            total += 1
+            result = recompute_flags_for_user(user)
+            if not user.is_complete_profile:
+                incomplete += 1
+            if user.has_placeholder_email:
+                placeholders += 1
+            has_missing_dates = (
+                "missing_training_dates" in (result.get("issues") or [])
+                or "missing_supervision_dates" in (result.get("issues") or [])
+            )
+            if has_missing_dates:
+                users_with_missing_dates += 1
+            default_records += user.training_records.filter(has_default_dates=True).count()
     return {
         "total_users": total,
         "incomplete_profiles": incomplete,
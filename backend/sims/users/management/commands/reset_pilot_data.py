@@ -20,7 +20,7 @@ from sims.training.models import (
     SubmissionCertificate, RotationCompletion, RotationCertificate
 )
 from sims.notifications.models import Notification, NotificationPreference
-from sims.audit.models import ActivityLog, AuditReport
+from sims.audit.models import ActivityLog, ActivityLogDailyRollup, AuditReport
 from sims.bulk.models import BulkOperation
 
 User = get_user_model()
@@ -60,6 +60,7 @@ class Command(BaseCommand):
         # All transactional rows are deleted
         deletions = {
             "ActivityLog": ActivityLog.objects.all(),
+            "ActivityLogDailyRollup": ActivityLogDailyRollup.objects.all(),
             "AuditReport": AuditReport.objects.all(),
             "BulkOperation": BulkOperation.objects.all(),
             "Notification": Notification.objects.all(),
@@ -289,54 +289,16 @@ class User(AbstractUser):
         """
         try:
             if self.role == "SUPERVISOR":
-                assigned_pgs = self.get_assigned_pgs()
-                if not assigned_pgs.exists():
-                    return 0
-                
-                total = 0
-                
-                # Pending logbook entry reviews
-                try:
-                    from sims.training.models import LogbookEntry
-                    total += LogbookEntry.objects.filter(
-                        resident_training_record__resident_user__in=assigned_pgs,
-                        status="SUBMITTED"
-                    ).count()
-                except Exception:
-                    pass
-
-                # Pending rotation completion verifications or assignments
-                try:
-                    from sims.training.models import RotationAssignment
-                    total += RotationAssignment.objects.filter(
-                        resident_training__resident_user__in=assigned_pgs,
-                        status="SUBMITTED"
-                    ).count()
-                except Exception:
-                    pass
-
-                # Pending leave requests
-                try:
-                    from sims.training.models import LeaveRequest
-                    total += LeaveRequest.objects.filter(
-                        resident_training__resident_user__in=assigned_pgs,
-                        status="SUBMITTED"
-                    ).count()
-                except Exception:
-                    pass
+                from sims.training.inbox import get_inbox_counter
+
+                counter = get_inbox_counter(self)
+                return (
+                    counter.pending_logbooks
+                    + counter.pending_rotations
+                    + counter.pending_leaves
+                    + counter.pending_submissions
+                )
 
-                # Pending synopses/theses
-                try:
-                    from sims.training.models import ResidentSubmission
-                    total += ResidentSubmission.objects.filter(
-                        resident_training_record__resident_user__in=assigned_pgs,
-                        status="SUBMITTED"
-                    ).count()
-                except Exception:
-                    pass
-                
-                return total
-            
             elif self.role == "RESIDENT":
                 total = 0
                 try:
@@ -1,4 +1,6 @@
 import string
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q
 from django.db import transaction
 from django.contrib.auth import get_user_model
@@ -229,38 +231,129 @@ def get_missing_profile_fields(user):
     return missing
 
 
+def _save_if_changed(instance, values):
+    changed = [field for field, value in values.items() if getattr(instance, field) != value]
+    if not changed:
+        return False
+    for field in changed:
+        setattr(instance, field, values[field])
+    instance.save()
+    return True
+
+
 def recalculate_profile_completion(user):
     """
     Recalculates profile completion state from registry and updates User and Profile objects.
+
+    Rows are only saved when the computed state differs from what is stored,
+    so repeated calls do not write (or generate history/audit rows).
+    Returns True when anything was persisted.
     """
     role = user.role
     if role not in PROFILE_COMPLETION_REQUIREMENTS:
-        return
+        return False
 
     req_config = PROFILE_COMPLETION_REQUIREMENTS[role]
     profile_relation = req_config["profile_relation"]
     profile = getattr(user, profile_relation, None)
     if not profile:
-        return
+        return False
 
     missing = get_missing_profile_fields(user)
     current_schema_version = req_config["schema_version"]
 
     if missing:
-        user.is_profile_complete = False
-        user.is_complete_profile = False
-        profile.profile_status = "INCOMPLETE"
-        profile.save()
-        user.save()
+        user_values = {"is_profile_complete": False, "is_complete_profile": False}
+        profile_values = {"profile_status": "INCOMPLETE"}
     else:
-        user.is_profile_complete = True
-        user.is_complete_profile = True
-        profile.profile_status = "COMPLETE"
-        profile.completed_schema_version = current_schema_version
+        user_values = {"is_profile_complete": True, "is_complete_profile": True}
+        profile_values = {
+            "profile_status": "COMPLETE",
+            "completed_schema_version": current_schema_version,
+        }
         if not profile.profile_completed_at:
-            profile.profile_completed_at = timezone.now()
-        profile.save()
-        user.save()
+            profile_values["profile_completed_at"] = timezone.now()
+
+    profile_changed = _save_if_changed(profile, profile_values)
+    user_changed = _save_if_changed(user, user_values)
+    return profile_changed or user_changed
+
+
+def _auth_me_cache_key(user_id):
+    return f"users:auth-me:{user_id}"
+
+
+def build_auth_me_payload(user):
+    """Build the /auth/me payload from the user's current in-memory state."""
+    missing = get_missing_profile_fields(user)
+    missing_fields = [m["field"] for m in missing]
+
+    role = user.role
+    profile_type = ""
+    profile_id = None
+    profile_status = "INCOMPLETE"
+    profile_schema_version = 1
+    completed_schema_version = 0
+
+    if role in PROFILE_COMPLETION_REQUIREMENTS:
+        req_config = PROFILE_COMPLETION_REQUIREMENTS[role]
+        profile_relation = req_config["profile_relation"]
+        profile = getattr(user, profile_relation, None)
+        if profile:
+            profile_type = profile.__class__.__name__
+            profile_id = profile.id
+            profile_status = profile.profile_status
+            profile_schema_version = profile.profile_schema_version
+            completed_schema_version = profile.completed_schema_version
+
+    if user.must_change_password:
+        allowed_next_route = "/change-password"
+    elif missing:
+        allowed_next_route = "/complete-profile"
+    else:
+        allowed_next_route = user.get_dashboard_url()
+
+    return {
+        "id": user.id,
+        "username": user.username,
+        "role": user.role,
+        "must_change_password": user.must_change_password,
+        "is_profile_complete": user.is_profile_complete,
+        "profile_type": profile_type,
+        "profile_id": profile_id,
+        "profile_status": profile_status,
+        "profile_schema_version": profile_schema_version,
+        "completed_schema_version": completed_schema_version,
+        "missing_required_fields": missing_fields,
+        "allowed_next_route": allowed_next_route,
+    }
+
+
+def get_auth_me_payload(user):
+    """
+    Return the /auth/me payload, served from a short-lived per-user cache.
+
+    On a miss, completion state is reconciled (writing only if it drifted)
+    and the payload is rebuilt. Saves of the user or its profile invalidate
+    the entry via ``invalidate_auth_me_cache``.
+    """
+    ttl = getattr(settings, "AUTH_ME_CACHE_TTL", 30)
+    key = _auth_me_cache_key(user.pk)
+    if ttl > 0:
+        payload = cache.get(key)
+        if payload is not None:
+            return payload
+
+    recalculate_profile_completion(user)
+    payload = build_auth_me_payload(user)
+    if ttl > 0:
+        cache.set(key, payload, timeout=ttl)
+    return payload
+
+
+def invalidate_auth_me_cache(user_id):
+    if user_id:
+        cache.delete(_auth_me_cache_key(user_id))
 
 
 def create_user_with_profile(
@@ -1,4 +1,4 @@
-"""User bootstrap signals.
+"""User bootstrap and cache-invalidation signals.
 
 The clean pilot baseline recreates minimal PG/resident accounts by role. Those
 accounts need a canonical active training record so resident dashboards and
@@ -7,12 +7,14 @@ resident-scoped workflows remain usable without frontend fallbacks.
 
 from datetime import timedelta
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
 from sims.training.models import ResidentTrainingRecord, TrainingProgram
-from .models import User
+from .authentication import USER_CLAIMS, revoke_principal
+from .models import AdminProfile, DepartmentMembership, ResidentProfile, SupervisorProfile, SupportStaffProfile, User
+from .services import invalidate_auth_me_cache
 
 
 BASELINE_PROGRAM_CODE = "PILOT-BASELINE"
@@ -61,3 +63,60 @@ def ensure_pilot_training_baseline(sender, instance: User, created: bool, **kwar
         )
 
     _bootstrap()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_me_on_user_change(sender, instance: User, **kwargs):
+    """Drop the cached /auth/me payload whenever the user row changes."""
+    invalidate_auth_me_cache(instance.pk)
+
+
+@receiver(post_save, sender=AdminProfile)
+@receiver(post_save, sender=ResidentProfile)
+@receiver(post_save, sender=SupervisorProfile)
+@receiver(post_save, sender=SupportStaffProfile)
+@receiver(post_delete, sender=AdminProfile)
+@receiver(post_delete, sender=ResidentProfile)
+@receiver(post_delete, sender=SupervisorProfile)
+@receiver(post_delete, sender=SupportStaffProfile)
+def invalidate_auth_me_on_profile_change(sender, instance, **kwargs):
+    """Profile edits change completion state reported by /auth/me."""
+    invalidate_auth_me_cache(instance.user_id)
+
+
+# User fields whose change alters the JWT principal claims.
+PRINCIPAL_USER_FIELDS = {"username", "role", "is_active", "is_staff", "is_superuser", "home_department"}
+
+
+@receiver(post_init, sender=User)
+def remember_principal_fields(sender, instance: User, **kwargs):
+    instance._principal_fields = tuple(instance.__dict__.get(name) for name in USER_CLAIMS)
+
+
+@receiver(post_save, sender=User)
+def revoke_principal_on_user_change(sender, instance: User, created: bool, update_fields=None, **kwargs):
+    """Logins and profile-completion saves leave the claims alone; role or status changes do not."""
+    current = tuple(getattr(instance, name) for name in USER_CLAIMS)
+    previous = getattr(instance, "_principal_fields", None)
+    instance._principal_fields = current
+    if created or (update_fields is not None and not PRINCIPAL_USER_FIELDS & set(update_fields)):
+        return
+    if current != previous:
+        revoke_principal(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_principal_on_user_delete(sender, instance: User, **kwargs):
+    revoke_principal(instance.pk)
+
+
+@receiver(post_save, sender=ResidentProfile)
+@receiver(post_save, sender=SupervisorProfile)
+@receiver(post_save, sender=DepartmentMembership)
+@receiver(post_delete, sender=ResidentProfile)
+@receiver(post_delete, sender=SupervisorProfile)
+@receiver(post_delete, sender=DepartmentMembership)
+def revoke_principal_on_scope_change(sender, instance, **kwargs):
+    """Profile ids, the HOD flag and department ids are principal claims."""
+    revoke_principal(instance.user_id)
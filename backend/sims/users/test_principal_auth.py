@@ -0,0 +1,117 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from sims.academics.models import Department
+from sims.users.authentication import PrincipalJWTAuthentication, RequestPrincipal
+from sims.users.models import SupervisorProfile, User
+
+
+class PrincipalJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.department = Department.objects.create(name="Surgery", code="SURG", active=True)
+        self.user = User.objects.create_user(
+            username="principal_hod", password="testpass123", role="SUPERVISOR", specialty="surgery"
+        )
+        SupervisorProfile.objects.update_or_create(
+            user=self.user, defaults={"designation_ref": "HOD", "department_ref": self.department}
+        )
+
+    def _access_token(self):
+        response = self.client.post(
+            reverse("auth_api:token_obtain_pair"),
+            {"username": "principal_hod", "password": "testpass123"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data["access"]
+
+    def _authenticate(self, token):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return PrincipalJWTAuthentication().authenticate(request)[0]
+
+    def test_current_token_authenticates_from_claims_without_queries(self):
+        token = self._access_token()
+
+        with CaptureQueriesContext(connection) as queries:
+            principal = self._authenticate(token)
+            claims = (principal.pk, principal.role, principal.is_authenticated, principal.principal_claims)
+
+        self.assertEqual(len(queries), 0)
+        self.assertIsInstance(principal, RequestPrincipal)
+        self.assertEqual(claims[:3], (self.user.pk, "SUPERVISOR", True))
+        self.assertTrue(claims[3]["is_hod"])
+        self.assertEqual(claims[3]["hod_department_ids"], [self.department.pk])
+        self.assertEqual(claims[3]["supervisor_profile_id"], self.user.supervisor_profile.pk)
+
+    def test_principal_loads_the_user_only_when_needed(self):
+        principal = self._authenticate(self._access_token())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIsInstance(principal, User)
+            self.assertEqual(principal.get_full_name(), self.user.get_full_name())
+        self.assertEqual(len(queries), 1)
+
+        principal.username = "renamed"
+        self.assertEqual(principal.username, "renamed")
+
+    def test_role_change_revokes_token_claims(self):
+        token = self._access_token()
+        self.user.role = "ADMIN"
+        self.user.save()
+
+        self.assertEqual(self._authenticate(token).role, "ADMIN")
+
+    def test_membership_change_revokes_department_claims(self):
+        token = self._access_token()
+        medicine = Department.objects.create(name="Medicine", code="MEDI", active=True)
+        self.user.department_memberships.create(department=medicine, member_type="supervisor", start_date=date.today())
+
+        claims = self._authenticate(token).principal_claims
+
+        self.assertEqual(claims["department_ids"], sorted([self.department.pk, medicine.pk]))
+
+    def test_deactivated_user_is_rejected_with_an_unexpired_token(self):
+        token = self._access_token()
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(token)
+
+    def test_api_requests_run_with_the_principal(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self._access_token()}")
+
+        response = self.client.get(reverse("auth_api:me"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["username"], "principal_hod")
+
+    @override_settings(AUTH_PRINCIPAL_SHARED_CACHE=False)
+    def test_per_process_cache_rechecks_role_and_activity(self):
+        token = self._access_token()
+        # A queryset update stands in for a change made by another worker,
+        # whose revocation never reaches this process's cache.
+        User.objects.filter(pk=self.user.pk).update(role="ADMIN")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._authenticate(token).role, "ADMIN")
+        self.assertGreater(len(queries), 1)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(token)
+
+    @override_settings(AUTH_PRINCIPAL_SHARED_CACHE=False)
+    def test_per_process_cache_serves_unchanged_claims_with_one_query(self):
+        token = self._access_token()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self._authenticate(token).principal_claims["is_hod"])
+        self.assertEqual(len(queries), 1)
@@ -4,7 +4,8 @@ Legacy HTML view tests removed; only model-level and API tests remain.
 """
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
 
 from django.contrib.auth import get_user_model
@@ -84,6 +85,49 @@ class UserAPIAuthTests(TestCase):
         mocked_send_mail.assert_called_once()
 
 
+@override_settings(AUTH_ME_CACHE_TTL=60)
+class AuthMeReadOnlyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.department = Department.objects.create(name="Medicine", code="MED-ME")
+        self.resident = User.objects.create_user(
+            username="me_res", password="pass", role="RESIDENT",
+            first_name="Me", last_name="Resident", email="me@example.com", phone_number="0300",
+        )
+        self.profile = ResidentProfile.objects.create(user=self.resident)
+        self.client.force_authenticate(self.resident)
+
+    def test_repeated_me_calls_do_not_write_history(self):
+        self.client.get("/api/auth/me/")
+        user_history = self.resident.history.count()
+        profile_history = self.profile.history.count()
+
+        for _ in range(3):
+            r = self.client.get("/api/auth/me/")
+            self.assertEqual(r.status_code, 200)
+
+        self.assertEqual(self.resident.history.count(), user_history)
+        self.assertEqual(self.profile.history.count(), profile_history)
+
+    def test_cached_payload_served_without_queries(self):
+        first = self.client.get("/api/auth/me/")
+        # force_authenticate skips the user lookup, so a cache hit needs no queries.
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/auth/me/")
+        self.assertEqual(first.data, second.data)
+
+    def test_profile_edit_invalidates_cache(self):
+        r = self.client.get("/api/auth/me/")
+        self.assertIn("department_ref", r.data["missing_required_fields"])
+
+        self.profile.department_ref = self.department
+        self.profile.save()
+
+        r = self.client.get("/api/auth/me/")
+        self.assertNotIn("department_ref", r.data["missing_required_fields"])
+
+
 class UserbaseReadOnlyScopeTests(TestCase):
     def setUp(self):
         self.client = APIClient()
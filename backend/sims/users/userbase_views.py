@@ -40,6 +40,7 @@ from sims.users.userbase_serializers import (
 )
 from sims.users.services import (
     create_user_with_profile,
+    get_auth_me_payload,
     get_missing_profile_fields,
     recalculate_profile_completion,
     PROFILE_COMPLETION_REQUIREMENTS,
@@ -587,52 +588,7 @@ class AuthMeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        recalculate_profile_completion(user)
-        user.refresh_from_db()
-        missing = get_missing_profile_fields(user)
-        missing_fields = [m["field"] for m in missing]
-
-        role = user.role
-        profile_type = ""
-        profile_id = None
-        profile_status = "INCOMPLETE"
-        profile_schema_version = 1
-        completed_schema_version = 0
-
-        if role in PROFILE_COMPLETION_REQUIREMENTS:
-            req_config = PROFILE_COMPLETION_REQUIREMENTS[role]
-            profile_relation = req_config["profile_relation"]
-            profile = getattr(user, profile_relation, None)
-            if profile:
-                profile_type = profile.__class__.__name__
-                profile_id = profile.id
-                profile_status = profile.profile_status
-                profile_schema_version = profile.profile_schema_version
-                completed_schema_version = profile.completed_schema_version
-
-        if user.must_change_password:
-            allowed_next_route = "/change-password"
-        elif missing:
-            allowed_next_route = "/complete-profile"
-        else:
-            allowed_next_route = user.get_dashboard_url()
-
-        data = {
-            "id": user.id,
-            "username": user.username,
-            "role": user.role,
-            "must_change_password": user.must_change_password,
-            "is_profile_complete": user.is_profile_complete,
-            "profile_type": profile_type,
-            "profile_id": profile_id,
-            "profile_status": profile_status,
-            "profile_schema_version": profile_schema_version,
-            "completed_schema_version": completed_schema_version,
-            "missing_required_fields": missing_fields,
-            "allowed_next_route": allowed_next_route,
-        }
-        return Response(data, status=status.HTTP_200_OK)
+        return Response(get_auth_me_payload(request.user), status=status.HTTP_200_OK)
 
 
 @extend_schema(responses={200: None})
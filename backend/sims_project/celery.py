@@ -7,6 +7,7 @@ This module sets up Celery for async task processing.
 import os
 
 from celery import Celery
+from celery.schedules import crontab
 
 # Set the default Django settings module
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sims_project.settings")
@@ -19,9 +20,23 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # Auto-discover tasks from installed apps
 app.autodiscover_tasks()
 
-# Celery Beat schedule for periodic tasks.
-# Keep empty here because production uses django-celery-beat DatabaseScheduler.
-app.conf.beat_schedule = {}
+# Celery Beat schedule for periodic tasks. django-celery-beat's
+# DatabaseScheduler (used in production) installs these entries into its
+# tables on startup; further periodic tasks can be managed in the admin.
+app.conf.beat_schedule = {
+    "reconcile-inbox-counters": {
+        "task": "sims.training.tasks.reconcile_inbox_counters",
+        "schedule": crontab(minute=30, hour=2),
+    },
+    "maintain-activity-logs": {
+        "task": "sims.audit.tasks.maintain_activity_logs",
+        "schedule": crontab(minute=0, hour=3),
+    },
+    "send-rotation-deadline-reminders": {
+        "task": "sims.notifications.tasks.send_rotation_deadline_reminders",
+        "schedule": crontab(minute=0, hour=7),
+    },
+}
 
 
 @app.task(bind=True)
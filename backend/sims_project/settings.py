@@ -110,6 +110,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "simple_history.middleware.HistoryRequestMiddleware",
+    "sims.audit.middleware.ActivityLogBufferMiddleware",  # Batch ActivityLog writes per request
     "sims_project.middleware.PerformanceTimingMiddleware",  # Performance monitoring
 ]
 
@@ -289,7 +290,7 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "sims.users.authentication.PrincipalJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -349,6 +350,20 @@ CACHES = {
     }
 }
 
+# Seconds a user's /auth/me payload is cached (0 disables). Entries are also
+# invalidated on any save of the user or its profile.
+AUTH_ME_CACHE_TTL = int(os.environ.get("AUTH_ME_CACHE_TTL", "30"))
+# Seconds rebuilt JWT principal claims are cached per user (0 disables). Any
+# change behind the claims moves the user to a new principal version.
+AUTH_PRINCIPAL_CACHE_TTL = int(os.environ.get("AUTH_PRINCIPAL_CACHE_TTL", "300"))
+# Whether the cache is shared by every worker, so a principal revocation
+# reaches them all. "auto": inferred from the backend (local-memory and dummy
+# caches are per-process, and then role/is_active are re-read per request).
+_principal_shared_cache = os.environ.get("AUTH_PRINCIPAL_SHARED_CACHE", "auto").lower()
+AUTH_PRINCIPAL_SHARED_CACHE = (
+    None if _principal_shared_cache == "auto" else _principal_shared_cache in ("true", "1", "yes")
+)
+
 # Session Configuration
 if os.environ.get("SESSION_ENGINE") == "django.contrib.sessions.backends.cache":
     SESSION_ENGINE = "django.contrib.sessions.backends.cache"
@@ -364,6 +379,15 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 
+# Eligibility recompute queue: signals only mark training records stale and a
+# debounced Celery task recomputes each marked record once per burst.
+ELIGIBILITY_RECOMPUTE_ASYNC = os.environ.get(
+    "ELIGIBILITY_RECOMPUTE_ASYNC", "true"
+).lower() in ("true", "1", "yes")
+ELIGIBILITY_RECOMPUTE_DEBOUNCE_SECONDS = int(
+    os.environ.get("ELIGIBILITY_RECOMPUTE_DEBOUNCE_SECONDS", "30")
+)
+
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
@@ -451,6 +475,40 @@ ANALYTICS_REQUEST_SAMPLING = max(
 ANALYTICS_CACHE_TTL = int(os.environ.get("ANALYTICS_CACHE_TTL", "60"))
 ANALYTICS_UI_INGEST_RATE = os.environ.get("ANALYTICS_UI_INGEST_RATE", "120/min")
 
+# Background bulk imports: uploads are staged here (must be shared with the
+# Celery workers) and processed BULK_IMPORT_CHUNK_SIZE rows per progress tick.
+BULK_IMPORT_STAGING_DIR = os.environ.get("BULK_IMPORT_STAGING_DIR", str(BASE_DIR / "bulk_imports"))
+BULK_IMPORT_CHUNK_SIZE = int(os.environ.get("BULK_IMPORT_CHUNK_SIZE", "200"))
+# Background dataset exports are written here and served back through the
+# bulk operation download endpoint.
+BULK_EXPORT_DIR = os.environ.get("BULK_EXPORT_DIR", str(BASE_DIR / "bulk_exports"))
+# ActivityLog entries are buffered per request / bulk job and written with
+# bulk_create every AUDIT_LOG_BATCH_SIZE entries; AUDIT_LOG_ASYNC hands request
+# batches to a Celery task after commit instead.
+AUDIT_LOG_BATCH_SIZE = int(os.environ.get("AUDIT_LOG_BATCH_SIZE", "500"))
+AUDIT_LOG_ASYNC = os.environ.get("AUDIT_LOG_ASYNC", "false").lower() in ("true", "1", "yes")
+# ActivityLog is partitioned by month on PostgreSQL; archive_activity_logs keeps
+# AUDIT_LOG_RETENTION_MONTHS (plus the current month) live and moves older
+# months to gzipped JSONL in AUDIT_LOG_ARCHIVE_DIR. AUDIT_PARTITION_BACKEND may
+# name a custom sims.audit.partitions.PartitionBackend.
+AUDIT_LOG_RETENTION_MONTHS = int(os.environ.get("AUDIT_LOG_RETENTION_MONTHS", "12"))
+AUDIT_LOG_ARCHIVE_DIR = os.environ.get("AUDIT_LOG_ARCHIVE_DIR", str(BASE_DIR / "audit_archive"))
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.environ.get("AUDIT_PARTITION_MONTHS_AHEAD", "2"))
+AUDIT_PARTITION_BACKEND = os.environ.get("AUDIT_PARTITION_BACKEND", "")
+# Rows fetched per keyset page by the streaming activity log export.
+AUDIT_EXPORT_PAGE_SIZE = int(os.environ.get("AUDIT_EXPORT_PAGE_SIZE", "2000"))
+# Academics monitoring dashboards: payloads are cached per write-bumped version;
+# the data-quality issue total rides on its own (longer) TTL.
+MONITORING_CACHE_TTL = int(os.environ.get("MONITORING_CACHE_TTL", "60"))
+MONITORING_DATA_QUALITY_TTL = int(os.environ.get("MONITORING_DATA_QUALITY_TTL", "300"))
+# Supervisor resident/department scopes are cached per user and retired by a
+# version bumped on assignment, membership and supervisor-profile writes.
+SUPERVISION_SCOPE_CACHE_TTL = int(os.environ.get("SUPERVISION_SCOPE_CACHE_TTL", "300"))
+# Keyset-paginated training inboxes (approval queues, my rotations/leaves):
+# default and maximum ?limit= per page.
+INBOX_PAGE_SIZE = int(os.environ.get("INBOX_PAGE_SIZE", "50"))
+INBOX_MAX_PAGE_SIZE = int(os.environ.get("INBOX_MAX_PAGE_SIZE", "200"))
+
 GLOBAL_SEARCH_CONFIG = {
     "MAX_RESULTS": int(os.environ.get("SEARCH_MAX_RESULTS", "100")),
     "RECENT_HISTORY_LIMIT": 10,
@@ -60,10 +60,24 @@ CACHES = {
     }
 }
 
+# Per-user response caches are opted into explicitly by the tests that cover them.
+AUTH_ME_CACHE_TTL = 0
+AUTH_PRINCIPAL_CACHE_TTL = 0
+# Tests run in one process, where the local-memory cache is shared.
+AUTH_PRINCIPAL_SHARED_CACHE = True
+MONITORING_CACHE_TTL = 0
+SUPERVISION_SCOPE_CACHE_TTL = 0
+MONITORING_DATA_QUALITY_TTL = 0
+
+# Run Celery tasks inline; no broker is available in tests.
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
+
 # Set a very high login rate limit so throttling never triggers in tests.
 LOGIN_RATE_LIMIT = "10000/min"
 LOGIN_RATE_LIMIT_BLOCK_DURATION = 1
 
+import os
 import tempfile
 import atexit
 import shutil
@@ -74,3 +88,7 @@ MEDIA_ROOT = TEMP_MEDIA_ROOT
 
 # Clean up the temporary directory on exit
 atexit.register(lambda: shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True))
+
+# Stage background bulk-import uploads inside the temporary media tree.
+BULK_IMPORT_STAGING_DIR = os.path.join(TEMP_MEDIA_ROOT, "bulk_imports")
+BULK_EXPORT_DIR = os.path.join(TEMP_MEDIA_ROOT, "bulk_exports")